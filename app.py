@@ -1,12 +1,37 @@
 import streamlit as st
 import requests
 import json
-import openai
+import logging
 import time
+import fnmatch
 import tempfile
 import os
 import zipfile
-from utils import get_site_locales
+from utils import WEBFLOW_API_BASE, get_site_locales, webflow_request
+from changeset import (accepted_changes, add_changes, change_id, change_key, change_set_rows, change_set_totals,
+                       changes_to_nodes, diff_dom_texts, dom_texts, export_change_set, forget_localized, get_localized,
+                       edit_changes, keep_unwritten, merge_changes, new_change_set, rejected_changes,
+                       remember_localized, replace_changes, review_rows, set_rejections)
+from glossary import glossary_version
+from exchange import (EXPORT_FORMATS, UPLOAD_TYPES, dom_import_changes, dom_segment_id, dom_segments, find_locale,
+                      read_exchange, remove_export_file, validate_segments, write_export_file)
+from ingestion import DOCUMENT_TYPES, ingest_document, match_rows, seed_memory
+from dedup import SegmentMemo, build_segment_payload, dedup_stats, fan_out, format_dedup_stats, normalize_segment, parse_segment_response
+from concurrency import DEFAULT_MAX_LIMIT, fixed_limit, format_limiter_stats
+from locale_terms import enforce_segments, map_segments
+from translation_memory import recall_segments
+from quality import format_failures, gate_translations, quality_notes, review_changes
+from metrics import observe, timed
+from llm import format_cache_stats, openai_chat, usage_cache_stats
+from prompts import ARABIC_QUESTION_MARK_RULE, DERIV_CONTEXT_RULE, JSON_OUTPUT_INSTRUCTIONS, build_locale_prompt, build_static_prompt
+from sweep import DEFAULT_SWEEP_WORKERS, result_matrix, run_sweep, sweep_counts
+from translation import get_glossary_terms
+from usage import UsageTracker, format_usage_totals, track_usage
+from logs import log_event, log_payload, setup_logging
+
+# Log records are queued and written by a background thread
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Hide the default menu
 st.set_page_config(
@@ -16,14 +41,14 @@ st.set_page_config(
 
 def validate_api_token(api_key):
     """Validate API token by making a test request"""
-    url = "https://api.webflow.com/v2/sites"
+    url = f"{WEBFLOW_API_BASE}/sites"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = webflow_request("GET", url, headers=headers)
         response.raise_for_status()
         return True
     except requests.exceptions.HTTPError as e:
@@ -40,21 +65,21 @@ def validate_api_token(api_key):
 
 def get_pages(site_id, api_key):
     """Get list of pages with their IDs"""
-    url = f"https://api.webflow.com/v2/sites/{site_id}/pages"
+    url = f"{WEBFLOW_API_BASE}/sites/{site_id}/pages"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
     }
     
-    print(f"\n[DEBUG] Fetching pages from URL: {url}")
+    log_event(logger, logging.DEBUG, "fetch pages", site_id=site_id)
     try:
-        response = requests.get(url, headers=headers)
+        response = webflow_request("GET", url, headers=headers)
         response.raise_for_status()
         pages = response.json()["pages"]
-        print(f"[DEBUG] Successfully fetched {len(pages)} pages")
+        log_event(logger, logging.INFO, "fetched pages", total=len(pages))
         return pages
     except Exception as e:
-        print(f"[DEBUG] Error fetching pages: {str(e)}")
+        log_event(logger, logging.ERROR, "fetch pages failed", site_id=site_id, error=str(e))
         st.error(f"Error fetching pages: {str(e)}")
         return []
 
@@ -334,9 +359,13 @@ with st.sidebar:
                     st.session_state.pages = pages
                     st.success(f"Successfully fetched {len(pages)} pages and {len(locales)} locales!")
 
-def get_page_content(page_id, api_key):
-    """Get page content using DOM endpoint with pagination handling"""
-    base_url = f"https://api.webflow.com/v2/pages/{page_id}/dom"
+def get_page_content(page_id, api_key, locale_id=None):
+    """Get page content using DOM endpoint with pagination handling
+    
+    With a locale_id the localized content of that locale is returned.
+    """
+    base_url = f"{WEBFLOW_API_BASE}/pages/{page_id}/dom"
+    locale_param = f"&localeId={locale_id}" if locale_id else ""
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}",
@@ -349,10 +378,10 @@ def get_page_content(page_id, api_key):
     
     while True:
         # Construct URL with pagination parameters
-        url = f"{base_url}?limit={limit}&offset={offset}"
+        url = f"{base_url}?limit={limit}&offset={offset}{locale_param}"
         
-        print(f"\nFetching nodes {offset} to {offset + limit}...")
-        response = requests.get(url, headers=headers)
+        log_event(logger, logging.DEBUG, "fetch page content", page_id=page_id, locale_id=locale_id, offset=offset)
+        response = webflow_request("GET", url, headers=headers)
         response.raise_for_status()
         data = response.json()
         
@@ -364,7 +393,9 @@ def get_page_content(page_id, api_key):
         pagination = data.get('pagination', {})
         total = pagination.get('total', 0)
         
-        print(f"Retrieved {len(current_nodes)} nodes (Total: {len(all_nodes)}/{total})")
+        log_event(logger, logging.DEBUG, "fetched page content", page_id=page_id, count=len(current_nodes),
+                  fetched=len(all_nodes), total=total)
+        log_payload(logger, "page content response", data, page_id=page_id, offset=offset)
         
         # Check if we've got all nodes
         if len(all_nodes) >= total:
@@ -380,6 +411,7 @@ def get_page_content(page_id, api_key):
         "lastUpdated": data.get("lastUpdated")
     }
 
+@timed('parse')
 def parse_page_content(content):
     """Parse page content and extract nodes with property overrides and text nodes"""
     parsed_nodes = []
@@ -422,33 +454,20 @@ def parse_page_content(content):
     
     return parsed_nodes
 
-def display_curl_commands(page_id, locale_id, api_key, nodes):
-    """Display curl commands for each node"""
-    st.subheader("Generated CURL Commands")
+def translate_content_with_openai(parsed_nodes, target_language, api_key, known_translations=None, notes=None,
+                                  keep_failed=False):
+    """Translate content using OpenAI while preserving JSON structure
     
-    for node in nodes:
-        for prop in node["propertyOverrides"]:
-            curl_command = f"""curl -X POST "https://api.webflow.com/v2/pages/{page_id}/dom?localeId={locale_id}" \\
-     -H "Authorization: Bearer {api_key}" \\
-     -H "Content-Type: application/json" \\
-     -d '{{
-  "nodes": [
-    {{
-      "nodeId": "{node['nodeId']}",
-      "propertyOverrides": [
-        {{
-          "propertyId": "{prop['propertyId']}",
-          "text": "{prop['text']}"
-        }}
-      ]
-    }}
-  ]
-}}'"""
-            st.code(curl_command, language="bash")
-            st.markdown("---")
-
-def translate_content_with_openai(parsed_nodes, target_language, api_key):
-    """Translate content using OpenAI while preserving JSON structure"""
+    known_translations maps normalized source segments to translations into
+    target_language (e.g. from other pages of a sweep); only the remaining
+    segments are sent to OpenAI. notes maps normalized source segments to a
+    reviewer's reasons for rejecting their previous translation; those are
+    always sent to OpenAI with the notes. With keep_failed, translations
+    still failing the quality checks are returned for review instead of an
+    error.
+    """
+    known_translations = known_translations or {}
+    notes = notes or {}
     try:
         # First verify we have valid inputs
         if not parsed_nodes:
@@ -458,61 +477,74 @@ def translate_content_with_openai(parsed_nodes, target_language, api_key):
         if not api_key:
             return None, "OpenAI API key is missing"
             
-        client = openai.OpenAI(api_key=api_key)
+        log_payload(logger, "translation request", parsed_nodes, locale=target_language)
         
-        # Print debug information
-        print("\n" + "="*50)
-        print("TRANSLATION REQUEST")
-        print("="*50)
-        print(f"Target Language: {target_language}")
-        print("Content to translate:")
-        print(json.dumps(parsed_nodes, indent=2))
+        # The static prompt (rules + glossary) is identical for every locale so
+        # it can be served from the provider's prompt cache; only the short
+        # locale prompt changes between languages
+        static_prompt = build_static_prompt(
+            task='Translate only the "text" values in the JSON.',
+            glossary_terms=get_glossary_terms(),
+            rules=[
+                DERIV_CONTEXT_RULE,
+                "Keep product names such as Forex, CFDs, P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, Deriv Bot, and Binary Bot in English.",
+                "Do not translate the following names of people explicitly mentioned in the JSON: Louise Wolf, Rakshit Choudhary,Chris Horn, Seema Hallon, Jean-Yves Sireau, and others. Keep them in English.",
+                'Do not translate "24/7". Keep the number in English.',
+                ARABIC_QUESTION_MARK_RULE
+            ],
+            output_instructions=JSON_OUTPUT_INSTRUCTIONS
+        )
         
-        # Get all terms from the glossary that should not be translated
-        do_not_translate_terms = []
-        if 'glossary' in st.session_state:
-            for category, terms in st.session_state.glossary.items():
-                do_not_translate_terms.extend(terms)
+        # Collapse repeated texts (button labels, disclaimers, CTAs) so each
+        # unique segment is only translated once
+        plan, segment_payload = build_segment_payload(parsed_nodes)
+        log_event(logger, logging.INFO, "translation request", locale=target_language,
+                  dedup=format_dedup_stats(dedup_stats(plan)))
         
-        # Format the terms as a bulleted list for the prompt
-        terms_list = "\n".join([f"- {term}" for term in do_not_translate_terms])
+        # Rejected segments always go to the model, with the reviewer's notes,
+        # even when known translations, memory or term mappings cover them
+        rejected = {idx for idx, text in enumerate(plan['unique']) if normalize_segment(text) in notes}
+        review_notes = [f"Segment {idx}: {notes[normalize_segment(plan['unique'][idx])]}" for idx in sorted(rejected)]
         
-        # Prepare the system message explaining what we want
-        system_message = f"""You are a professional translator with 20 years of experience.  
-        Translate only the "text" values in the JSON to {target_language}.
-
-        If the {target_language} is "sw", then in that case translate to Swahili.
-                 
-        DO NOT TRANSLATE the following terms - keep them exactly as they appear:
-        {terms_list}
-        
-        Follow these additional rules when translating:
-        - When encountering the word "Deriv" and any succeeding word, analyze the context and based on it, keep it in English. For example, "Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be kept in English.
-        - Keep product names such as Forex, CFDs, P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, Deriv Bot, and Binary Bot in English.
-        - Do not translate the following names of people explicitly mentioned in the JSON: Louise Wolf, Rakshit Choudhary,Chris Horn, Seema Hallon, Jean-Yves Sireau, and others. Keep them in English.
-        - Do not translate "24/7". Keep the number in English.
-        - When encountering the symbol "?", mirror it in the translated text when the target language is Arabic.
+        # Reuse translations that are already known for this language
+        translations = {
+            idx: known_translations[normalize_segment(text)]
+            for idx, text in enumerate(plan['unique'])
+            if idx not in rejected and normalize_segment(text) in known_translations
+        }
+        # Approved translations from the translation memory need no model call either
+        translations.update(recall_segments(plan['unique'], target_language, skip=translations.keys() | rejected))
+        # Texts made up only of mapped locale terms need no model call
+        mapped, term_mappings = map_segments(plan['unique'], target_language, skip=translations.keys() | rejected)
+        translations.update(mapped)
+        segment_payload["segments"] = [
+            segment for segment in segment_payload["segments"]
+            if segment["id"] not in translations
+        ]
+        if not segment_payload["segments"]:
+            log_event(logger, logging.INFO, "all segments already translated, skipping OpenAI call",
+                      locale=target_language, segments=len(translations))
+            translated_content, _ = fan_out(parsed_nodes, plan, translations)
+            return translated_content, None
         
-        Keep all other JSON structure and values exactly the same.
-        Return only the JSON, no explanations."""
+        locale_prompt = build_locale_prompt(target_language, term_mappings, review_notes)
         
         # Prepare the JSON for translation
-        user_message = f"Translate this JSON content. Original JSON:\n{json.dumps(parsed_nodes, indent=2)}"
+        user_message = f"Translate this JSON content. Original JSON:\n{json.dumps(segment_payload, indent=2)}"
         
         # Make the API call with new syntax
         try:
-            response = client.chat.completions.create(
+            response = openai_chat(
+                api_key=api_key,
                 model="o3-mini",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ]
+                static_prompt=static_prompt,
+                locale_prompt=locale_prompt,
+                locale=target_language,
+                user_message=user_message
                 # temperature=0.3
             )
             
-            # Print the raw response for debugging
-            print("\nOpenAI Response:")
-            print(response)
+            log_payload(logger, "OpenAI response", str(response), locale=target_language)
             
             # Extract and validate the response content
             response_content = response.choices[0].message.content
@@ -522,24 +554,85 @@ def translate_content_with_openai(parsed_nodes, target_language, api_key):
             # Try to parse the JSON response
             try:
                 translated_json = json.loads(response_content)
-                return translated_json, None
+                
+                translated = enforce_segments(plan['unique'], parse_segment_response(translated_json), target_language)
+
+                def retranslate(failures):
+                    retry_payload = {"segments": [segment for segment in segment_payload["segments"]
+                                                  if segment["id"] in failures]}
+                    try:
+                        retry_response = openai_chat(
+                            api_key=api_key,
+                            model="o3-mini",
+                            static_prompt=static_prompt,
+                            locale_prompt=build_locale_prompt(target_language, term_mappings,
+                                                              review_notes + quality_notes(failures)),
+                            locale=target_language,
+                            user_message=f"Translate this JSON content. Original JSON:\n{json.dumps(retry_payload, indent=2)}"
+                        )
+                        retried = parse_segment_response(json.loads(retry_response.choices[0].message.content or ''))
+                    except Exception as e:
+                        return None, str(e)
+                    return enforce_segments(plan['unique'], retried, target_language), None
+
+                # Check the model's output locally and re-request only the failing
+                # segments; nothing is returned for upload while any still fail
+                translated, failures = gate_translations(plan['unique'], translated, target_language, retranslate,
+                                                         keep_failed=keep_failed)
+                if failures and not keep_failed:
+                    return None, format_failures(failures, plan['unique'])
+                translations.update(translated)
+
+                # Fan the unique translations back out to every node that uses them
+                translated_content, missing = fan_out(parsed_nodes, plan, translations)
+                if missing:
+                    return None, f"OpenAI response is missing {len(missing)} of {len(plan['unique'])} segments"
+                return translated_content, None
             except json.JSONDecodeError as e:
-                print(f"JSON Parse Error: {str(e)}")
-                print("Raw response content:")
-                print(response_content)
+                log_event(logger, logging.ERROR, "OpenAI response is not JSON", locale=target_language, error=str(e),
+                          response=response_content)
                 return None, f"Failed to parse OpenAI response as JSON: {str(e)}"
                 
         except Exception as e:
-            print(f"OpenAI API Error: {str(e)}")
+            log_event(logger, logging.ERROR, "OpenAI API error", locale=target_language, error=str(e))
             return None, f"OpenAI API Error: {str(e)}"
             
     except Exception as e:
-        print(f"Unexpected Error: {str(e)}")
+        log_event(logger, logging.ERROR, "translation failed", locale=target_language, error=str(e))
         return None, f"Translation error: {str(e)}"
 
+def get_localized_page_texts(page_id, locale_id, api_key):
+    """Current localized texts of a page, from the cache or fetched from Webflow; None if unavailable"""
+    cache_key = ('page', page_id, locale_id)
+    texts = get_localized(cache_key)
+    if texts is not None:
+        return texts
+    try:
+        texts = dom_texts(parse_page_content(get_page_content(page_id, api_key, locale_id)))
+    except Exception as e:
+        log_event(logger, logging.WARNING, "fetch localized page content failed", page_id=page_id, locale_id=locale_id,
+                  error=str(e))
+        return None
+    remember_localized(cache_key, texts)
+    return texts
+
 def update_page_content(page_id, locale_id, api_key, translated_content):
-    """Update page content with translated text"""
-    url = f"https://api.webflow.com/v2/pages/{page_id}/dom?localeId={locale_id}"
+    """Update page content with translated text
+    
+    Only nodes whose text differs from the current localized content are
+    sent; when nothing changed no request is made. If the localized content
+    can't be read, every node is sent.
+    """
+    url = f"{WEBFLOW_API_BASE}/pages/{page_id}/dom?localeId={locale_id}"
+    
+    current_texts = get_localized_page_texts(page_id, locale_id, api_key)
+    if current_texts is not None:
+        changes, unchanged = diff_dom_texts(current_texts, translated_content)
+        log_event(logger, logging.INFO, "diffed page content", page_id=page_id, locale_id=locale_id,
+                  changed=len(changes), unchanged=unchanged)
+        if not changes:
+            return True, None
+        translated_content = changes_to_nodes(changes)
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}",
@@ -575,47 +668,327 @@ def update_page_content(page_id, locale_id, api_key, translated_content):
         
         request_body["nodes"].append(node_data)
     
-    print("\n" + "="*50)
-    print("UPDATE PAGE CONTENT REQUEST")
-    print("="*50)
-    print(f"URL: {url}")
-    print("\nHeaders:")
-    for key, value in headers.items():
-        if key.lower() == 'authorization':
-            print(f"{key}: Bearer ****{value[-4:]}")
-        else:
-            print(f"{key}: {value}")
-    
-    print("\nPayload:")
-    print(json.dumps(request_body, indent=2))
+    log_payload(logger, "update page content request", request_body, page_id=page_id, locale_id=locale_id)
     
     try:
-        response = requests.post(url, headers=headers, json=request_body)
-        
-        print("\n" + "="*50)
-        print("API RESPONSE")
-        print("="*50)
-        print(f"Status Code: {response.status_code}")
-        try:
-            print(json.dumps(response.json(), indent=2))
-        except:
-            print(response.text)
+        response = webflow_request("POST", url, headers=headers, json=request_body)
+        log_event(logger, logging.INFO, "updated page content", page_id=page_id, locale_id=locale_id,
+                  nodes=len(request_body["nodes"]), status=response.status_code)
+        log_payload(logger, "update page content response", response.text, page_id=page_id)
             
         # Check for specific node errors in the response
+        node_errors = []
         if response.status_code == 200:
             response_data = response.json()
-            if response_data.get("errors"):
-                print("\nWarning: Some nodes had errors:")
-                for error in response_data["errors"]:
-                    print(f"Node {error['nodeId']}: {error['error']}")
+            node_errors = response_data.get("errors") or []
+            for error in node_errors:
+                log_event(logger, logging.WARNING, "node update failed", page_id=page_id, locale_id=locale_id,
+                          node_id=error['nodeId'], error=error['error'])
         
         response.raise_for_status()
+        if current_texts is not None and not node_errors:
+            remember_localized(('page', page_id, locale_id), merge_changes(current_texts, changes))
+        else:
+            forget_localized(('page', page_id, locale_id))
         return True, None
     except Exception as e:
+        forget_localized(('page', page_id, locale_id))
         error_message = str(e)
-        print(f"\nERROR: {error_message}")
+        log_event(logger, logging.ERROR, "update page content failed", page_id=page_id, locale_id=locale_id,
+                  error=error_message)
         return False, error_message
 
+def retranslate_rejected_page_changes(entry, locale_code, source_nodes):
+    """Re-request only the rejected changes of a locale, with each rejection note as context
+    
+    Accepted changes are kept as they are. Re-translations that still fail
+    the quality checks stay rejected with the problems as note. Returns
+    (re-translated count, error).
+    """
+    sources = dom_texts(source_nodes)
+    rejected = [change for change in rejected_changes(entry) if change_key(change) in sources]
+    if not rejected:
+        return 0, "The rejected texts are not in the loaded page content"
+    
+    notes = {}
+    for change in rejected:
+        note = change['rejected']
+        if isinstance(change['new'], str):
+            note += f' (rejected translation: "{change["new"]}")'
+        notes[normalize_segment(sources[change_key(change)])] = note
+    retry_nodes = changes_to_nodes([{**change, 'new': sources[change_key(change)]} for change in rejected])
+    translated_content, error = translate_content_with_openai(retry_nodes, locale_code, st.session_state.openai_key,
+                                                              notes=notes, keep_failed=True)
+    if error:
+        return 0, error
+    
+    translated_texts = dom_texts(translated_content)
+    retried = {change_id(change): translated_texts[change_key(change)] for change in rejected
+               if change_key(change) in translated_texts}
+    replace_changes(entry, retried)
+    review_changes([change for change in entry['changes'] if change_id(change) in retried], sources, locale_code)
+    log_event(logger, logging.INFO, "re-translated rejected page texts", locale=locale_code, segments=len(retried),
+              still_rejected=len(rejected_changes(entry)))
+    return len(retried), None
+
+def render_page_change_set(page_id, state_key='page_change_set', title="Dry Run Change Set"):
+    """Show the staged changes of a page, let the user edit or reject single values and apply the accepted writes"""
+    change_set = st.session_state.get(state_key)
+    if not change_set or change_set['target_id'] != page_id:
+        return
+    
+    st.subheader(title)
+    st.caption("Edit a translation in place, or tick Reject (and add a note) for translations that must not be "
+               "written; they can be re-translated on their own while the accepted ones are kept.")
+    for locale_code, entry in change_set['locales'].items():
+        if entry['changes']:
+            with st.expander(f"Changes for {locale_code}", expanded=bool(rejected_changes(entry))):
+                rows = review_rows(entry)
+                edited = st.data_editor(rows, use_container_width=True, hide_index=True,
+                                        disabled=[column for column in rows[0]
+                                                  if column not in ('Translation', 'Reject', 'Note')],
+                                        key=f"review_{state_key}_{locale_code}_{entry.get('revision', 0)}")
+                edit_changes(entry, {row['Segment']: row['Translation'] for row in edited})
+                set_rejections(entry, {row['Segment']: row['Note'] for row in edited if row['Reject']})
+    
+    totals = change_set_totals(change_set)
+    accepted = totals['changed'] - totals['rejected']
+    st.write(f"{totals['changed']} values would change ({totals['rejected']} rejected), {totals['unchanged']} "
+             f"are already up to date (byte delta {totals['bytes']:+d})")
+    st.dataframe(change_set_rows(change_set), use_container_width=True, hide_index=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Download change set (JSON)", export_change_set(change_set),
+                           file_name=f"changes-{page_id}.json", mime="application/json",
+                           key=f"download_{state_key}")
+    with col2:
+        if totals['rejected'] and st.button(f"Re-translate {totals['rejected']} rejected", key=f"retry_{state_key}"):
+            usage_tracker = UsageTracker('pages_retry', source=page_id)
+            for locale_code, entry in change_set['locales'].items():
+                if not rejected_changes(entry):
+                    continue
+                with st.spinner(f"Re-translating rejected texts for {locale_code}..."), track_usage(usage_tracker):
+                    _, error = retranslate_rejected_page_changes(entry, locale_code,
+                                                             st.session_state.parsed_nodes or [])
+                if error:
+                    st.error(f"Re-translation failed for {locale_code}: {error}")
+            usage_tracker.save()
+            st.rerun()
+    with col3:
+        if accepted and st.button(f"Apply {accepted} changes to Webflow", key=f"apply_{state_key}"):
+            # The accepted translations are written as they are and only the
+            # changed nodes are sent; rejected ones and failed writes stay staged
+            failed = {}
+            for locale_code, entry in change_set['locales'].items():
+                changes = accepted_changes(entry)
+                if not changes:
+                    continue
+                success, error = update_page_content(page_id, entry['locale_id'], st.session_state.api_key,
+                                                     changes_to_nodes(changes))
+                if success:
+                    st.success(f"Updated {len(changes)} values for {locale_code}")
+                else:
+                    st.error(f"Failed to update content for {locale_code}: {error}")
+                    failed[locale_code] = {change_id(change): error for change in changes}
+            if not keep_unwritten(change_set, failed):
+                st.session_state[state_key] = None
+
+def render_page_exchange(page_id):
+    """Export the page's texts for a translation vendor and stage the vendor's edited file as a change set"""
+    locale_options = {f"{locale.get('displayName', 'Unnamed')} ({locale.get('tag', 'No tag')})": locale
+                      for locale in st.session_state.locales if locale.get('type') != 'Primary'}
+    export_tab, import_tab = st.tabs(["Export", "Import"])
+    
+    with export_tab:
+        col1, col2 = st.columns(2)
+        with col1:
+            language = st.selectbox("Language", options=list(locale_options.keys()), key="page_exchange_language")
+        with col2:
+            export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key="page_exchange_format")
+        if language and st.button("Prepare export", key="prepare_page_exchange"):
+            locale = locale_options[language]
+            with st.spinner("Reading the current translations..."):
+                current_texts = get_localized_page_texts(page_id, locale.get('id'), st.session_state.api_key)
+            if current_texts is None:
+                st.warning(f"Could not read the current {locale.get('tag')} content; targets are left empty")
+            remove_export_file(st.session_state.get('page_exchange_file'))
+            st.session_state.page_exchange_file = {
+                'page_id': page_id,
+                **write_export_file(export_format, 'page', page_id, locale.get('tag'),
+                                    dom_segments(st.session_state.parsed_nodes, current_texts, locale.get('tag')))
+            }
+        export = st.session_state.get('page_exchange_file')
+        if export and export['page_id'] == page_id and os.path.exists(export['path']):
+            with open(export['path'], 'rb') as file:
+                st.download_button(f"Download {export['file_name']} ({export['segments']} segments)", file,
+                                   file_name=export['file_name'], mime=export['mime'], key="download_page_exchange")
+    
+    with import_tab:
+        uploaded_file = st.file_uploader("Vendor file (XLIFF 2.0 or CSV)", type=UPLOAD_TYPES, key="page_exchange_upload")
+        if uploaded_file and st.button("Check file", key="check_page_exchange"):
+            document, error = read_exchange(uploaded_file)
+            if not error and (document['target_type'], document['target_id']) != ('page', page_id):
+                error = f"The file is for {document['target_type']} {document['target_id']}, not this page"
+            locale = find_locale(locale_options.values(), document['locale']) if not error else None
+            if not error and locale is None:
+                error = f"The site has no secondary locale '{document['locale']}'"
+            if error:
+                st.error(error)
+            else:
+                known_ids = [dom_segment_id(*key) for key in dom_texts(st.session_state.parsed_nodes)]
+                targets, errors = validate_segments(document, known_ids)
+                current_texts = get_localized_page_texts(page_id, locale.get('id'), st.session_state.api_key) or {}
+                changes, unchanged = dom_import_changes(targets, current_texts)
+                change_set = new_change_set('page', page_id)
+                add_changes(change_set, locale.get('tag'), locale.get('id'), changes, unchanged)
+                st.session_state.page_exchange_change_set = change_set
+                log_event(logger, logging.INFO, "staged vendor import", page_id=page_id, locale=locale.get('tag'),
+                          changed=len(changes), unchanged=unchanged, rejected=len(errors))
+                if errors:
+                    st.warning(f"{len(errors)} segments were skipped")
+                    st.dataframe(errors, use_container_width=True, hide_index=True)
+        render_page_change_set(page_id, state_key='page_exchange_change_set')
+
+def render_page_ingestion(page_id):
+    """Align an already-translated DOCX/PDF with the page and seed the translation memory"""
+    locale_options = {f"{locale.get('displayName', 'Unnamed')} ({locale.get('tag', 'No tag')})": locale
+                      for locale in st.session_state.locales if locale.get('type') != 'Primary'}
+    segments = list(dom_texts(st.session_state.parsed_nodes).items())
+    col1, col2 = st.columns(2)
+    with col1:
+        language = st.selectbox("Language of the document", options=list(locale_options.keys()),
+                                key="page_ingestion_language")
+    with col2:
+        uploaded_file = st.file_uploader("Translated document", type=DOCUMENT_TYPES, key="page_ingestion_upload")
+    if uploaded_file and language and st.button("Align with page", key="align_page_document"):
+        locale_code = locale_options[language].get('tag')
+        with st.spinner("Reading and aligning the document..."):
+            matches, error = ingest_document(uploaded_file, segments, locale_code)
+        if error:
+            st.error(error)
+            st.session_state.page_ingestion = None
+        else:
+            st.session_state.page_ingestion = {'page_id': page_id, 'locale': locale_code, 'file': uploaded_file.name,
+                                               'matches': matches}
+    
+    ingestion = st.session_state.get('page_ingestion')
+    if not ingestion or ingestion['page_id'] != page_id:
+        return
+    matches = ingestion['matches']
+    st.write(f"{sum(1 for match in matches if match['translation'])} of {len(matches)} texts matched a paragraph "
+             f"of {ingestion['file']}; check the selection before seeding")
+    edited = st.data_editor(match_rows(matches), use_container_width=True, hide_index=True,
+                            disabled=['Source', 'Translation', 'Confidence', 'Note'], key="page_ingestion_rows")
+    if st.button(f"Seed translation memory ({ingestion['locale']})", key="seed_page_memory"):
+        stored, error = seed_memory(segments, matches, [row['Seed'] for row in edited], ingestion['locale'],
+                                    ingestion['file'])
+        if error:
+            st.error(error)
+        else:
+            st.success(f"Stored {stored} page texts; they will no longer be sent to OpenAI for {ingestion['locale']}")
+            st.session_state.page_ingestion = None
+
+def sweep_pages(pages, locales, max_workers, memo):
+    """Fetch, translate and update every (page, locale) pair; returns the unit results
+    
+    The memo is kept for the session, so texts shared between pages and
+    earlier sweeps are translated once per locale.
+    """
+    api_key = st.session_state.api_key
+    openai_key = st.session_state.openai_key
+    
+    def fetch(page):
+        return parse_page_content(get_page_content(page['id'], api_key)), None
+    
+    def translate(page, parsed_nodes, locale):
+        if not parsed_nodes:
+            return [], None
+        known = memo.known_translations(parsed_nodes, locale['tag'])
+        translated, error = translate_content_with_openai(parsed_nodes, locale['tag'], openai_key,
+                                                          known_translations=known)
+        if not error:
+            memo.prime_from(parsed_nodes, translated, locale['tag'])
+        return translated, error
+    
+    def update(page, locale, translated):
+        current_texts = get_localized_page_texts(page['id'], locale['id'], api_key)
+        if not translated or (current_texts is not None and not diff_dom_texts(current_texts, translated)[0]):
+            return {'skipped': True}, None
+        success, error = update_page_content(page['id'], locale['id'], api_key, translated)
+        return ({'skipped': False} if success else None), error
+    
+    progress_bar = st.progress(0.0)
+    status = st.empty()
+    
+    def on_result(result, done, total):
+        progress_bar.progress(done / total)
+        status.info(f"{done}/{total} page translations done: {result['target']} ({result['locale']}) {result['status']}")
+    
+    results = run_sweep(pages, locales, fetch, translate, update, max_workers=max_workers, on_result=on_result)
+    status.empty()
+    return results
+
+def render_page_sweep():
+    """Site-wide sweep: selected pages, or every page matching a slug pattern, into every selected locale"""
+    st.write("Translate many pages into many languages in one run.")
+    
+    selection_mode = st.radio("Pages", ["Select pages", "Slug pattern"], horizontal=True, key="page_sweep_mode")
+    if selection_mode == "Select pages":
+        page_options = {f"{page.get('title', 'Untitled')} ({page['id']})": page for page in st.session_state.pages}
+        selected = st.multiselect("Pages to translate", options=list(page_options.keys()), key="page_sweep_pages")
+        matching = [page_options[name] for name in selected]
+    else:
+        pattern = st.text_input("Slug pattern", value="*", key="page_sweep_pattern",
+                                help="Shell-style wildcards, e.g. blog-* or *-trading")
+        matching = [page for page in st.session_state.pages if fnmatch.fnmatch(page.get('slug') or '', pattern)]
+        st.caption(f"{len(matching)} pages match")
+    
+    secondary_locales = [locale for locale in st.session_state.locales if locale.get('type') != 'Primary']
+    locale_options = {f"{locale.get('displayName', 'Unnamed')} ({locale.get('tag', 'No tag')})": locale
+                      for locale in secondary_locales}
+    sweep_languages = st.multiselect("Languages", options=list(locale_options.keys()),
+                                     default=list(locale_options.keys()), key="page_sweep_languages")
+    
+    adaptive = st.checkbox("Adaptive concurrency (raise parallel requests until the APIs push back)", value=True,
+                           key="page_sweep_adaptive")
+    max_workers = st.slider("Parallel page translations", min_value=1, max_value=DEFAULT_MAX_LIMIT,
+                            value=DEFAULT_SWEEP_WORKERS, key="page_sweep_workers")
+    
+    if not st.button(f"Sweep {len(matching)} pages × {len(sweep_languages)} languages", key="start_page_sweep",
+                     disabled=not matching or not sweep_languages or not st.session_state.openai_key):
+        return
+    
+    # Translations remembered across sweeps were made with a specific glossary
+    if st.session_state.get('page_sweep_memo') is None or \
+            st.session_state.get('page_sweep_glossary_version') != glossary_version():
+        st.session_state.page_sweep_memo = SegmentMemo()
+        st.session_state.page_sweep_glossary_version = glossary_version()
+    targets = [{'id': page['id'], 'name': page.get('title', 'Untitled')} for page in matching]
+    locales = [{'id': locale.get('id'), 'tag': locale.get('tag', 'unknown')}
+               for name, locale in locale_options.items() if name in sweep_languages]
+    
+    start_time = time.time()
+    usage_tracker = UsageTracker('pages_sweep', source=f"{len(targets)} pages")
+    # A fixed limit caps only this sweep; the shared limiters stay adaptive
+    with track_usage(usage_tracker), fixed_limit(None if adaptive else max_workers):
+        results = sweep_pages(targets, locales, max_workers, st.session_state.page_sweep_memo)
+    observe('job', time.time() - start_time, page='pages_sweep')
+    usage_report = usage_tracker.save()
+    
+    counts = sweep_counts(results)
+    st.success(f"Sweep finished in {time.time() - start_time:.0f}s: {counts['updated']} updated, "
+               f"{counts['unchanged']} already up to date, {counts['error']} failed")
+    st.dataframe(result_matrix(results), use_container_width=True, hide_index=True)
+    st.caption(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+    st.caption(format_limiter_stats())
+    st.caption(f"Usage: {format_usage_totals(usage_report['totals'])}")
+    failed = [result for result in results if result['status'] == 'error']
+    if failed:
+        with st.expander(f"View {len(failed)} failed page translations", expanded=False):
+            for result in failed:
+                st.error(f"❌ {result['target']} - {result['locale']}: {result['message']}")
+
 def main():
     st.title("Webflow Page Content Manager")
     
@@ -624,14 +997,10 @@ def main():
     with col2:
         st.image("jameson.webp", caption="J. Jonah Jameson")
     
-    # Print current session state
-    print("\nCurrent Session State:")
-    print(f"Has site_id: {bool(st.session_state.site_id)}")
-    print(f"Has api_key: {bool(st.session_state.api_key)}")
-    print(f"Number of pages: {len(st.session_state.pages)}")
-    print(f"Number of locales: {len(st.session_state.locales)}")
-    print(f"Has OpenAI key: {bool(st.session_state.openai_key)}")
-    print(f"Has current content: {bool(st.session_state.current_content)}")
+    log_event(logger, logging.DEBUG, "session state", has_site_id=bool(st.session_state.site_id),
+              has_api_key=bool(st.session_state.api_key), pages=len(st.session_state.pages),
+              locales=len(st.session_state.locales), has_openai_key=bool(st.session_state.openai_key),
+              has_current_content=bool(st.session_state.current_content))
     
     # Check if credentials are set in session state
     if not st.session_state.api_key or not st.session_state.site_id:
@@ -664,6 +1033,10 @@ def main():
             "Slug": [page.get('slug', 'No slug') for page in st.session_state.pages]
         }
         st.table(page_data)
+        
+        if st.session_state.locales:
+            with st.expander("Site-wide Sweep", expanded=False):
+                render_page_sweep()
     
     # Page selection and content viewing
     if st.session_state.pages:
@@ -729,12 +1102,29 @@ def main():
                         key="translate_languages_select"
                     )
                     
+                    if st.session_state.parsed_nodes:
+                        plan, _ = build_segment_payload(st.session_state.parsed_nodes)
+                        st.caption(f"Deduplication: {format_dedup_stats(dedup_stats(plan))}")
+                    
+                    # A dry run compares the translations with the live localized
+                    # content and lists the writes without sending them
+                    dry_run = st.checkbox(
+                        "Dry run (compute the changes without writing to Webflow)",
+                        key="page_dry_run"
+                    )
+                    # Proofreaders review the same change set before anything is written
+                    stage_changes = dry_run or user_role == "Proofreader"
+                    
                     if st.button("Translate to Selected Languages", key="translate_button"):
                         if not target_languages:
                             st.warning("Please select at least one language")
                             return
                             
-                        print(f"\nTranslating to {len(target_languages)} languages")
+                        log_event(logger, logging.INFO, "translating page", page=selected_page,
+                                  languages=len(target_languages))
+                        job_start_time = time.time()
+                        usage_tracker = UsageTracker('pages', source=selected_page)
+                        change_set = new_change_set('page', page_id)
                         
                         # Create a progress bar
                         progress_bar = st.progress(0)
@@ -743,15 +1133,16 @@ def main():
                         # Process each language
                         for index, target_language in enumerate(target_languages):
                             translation_status.text(f"Processing {target_language} ({index + 1}/{len(target_languages)})")
-                            print(f"\nProcessing language: {target_language}")
                             
                             with st.spinner(f"Translating to {target_language}..."):
                                 # Use the language tag for translation
-                                translated_content, error = translate_content_with_openai(
-                                    st.session_state.parsed_nodes,
-                                    locale_options[target_language]['tag'],
-                                    st.session_state.openai_key
-                                )
+                                with track_usage(usage_tracker):
+                                    translated_content, error = translate_content_with_openai(
+                                        st.session_state.parsed_nodes,
+                                        locale_options[target_language]['tag'],
+                                        st.session_state.openai_key,
+                                        keep_failed=stage_changes
+                                    )
                                 
                                 if error:
                                     st.error(f"Error translating to {target_language}: {error}")
@@ -759,8 +1150,22 @@ def main():
                                 
                                 # Get the locale ID for the API call
                                 locale_id = locale_options[target_language]['id']
-                                print(f"\nUsing locale ID: {locale_id}")
-                                print(f"Language tag: {locale_options[target_language]['tag']}")
+                                
+                                if stage_changes:
+                                    current_texts = get_localized_page_texts(page_id, locale_id, st.session_state.api_key)
+                                    if current_texts is None:
+                                        st.error(f"Error fetching current {target_language} content")
+                                        continue
+                                    changes, unchanged = diff_dom_texts(current_texts, translated_content)
+                                    # Translations failing the quality checks are staged as rejected
+                                    rejected = review_changes(changes, dom_texts(st.session_state.parsed_nodes),
+                                                              locale_options[target_language]['tag'])
+                                    add_changes(change_set, locale_options[target_language]['tag'], locale_id,
+                                                changes, unchanged)
+                                    st.write(f"🔍 {target_language}: {len(changes)} changed ({rejected} rejected), "
+                                             f"{unchanged} unchanged")
+                                    progress_bar.progress((index + 1) / len(target_languages))
+                                    continue
                                 
                                 # Create a minimal status indicator for this language
                                 st.success(f"Translation completed for {target_language}")
@@ -770,249 +1175,18 @@ def main():
                                     st.subheader("Translated Content")
                                     st.json(translated_content)
                                 
-                                # Handle content update based on user role
-                                if user_role == "Designer/Content Writer":
-                                    # Update the page content immediately
-                                    success, error = update_page_content(
-                                        page_id=page_id,
-                                        locale_id=locale_id,
-                                        api_key=st.session_state.api_key,
-                                        translated_content=translated_content
-                                    )
-                                    
-                                    if success:
-                                        st.success(f"Successfully updated content for {target_language}")
-                                    else:
-                                        st.error(f"Failed to update content for {target_language}: {error}")
-                                elif user_role == "Proofreader":
-                                    st.write("### Proofreader Review")
-                                    st.info("Review and edit translations before publishing to Webflow.")
-                                    
-                                    # Create tabs for different views
-                                    tab1, tab2 = st.tabs(["Side-by-Side View", "Full JSON View"])
-                                    
-                                    with tab1:
-                                        # Track if any translations were modified
-                                        modified_translations = False
-                                        
-                                        # Create a dictionary to store edited translations
-                                        if 'edited_translations' not in st.session_state:
-                                            st.session_state.edited_translations = {}
-                                        
-                                        # Initialize the edited translations for this language if not present
-                                        lang_key = f"edited_{target_language}"
-                                        if lang_key not in st.session_state.edited_translations:
-                                            st.session_state.edited_translations[lang_key] = {}
-                                        
-                                        # Add a filter option
-                                        filter_text = st.text_input("Filter translations", placeholder="Type to filter...", key=f"filter_{target_language}")
-                                        
-                                        # Count total translation items for progress tracking
-                                        total_items = 0
-                                        for node in translated_content:
-                                            if "propertyOverrides" in node and node["propertyOverrides"]:
-                                                total_items += len([o for o in node["propertyOverrides"] if 'text' in o])
-                                            elif "text" in node:
-                                                total_items += 1
-                                        
-                                        st.progress(0.0, text=f"0/{total_items} items reviewed")
-                                        
-                                        # Process each node for side-by-side display
-                                        item_counter = 0
-                                        reviewed_counter = 0
-                                        
-                                        for i, node in enumerate(translated_content):
-                                            node_id = node.get('id') or node.get('nodeId')
-                                            
-                                            # Handle nodes with property overrides
-                                            if "propertyOverrides" in node and node["propertyOverrides"]:
-                                                for j, override in enumerate(node["propertyOverrides"]):
-                                                    if 'text' in override:
-                                                        item_counter += 1
-                                                        
-                                                        # Get the text content
-                                                        text_content = override['text'] if isinstance(override['text'], str) else override['text'].get('text', '')
-                                                        
-                                                        # Skip if filtered and doesn't match
-                                                        if filter_text and filter_text.lower() not in text_content.lower():
-                                                            continue
-                                                        
-                                                        # Create a unique key for this text item
-                                                        item_key = f"{node_id}_prop_{j}"
-                                                        
-                                                        # Find the original text if available
-                                                        original_text = "Original text not available"
-                                                        for orig_node in st.session_state.parsed_nodes:
-                                                            if orig_node.get('nodeId') == node_id:
-                                                                for orig_override in orig_node.get('propertyOverrides', []):
-                                                                    if orig_override.get('propertyId') == override.get('propertyId'):
-                                                                        original_text = orig_override.get('text', 'No text')
-                                                                        break
-                                                        
-                                                        # Create an expander for each translation item
-                                                        with st.expander(f"Item #{item_counter}: Property Override", expanded=False):
-                                                            col1, col2 = st.columns(2)
-                                                            
-                                                            with col1:
-                                                                st.caption("Original Text")
-                                                                st.code(original_text, language=None)
-                                                                st.caption(f"Node ID: {node_id[:8]}... | Property ID: {override.get('propertyId', 'N/A')[:8]}...")
-                                                            
-                                                            with col2:
-                                                                st.caption(f"Translation ({target_language})")
-                                                                # Use the stored edited value or the original translation
-                                                                current_value = st.session_state.edited_translations[lang_key].get(item_key, text_content)
-                                                                
-                                                                # Create a text area for editing
-                                                                edited_text = st.text_area(
-                                                                    "Edit translation",
-                                                                    value=current_value,
-                                                                    height=max(100, min(300, 100 + 20 * text_content.count('\n'))),
-                                                                    key=f"edit_{target_language}_{item_key}",
-                                                                    label_visibility="collapsed"
-                                                                )
-                                                                
-                                                                # Add a "Mark as reviewed" checkbox
-                                                                reviewed = st.checkbox("Mark as reviewed", 
-                                                                                      key=f"reviewed_{target_language}_{item_key}",
-                                                                                      value=item_key in st.session_state.edited_translations.get(f"reviewed_{target_language}", set()))
-                                                                
-                                                                if reviewed:
-                                                                    if f"reviewed_{target_language}" not in st.session_state.edited_translations:
-                                                                        st.session_state.edited_translations[f"reviewed_{target_language}"] = set()
-                                                                    st.session_state.edited_translations[f"reviewed_{target_language}"].add(item_key)
-                                                                    reviewed_counter += 1
-                                                                elif f"reviewed_{target_language}" in st.session_state.edited_translations and item_key in st.session_state.edited_translations[f"reviewed_{target_language}"]:
-                                                                    st.session_state.edited_translations[f"reviewed_{target_language}"].remove(item_key)
-                                                                
-                                                                # Check if the text was modified
-                                                                if edited_text != text_content:
-                                                                    st.session_state.edited_translations[lang_key][item_key] = edited_text
-                                                                    modified_translations = True
-                                                                    
-                                                                    # Update the translation in our content
-                                                                    override['text'] = edited_text
-                                            
-                                            # Handle text nodes
-                                            elif "text" in node:
-                                                item_counter += 1
-                                                
-                                                # Get the text content
-                                                text_content = node['text'] if isinstance(node['text'], str) else node['text'].get('html', '')
-                                                
-                                                # Skip if filtered and doesn't match
-                                                if filter_text and filter_text.lower() not in text_content.lower():
-                                                    continue
-                                                
-                                                # Create a unique key for this text item
-                                                item_key = f"{node_id}_text"
-                                                
-                                                # Find the original text if available
-                                                original_text = "Original text not available"
-                                                for orig_node in st.session_state.parsed_nodes:
-                                                    if orig_node.get('nodeId') == node_id and "text" in orig_node:
-                                                        original_text = orig_node.get('text', 'No text')
-                                                        break
-                                                
-                                                # Create an expander for each translation item
-                                                with st.expander(f"Item #{item_counter}: Text Node", expanded=False):
-                                                    col1, col2 = st.columns(2)
-                                                    
-                                                    with col1:
-                                                        st.caption("Original Text")
-                                                        st.code(original_text, language=None)
-                                                        st.caption(f"Node ID: {node_id[:8]}...")
-                                                    
-                                                    with col2:
-                                                        st.caption(f"Translation ({target_language})")
-                                                        # Use the stored edited value or the original translation
-                                                        current_value = st.session_state.edited_translations[lang_key].get(item_key, text_content)
-                                                        
-                                                        # Create a text area for editing
-                                                        edited_text = st.text_area(
-                                                            "Edit translation",
-                                                            value=current_value,
-                                                            height=max(100, min(300, 100 + 20 * text_content.count('\n'))),
-                                                            key=f"edit_{target_language}_{item_key}",
-                                                            label_visibility="collapsed"
-                                                        )
-                                                        
-                                                        # Add a "Mark as reviewed" checkbox
-                                                        reviewed = st.checkbox("Mark as reviewed", 
-                                                                              key=f"reviewed_{target_language}_{item_key}",
-                                                                              value=item_key in st.session_state.edited_translations.get(f"reviewed_{target_language}", set()))
-                                                        
-                                                        if reviewed:
-                                                            if f"reviewed_{target_language}" not in st.session_state.edited_translations:
-                                                                st.session_state.edited_translations[f"reviewed_{target_language}"] = set()
-                                                            st.session_state.edited_translations[f"reviewed_{target_language}"].add(item_key)
-                                                            reviewed_counter += 1
-                                                        elif f"reviewed_{target_language}" in st.session_state.edited_translations and item_key in st.session_state.edited_translations[f"reviewed_{target_language}"]:
-                                                            st.session_state.edited_translations[f"reviewed_{target_language}"].remove(item_key)
-                                                        
-                                                        # Check if the text was modified
-                                                        if edited_text != text_content:
-                                                            st.session_state.edited_translations[lang_key][item_key] = edited_text
-                                                            modified_translations = True
-                                                            
-                                                            # Update the translation in our content
-                                                            node['text'] = edited_text
-                                        
-                                        # Update progress bar
-                                        if total_items > 0:
-                                            progress_value = reviewed_counter / total_items
-                                            st.progress(progress_value, text=f"{reviewed_counter}/{total_items} items reviewed")
-                                        
-                                        # Add approval button
-                                        st.divider()
-                                        col1, col2 = st.columns([3, 1])
-                                        
-                                        with col1:
-                                            if modified_translations:
-                                                st.success("You've made changes to the translations.")
-                                            else:
-                                                st.info("No changes made to translations.")
-                                            
-                                            # Show review progress
-                                            if reviewed_counter == total_items:
-                                                st.success("All items have been reviewed!")
-                                            else:
-                                                st.warning(f"{total_items - reviewed_counter} items still need review.")
-                                        
-                                        with col2:
-                                            if st.button(f"Approve & Update Webflow", key=f"approve_{target_language}", use_container_width=True):
-                                                success, error = update_page_content(
-                                                    page_id=page_id,
-                                                    locale_id=locale_id,
-                                                    api_key=st.session_state.api_key,
-                                                    translated_content=translated_content
-                                                )
-                                                
-                                                if success:
-                                                    st.success(f"Successfully updated content for {target_language}")
-                                                    # Clear the edited translations for this language
-                                                    st.session_state.edited_translations[lang_key] = {}
-                                                    if f"reviewed_{target_language}" in st.session_state.edited_translations:
-                                                        st.session_state.edited_translations[f"reviewed_{target_language}"] = set()
-                                                else:
-                                                    st.error(f"Failed to update content for {target_language}: {error}")
-                                    
-                                    with tab2:
-                                        st.subheader("Full JSON View")
-                                        st.json(translated_content)
-                                        
-                                        if st.button("Update Webflow from JSON", key=f"json_update_{target_language}"):
-                                            success, error = update_page_content(
-                                                page_id=page_id,
-                                                locale_id=locale_id,
-                                                api_key=st.session_state.api_key,
-                                                translated_content=translated_content
-                                            )
-                                            
-                                            if success:
-                                                st.success(f"Successfully updated content for {target_language}")
-                                            else:
-                                                st.error(f"Failed to update content for {target_language}: {error}")
+                                # Update the page content immediately
+                                success, error = update_page_content(
+                                    page_id=page_id,
+                                    locale_id=locale_id,
+                                    api_key=st.session_state.api_key,
+                                    translated_content=translated_content
+                                )
+                                
+                                if success:
+                                    st.success(f"Successfully updated content for {target_language}")
+                                else:
+                                    st.error(f"Failed to update content for {target_language}: {error}")
                                 
                                 # Update progress
                                 progress = (index + 1) / len(target_languages)
@@ -1025,6 +1199,13 @@ def main():
                                 time.sleep(1)
                         
                         translation_status.text("All translations completed!")
+                        observe('job', time.time() - job_start_time, page='pages')
+                        if stage_changes:
+                            st.session_state.page_change_set = change_set
+                        usage_report = usage_tracker.save()
+                        st.caption(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+                        st.caption(format_limiter_stats())
+                        st.caption(f"Usage: {format_usage_totals(usage_report['totals'])}")
                         
                         # Add an expander with all results
                         with st.expander("View all translation details", expanded=False):
@@ -1032,15 +1213,26 @@ def main():
                                 st.subheader(f"Translation Details - {target_language}")
                                 st.write(f"Status: Completed")
                                 if user_role == "Proofreader":
-                                    st.write("Review status available in the Side-by-Side View tab")
+                                    st.write("Staged for review, nothing was written to Webflow yet")
+                                elif dry_run:
+                                    st.write("Dry run, nothing was written to Webflow")
                                 else:
                                     st.write("Content was updated directly to Webflow")
+                    
+                    render_page_change_set(page_id, title="Proofreader Review" if user_role == "Proofreader"
+                                           else "Dry Run Change Set")
                         
                 else:
                     if not st.session_state.openai_key:
                         st.warning("Please add your OpenAI API key in the sidebar to enable translations")
                     if not st.session_state.locales:
                         st.warning("No locales available for translation")
+                
+                if st.session_state.locales:
+                    st.subheader("Vendor Exchange (XLIFF/CSV)")
+                    render_page_exchange(page_id)
+                    st.subheader("Seed Translation Memory from a Document")
+                    render_page_ingestion(page_id)
 
     # Add footer at the bottom of the app
     st.markdown("---")
@@ -0,0 +1,484 @@
+"""Local stand-ins for the Webflow v2 API and the OpenAI/Anthropic APIs
+
+Run standalone to point the Streamlit app at them:
+
+    python -m benchmarks.mock_servers --webflow-port 8801 --llm-port 8802
+    WEBFLOW_API_BASE=http://127.0.0.1:8801/v2 \\
+    OPENAI_BASE_URL=http://127.0.0.1:8802/v1 \\
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8802 streamlit run app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LOCALE_TAGS = ['fr', 'es', 'de', 'it', 'pt', 'ar', 'ru', 'zh-cn', 'zh-tw', 'ja', 'ko', 'vi', 'th', 'id',
+               'pl', 'tr', 'bn', 'si', 'sw', 'uz', 'km', 'mn', 'tl', 'ms']
+
+# Shared across items so the dedup paths see realistic repetition
+SHARED_DISCLAIMER = ("The products offered on our website are complex derivative products that carry a "
+                     "significant risk of potential loss.")
+
+
+class LatencyModel:
+    """Fixed latency plus uniform jitter and an optional per-character cost"""
+
+    def __init__(self, base_ms=50, jitter_ms=20, per_char_ms=0.0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.per_char_ms = per_char_ms
+
+    def sleep(self, chars=0):
+        delay = self.base_ms + random.uniform(0, self.jitter_ms) + self.per_char_ms * chars
+        time.sleep(delay / 1000)
+
+
+class TokenBucket:
+    """Requests-per-second limit; requests over the limit get a 429"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = float(rate or 0)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class ServerStats:
+    """Thread-safe request counters for a mock server"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Shared plumbing: JSON bodies, latency, 429 injection and routing"""
+
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def handle_request(self, method):
+        state = self.state
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        body = self.read_json() if method in ('POST', 'PATCH') else None
+
+        if not state.bucket.allow() or random.random() < state.error_rate:
+            state.stats.count('429')
+            self.send_json(429, {"message": "Too many requests", "code": "too_many_requests"})
+            return
+
+        for route_method, pattern, handler in self.routes():
+            match = re.fullmatch(pattern, parsed.path)
+            if route_method == method and match:
+                state.stats.count(handler.__name__)
+                status, response = handler(self, *match.groups(), query=query, body=body)
+                self.send_json(status, response)
+                return
+        self.send_json(404, {"message": f"No route for {method} {parsed.path}"})
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PATCH(self):
+        self.handle_request('PATCH')
+
+    def routes(self):
+        return []
+
+
+def paginate(entries, query, key):
+    offset = int(query.get('offset', 0))
+    limit = min(int(query.get('limit', 100)), 100)
+    return {
+        key: entries[offset:offset + limit],
+        "pagination": {"total": len(entries), "offset": offset, "limit": limit}
+    }
+
+
+def text_node(node_id, text):
+    return {"id": node_id, "type": "text", "text": {"html": f"<p>{text}</p>", "text": text}}
+
+
+class MockWebflowState:
+    """Generated site with locales, pages, components and one Blog collection"""
+
+    def __init__(self, item_count=1000, locale_count=20, page_count=10, nodes_per_page=150,
+                 component_count=10, latency=None, rate_limit=None, error_rate=0.0):
+        self.latency = latency or LatencyModel()
+        self.bucket = TokenBucket(rate_limit)
+        self.error_rate = error_rate
+        self.stats = ServerStats()
+        self.lock = threading.Lock()
+        self.site_id = "site-bench"
+        self.collection_id = "col-blog"
+
+        self.primary_locale = {"id": "loc-en", "cmsLocaleId": "cms-en", "displayName": "English",
+                               "tag": "en", "enabled": True}
+        self.secondary_locales = [
+            {"id": f"loc-{tag}", "cmsLocaleId": f"cms-{tag}", "displayName": tag.upper(), "tag": tag,
+             "enabled": True}
+            for tag in (LOCALE_TAGS * (locale_count // len(LOCALE_TAGS) + 1))[:locale_count]
+        ]
+
+        self.items = [self.make_item(i) for i in range(item_count)]
+        self.pages = [{"id": f"page-{i}", "title": f"Page {i}", "slug": f"page-{i}"} for i in range(page_count)]
+        self.page_nodes = {
+            page['id']: [text_node(f"{page['id']}-n{n}", f"Trade with confidence, section {n % 40}")
+                         for n in range(nodes_per_page)]
+            for page in self.pages
+        }
+        self.components = [{"id": f"comp-{i}", "name": f"Component {i}"} for i in range(component_count)]
+        self.component_nodes = {
+            comp['id']: [text_node(f"{comp['id']}-n{n}", f"Open an account {n % 10}") for n in range(30)]
+            for comp in self.components
+        }
+        self.component_properties = {
+            comp['id']: [{"propertyId": f"{comp['id']}-p{n}", "type": "Plain Text", "label": f"Label {n}",
+                          "text": {"html": None, "text": f"Get started {n % 5}"}} for n in range(8)]
+            for comp in self.components
+        }
+        # Writes per (entity, locale) so a run can be checked for completeness
+        self.writes = {}
+
+    def make_item(self, index):
+        return {
+            "id": f"item-{index}",
+            "isArchived": False,
+            "isDraft": False,
+            "fieldData": {
+                "name": f"Market outlook #{index}",
+                "slug": f"market-outlook-{index}",
+                "page-title": f"Market outlook #{index} | Blog",
+                "summary": f"What moved the markets in week {index % 52}.",
+                "meta-description-2": f"Weekly market analysis and trading ideas, edition {index}.",
+                "post": "".join(f"<p>Paragraph {p} of post {index % 200}: prices moved sharply.</p>"
+                                for p in range(8)),
+                "disclaimer-2": SHARED_DISCLAIMER,
+                "accumulators-option": index % 2 == 0
+            }
+        }
+
+    def record_write(self, key):
+        with self.lock:
+            self.writes[key] = self.writes.get(key, 0) + 1
+
+
+class MockWebflowHandler(MockHandler):
+    """Webflow v2 endpoints used by the app pages"""
+
+    def routes(self):
+        return [
+            ('GET', r"/v2/sites", MockWebflowHandler.get_sites),
+            ('GET', r"/v2/sites/([^/]+)", MockWebflowHandler.get_site),
+            ('GET', r"/v2/sites/([^/]+)/pages", MockWebflowHandler.get_pages),
+            ('GET', r"/v2/sites/([^/]+)/collections", MockWebflowHandler.get_collections),
+            ('GET', r"/v2/sites/([^/]+)/components", MockWebflowHandler.get_components),
+            ('GET', r"/v2/pages/([^/]+)/dom", MockWebflowHandler.get_page_dom),
+            ('POST', r"/v2/pages/([^/]+)/dom", MockWebflowHandler.update_page_dom),
+            ('GET', r"/v2/sites/([^/]+)/components/([^/]+)/dom", MockWebflowHandler.get_component_dom),
+            ('POST', r"/v2/sites/([^/]+)/components/([^/]+)/dom", MockWebflowHandler.update_component_dom),
+            ('GET', r"/v2/sites/([^/]+)/components/([^/]+)/properties", MockWebflowHandler.get_properties),
+            ('POST', r"/v2/sites/([^/]+)/components/([^/]+)/properties", MockWebflowHandler.update_properties),
+            ('GET', r"/v2/collections/([^/]+)", MockWebflowHandler.get_collection),
+            ('GET', r"/v2/collections/([^/]+)/items", MockWebflowHandler.get_items),
+            ('GET', r"/v2/collections/([^/]+)/items/([^/]+)", MockWebflowHandler.get_item),
+            ('PATCH', r"/v2/collections/([^/]+)/items/([^/]+)", MockWebflowHandler.update_item),
+        ]
+
+    def get_sites(self, query, body):
+        self.state.latency.sleep()
+        return 200, {"sites": [{"id": self.state.site_id, "displayName": "Benchmark Site"}]}
+
+    def get_site(self, site_id, query, body):
+        self.state.latency.sleep()
+        return 200, {
+            "id": site_id,
+            "displayName": "Benchmark Site",
+            "locales": {"primary": self.state.primary_locale, "secondary": self.state.secondary_locales}
+        }
+
+    def get_pages(self, site_id, query, body):
+        self.state.latency.sleep()
+        return 200, paginate(self.state.pages, query, "pages")
+
+    def get_collections(self, site_id, query, body):
+        self.state.latency.sleep()
+        return 200, {"collections": [{"id": self.state.collection_id, "displayName": "Blog", "slug": "blog"}]}
+
+    def get_components(self, site_id, query, body):
+        self.state.latency.sleep()
+        return 200, paginate(self.state.components, query, "components")
+
+    def get_page_dom(self, page_id, query, body):
+        self.state.latency.sleep()
+        if page_id not in self.state.page_nodes:
+            return 404, {"message": "Page not found"}
+        return 200, dict(paginate(self.state.page_nodes[page_id], query, "nodes"), pageId=page_id)
+
+    def update_page_dom(self, page_id, query, body):
+        self.state.latency.sleep(len(json.dumps(body)))
+        self.state.record_write((page_id, query.get('localeId')))
+        return 200, {}
+
+    def get_component_dom(self, site_id, component_id, query, body):
+        self.state.latency.sleep()
+        return 200, dict(paginate(self.state.component_nodes.get(component_id, []), query, "nodes"),
+                         componentId=component_id)
+
+    def update_component_dom(self, site_id, component_id, query, body):
+        self.state.latency.sleep(len(json.dumps(body)))
+        self.state.record_write((component_id, query.get('localeId')))
+        return 200, {}
+
+    def get_properties(self, site_id, component_id, query, body):
+        self.state.latency.sleep()
+        return 200, dict(paginate(self.state.component_properties.get(component_id, []), query, "properties"),
+                         componentId=component_id)
+
+    def update_properties(self, site_id, component_id, query, body):
+        self.state.latency.sleep(len(json.dumps(body)))
+        self.state.record_write((f"{component_id}/properties", query.get('localeId')))
+        return 200, {}
+
+    def get_collection(self, collection_id, query, body):
+        self.state.latency.sleep()
+        fields = [
+            ("name", "PlainText"), ("slug", "PlainText"), ("page-title", "PlainText"), ("summary", "PlainText"),
+            ("meta-description-2", "PlainText"), ("post", "RichText"), ("disclaimer-2", "RichText"),
+            ("accumulators-option", "Switch")
+        ]
+        return 200, {
+            "id": collection_id,
+            "displayName": "Blog",
+            "singularName": "Blog Post",
+            "slug": "blog",
+            "fields": [{"id": f"field-{slug}", "slug": slug, "displayName": slug, "type": field_type}
+                       for slug, field_type in fields]
+        }
+
+    def get_items(self, collection_id, query, body):
+        self.state.latency.sleep()
+        return 200, paginate(self.state.items, query, "items")
+
+    def get_item(self, collection_id, item_id, query, body):
+        self.state.latency.sleep()
+        index = int(item_id.split('-')[-1])
+        return 200, self.state.items[index]
+
+    def update_item(self, collection_id, item_id, query, body):
+        self.state.latency.sleep(len(json.dumps(body)))
+        self.state.record_write((item_id, body.get('cmsLocaleId')))
+        return 200, {"id": item_id, "cmsLocaleId": body.get('cmsLocaleId'), "fieldData": body.get('fieldData')}
+
+
+class MockLLMState:
+    """Fake OpenAI/Anthropic backend with tunable latency and simulated prompt caching"""
+
+    def __init__(self, latency=None, rate_limit=None, error_rate=0.0):
+        self.latency = latency or LatencyModel(base_ms=300, jitter_ms=200, per_char_ms=0.05)
+        self.bucket = TokenBucket(rate_limit)
+        self.error_rate = error_rate
+        self.stats = ServerStats()
+        self.lock = threading.Lock()
+        self.seen_prefixes = set()
+
+    def cached_tokens(self, prefix):
+        """Tokens of a prompt prefix served from cache; providers cache prefixes of 1024+ tokens"""
+        tokens = estimate_tokens(prefix)
+        key = hashlib.sha256(prefix.encode()).hexdigest()
+        with self.lock:
+            seen = key in self.seen_prefixes
+            self.seen_prefixes.add(key)
+        if not seen or tokens < 1024:
+            return 0, tokens
+        return tokens - tokens % 128, 0
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def fake_translate(text, target):
+    return f"[{target}] {text}"
+
+
+def fake_translate_json(value, target):
+    """Translate every string leaf of a JSON payload, keeping ids and structure"""
+    if isinstance(value, dict):
+        if set(value) >= {"target_languages", "segments"}:
+            # Multi-locale request: answer {segment id: {locale: text}}
+            return {segment_id: {code: fake_translate(text, code) for code in value['target_languages']}
+                    for segment_id, text in value['segments'].items()}
+        return {key: (item if key in ('id', 'propertyId', 'nodeId', 'type') else fake_translate_json(item, target))
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [fake_translate_json(item, target) for item in value]
+    if isinstance(value, str):
+        return fake_translate(value, target)
+    return value
+
+
+def target_from_prompt(prompt):
+    match = re.search(r"Target languages?: ([^\n]+)", prompt or "")
+    return match.group(1).strip() if match else "xx"
+
+
+def fake_completion(system_text, user_text):
+    target = target_from_prompt(system_text)
+    try:
+        return json.dumps(fake_translate_json(json.loads(user_text), target), ensure_ascii=False)
+    except ValueError:
+        return fake_translate(user_text, target)
+
+
+class MockLLMHandler(MockHandler):
+    """OpenAI chat completions and Anthropic messages endpoints"""
+
+    def routes(self):
+        return [
+            ('POST', r"/v1/chat/completions", MockLLMHandler.chat_completions),
+            ('POST', r"/v1/messages", MockLLMHandler.messages),
+        ]
+
+    def chat_completions(self, query, body):
+        messages = body.get('messages', [])
+        system_messages = [m['content'] for m in messages if m['role'] == 'system']
+        user_text = next((m['content'] for m in reversed(messages) if m['role'] == 'user'), "")
+        content = fake_completion("\n".join(system_messages), user_text)
+        self.state.latency.sleep(len(content))
+
+        cached, _ = self.state.cached_tokens(system_messages[0] if system_messages else "")
+        prompt_tokens = estimate_tokens("".join(m['content'] for m in messages))
+        completion_tokens = estimate_tokens(content)
+        return 200, {
+            "id": f"chatcmpl-{random.getrandbits(48):x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": min(cached, prompt_tokens)}
+            }
+        }
+
+    def messages(self, query, body):
+        system = body.get('system', [])
+        if isinstance(system, str):
+            system = [{"type": "text", "text": system}]
+        system_text = "\n".join(block['text'] for block in system)
+        user_message = body['messages'][-1]['content']
+        user_text = user_message if isinstance(user_message, str) else user_message[0]['text']
+        content = fake_completion(system_text, user_text)
+        self.state.latency.sleep(len(content))
+
+        cached, written = self.state.cached_tokens(system[0]['text']) if system else (0, 0)
+        input_tokens = estimate_tokens(system_text + user_text) - cached - written
+        return 200, {
+            "id": f"msg_{random.getrandbits(48):x}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get('model'),
+            "content": [{"type": "text", "text": content}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": max(input_tokens, 0),
+                "output_tokens": estimate_tokens(content),
+                "cache_read_input_tokens": cached,
+                "cache_creation_input_tokens": written
+            }
+        }
+
+
+def start_server(handler_cls, state, port=0):
+    """Start a mock server on a background thread; returns (server, base_url)"""
+    handler = type(handler_cls.__name__, (handler_cls,), {'state': state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the mock Webflow and LLM servers")
+    parser.add_argument("--webflow-port", type=int, default=8801)
+    parser.add_argument("--llm-port", type=int, default=8802)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--locales", type=int, default=20)
+    parser.add_argument("--webflow-latency-ms", type=float, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--webflow-rps", type=float, default=None, help="Requests/sec before Webflow returns 429")
+    parser.add_argument("--llm-rps", type=float, default=None, help="Requests/sec before the LLM returns 429")
+    args = parser.parse_args()
+
+    webflow_state = MockWebflowState(item_count=args.items, locale_count=args.locales,
+                                     latency=LatencyModel(base_ms=args.webflow_latency_ms),
+                                     rate_limit=args.webflow_rps)
+    llm_state = MockLLMState(latency=LatencyModel(base_ms=args.llm_latency_ms, jitter_ms=args.llm_latency_ms / 2),
+                             rate_limit=args.llm_rps)
+    _, webflow_url = start_server(MockWebflowHandler, webflow_state, args.webflow_port)
+    _, llm_url = start_server(MockLLMHandler, llm_state, args.llm_port)
+    print(f"WEBFLOW_API_BASE={webflow_url}/v2")
+    print(f"OPENAI_BASE_URL={llm_url}/v1")
+    print(f"ANTHROPIC_BASE_URL={llm_url}")
+    print(f"Site ID: {webflow_state.site_id}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Offline throughput benchmark for the fetch -> translate -> update pipelines
+
+Starts the mock Webflow and LLM servers in-process and drives the shared
+translation code (llm, prompts, dedup, concurrency, utils) against them:
+
+    python -m benchmarks.run_benchmark --scenario cms-1k
+    python -m benchmarks.run_benchmark --scenario cms-1k-throttled --fixed 8
+    python -m benchmarks.run_benchmark --list
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_servers import (LatencyModel, MockLLMHandler, MockLLMState, MockWebflowHandler,
+                                     MockWebflowState, start_server)
+from concurrency import DEFAULT_MAX_LIMIT, configure_limiters, format_limiter_stats, percentile
+from dedup import SegmentMemo, build_segment_payload, fan_out, format_dedup_stats, parse_segment_response
+from llm import format_cache_stats, get_cache_stats, openai_chat
+from metrics import bottleneck, reset_metrics, stage_summary
+from prompts import (ARABIC_QUESTION_MARK_RULE, DERIV_CONTEXT_RULE, JSON_OUTPUT_INSTRUCTIONS, build_cms_static_prompt,
+                     build_locale_prompt, build_static_prompt)
+from utils import webflow_request
+
+# Blog collection fields, as pinned in collection_overrides.json
+BLOG_FIELDS_TO_TRANSLATE = ['disclaimer-2', 'post', 'summary', 'name', 'meta-description-2', 'page-title']
+
+SCENARIOS = {
+    'cms-smoke': {
+        'description': "50-item collection x 5 locales",
+        'pipeline': 'cms', 'items': 50, 'locales': 5
+    },
+    'cms-1k': {
+        'description': "1k-item collection x 20 locales",
+        'pipeline': 'cms', 'items': 1000, 'locales': 20
+    },
+    'cms-1k-throttled': {
+        'description': "1k-item collection x 20 locales with Webflow at 60 req/s and the LLM at 100 req/s",
+        'pipeline': 'cms', 'items': 1000, 'locales': 20, 'webflow_rps': 60, 'llm_rps': 100
+    },
+    'pages': {
+        'description': "10 pages of 150 text nodes x 20 locales",
+        'pipeline': 'pages', 'pages': 10, 'locales': 20
+    },
+}
+
+API_KEY = "benchmark"
+
+
+def webflow_get_all(url, key):
+    """GET every page of a paginated Webflow list endpoint"""
+    entries = []
+    offset = 0
+    while True:
+        response = webflow_request("GET", url, params={"offset": offset, "limit": 100},
+                                   headers={"authorization": f"Bearer {API_KEY}"})
+        response.raise_for_status()
+        data = response.json()
+        entries.extend(data.get(key, []))
+        if not data.get(key) or len(entries) >= data.get('pagination', {}).get('total', 0):
+            return entries
+        offset += 100
+
+
+def get_secondary_locales(webflow_url, site_id):
+    response = webflow_request("GET", f"{webflow_url}/sites/{site_id}")
+    response.raise_for_status()
+    return response.json()['locales']['secondary']
+
+
+def translate_field(text, locale_code):
+    """Translate a single CMS field the way pages/2 does"""
+    try:
+        response = openai_chat(
+            api_key=API_KEY,
+            model="gpt-4.1-mini",
+            static_prompt=build_cms_static_prompt([]),
+            locale_prompt=build_locale_prompt(locale_code),
+            locale=locale_code,
+            user_message=text
+        )
+        return response.choices[0].message.content.strip(), None
+    except Exception as e:
+        return None, str(e)
+
+
+def run_cms_unit(webflow_url, collection_id, item, locale, memo):
+    """Translate one item into one locale and PATCH it; returns (latency, error)"""
+    start_time = time.monotonic()
+    field_data = dict(item['fieldData'])
+    for field in BLOG_FIELDS_TO_TRANSLATE:
+        value = field_data.get(field)
+        if not isinstance(value, str):
+            continue
+        translated, error = memo.get_or_translate(value, locale['tag'], lambda text: translate_field(text, locale['tag']))
+        if error:
+            return time.monotonic() - start_time, error
+        field_data[field] = translated
+
+    try:
+        response = webflow_request(
+            "PATCH",
+            f"{webflow_url}/collections/{collection_id}/items/{item['id']}",
+            json={"isArchived": False, "isDraft": False, "fieldData": field_data,
+                  "cmsLocaleId": locale['cmsLocaleId']}
+        )
+        error = None if response.status_code == 200 else f"HTTP Error: {response.status_code}"
+    except Exception as e:
+        error = str(e)
+    return time.monotonic() - start_time, error
+
+
+def run_page_unit(webflow_url, page_id, locale):
+    """Fetch a page DOM, translate its deduplicated segments and POST it back"""
+    start_time = time.monotonic()
+    try:
+        nodes = webflow_get_all(f"{webflow_url}/pages/{page_id}/dom", 'nodes')
+        content = {"nodes": [{"nodeId": node['id'], "text": node['text']['text']} for node in nodes]}
+        plan, payload = build_segment_payload(content)
+        static_prompt = build_static_prompt(
+            task="Translate the text values in the JSON segments.",
+            glossary_terms=[],
+            rules=[DERIV_CONTEXT_RULE, ARABIC_QUESTION_MARK_RULE],
+            output_instructions=JSON_OUTPUT_INSTRUCTIONS
+        )
+        response = openai_chat(
+            api_key=API_KEY,
+            model="o3-mini",
+            static_prompt=static_prompt,
+            locale_prompt=build_locale_prompt(locale['tag']),
+            locale=locale['tag'],
+            user_message=json.dumps(payload, ensure_ascii=False),
+            response_format={"type": "json_object"}
+        )
+        translations = parse_segment_response(json.loads(response.choices[0].message.content))
+        translated, missing = fan_out(content, plan, translations)
+        response = webflow_request("POST", f"{webflow_url}/pages/{page_id}/dom",
+                                   params={"localeId": locale['id']}, json=translated)
+        error = None if response.status_code == 200 else f"HTTP Error: {response.status_code}"
+        if not error and missing:
+            error = f"{len(missing)} segments missing from the translation"
+    except Exception as e:
+        error = str(e)
+    return time.monotonic() - start_time, error
+
+
+def run_scenario(name, scenario, workers, fixed_limit=None, llm_latency_ms=300, webflow_latency_ms=50):
+    """Run a scenario end to end and return its report"""
+    webflow_state = MockWebflowState(
+        item_count=scenario.get('items', 0),
+        locale_count=scenario['locales'],
+        page_count=scenario.get('pages', 0),
+        latency=LatencyModel(base_ms=webflow_latency_ms, jitter_ms=webflow_latency_ms / 2),
+        rate_limit=scenario.get('webflow_rps')
+    )
+    llm_state = MockLLMState(
+        latency=LatencyModel(base_ms=llm_latency_ms, jitter_ms=llm_latency_ms / 2, per_char_ms=0.05),
+        rate_limit=scenario.get('llm_rps')
+    )
+    webflow_server, webflow_root = start_server(MockWebflowHandler, webflow_state)
+    llm_server, llm_root = start_server(MockLLMHandler, llm_state)
+    webflow_url = f"{webflow_root}/v2"
+    os.environ["OPENAI_BASE_URL"] = f"{llm_root}/v1"
+    os.environ["ANTHROPIC_BASE_URL"] = llm_root
+
+    reset_metrics()
+    if fixed_limit:
+        configure_limiters(adaptive=False, limit=fixed_limit)
+    else:
+        configure_limiters(adaptive=True)
+
+    try:
+        locales = get_secondary_locales(webflow_url, webflow_state.site_id)
+        fetch_start = time.monotonic()
+        memo = SegmentMemo()
+        if scenario['pipeline'] == 'cms':
+            entities = webflow_get_all(f"{webflow_url}/collections/{webflow_state.collection_id}/items", 'items')
+            run_unit = lambda item, locale: run_cms_unit(webflow_url, webflow_state.collection_id, item, locale, memo)
+        else:
+            entities = webflow_get_all(f"{webflow_url}/sites/{webflow_state.site_id}/pages", 'pages')
+            run_unit = lambda page, locale: run_page_unit(webflow_url, page['id'], locale)
+        fetch_elapsed = time.monotonic() - fetch_start
+
+        latencies = []
+        errors = []
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_unit, entity, locale) for entity in entities for locale in locales]
+            for future in as_completed(futures):
+                latency, error = future.result()
+                latencies.append(latency)
+                if error:
+                    errors.append(error)
+        elapsed = time.monotonic() - start_time
+    finally:
+        webflow_server.shutdown()
+        llm_server.shutdown()
+
+    units = len(latencies)
+    return {
+        'scenario': name,
+        'description': scenario['description'],
+        'mode': f"fixed {fixed_limit}" if fixed_limit else "adaptive",
+        'entities': len(entities),
+        'locales': len(locales),
+        'fetch_seconds': round(fetch_elapsed, 3),
+        'units': units,
+        'failed_units': len(errors),
+        'seconds': round(elapsed, 3),
+        'units_per_second': round(units / elapsed, 2) if elapsed else 0.0,
+        'items_per_second': round(len(entities) / elapsed, 2) if elapsed else 0.0,
+        'p50': round(percentile(latencies, 50), 3),
+        'p95': round(percentile(latencies, 95), 3),
+        'webflow_requests': webflow_state.stats.snapshot(),
+        'llm_requests': llm_state.stats.snapshot(),
+        'dedup': format_dedup_stats(memo.stats()) if scenario['pipeline'] == 'cms' else None,
+        'prompt_cache': format_cache_stats(get_cache_stats()),
+        'limits': format_limiter_stats(),
+        'stages': {stage: round(totals['seconds'], 3) for stage, totals in stage_summary()['stages'].items()},
+        'bottleneck': bottleneck(stage_summary()),
+        'sample_errors': sorted(set(errors))[:5]
+    }
+
+
+def format_report(report):
+    lines = [
+        f"Scenario {report['scenario']} ({report['description']}), {report['mode']} concurrency",
+        f"  Fetched {report['entities']} entities in {report['fetch_seconds']:.2f}s",
+        f"  {report['units']} entity-locale updates ({report['failed_units']} failed) in {report['seconds']:.2f}s",
+        f"  Throughput: {report['units_per_second']:.1f} updates/s, {report['items_per_second']:.2f} items/s "
+        f"(all {report['locales']} locales)",
+        f"  Update latency: p50 {report['p50']:.3f}s, p95 {report['p95']:.3f}s",
+        f"  Webflow: {sum(report['webflow_requests'].values())} requests, "
+        f"{report['webflow_requests'].get('429', 0)} throttled",
+        f"  LLM: {sum(report['llm_requests'].values())} requests, {report['llm_requests'].get('429', 0)} throttled",
+    ]
+    if report['dedup']:
+        lines.append(f"  Deduplication: {report['dedup']}")
+    lines.append(f"  {report['prompt_cache']}")
+    lines.append(f"  {report['limits']}")
+    stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in report['stages'].items())
+    lines.append(f"  Stage busy time: {stages} ({report['bottleneck']})")
+    for error in report['sample_errors']:
+        lines.append(f"  Error: {error}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the translation pipelines")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default cms-smoke)")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_LIMIT * 2,
+                        help="Worker threads; the per-backend limiters gate the actual concurrency")
+    parser.add_argument("--fixed", type=int, default=None, help="Pin every limiter to this many in-flight requests")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--webflow-latency-ms", type=float, default=50)
+    parser.add_argument("--json", help="Also write the reports to this JSON file")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name}: {scenario['description']}")
+        return
+
+    reports = []
+    for name in args.scenario or ['cms-smoke']:
+        report = run_scenario(name, SCENARIOS[name], args.workers, args.fixed,
+                              llm_latency_ms=args.llm_latency_ms, webflow_latency_ms=args.webflow_latency_ms)
+        print(format_report(report))
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+import datetime
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import anthropic
+import openai
+
+from dedup import normalize_segment
+from llm import build_anthropic_system, build_openai_messages
+from locale_terms import enforce_text, map_text
+from prompts import build_cms_portuguese_static_prompt, build_cms_static_prompt, build_locale_prompt
+from quality import check_text
+from translation_memory import recall_text
+from usage import UsageTracker, extract_usage
+
+logger = logging.getLogger(__name__)
+
+# Job manifests, submitted JSONL files and downloaded results live here so a
+# job can be polled and pushed across Streamlit reruns and sessions
+BULK_JOBS_DIR = os.environ.get('BULK_JOBS_DIR', 'bulk_job_data')
+
+OPENAI_BATCH_MODEL = "gpt-4.1-mini"
+ANTHROPIC_BATCH_MODEL = "claude-3-5-sonnet-20240620"
+
+PORTUGUESE_CODES = ['pt', 'pt-br', 'pt-pt']
+
+# Provider batch states that mean no more results will arrive
+OPENAI_FINAL_STATES = ['completed', 'failed', 'expired', 'cancelled']
+OPENAI_FAILED_STATES = ['failed', 'expired', 'cancelled']
+
+
+def job_dir(job_id):
+    """Directory holding all files of a bulk job"""
+    return os.path.join(BULK_JOBS_DIR, job_id)
+
+
+def save_job(job):
+    """Persist a job manifest atomically"""
+    os.makedirs(job_dir(job['job_id']), exist_ok=True)
+    path = os.path.join(job_dir(job['job_id']), 'manifest.json')
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(job, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_job(job_id):
+    """Load a job manifest from disk"""
+    with open(os.path.join(job_dir(job_id), 'manifest.json')) as f:
+        return json.load(f)
+
+
+def list_jobs(collection_id=None):
+    """List job manifests, newest first, optionally for a single collection"""
+    if not os.path.isdir(BULK_JOBS_DIR):
+        return []
+    jobs = []
+    for job_id in os.listdir(BULK_JOBS_DIR):
+        try:
+            job = load_job(job_id)
+        except (OSError, ValueError):
+            continue
+        if collection_id is None or job.get('collection_id') == collection_id:
+            jobs.append(job)
+    return sorted(jobs, key=lambda job: job.get('created_at', ''), reverse=True)
+
+
+def compile_units(items, schema, locales, use_claude_for_portuguese=False):
+    """Compile every (item, field, locale) unit of a collection translation
+
+    Units that share the same normalized source text, field kind (rich or
+    plain text), locale and provider point at a single batch request.
+    Requests whose text has an approved translation in the translation
+    memory or is made up only of mapped locale terms carry that translation
+    and are not sent. Returns (units, requests).
+    """
+    units = []
+    requests = []
+    request_ids = {}
+
+    for item in items:
+        for field, value in item.data.items():
+            if field not in schema.translate_fields or not isinstance(value, str) or not value.strip():
+                continue
+            rich_text = field in schema.rich_text_fields
+            for locale in locales:
+                is_portuguese = locale['code'].lower() in PORTUGUESE_CODES
+                provider = 'anthropic' if use_claude_for_portuguese and is_portuguese else 'openai'
+                key = (normalize_segment(value), rich_text, locale['code'], provider)
+                if key not in request_ids:
+                    request_ids[key] = f"req-{len(requests)}"
+                    request = {
+                        'custom_id': request_ids[key],
+                        'provider': provider,
+                        'locale_code': locale['code'],
+                        'rich_text': rich_text,
+                        'text': value
+                    }
+                    mapped = recall_text(value, locale['code']) or map_text(value, locale['code'])[0]
+                    if mapped is not None:
+                        request['mapped'] = mapped
+                    requests.append(request)
+                units.append({
+                    'item_id': item.id,
+                    'field': field,
+                    'cms_locale_id': locale['id'],
+                    'locale_name': locale['name'],
+                    'custom_id': request_ids[key]
+                })
+
+    return units, requests
+
+
+def build_openai_batch_line(request, glossary_terms):
+    """Build one line of an OpenAI Batch API JSONL input file"""
+    return {
+        "custom_id": request['custom_id'],
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": OPENAI_BATCH_MODEL,
+            "messages": build_openai_messages(
+                build_cms_static_prompt(glossary_terms, rich_text=request.get('rich_text', False)),
+                build_locale_prompt(request['locale_code'], map_text(request['text'], request['locale_code'])[1]),
+                request['text']
+            )
+        }
+    }
+
+
+def build_anthropic_batch_request(request, glossary_terms):
+    """Build one request of an Anthropic Message Batches submission"""
+    return {
+        "custom_id": request['custom_id'],
+        "params": {
+            "model": ANTHROPIC_BATCH_MODEL,
+            "system": build_anthropic_system(
+                build_cms_portuguese_static_prompt(glossary_terms, rich_text=request.get('rich_text', False)),
+                build_locale_prompt(request['locale_code'], map_text(request['text'], request['locale_code'])[1])
+            ),
+            "messages": [{"role": "user", "content": request['text']}],
+            "temperature": 0.3,
+            "max_tokens": 8000
+        }
+    }
+
+
+def write_jsonl(path, lines):
+    """Write dicts to a JSONL file"""
+    with open(path, 'w') as f:
+        for line in lines:
+            f.write(json.dumps(line, ensure_ascii=False))
+            f.write("\n")
+
+
+def create_job(collection_id, collection_name, items, schema, locales, glossary_terms, use_claude_for_portuguese=False):
+    """Compile a bulk job and write its provider submission files to disk"""
+    job_id = f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    units, requests = compile_units(items, schema, locales, use_claude_for_portuguese)
+
+    job = {
+        'job_id': job_id,
+        'collection_id': collection_id,
+        'collection_name': collection_name,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'status': 'compiled',
+        'items': {item.id: {'identifier': item.identifier, 'data': dict(item.data)} for item in items},
+        'fields_to_translate': list(schema.field_order),
+        'units': units,
+        'requests': requests,
+        'batches': {},
+        'push_results': []
+    }
+
+    os.makedirs(job_dir(job_id), exist_ok=True)
+    batch_requests = [r for r in requests if 'mapped' not in r]
+    openai_lines = [build_openai_batch_line(r, glossary_terms) for r in batch_requests if r['provider'] == 'openai']
+    anthropic_requests = [build_anthropic_batch_request(r, glossary_terms) for r in batch_requests
+                          if r['provider'] == 'anthropic']
+    if openai_lines:
+        write_jsonl(os.path.join(job_dir(job_id), 'openai_requests.jsonl'), openai_lines)
+        job['batches']['openai'] = {'id': None, 'status': 'compiled', 'count': len(openai_lines)}
+    if anthropic_requests:
+        write_jsonl(os.path.join(job_dir(job_id), 'anthropic_requests.jsonl'), anthropic_requests)
+        job['batches']['anthropic'] = {'id': None, 'status': 'compiled', 'count': len(anthropic_requests)}
+    if not job['batches']:
+        # Every text is already translated; there is nothing to submit
+        job['status'] = 'completed'
+
+    save_job(job)
+    logger.info(f"Compiled bulk job {job_id}: {len(units)} units -> {len(batch_requests)} batch requests "
+                f"({len(requests) - len(batch_requests)} from translation memory or locale terms)")
+    return job
+
+
+def submit_job(job, openai_key=None, claude_key=None):
+    """Submit the compiled JSONL files to the provider batch APIs
+
+    The clients honour OPENAI_BASE_URL / ANTHROPIC_BASE_URL, so a local stub
+    server can stand in for the providers.
+    """
+    errors = []
+    if not job['batches']:
+        return errors
+
+    if 'openai' in job['batches']:
+        try:
+            client = openai.OpenAI(api_key=openai_key)
+            with open(os.path.join(job_dir(job['job_id']), 'openai_requests.jsonl'), 'rb') as f:
+                batch_file = client.files.create(file=f, purpose="batch")
+            batch = client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+                metadata={"bulk_job": job['job_id']}
+            )
+            job['batches']['openai'].update({'id': batch.id, 'status': batch.status})
+        except Exception as e:
+            errors.append(f"OpenAI batch submission failed: {str(e)}")
+            job['batches']['openai']['status'] = 'failed'
+
+    if 'anthropic' in job['batches']:
+        try:
+            client = anthropic.Anthropic(api_key=claude_key)
+            with open(os.path.join(job_dir(job['job_id']), 'anthropic_requests.jsonl')) as f:
+                batch_requests = [json.loads(line) for line in f if line.strip()]
+            batch = client.messages.batches.create(requests=batch_requests)
+            job['batches']['anthropic'].update({'id': batch.id, 'status': batch.processing_status})
+        except Exception as e:
+            errors.append(f"Anthropic batch submission failed: {str(e)}")
+            job['batches']['anthropic']['status'] = 'failed'
+
+    job['status'] = 'failed' if errors else 'submitted'
+    save_job(job)
+    for error in errors:
+        logger.error(error)
+    return errors
+
+
+def parse_openai_results(text):
+    """Parse an OpenAI batch output file into {custom_id: {'text' | 'error'}}"""
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get('response') or {}
+        if entry.get('error') or response.get('status_code') != 200:
+            results[entry['custom_id']] = {'error': str(entry.get('error') or response.get('body'))}
+            continue
+        content = response['body']['choices'][0]['message']['content']
+        results[entry['custom_id']] = {
+            'text': content.strip(),
+            'tokens': extract_usage('openai', response['body'].get('usage'))
+        }
+    return results
+
+
+def collect_openai_results(job, openai_key):
+    """Poll the OpenAI batch and download its results once it is finished"""
+    batch_info = job['batches']['openai']
+    client = openai.OpenAI(api_key=openai_key)
+    batch = client.batches.retrieve(batch_info['id'])
+    batch_info['status'] = batch.status
+    if batch.status not in OPENAI_FINAL_STATES:
+        return {}
+
+    results = {}
+    for file_id in [batch.output_file_id, batch.error_file_id]:
+        if file_id:
+            results.update(parse_openai_results(client.files.content(file_id).text))
+    return results
+
+
+def collect_anthropic_results(job, claude_key):
+    """Poll the Anthropic message batch and read its results once it has ended"""
+    batch_info = job['batches']['anthropic']
+    client = anthropic.Anthropic(api_key=claude_key)
+    batch = client.messages.batches.retrieve(batch_info['id'])
+    batch_info['status'] = batch.processing_status
+    if batch.processing_status != 'ended':
+        return {}
+
+    results = {}
+    for entry in client.messages.batches.results(batch_info['id']):
+        if entry.result.type == 'succeeded':
+            results[entry.custom_id] = {
+                'text': entry.result.message.content[0].text,
+                'tokens': extract_usage('anthropic', entry.result.message.usage)
+            }
+        else:
+            results[entry.custom_id] = {'error': entry.result.type}
+    return results
+
+
+def refresh_job(job, openai_key=None, claude_key=None):
+    """Poll every provider batch of a job and store results that have arrived"""
+    results_path = os.path.join(job_dir(job['job_id']), 'results.json')
+    results = {}
+    if os.path.exists(results_path):
+        with open(results_path) as f:
+            results = json.load(f)
+
+    collectors = {
+        'openai': lambda: collect_openai_results(job, openai_key),
+        'anthropic': lambda: collect_anthropic_results(job, claude_key)
+    }
+    for provider, batch_info in job['batches'].items():
+        if not batch_info.get('id') or batch_info.get('collected'):
+            continue
+        try:
+            provider_results = collectors[provider]()
+        except Exception as e:
+            logger.error(f"Error polling {provider} batch {batch_info['id']}: {str(e)}")
+            continue
+        if provider_results or batch_info['status'] in OPENAI_FINAL_STATES + ['ended']:
+            results.update(provider_results)
+            batch_info['collected'] = True
+
+    with open(results_path, 'w') as f:
+        json.dump(results, f, ensure_ascii=False)
+
+    batches = job['batches'].values()
+    if batches and all(batch.get('collected') for batch in batches) and job['status'] == 'submitted':
+        failed = any(batch['status'] in OPENAI_FAILED_STATES for batch in batches)
+        job['status'] = 'failed' if failed else 'completed'
+        save_job_usage(job, results)
+    job['result_count'] = len(results)
+    save_job(job)
+    return results
+
+
+def save_job_usage(job, results):
+    """Persist a usage report for the batch requests of a finished job"""
+    tracker = UsageTracker('cms_bulk', source=job['collection_name'], job_id=job['job_id'])
+    first_units = {}
+    for unit in job['units']:
+        first_units.setdefault(unit['custom_id'], unit)
+
+    for request in job['requests']:
+        tokens = results.get(request['custom_id'], {}).get('tokens')
+        if not tokens:
+            continue
+        # Deduplicated requests are attributed to the first unit that needed them
+        unit = first_units[request['custom_id']]
+        model = ANTHROPIC_BATCH_MODEL if request['provider'] == 'anthropic' else OPENAI_BATCH_MODEL
+        tracker.add(request['provider'], model, tokens, batch=True, locale=request['locale_code'],
+                    item=job['items'][unit['item_id']]['identifier'], field=unit['field'])
+    return tracker.save()
+
+
+def push_job(job, results, update_fn, webflow_key, max_workers=5):
+    """Push the translated fields of a completed job through the CMS update path
+
+    update_fn has the signature of execute_curl_command_concurrent. Items with
+    any missing or failed field translation for a locale are not pushed for
+    that locale so no half-translated item reaches Webflow. The locale term
+    mappings are enforced on every translation before it is pushed, and a
+    translation failing the quality checks fails its item for that locale.
+    """
+    requests = {request['custom_id']: request for request in job['requests']}
+    grouped = {}
+    for unit in job['units']:
+        grouped.setdefault((unit['item_id'], unit['cms_locale_id'], unit['locale_name']), []).append(unit)
+
+    def push_item(item_id, cms_locale_id, locale_name, units):
+        item = job['items'][item_id]
+        field_data = dict(item['data'])
+        for unit in units:
+            request = requests[unit['custom_id']]
+            if 'mapped' in request:
+                field_data[unit['field']] = request['mapped']
+                continue
+            result = results.get(unit['custom_id'], {})
+            if 'text' not in result:
+                return {
+                    'item': item['identifier'],
+                    'language': locale_name,
+                    'status': 'error',
+                    'message': f"Error translating {unit['field']}: {result.get('error', 'no result returned')}"
+                }
+            translated_text = enforce_text(request['text'], result['text'], request['locale_code'])
+            problems = check_text(request['text'], translated_text, request['locale_code'])
+            if problems:
+                return {
+                    'item': item['identifier'],
+                    'language': locale_name,
+                    'status': 'error',
+                    'message': f"{unit['field']} failed quality checks: {'; '.join(problems)}"
+                }
+            field_data[unit['field']] = translated_text
+
+        response = update_fn(
+            collection_id=job['collection_id'],
+            item_id=item_id,
+            api_key=webflow_key,
+            cms_locale_id=cms_locale_id,
+            field_data=field_data
+        )
+        return {
+            'item': item['identifier'],
+            'language': locale_name,
+            'status': 'success' if not response.get('error') else 'error',
+            'message': response.get('error') or 'Translation completed successfully'
+        }
+
+    push_results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(push_item, item_id, cms_locale_id, locale_name, units)
+            for (item_id, cms_locale_id, locale_name), units in grouped.items()
+        ]
+        for future in as_completed(futures):
+            push_results.append(future.result())
+
+    job['push_results'] = push_results
+    job['status'] = 'pushed'
+    save_job(job)
+    return push_results
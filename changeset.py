@@ -0,0 +1,301 @@
+import datetime
+import json
+import os
+import threading
+import time
+
+# A change set lists, per locale, every value a translation run would write
+# to Webflow next to the localized value Webflow serves now. Identical values
+# are only counted, so the change set is also the exact write queue.
+
+# Localized values Webflow served or was sent for a target and locale are
+# reused for this many seconds, so reruns skip unchanged writes without
+# fetching the localized content again
+LOCALIZED_CACHE_TTL = int(os.environ.get('LOCALIZED_CONTENT_TTL', '300'))
+
+_localized_lock = threading.Lock()
+_localized = {}
+
+
+def text_value(value):
+    """Plain string of a DOM text value, which may be a string or a {"html", "text"} dict"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    return value.get('html') or value.get('text') or ''
+
+
+def byte_delta(old, new):
+    old_bytes = len(old.encode('utf-8')) if isinstance(old, str) else 0
+    new_bytes = len(new.encode('utf-8')) if isinstance(new, str) else 0
+    return new_bytes - old_bytes
+
+
+def diff_fields(current, new):
+    """Compare new field values against the current localized ones
+
+    Returns (changes, unchanged) where changes is a list of
+    {"field", "old", "new", "bytes"} for every field whose value differs.
+    """
+    changes = []
+    unchanged = 0
+    for field, value in new.items():
+        old = current.get(field)
+        if old == value:
+            unchanged += 1
+            continue
+        changes.append({'field': field, 'old': old, 'new': value, 'bytes': byte_delta(old, value)})
+    return changes, unchanged
+
+
+def dom_texts(nodes):
+    """Map (nodeId, propertyId) to text for parsed or translated DOM nodes
+
+    Text nodes use a propertyId of None.
+    """
+    texts = {}
+    for node in nodes:
+        node_id = node.get('id') or node.get('nodeId')
+        overrides = node.get('propertyOverrides')
+        if overrides:
+            for override in overrides:
+                texts[(node_id, override['propertyId'])] = text_value(override.get('text'))
+        elif 'text' in node:
+            texts[(node_id, None)] = text_value(node['text'])
+    return texts
+
+
+def diff_dom(current_nodes, new_nodes):
+    """Compare translated DOM nodes against the current localized nodes
+
+    Returns (changes, unchanged) where changes is a list of
+    {"node_id", "property_id", "old", "new", "bytes"}.
+    """
+    return diff_dom_texts(dom_texts(current_nodes), new_nodes)
+
+
+def diff_dom_texts(current, new_nodes):
+    """diff_dom against current texts already flattened with dom_texts"""
+    changes = []
+    unchanged = 0
+    for (node_id, property_id), value in dom_texts(new_nodes).items():
+        old = current.get((node_id, property_id))
+        if old == value:
+            unchanged += 1
+            continue
+        changes.append({
+            'node_id': node_id,
+            'property_id': property_id,
+            'old': old,
+            'new': value,
+            'bytes': byte_delta(old, value)
+        })
+    return changes, unchanged
+
+
+def changes_to_nodes(changes):
+    """Build DOM update nodes carrying only the changed texts and overrides"""
+    nodes = []
+    by_node = {}
+    for change in changes:
+        if change['property_id'] is None:
+            nodes.append({'nodeId': change['node_id'], 'text': change['new']})
+            continue
+        if change['node_id'] not in by_node:
+            by_node[change['node_id']] = {'nodeId': change['node_id'], 'propertyOverrides': []}
+            nodes.append(by_node[change['node_id']])
+        by_node[change['node_id']]['propertyOverrides'].append({'propertyId': change['property_id'],
+                                                               'text': change['new']})
+    return nodes
+
+
+def change_key(change):
+    return change['field'] if 'field' in change else (change['node_id'], change['property_id'])
+
+
+def change_id(change):
+    """Stable ID of a change across reruns: itemId.field or nodeId[.propertyId], as in exchange files"""
+    if 'field' in change:
+        return f"{change.get('item_id')}.{change['field']}"
+    return change['node_id'] if change['property_id'] is None else f"{change['node_id']}.{change['property_id']}"
+
+
+def merge_changes(values, changes):
+    """Localized values after the changes are written"""
+    merged = dict(values)
+    merged.update({change_key(change): change['new'] for change in changes})
+    return merged
+
+
+def get_localized(key):
+    """Return cached localized values of a (kind, target, locale) key, or None if missing or expired"""
+    with _localized_lock:
+        entry = _localized.get(key)
+    if not entry or time.monotonic() - entry[0] >= LOCALIZED_CACHE_TTL:
+        return None
+    return entry[1]
+
+
+def remember_localized(key, values):
+    with _localized_lock:
+        _localized[key] = (time.monotonic(), values)
+
+
+def forget_localized(key):
+    with _localized_lock:
+        _localized.pop(key, None)
+
+
+def new_change_set(target_type, target_id=None):
+    return {
+        'target_type': target_type,
+        'target_id': target_id,
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'locales': {}
+    }
+
+
+def add_changes(change_set, locale_code, locale_id, changes, unchanged, **labels):
+    """Add one target's changes for a locale; labels (e.g. item_id) are copied onto each change"""
+    entry = change_set['locales'].setdefault(locale_code, {
+        'locale_id': locale_id,
+        'changes': [],
+        'unchanged': 0,
+        'bytes': 0
+    })
+    for change in changes:
+        entry['changes'].append({**labels, **change})
+        entry['bytes'] += change['bytes']
+    entry['unchanged'] += unchanged
+    return entry
+
+
+def accepted_changes(entry):
+    """Changes of a locale entry that may be written"""
+    return [change for change in entry['changes'] if not change.get('rejected') and change['new'] is not None]
+
+
+def rejected_changes(entry):
+    """Changes of a locale entry rejected by a reviewer or the quality checks; their note is in "rejected" """
+    return [change for change in entry['changes'] if change.get('rejected') or change['new'] is None]
+
+
+def review_rows(entry):
+    """Rows of a locale entry's changes for the review editor"""
+    failed = any('failed' in change for change in entry['changes'])
+    return [
+        {
+            **({'Item': change['item']} if 'item' in change else {}),
+            'Segment': change_id(change),
+            'Current': change['old'],
+            'Translation': change['new'],
+            'Reject': bool(change.get('rejected')),
+            'Note': change.get('rejected') or '',
+            **({'Write error': change.get('failed') or ''} if failed else {})
+        }
+        for change in entry['changes']
+    ]
+
+
+def set_rejections(entry, notes):
+    """Reject the changes whose change_id is in notes, with the note as reason, and accept all others
+
+    A change without a translated value (a failed translation) stays
+    rejected whatever the reviewer ticks, so it can't blank the field.
+    """
+    for change in entry['changes']:
+        key = change_id(change)
+        if key in notes:
+            change['rejected'] = (notes[key] or '').strip() or "Rejected by reviewer"
+        elif change['new'] is None:
+            change['rejected'] = change.get('rejected') or "No translation"
+        else:
+            change.pop('rejected', None)
+
+
+def edit_changes(entry, values):
+    """Take reviewer edits {change_id: text} of the translations; returns how many changed"""
+    edited = 0
+    for change in entry['changes']:
+        value = values.get(change_id(change))
+        if isinstance(value, str) and value != change['new']:
+            change.update(new=value, bytes=byte_delta(change['old'], value))
+            edited += 1
+    entry['bytes'] = sum(change['bytes'] for change in entry['changes'])
+    return edited
+
+
+def replace_changes(entry, retried):
+    """Put re-translated values {change_id: text} in place of rejected ones
+
+    The replaced changes are accepted again; a value equal to the current
+    localized one is dropped from the changes and counted as unchanged.
+    """
+    changes = []
+    for change in entry['changes']:
+        value = retried.get(change_id(change))
+        if value is not None:
+            change.pop('rejected', None)
+            change.update(new=value, bytes=byte_delta(change['old'], value))
+            if value == change['old']:
+                entry['unchanged'] += 1
+                continue
+        changes.append(change)
+    entry['changes'] = changes
+    entry['bytes'] = sum(change['bytes'] for change in changes)
+    # Review editors are keyed by revision so they show the new values
+    entry['revision'] = entry.get('revision', 0) + 1
+
+
+def keep_unwritten(change_set, failed):
+    """Drop the accepted changes once written, leaving the rejected ones and the failed writes staged
+
+    failed maps a locale code to {change_id: error} of accepted changes whose
+    write failed; they stay accepted with the error in "failed", so the next
+    apply sends them again. Returns how many changes are left.
+    """
+    left = 0
+    for locale_code, entry in change_set['locales'].items():
+        errors = failed.get(locale_code, {})
+        changes = []
+        for change in entry['changes']:
+            if change.get('rejected'):
+                changes.append(change)
+            elif change_id(change) in errors:
+                change['failed'] = errors[change_id(change)]
+                changes.append(change)
+        entry['changes'] = changes
+        entry['bytes'] = sum(change['bytes'] for change in changes)
+        entry['revision'] = entry.get('revision', 0) + 1
+        left += len(changes)
+    return left
+
+
+def change_set_rows(change_set):
+    """Per-locale summary rows for display"""
+    return [
+        {
+            'Locale': locale_code,
+            'Changed': len(entry['changes']),
+            'Rejected': len(rejected_changes(entry)),
+            'Failed': sum(1 for change in entry['changes'] if 'failed' in change),
+            'Unchanged': entry['unchanged'],
+            'Byte delta': entry['bytes']
+        }
+        for locale_code, entry in change_set['locales'].items()
+    ]
+
+
+def change_set_totals(change_set):
+    entries = change_set['locales'].values()
+    return {
+        'changed': sum(len(entry['changes']) for entry in entries),
+        'rejected': sum(len(rejected_changes(entry)) for entry in entries),
+        'unchanged': sum(entry['unchanged'] for entry in entries),
+        'bytes': sum(entry['bytes'] for entry in entries)
+    }
+
+
+def export_change_set(change_set):
+    return json.dumps({**change_set, 'totals': change_set_totals(change_set)}, indent=2, ensure_ascii=False)
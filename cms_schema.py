@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from logs import log_event
+from utils import WEBFLOW_API_BASE, webflow_request
+
+logger = logging.getLogger(__name__)
+
+# Webflow field types whose values are translated; RichText values are HTML
+TRANSLATABLE_FIELD_TYPES = ['PlainText', 'RichText']
+
+# Fields that are sent back unchanged with every localized update
+DEFAULT_PRESERVE_FIELDS = ['slug']
+
+DEFAULT_ITEM_IDENTIFIER = 'name'
+
+# Per-collection overrides keyed by collection ID or name. An entry may pin
+# "fields_to_translate", drop detected fields with "fields_to_skip", and set
+# "fields_to_preserve", "display_name" and "item_identifier". Its
+# "rich_text_fields" lists the HTML fields; it is required for the entry to
+# be used when the collection details can't be fetched.
+COLLECTION_OVERRIDES_PATH = os.environ.get('COLLECTION_OVERRIDES_PATH', 'collection_overrides.json')
+
+# Collection schemas rarely change; refetch them after this many seconds
+SCHEMA_CACHE_TTL = int(os.environ.get('COLLECTION_SCHEMA_TTL', '600'))
+
+_schema_lock = threading.Lock()
+_schemas = {}
+_overrides = {'mtime': None, 'by_key': {}, 'names': []}
+
+
+@dataclass(frozen=True)
+class CollectionSchema:
+    """Resolved translation schema of one collection, built once and shared"""
+
+    collection_id: str
+    display_name: str
+    item_identifier: str
+    translate_fields: frozenset
+    preserve_fields: frozenset
+    rich_text_fields: frozenset
+    # translate_fields in schema order, for display and job manifests
+    field_order: tuple
+    source: str
+
+    @property
+    def kept_fields(self):
+        """Fields parsed from items and sent back with localized updates"""
+        return self.translate_fields | self.preserve_fields
+
+
+def _load_overrides():
+    """Return the overrides index, reloading the file only when it changed
+
+    Names are kept longest first so the most specific name wins when several
+    occur in a collection name ("EU CTA Footer CMS" before "CTA Footer CMS").
+    """
+    path = COLLECTION_OVERRIDES_PATH
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    with _schema_lock:
+        if mtime == _overrides['mtime']:
+            return _overrides
+    overrides = {}
+    if mtime is not None:
+        with open(path) as f:
+            overrides = json.load(f)
+    with _schema_lock:
+        _overrides['mtime'] = mtime
+        _overrides['by_key'] = {key.lower(): override for key, override in overrides.items()}
+        _overrides['names'] = sorted(_overrides['by_key'], key=len, reverse=True)
+        # Schemas resolved against the old overrides are stale
+        _schemas.clear()
+        return _overrides
+
+
+def find_override(collection_id, collection_name):
+    """Return the override for a collection: by ID, exact name, then the longest contained name"""
+    overrides = _load_overrides()
+    by_key = overrides['by_key']
+    for key in [collection_id.lower(), collection_name.lower()]:
+        if key in by_key:
+            return by_key[key]
+    name = collection_name.lower()
+    for key in overrides['names']:
+        if key in name:
+            return by_key[key]
+    return None
+
+
+def get_collection_details(collection_id, api_key):
+    """Fetch a collection's schema (fields and their types) from Webflow
+
+    Returns (details, error).
+    """
+    url = f"{WEBFLOW_API_BASE}/collections/{collection_id}"
+    headers = {
+        "accept": "application/json",
+        "authorization": f"Bearer {api_key}"
+    }
+    try:
+        response = webflow_request("GET", url, headers=headers)
+        response.raise_for_status()
+        details = response.json()
+    except Exception as e:
+        log_event(logger, logging.ERROR, "fetch collection schema failed", collection_id=collection_id, error=str(e))
+        return None, f"Error fetching collection schema: {str(e)}"
+    log_event(logger, logging.INFO, "fetched collection schema", collection_id=collection_id,
+              fields=len(details.get('fields', [])))
+    return details, None
+
+
+def build_collection_schema(collection_id, details, override=None):
+    """Resolve a collection's schema from its Webflow details and optional override
+
+    Without an override every PlainText and RichText field except the slug is
+    translated.
+    """
+    source = ('schema+override' if override else 'schema') if details else 'override'
+    details = details or {}
+    override = override or {}
+    fields = details.get('fields', [])
+
+    preserve = override.get('fields_to_preserve', DEFAULT_PRESERVE_FIELDS)
+    if 'fields_to_translate' in override:
+        translate = list(override['fields_to_translate'])
+    else:
+        skip = set(override.get('fields_to_skip', [])) | set(preserve)
+        translate = [
+            field['slug'] for field in fields
+            if field.get('type') in TRANSLATABLE_FIELD_TYPES and field.get('slug') not in skip
+        ]
+
+    return CollectionSchema(
+        collection_id=collection_id,
+        display_name=override.get('display_name') or details.get('singularName') or details.get('displayName', 'Item'),
+        item_identifier=override.get('item_identifier', DEFAULT_ITEM_IDENTIFIER),
+        translate_fields=frozenset(translate),
+        preserve_fields=frozenset(preserve),
+        rich_text_fields=frozenset(field['slug'] for field in fields if field.get('type') == 'RichText')
+        | frozenset(override.get('rich_text_fields', [])),
+        field_order=tuple(translate),
+        source=source
+    )
+
+
+def get_collection_schema(collection_id, collection_name, api_key, refresh=False):
+    """Return the cached schema of a collection, building it on first use
+
+    The schema comes from Webflow's collection details endpoint; a matching
+    entry in the overrides file adjusts it. Collections whose details can't be
+    fetched still work from an override alone if it lists the rich text
+    fields. Returns (schema, error).
+    """
+    override = find_override(collection_id, collection_name)
+    with _schema_lock:
+        cached = _schemas.get(collection_id)
+    if cached and not refresh and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL:
+        return cached[1], None
+
+    details, error = get_collection_details(collection_id, api_key)
+    if details is None and override is None:
+        return None, error
+    if details is None and 'rich_text_fields' not in override:
+        # Without field types HTML fields would be translated as plain text
+        return None, f"{error}. The override can't replace it because it doesn't list its rich_text_fields"
+    schema = build_collection_schema(collection_id, details, override)
+    if details is not None:
+        # Override-only schemas are retried against Webflow on the next call
+        with _schema_lock:
+            _schemas[collection_id] = (time.monotonic(), schema)
+    return schema, None
+
+
+def clear_schema_cache():
+    with _schema_lock:
+        _schemas.clear()
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+from metrics import timed
+
+# Parsed items are shared by every session on the same site and token;
+# reload them from Webflow after this many seconds
+ITEM_CACHE_TTL = int(os.environ.get('COLLECTION_ITEMS_TTL', '300'))
+
+_cache_lock = threading.Lock()
+_item_cache = {}
+
+
+class CollectionItem:
+    """One parsed collection item holding only the fields a translation needs
+
+    Records are slotted and their field data is a read-only view, so a single
+    copy can be shared between sessions.
+    """
+
+    __slots__ = ('id', 'identifier', 'slug', 'data')
+
+    def __init__(self, item_id, identifier, slug, data):
+        self.id = item_id
+        self.identifier = identifier
+        self.slug = slug
+        self.data = MappingProxyType(data)
+
+    def __repr__(self):
+        return f"CollectionItem(id={self.id!r}, identifier={self.identifier!r}, fields={len(self.data)})"
+
+
+@timed('parse')
+def parse_collection_items(items, schema):
+    """Parse raw API items in one pass, keeping the fields the schema translates or preserves
+
+    Field keys are interned so thousands of items share one copy of each key.
+    The raw items can be dropped as soon as this returns.
+    """
+    kept_fields = schema.kept_fields
+    identifier_field = schema.item_identifier
+    parsed_items = []
+
+    for item in items:
+        field_data = item.get('fieldData', {})
+        parsed_items.append(CollectionItem(
+            item.get('id'),
+            field_data.get(identifier_field, 'Unnamed'),
+            field_data.get('slug', 'no-slug'),
+            {sys.intern(key): value for key, value in field_data.items() if key in kept_fields}
+        ))
+
+    return parsed_items
+
+
+def records_size(items):
+    """Approximate bytes held by parsed items, counting shared objects once"""
+    seen = set()
+    total = 0
+
+    def add(obj):
+        nonlocal total
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            total += sys.getsizeof(obj)
+
+    for item in items:
+        add(item)
+        add(item.data)
+        for value in (item.id, item.identifier, item.slug):
+            add(value)
+        for key, value in item.data.items():
+            add(key)
+            add(value)
+    return total
+
+
+def _cache_key(site_id, collection_id, api_key):
+    # Sessions only share items loaded with the same token
+    token = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return (site_id, collection_id, token)
+
+
+def get_cached_items(site_id, collection_id, api_key, schema):
+    """Return the shared items of a collection, or None if missing, expired or parsed with another schema"""
+    with _cache_lock:
+        entry = _item_cache.get(_cache_key(site_id, collection_id, api_key))
+    if not entry or entry['schema'] != schema or time.monotonic() - entry['loaded_at'] >= ITEM_CACHE_TTL:
+        return None
+    return entry['items']
+
+
+def cache_items(site_id, collection_id, api_key, schema, items):
+    """Share a fully loaded collection with other sessions; returns the stored tuple"""
+    items = tuple(items)
+    with _cache_lock:
+        _item_cache[_cache_key(site_id, collection_id, api_key)] = {
+            'site_id': site_id,
+            'collection_id': collection_id,
+            'schema': schema,
+            'items': items,
+            'bytes': records_size(items),
+            'loaded_at': time.monotonic()
+        }
+    return items
+
+
+def invalidate_items(site_id, collection_id=None):
+    """Drop the shared items of a collection, or of every collection of a site"""
+    with _cache_lock:
+        for key in list(_item_cache):
+            if key[0] == site_id and collection_id in (None, key[1]):
+                del _item_cache[key]
+
+
+def get_item_cache_stats():
+    with _cache_lock:
+        entries = list(_item_cache.values())
+    now = time.monotonic()
+    return [
+        {
+            'site_id': entry['site_id'],
+            'collection_id': entry['collection_id'],
+            'items': len(entry['items']),
+            'bytes': entry['bytes'],
+            'age': now - entry['loaded_at']
+        }
+        for entry in entries
+    ]
+
+
+def format_item_cache_stats(stats=None):
+    stats = get_item_cache_stats() if stats is None else stats
+    if not stats:
+        return "Shared item cache: empty"
+    items = sum(entry['items'] for entry in stats)
+    megabytes = sum(entry['bytes'] for entry in stats) / (1024 * 1024)
+    return f"Shared item cache: {items} items in {len(stats)} collections, ~{megabytes:.1f} MB"
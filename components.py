@@ -0,0 +1,321 @@
+import logging
+
+from changeset import (changes_to_nodes, diff_dom_texts, diff_fields, dom_texts, forget_localized, get_localized,
+                       merge_changes, remember_localized)
+from logs import log_event, log_payload
+from metrics import timed
+from utils import WEBFLOW_API_BASE, webflow_request
+
+logger = logging.getLogger(__name__)
+
+
+def get_component_properties(site_id, component_id, api_key, locale_id=None):
+    """Get component properties with pagination handling
+    
+    Returns (properties_data, error); it runs in sweep worker threads, so
+    the caller shows the error.
+    """
+    base_url = f"{WEBFLOW_API_BASE}/sites/{site_id}/components/{component_id}/properties"
+    headers = {
+        "accept": "application/json",
+        "authorization": f"Bearer {api_key}"
+    }
+    
+    # Add locale_id as a query parameter if provided
+    params = {}
+    if locale_id:
+        params["localeId"] = locale_id
+    
+    all_properties = []
+    offset = 0
+    limit = 100  # Maximum allowed by API
+    
+    while True:
+        # Add pagination parameters
+        params["limit"] = limit
+        params["offset"] = offset
+        
+        log_event(logger, logging.DEBUG, "fetch component properties", component_id=component_id,
+                  locale_id=locale_id, offset=offset)
+        
+        try:
+            response = webflow_request("GET", base_url, headers=headers, params=params)
+            response.raise_for_status()
+            data = response.json()
+            
+            # Add properties from this batch
+            current_properties = data.get('properties', [])
+            all_properties.extend(current_properties)
+            
+            # Get pagination info
+            pagination = data.get('pagination', {})
+            total = pagination.get('total', 0)
+            
+            log_event(logger, logging.DEBUG, "fetched component properties", component_id=component_id,
+                      count=len(current_properties), fetched=len(all_properties), total=total)
+            log_payload(logger, "component properties response", data, component_id=component_id, offset=offset)
+            
+            # Check if we've got all properties
+            if len(all_properties) >= total:
+                break
+                
+            # Update offset for next batch
+            offset += limit
+            
+        except Exception as e:
+            log_event(logger, logging.ERROR, "fetch component properties failed", component_id=component_id,
+                      offset=offset, error=str(e))
+            return None, f"Error fetching component properties: {str(e)}"
+    
+    # Return complete data with all properties
+    return {
+        "componentId": data.get("componentId"),
+        "properties": all_properties
+    }, None
+
+
+@timed('parse')
+def parse_component_properties(properties_data):
+    """Parse component properties to extract property IDs and text content"""
+    parsed_properties = []
+    
+    for prop in properties_data.get('properties', []):
+        # Only include properties that have text content
+        if prop.get('type') in ['Plain Text', 'Rich Text'] and prop.get('text'):
+            property_data = {
+                "propertyId": prop['propertyId'],
+                "type": prop['type'],
+                "label": prop.get('label', ''),
+            }
+            
+            # Add the appropriate text field based on property type
+            if prop['type'] == 'Plain Text' and 'text' in prop.get('text', {}):
+                property_data["text"] = prop['text']['text']
+            elif prop['type'] == 'Rich Text' and 'html' in prop.get('text', {}):
+                property_data["text"] = prop['text']['html']
+                
+            parsed_properties.append(property_data)
+    
+    return {"properties": parsed_properties}
+
+
+def format_translated_properties(translated_json):
+    """Format translated properties for the update API"""
+    formatted_properties = []
+    for prop in translated_json.get('properties', []):
+        formatted_prop = {
+            "propertyId": prop['propertyId']
+        }
+        
+        # Add the appropriate field based on property type
+        if prop['type'] == 'Plain Text':
+            formatted_prop["text"] = prop['text']
+        elif prop['type'] == 'Rich Text':
+            formatted_prop["text"] = prop['text']
+            
+        formatted_properties.append(formatted_prop)
+    
+    return {"properties": formatted_properties}
+
+
+def get_localized_property_texts(site_id, component_id, locale_id, api_key):
+    """Current localized property texts by propertyId, from the cache or fetched from Webflow; None if unavailable"""
+    cache_key = ('properties', component_id, locale_id)
+    texts = get_localized(cache_key)
+    if texts is None:
+        properties_data, _ = get_component_properties(site_id, component_id, api_key, locale_id)
+        if properties_data is None:
+            return None
+        texts = {prop['propertyId']: prop.get('text', '')
+                 for prop in parse_component_properties(properties_data)['properties']}
+        remember_localized(cache_key, texts)
+    return texts
+
+
+def update_component_properties(site_id, component_id, locale_id, properties, api_key):
+    """Update component properties with translated text
+    
+    Only properties whose text differs from the current localized value are
+    sent; when nothing changed no request is made. If the localized
+    properties can't be read, every property is sent.
+    """
+    url = f"{WEBFLOW_API_BASE}/sites/{site_id}/components/{component_id}/properties"
+    cache_key = ('properties', component_id, locale_id)
+    
+    current_texts = get_localized_property_texts(site_id, component_id, locale_id, api_key)
+    if current_texts is not None:
+        changes, unchanged = diff_fields(current_texts, {prop['propertyId']: prop['text']
+                                                         for prop in properties['properties']})
+        log_event(logger, logging.INFO, "diffed component properties", component_id=component_id,
+                  locale_id=locale_id, changed=len(changes), unchanged=unchanged)
+        if not changes:
+            return {"properties": [], "skipped": True}, None
+        properties = {"properties": [{"propertyId": change['field'], "text": change['new']} for change in changes]}
+    
+    headers = {
+        "accept": "application/json",
+        "authorization": f"Bearer {api_key}",
+        "content-type": "application/json"
+    }
+    
+    # Add locale_id as a query parameter
+    params = {"localeId": locale_id}
+    
+    log_payload(logger, "update component properties request", properties, component_id=component_id,
+                locale_id=locale_id)
+    
+    try:
+        response = webflow_request("POST", url, headers=headers, params=params, json=properties)
+        log_event(logger, logging.INFO, "updated component properties", component_id=component_id,
+                  locale_id=locale_id, status=response.status_code)
+        log_payload(logger, "update component properties response", response.text, component_id=component_id)
+        response.raise_for_status()
+        if current_texts is not None:
+            remember_localized(cache_key, merge_changes(current_texts, changes))
+        return response.json(), None
+    except Exception as e:
+        forget_localized(cache_key)
+        error_msg = f"Error updating component properties: {str(e)}"
+        log_event(logger, logging.ERROR, "update component properties failed", component_id=component_id,
+                  locale_id=locale_id, error=str(e))
+        return None, error_msg
+
+
+def get_component_content(site_id, component_id, api_key, locale_id=None):
+    """Get component content using DOM endpoint with pagination handling
+    
+    With a locale_id the localized content of that locale is returned.
+    Returns (content, error), like get_component_properties.
+    """
+    base_url = f"{WEBFLOW_API_BASE}/sites/{site_id}/components/{component_id}/dom"
+    locale_param = f"&localeId={locale_id}" if locale_id else ""
+    headers = {
+        "accept": "application/json",
+        "authorization": f"Bearer {api_key}",
+        "accept-version": "1.0.0"
+    }
+    
+    all_nodes = []
+    offset = 0
+    limit = 100  # Maximum allowed by API
+    
+    while True:
+        # Construct URL with pagination parameters
+        url = f"{base_url}?limit={limit}&offset={offset}{locale_param}"
+        
+        log_event(logger, logging.DEBUG, "fetch component content", component_id=component_id, locale_id=locale_id,
+                  offset=offset)
+        
+        try:
+            response = webflow_request("GET", url, headers=headers)
+            response.raise_for_status()
+            data = response.json()
+            
+            # Add nodes from this batch to our collection
+            current_nodes = data.get('nodes', [])
+            all_nodes.extend(current_nodes)
+            
+            # Get pagination info
+            pagination = data.get('pagination', {})
+            total = pagination.get('total', 0)
+            
+            log_event(logger, logging.DEBUG, "fetched component content", component_id=component_id,
+                      count=len(current_nodes), fetched=len(all_nodes), total=total)
+            log_payload(logger, "component content response", data, component_id=component_id, offset=offset)
+            
+            # Check if we've got all nodes
+            if len(all_nodes) >= total:
+                break
+                
+            # Update offset for next batch
+            offset += limit
+            
+        except Exception as e:
+            log_event(logger, logging.ERROR, "fetch component content failed", component_id=component_id,
+                      offset=offset, error=str(e))
+            return None, f"Error fetching component content: {str(e)}"
+    
+    # Return complete data with all nodes
+    return {
+        "nodes": all_nodes,
+        "lastUpdated": data.get("lastUpdated")
+    }, None
+
+
+@timed('parse')
+def parse_component_content(content):
+    """Parse component content to extract node IDs and HTML"""
+    parsed_nodes = []
+    
+    for node in content.get('nodes', []):
+        # Only include nodes that have non-empty html
+        if node.get('text', {}).get('html'):
+            node_data = {
+                "nodeId": node['id'],
+                "text": node['text']['html']  # Getting HTML instead of plain text
+            }
+            parsed_nodes.append(node_data)
+    
+    return {"nodes": parsed_nodes}
+
+
+def get_localized_component_texts(site_id, component_id, locale_id, api_key):
+    """Current localized texts of a component, from the cache or fetched from Webflow; None if unavailable"""
+    cache_key = ('component', component_id, locale_id)
+    texts = get_localized(cache_key)
+    if texts is None:
+        content, _ = get_component_content(site_id, component_id, api_key, locale_id)
+        if content is None:
+            return None
+        texts = dom_texts(parse_component_content(content)['nodes'])
+        remember_localized(cache_key, texts)
+    return texts
+
+
+def update_component_content(site_id, component_id, locale_id, nodes, api_key):
+    """Update component content with translated text
+    
+    Only nodes whose text differs from the current localized content are
+    sent; when nothing changed no request is made. If the localized content
+    can't be read, every node is sent.
+    """
+    # Updated URL structure to match the API specification
+    url = f"{WEBFLOW_API_BASE}/sites/{site_id}/components/{component_id}/dom?localeId={locale_id}"
+    cache_key = ('component', component_id, locale_id)
+    
+    current_texts = get_localized_component_texts(site_id, component_id, locale_id, api_key)
+    if current_texts is not None:
+        changes, unchanged = diff_dom_texts(current_texts, nodes)
+        log_event(logger, logging.INFO, "diffed component content", component_id=component_id, locale_id=locale_id,
+                  changed=len(changes), unchanged=unchanged)
+        if not changes:
+            return {"nodes": [], "skipped": True}, None
+        nodes = changes_to_nodes(changes)
+    
+    headers = {
+        "accept": "application/json",
+        "authorization": f"Bearer {api_key}",
+        "content-type": "application/json"
+    }
+    
+    payload = {
+        "nodes": nodes
+    }
+    
+    log_payload(logger, "update component content request", payload, component_id=component_id, locale_id=locale_id)
+    
+    try:
+        response = webflow_request("POST", url, headers=headers, json=payload)
+        log_event(logger, logging.INFO, "updated component content", component_id=component_id, locale_id=locale_id,
+                  nodes=len(nodes), status=response.status_code)
+        log_payload(logger, "update component content response", response.text, component_id=component_id)
+        response.raise_for_status()
+        if current_texts is not None:
+            remember_localized(cache_key, merge_changes(current_texts, changes))
+        return response.json(), None
+    except Exception as e:
+        forget_localized(cache_key)
+        error_msg = f"Error updating component content: {str(e)}"
+        log_event(logger, logging.ERROR, "update component content failed", component_id=component_id,
+                  locale_id=locale_id, error=str(e))
+        return None, error_msg
@@ -0,0 +1,231 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from metrics import observe
+
+logger = logging.getLogger(__name__)
+
+# Backends that get their own limiter; every call to one of them goes
+# through call_with_limit so the limiter sees all traffic in this process
+BACKENDS = ['openai', 'anthropic', 'webflow']
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 32
+
+# Multiplicative decrease applied on 429/5xx/connection errors and on p95 growth
+THROTTLE_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.75
+
+# p95 over the recent window may grow to this multiple of the long-running
+# p95 baseline before the limiter treats it as saturation
+LATENCY_TOLERANCE = 2.0
+LATENCY_WINDOW = 50
+MIN_LATENCY_SAMPLES = 10
+BASELINE_ALPHA = 0.05
+
+
+def is_throttle_status(status):
+    """Check whether a call outcome means the backend is overloaded"""
+    if status == 'error':
+        # Timeouts and connection resets
+        return True
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter for a single backend
+
+    The limit grows by one for every ``limit`` healthy completions and is cut
+    multiplicatively on 429/5xx responses or when the recent p95 latency rises
+    well above its baseline. In fixed mode the limit never changes.
+    """
+
+    def __init__(self, name, initial_limit=DEFAULT_INITIAL_LIMIT, min_limit=DEFAULT_MIN_LIMIT,
+                 max_limit=DEFAULT_MAX_LIMIT):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.adaptive = True
+        self._cond = threading.Condition()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._baseline_p95 = None
+        self._completions_since_decrease = 0
+        self.completed = 0
+        self.throttled = 0
+        self.errors = 0
+
+    @property
+    def limit(self):
+        return max(self.min_limit, int(self._limit))
+
+    def configure(self, adaptive=True, limit=None):
+        """Switch between adaptive and fixed mode, optionally resetting the limit"""
+        with self._cond:
+            self.adaptive = adaptive
+            if limit is not None:
+                self._limit = float(min(max(limit, self.min_limit), self.max_limit))
+            self._cond.notify_all()
+
+    def acquire(self):
+        """Block until a slot is free under the current limit"""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency, status=None):
+        """Free a slot and feed the call outcome into the AIMD controller
+
+        ``status`` is the HTTP status code, ``'error'`` for a failure without a
+        response, or None for a successful SDK call.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self.completed += 1
+            self._completions_since_decrease += 1
+
+            if is_throttle_status(status):
+                self.throttled += 1
+                self._decrease(THROTTLE_BACKOFF, f"status {status}")
+            elif isinstance(status, int) and status >= 400:
+                # Client errors say nothing about backend capacity
+                self.errors += 1
+            else:
+                self._latencies.append(latency)
+                p95 = self._window_p95()
+                if p95 is not None:
+                    if self._baseline_p95 is None:
+                        self._baseline_p95 = p95
+                    self._baseline_p95 += BASELINE_ALPHA * (p95 - self._baseline_p95)
+                if p95 is not None and p95 > LATENCY_TOLERANCE * self._baseline_p95:
+                    self._decrease(LATENCY_BACKOFF, f"p95 {p95:.2f}s over baseline {self._baseline_p95:.2f}s")
+                elif self.adaptive:
+                    # Additive increase: +1 per limit's worth of healthy completions
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+            self._cond.notify_all()
+
+    def _window_p95(self):
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        return percentile(list(self._latencies), 95)
+
+    def _decrease(self, factor, reason):
+        # Only back off once per round trip of the current limit so a burst of
+        # failures from requests already in flight doesn't collapse the limit
+        if not self.adaptive or self._completions_since_decrease < self.limit:
+            return
+        old_limit = self.limit
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        self._completions_since_decrease = 0
+        self._latencies.clear()
+        logger.info(f"{self.name} limiter: {reason}, limit {old_limit} -> {self.limit}")
+
+    def snapshot(self):
+        """Return the current limit, in-flight count and call statistics"""
+        with self._cond:
+            return {
+                'name': self.name,
+                'adaptive': self.adaptive,
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'p95': self._window_p95() or 0.0,
+                'completed': self.completed,
+                'throttled': self.throttled,
+                'errors': self.errors
+            }
+
+
+_limiters = {name: AdaptiveLimiter(name) for name in BACKENDS}
+
+# Per-backend caps of the job running in this context, see fixed_limit
+_job_limits = contextvars.ContextVar('job_limits', default=None)
+
+
+def get_limiter(backend):
+    """Return the process-wide limiter for a backend"""
+    return _limiters[backend]
+
+
+def configure_limiters(adaptive=True, limit=None):
+    """Put every limiter into adaptive mode or pin it to a fixed limit
+
+    The limiters are shared by every session of the process; a single job
+    caps its own requests with fixed_limit instead.
+    """
+    for limiter in _limiters.values():
+        limiter.configure(adaptive=adaptive, limit=limit)
+
+
+@contextmanager
+def fixed_limit(limit):
+    """Cap the in-flight requests of the job in this context at limit per backend
+
+    The shared adaptive limiters still gate every request; other jobs keep
+    their own limits. Workers see the cap when submitted with
+    usage.submit_with_context. A limit of None adds no cap.
+    """
+    if limit is None:
+        yield
+        return
+    token = _job_limits.set({name: threading.BoundedSemaphore(limit) for name in BACKENDS})
+    try:
+        yield
+    finally:
+        _job_limits.reset(token)
+
+
+def call_with_limit(backend, fn, *args, **kwargs):
+    """Call fn under the backend's limiter and report the outcome to it
+
+    Responses and exceptions that carry a ``status_code`` (requests responses,
+    OpenAI and Anthropic API errors) are classified by it.
+    """
+    limiter = get_limiter(backend)
+    job_limit = (_job_limits.get() or {}).get(backend)
+    wait_start = time.monotonic()
+    if job_limit is not None:
+        job_limit.acquire()
+    try:
+        limiter.acquire()
+        start_time = time.monotonic()
+        observe('limiter_wait', start_time - wait_start, backend=backend)
+        status = None
+        try:
+            result = fn(*args, **kwargs)
+            status = getattr(result, 'status_code', None)
+            return result
+        except Exception as e:
+            status = getattr(e, 'status_code', None) or 'error'
+            raise
+        finally:
+            limiter.release(time.monotonic() - start_time, status)
+    finally:
+        if job_limit is not None:
+            job_limit.release()
+
+
+def format_limiter_stats():
+    """Format the current limits of every backend for display"""
+    parts = []
+    for limiter in _limiters.values():
+        stats = limiter.snapshot()
+        mode = "" if stats['adaptive'] else " fixed"
+        parts.append(f"{stats['name']} {stats['limit']}{mode} (p95 {stats['p95']:.2f}s, {stats['throttled']} throttled)")
+    return "Concurrency limits: " + ", ".join(parts)
@@ -0,0 +1,217 @@
+import copy
+import re
+import threading
+from concurrent.futures import Future
+
+from metrics import timed
+
+# Collapse runs of whitespace (\s also covers non-breaking spaces) so that
+# "Sign up  now" and "Sign up now" are treated as the same segment
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_segment(text):
+    """Normalize a source segment for duplicate detection"""
+    if not isinstance(text, str):
+        return text
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def collect_text_refs(content):
+    """Collect every dict in a JSON structure that carries a string "text" value
+
+    The returned dicts are references into ``content`` so callers can write
+    translated values back in place.
+    """
+    refs = []
+    stack = [content]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if isinstance(current.get('text'), str) and current['text'].strip():
+                refs.append(current)
+            stack.extend(reversed([v for v in current.values() if isinstance(v, (dict, list))]))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+    return refs
+
+
+def build_dedup_plan(texts):
+    """Collapse identical (normalized) segments into a list of unique segments
+
+    Returns a dict with the unique source texts, the index of the unique
+    segment used by every input position and the total segment count.
+    """
+    unique = []
+    positions = {}
+    index = []
+    for text in texts:
+        key = normalize_segment(text)
+        if key not in positions:
+            positions[key] = len(unique)
+            unique.append(text)
+        index.append(positions[key])
+    return {
+        'unique': unique,
+        'index': index,
+        'total': len(index)
+    }
+
+
+def dedup_stats(plan):
+    """Summarize a dedup plan as total/unique counts and dedup ratio"""
+    total = plan['total']
+    unique = len(plan['unique'])
+    return {
+        'total': total,
+        'unique': unique,
+        'ratio': (total / unique) if unique else 1.0,
+        'saved': total - unique
+    }
+
+
+def format_dedup_stats(stats):
+    """Format dedup stats for display"""
+    if not stats['total']:
+        return "No segments to translate"
+    saved_pct = stats['saved'] / stats['total'] * 100
+    return (f"{stats['total']} segments, {stats['unique']} unique "
+            f"(dedup ratio {stats['ratio']:.2f}x, {saved_pct:.0f}% fewer translations)")
+
+
+@timed('parse')
+def build_segment_payload(content):
+    """Build the deduplicated segment payload sent to the LLM for a JSON structure
+
+    Returns the plan and a payload of the form
+    ``{"segments": [{"id": 0, "text": "..."}]}``.
+    """
+    refs = collect_text_refs(content)
+    plan = build_dedup_plan(ref['text'] for ref in refs)
+    payload = {
+        "segments": [
+            {"id": idx, "text": text}
+            for idx, text in enumerate(plan['unique'])
+        ]
+    }
+    return plan, payload
+
+
+@timed('parse_response')
+def parse_segment_response(response_json):
+    """Map a translated segment payload back to {segment id: translated text}"""
+    segments = response_json.get('segments', []) if isinstance(response_json, dict) else response_json
+    translations = {}
+    for segment in segments or []:
+        if isinstance(segment, dict) and 'id' in segment and isinstance(segment.get('text'), str):
+            try:
+                translations[int(segment['id'])] = segment['text']
+            except (TypeError, ValueError):
+                continue
+    return translations
+
+
+@timed('parse_response')
+def fan_out(content, plan, translations):
+    """Return a copy of ``content`` with every text replaced by its translation
+
+    ``translations`` maps unique segment index to translated text. Segments
+    without a translation keep their source text and are reported as missing.
+    """
+    translated = copy.deepcopy(content)
+    refs = collect_text_refs(translated)
+    missing = []
+    for ref, unique_idx in zip(refs, plan['index']):
+        if unique_idx in translations:
+            ref['text'] = translations[unique_idx]
+        else:
+            missing.append(unique_idx)
+    return translated, sorted(set(missing))
+
+
+class SegmentMemo:
+    """Thread-safe, job-scoped memo that translates each unique segment once per locale
+
+    Concurrent callers asking for the same (segment, locale) wait for the first
+    caller's result instead of issuing a duplicate request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.requests = 0
+        self.translations = 0
+
+    def get_or_translate(self, text, locale_code, translate_fn):
+        """Return (translated_text, error), calling translate_fn only for unseen segments"""
+        key = (normalize_segment(text), locale_code)
+        with self._lock:
+            self.requests += 1
+            future = self._entries.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[key] = future
+                self.translations += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = translate_fn(text)
+        except Exception as e:
+            result = (None, str(e))
+        if result[1]:
+            # Don't memoize failures so a later field can retry the segment
+            with self._lock:
+                self._entries.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def prime(self, text, locale_code, translated_text):
+        """Seed the memo with a translation obtained elsewhere"""
+        key = (normalize_segment(text), locale_code)
+        with self._lock:
+            if key in self._entries:
+                return
+            future = Future()
+            future.set_result((translated_text, None))
+            self._entries[key] = future
+            self.translations += 1
+
+    def known_translations(self, content, locale_code):
+        """Return {normalized segment: translation} for the texts of ``content`` already translated into a locale
+
+        Segments still being translated by another caller are left out rather
+        than waited for.
+        """
+        known = {}
+        with self._lock:
+            for ref in collect_text_refs(content):
+                key = normalize_segment(ref['text'])
+                future = self._entries.get((key, locale_code))
+                if future is not None and future.done() and not future.result()[1]:
+                    known[key] = future.result()[0]
+        return known
+
+    def prime_from(self, content, translated, locale_code):
+        """Seed the memo with every segment of ``content`` and its counterpart in ``translated``"""
+        source_refs = collect_text_refs(content)
+        translated_refs = collect_text_refs(translated)
+        if len(source_refs) != len(translated_refs):
+            # An emptied translation shifts the pairs; seed nothing rather than mismatched segments
+            return
+        for source_ref, translated_ref in zip(source_refs, translated_refs):
+            self.prime(source_ref['text'], locale_code, translated_ref['text'])
+
+    def stats(self):
+        """Return dedup stats for all lookups made through this memo"""
+        with self._lock:
+            total = self.requests
+            unique = self.translations
+        return {
+            'total': total,
+            'unique': unique,
+            'ratio': (total / unique) if unique else 1.0,
+            'saved': total - unique
+        }
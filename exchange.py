@@ -0,0 +1,313 @@
+import csv
+import io
+import logging
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+from changeset import byte_delta, diff_fields, dom_texts
+from glossary_index import glossary_terms_in_text
+from locale_terms import get_term_matcher
+from logs import log_event
+
+logger = logging.getLogger(__name__)
+
+# Files exchanged with human translation vendors: every translatable text of
+# a page, component or collection becomes one segment with a stable ID
+# (nodeId[.propertyId] for DOM content, itemId.field for CMS items), the
+# source text, the current localized text and notes about glossary terms.
+
+XLIFF_NAMESPACE = "urn:oasis:names:tc:xliff:document:2.0"
+
+SOURCE_LANGUAGE = "en"
+
+CSV_COLUMNS = ['target_type', 'target_id', 'locale', 'segment_id', 'source', 'target', 'notes']
+
+TARGET_TYPES = ('page', 'component', 'collection')
+
+EXPORT_FORMATS = {
+    'XLIFF 2.0': {'extension': 'xlf', 'mime': 'application/xliff+xml'},
+    'CSV': {'extension': 'csv', 'mime': 'text/csv'}
+}
+
+UPLOAD_TYPES = ['xlf', 'xliff', 'xml', 'csv']
+
+
+def dom_segment_id(node_id, property_id=None):
+    return node_id if property_id is None else f"{node_id}.{property_id}"
+
+
+def parse_dom_segment_id(segment_id):
+    """Return (nodeId, propertyId or None) of a DOM segment ID"""
+    node_id, _, property_id = segment_id.partition('.')
+    return node_id, property_id or None
+
+
+def field_segment_id(item_id, field):
+    return f"{item_id}.{field}"
+
+
+def parse_field_segment_id(segment_id):
+    """Return (item ID, field slug) of a CMS segment ID"""
+    item_id, _, field = segment_id.partition('.')
+    return item_id, field
+
+
+def segment_notes(source, locale_code):
+    """Glossary guidance for a segment: do-not-translate terms and fixed locale translations it contains"""
+    notes = []
+    terms = glossary_terms_in_text(source)
+    if terms:
+        notes.append("Do not translate: " + ", ".join(terms))
+    matcher = get_term_matcher(locale_code)
+    if matcher is not None:
+        mappings = matcher.required(source)
+        if mappings:
+            notes.append("Always translate: " + "; ".join(f"{src} -> {tgt}" for src, tgt in mappings.items()))
+    return " | ".join(notes)
+
+
+def dom_segments(source_nodes, current_texts, locale_code):
+    """Segments of parsed DOM nodes, with the current localized text as target"""
+    current_texts = current_texts or {}
+    for (node_id, property_id), source in dom_texts(source_nodes).items():
+        if not source.strip():
+            continue
+        yield {
+            'id': dom_segment_id(node_id, property_id),
+            'source': source,
+            'target': current_texts.get((node_id, property_id), ''),
+            'notes': segment_notes(source, locale_code)
+        }
+
+
+def item_segments(item, fields, current_fields, locale_code):
+    """Segments of the translatable fields of a parsed collection item"""
+    current_fields = current_fields or {}
+    for field in fields:
+        source = item.data.get(field)
+        if not isinstance(source, str) or not source.strip():
+            continue
+        target = current_fields.get(field)
+        yield {
+            'id': field_segment_id(item.id, field),
+            'source': source,
+            'target': target if isinstance(target, str) else '',
+            'notes': segment_notes(source, locale_code)
+        }
+
+
+def iter_xliff(target_type, target_id, locale_code, segments, source_language=SOURCE_LANGUAGE):
+    """Yield an XLIFF 2.0 document chunk by chunk, one unit per segment"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield (f'<xliff xmlns="{XLIFF_NAMESPACE}" version="2.0" srcLang={quoteattr(source_language)} '
+           f'trgLang={quoteattr(locale_code)}>\n')
+    yield f'  <file id={quoteattr(f"{target_type}-{target_id}")} original={quoteattr(f"{target_type}/{target_id}")}>\n'
+    for segment in segments:
+        chunk = f'    <unit id={quoteattr(segment["id"])}>\n'
+        if segment.get('notes'):
+            chunk += f'      <notes><note category="glossary">{escape(segment["notes"])}</note></notes>\n'
+        state = 'translated' if segment.get('target') and segment['target'] != segment['source'] else 'initial'
+        chunk += (f'      <segment state="{state}">\n'
+                  f'        <source>{escape(segment["source"])}</source>\n'
+                  f'        <target>{escape(segment.get("target") or "")}</target>\n'
+                  f'      </segment>\n'
+                  f'    </unit>\n')
+        yield chunk
+    yield '  </file>\n</xliff>\n'
+
+
+def iter_csv(target_type, target_id, locale_code, segments):
+    """Yield a CSV document row by row with the CSV_COLUMNS header"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for segment in segments:
+        writer.writerow([target_type, target_id, locale_code, segment['id'], segment['source'],
+                         segment.get('target') or '', segment.get('notes') or ''])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # No segments: header only
+        yield buffer.getvalue()
+
+
+def write_export_file(export_format, target_type, target_id, locale_code, segments):
+    """Stream segments into a temporary export file
+
+    Segments are written as they are produced, so a large collection is
+    never held in memory as one document. Returns a dict with the file's
+    path, download name, mime type and segment count; remove the file with
+    remove_export_file once it is no longer offered.
+    """
+    spec = EXPORT_FORMATS[export_format]
+    counted = {'segments': 0}
+
+    def counting(segments):
+        for segment in segments:
+            counted['segments'] += 1
+            yield segment
+
+    iter_document = iter_xliff if spec['extension'] == 'xlf' else iter_csv
+    with tempfile.NamedTemporaryFile('wb', suffix=f".{spec['extension']}", delete=False) as file:
+        try:
+            for chunk in iter_document(target_type, target_id, locale_code, counting(segments)):
+                file.write(chunk.encode('utf-8'))
+        except Exception:
+            # A failed fetch mid-export must not leave a partial file behind
+            file.close()
+            os.remove(file.name)
+            raise
+    log_event(logger, logging.INFO, "wrote exchange file", target_type=target_type, target_id=target_id,
+              locale=locale_code, format=spec['extension'], segments=counted['segments'],
+              bytes=os.path.getsize(file.name))
+    return {
+        'path': file.name,
+        'file_name': f"{target_type}-{target_id}-{locale_code}.{spec['extension']}",
+        'mime': spec['mime'],
+        'segments': counted['segments']
+    }
+
+
+def remove_export_file(export):
+    if export:
+        try:
+            os.remove(export['path'])
+        except OSError:
+            pass
+
+
+def find_locale(locales, code, key='tag'):
+    """Locale whose tag (or other code key) matches code case-insensitively, or None"""
+    code = (code or '').lower()
+    return next((locale for locale in locales if (locale.get(key) or '').lower() == code), None)
+
+
+def _new_document():
+    return {'target_type': None, 'target_id': None, 'locale': None, 'segments': {}, 'errors': []}
+
+
+def _read_xliff(upload):
+    document = _new_document()
+    for _, element in ET.iterparse(upload, events=('end',)):
+        tag = element.tag.rpartition('}')[2]
+        if tag == 'unit':
+            target = element.find(f'.//{{{XLIFF_NAMESPACE}}}target')
+            segment_id = element.get('id')
+            if segment_id in document['segments']:
+                document['errors'].append({'Segment': segment_id, 'Error': "Duplicate segment ID"})
+            document['segments'][segment_id] = ''.join(target.itertext()) if target is not None else ''
+            # Drop parsed units so large files are read in bounded memory
+            element.clear()
+        elif tag == 'file':
+            target_type, _, target_id = (element.get('original') or '').partition('/')
+            document.update(target_type=target_type, target_id=target_id)
+        elif tag == 'xliff':
+            document['locale'] = element.get('trgLang')
+    return document
+
+
+def _read_csv(upload):
+    document = _new_document()
+    text = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        missing = [column for column in ('target_type', 'target_id', 'locale', 'segment_id', 'target')
+                   if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+        for row_number, row in enumerate(reader, start=2):
+            header = (row['target_type'], row['target_id'], row['locale'])
+            if document['target_type'] is None:
+                document.update(target_type=header[0], target_id=header[1], locale=header[2])
+            elif header != (document['target_type'], document['target_id'], document['locale']):
+                document['errors'].append({'Segment': row['segment_id'],
+                                           'Error': f"Row {row_number} belongs to another target or locale"})
+                continue
+            if row['segment_id'] in document['segments']:
+                document['errors'].append({'Segment': row['segment_id'], 'Error': "Duplicate segment ID"})
+            document['segments'][row['segment_id']] = row['target'] or ''
+    finally:
+        text.detach()
+    return document
+
+
+def read_exchange(upload):
+    """Parse an uploaded XLIFF 2.0 or CSV exchange file
+
+    Returns (document, error) where document holds target_type, target_id,
+    locale, segments ({segment ID: target text}) and per-segment errors.
+    """
+    name = (getattr(upload, 'name', '') or '').lower()
+    upload.seek(0)
+    try:
+        document = _read_csv(upload) if name.endswith('.csv') else _read_xliff(upload)
+    except (ET.ParseError, csv.Error, UnicodeDecodeError, ValueError) as e:
+        return None, f"Could not read the file: {str(e)}"
+    if document['target_type'] not in TARGET_TYPES or not document['target_id']:
+        return None, "The file does not name a page, component or collection to import into"
+    if not document['locale']:
+        return None, "The file does not name a target locale"
+    log_event(logger, logging.INFO, "read exchange file", file=name, target_type=document['target_type'],
+              target_id=document['target_id'], locale=document['locale'], segments=len(document['segments']),
+              errors=len(document['errors']))
+    return document, None
+
+
+def validate_segments(document, known_ids):
+    """Keep the non-empty targets of known segment IDs
+
+    Returns (targets {segment ID: text}, errors) where errors lists unknown
+    IDs in addition to the document's own errors. Empty targets are skipped
+    so untranslated rows don't blank the localized content.
+    """
+    known_ids = set(known_ids)
+    errors = list(document['errors'])
+    targets = {}
+    for segment_id, target in document['segments'].items():
+        if segment_id not in known_ids:
+            errors.append({'Segment': segment_id, 'Error': "Unknown segment ID for this target"})
+        elif target.strip():
+            targets[segment_id] = target
+    return targets, errors
+
+
+def dom_import_changes(targets, current_texts):
+    """Compare imported {DOM segment ID: text} against the current localized texts
+
+    Returns (changes, unchanged) in the diff_dom format, ready for
+    changeset.changes_to_nodes.
+    """
+    changes = []
+    unchanged = 0
+    for segment_id, value in targets.items():
+        node_id, property_id = parse_dom_segment_id(segment_id)
+        old = current_texts.get((node_id, property_id))
+        if old == value:
+            unchanged += 1
+            continue
+        changes.append({'node_id': node_id, 'property_id': property_id, 'old': old, 'new': value,
+                        'bytes': byte_delta(old, value)})
+    return changes, unchanged
+
+
+def field_import_changes(targets, current_by_item):
+    """Compare imported {CMS segment ID: text} against each item's current localized fields
+
+    Returns ({item ID: changes in the diff_fields format}, unchanged count),
+    leaving out items with nothing to update.
+    """
+    by_item = {}
+    for segment_id, value in targets.items():
+        item_id, field = parse_field_segment_id(segment_id)
+        by_item.setdefault(item_id, {})[field] = value
+    changes_by_item = {}
+    unchanged = 0
+    for item_id, fields in by_item.items():
+        changes, item_unchanged = diff_fields(current_by_item.get(item_id) or {}, fields)
+        unchanged += item_unchanged
+        if changes:
+            changes_by_item[item_id] = changes
+    return changes_by_item, unchanged
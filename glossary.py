@@ -0,0 +1,363 @@
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+from types import MappingProxyType
+
+from logs import log_event
+
+logger = logging.getLogger(__name__)
+
+GLOSSARY_FILE = os.environ.get('GLOSSARY_FILE', 'glossary.json')
+
+# Per-locale term mappings ({locale code: {source term: target term}}) are
+# kept in glossary.json under this key, next to the categories
+LOCALE_TERMS_KEY = '_locale_terms'
+
+# Categories every glossary starts with; they can't be deleted from the UI
+DEFAULT_CATEGORIES = ['product_names', 'technical_terms', 'awards_name', 'address', 'list_of_people', 'custom_terms']
+
+# Default glossary with common terms that should not be translated
+DEFAULT_GLOSSARY = {
+    'product_names': [
+        'Deriv',
+        'Deriv App',
+        'Deriv Bot',
+        'Deriv GO',
+        'Deriv Life',
+        'Deriv Blog',
+        'Deriv X',
+        'Deriv cTrader',
+        'MT5',
+        'P2P',
+        'SmartTrader',
+        'Deriv Trader',
+        'Binary Bot'
+    ],
+    'technical_terms': [
+        # Web Technologies
+        'API',
+        'URL',
+        'HTTP',
+        'HTTPS',
+        'SSL',
+        'TLS',
+        'JSON',
+        'XML',
+        'REST',
+        'RESTful',
+        'SOAP',
+        'WebSocket',
+        'WS',
+        'WSS',
+        'GET',
+        'POST',
+        'PUT',
+        'DELETE',
+        'OAuth',
+        'Passkey',
+        
+        # Web Browsers & Tools
+        'Google Chrome',
+        'Firefox',
+        'Safari',
+        'Edge',
+        'Chrome DevTools',
+        
+        # Cloud & Storage
+        'Google Drive',
+        'Dropbox',
+        'iCloud',
+        'AWS',
+        'Azure',
+        
+        # Development Frameworks & Libraries
+        'Flutter',
+        'React',
+        'Angular',
+        'Vue.js',
+        'Node.js',
+        'Express.js',
+        'Django',
+        'Flask',
+        
+        # Security
+        'CORS',
+        'XSS',
+        'CSRF',
+        'JWT',
+        'SSH',
+        'VPN',
+        
+        # Database
+        'SQL',
+        'NoSQL',
+        'MongoDB',
+        'PostgreSQL',
+        'MySQL',
+        'Redis',
+        
+        # File Types
+        'CSV',
+        'PDF',
+        'ZIP',
+        'RAR',
+        'JPG',
+        'PNG',
+        'SVG',
+        
+        # Protocols
+        'FTP',
+        'SMTP',
+        'POP3',
+        'IMAP',
+        'TCP/IP',
+        'UDP',
+        
+        # Mobile Development
+        'iOS',
+        'Android',
+        'APK',
+        'IPA'
+    ],
+    'awards_name': [
+        'Affiliate Program of the Year',
+        'Best Customer Service - Global',
+        'Best Latam Region Broker',
+        'Best Partner Programme',
+        'Best Trading Experience',
+        'Best Trading Experience (LATAM) 2024',
+        'Broker of the Year - Global',
+        'Finance Magnates 2024',
+        'Forex Expo Dubai 2024',
+        'FX&Trust Score Awards 2024',
+        'Global Forex Awards',
+        'Global Forex Awards 2024',
+        'Most Innovative Broker',
+        'Most Innovative Broker— MEA 2025',
+        'Most Trusted Broker',
+        'UF Awards 2024'
+    ],
+    'address': [
+        "17 Rue d'Antin, 75002 Paris",
+        "181, Leoforos Archiepiskopou Makariou III Avenue 15 Business Centre, 1st Floor, 3030, Limassol Cyprus",
+        "2nd Floor, Suite 2, Omar Hodge Building, 325 Waterfront Drive, Road Town, Tortola, VG 1110, British Virgin Islands",
+        "67-1 & 69-1, Jalan KLJ 6, Taman Kota Laksamana Jaya, Melaka 75200",
+        "72 Limassol Avenue, 12th floor, Asteroid Business Centre, 2014 Strovolos, Nicosia",
+        "80 Robinson Road, #11-03, Singapore 068898",
+        "AJIB Building, No 12A & 12B, 3rd Floor, Al Bonouk Street, Al Abdali Boulevard, Amman - Jordan.",
+        "Cayman Enterprise City, Strathvale House, 2nd Floor, 90N Church St, George Town, Cayman Islands",
+        "Deriv HQ, 3500, Jalan Teknokrat 3, 63000 Cyberjaya, Selangor",
+        "Deriv Technologies Limited, Apex Forbury Road, Reading RG1 1AX",
+        "E-5-6, Soho Ipoh 2, Jalan Sultan Idris Shah, Ipoh 30000, Perak",
+        "Edificio Atrium, Piso 2, Guido Spano Esq. Doctor Morra, Asunción 1849",
+        "F16, Level 1, Paragon Labuan, Jalan Tun Mustapha, Labuan 87000, Sabah",
+        "First Floor, 68 - 72 Leonard Street, London, EC2A 4QX",
+        "Kemperplatz 1 Mitte D, 10785 Berlin, Germany",
+        "Level 2 East Wing, Kigali Heights, KG7 Avenue, Kigali",
+        "Level 3, W Business Centre, Triq Dun Karm, Birkirkara, BKR 9033",
+        "Nicosia",
+        "No. 1-23A, First Floor, Paragon, Jalan Tun Mustapha, 87008, Federal Territory of Labuan, Malaysia.",
+        "Office 1902, Jumeirah Business Center 1, JLT Cluster G",
+        "Room 408A, Empire Centre, 68 Mody Road, Tsim Sha Tsui East, Kowloon, Hong Kong",
+        "Suite 5, One Cornet Street, St Peter Port, Guernsey GY1 1 BZ",
+        "World Trade Center Ciudad del Este",
+        "Yumiwork, Lolam building, Kumul Highway, Land # 11/OD22/021, Port Vila, Vanuatu"
+    ],
+    'list_of_people': [
+        'Chris Horn',
+        'Derrick',
+        'Jean Yeas',
+        'Rakshit',
+        'Jean-Yves Sireau',
+        'Louise Wolf',
+        'Seema Hallon',
+        'Joanna Frendo',
+        'Jennice Lourdsamy',
+        'Prakash Bhudia'
+    ],
+    'custom_terms': []  # For user-added terms
+}
+
+_lock = threading.Lock()
+_state = {'version': 0, 'stamp': None, 'glossary': None, 'locale_terms': None}
+_listeners = []
+
+
+def _freeze(glossary):
+    return MappingProxyType({category: tuple(terms) for category, terms in glossary.items()})
+
+
+def _freeze_locale_terms(locale_terms):
+    return MappingProxyType({locale: MappingProxyType(dict(terms)) for locale, terms in locale_terms.items()})
+
+
+def _file_stamp():
+    try:
+        stat = os.stat(GLOSSARY_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _write(glossary, locale_terms):
+    """Atomically replace the glossary file so readers never see a partial write"""
+    if locale_terms:
+        glossary = {**glossary, LOCALE_TERMS_KEY: locale_terms}
+    directory = os.path.dirname(os.path.abspath(GLOSSARY_FILE))
+    fd, tmp_path = tempfile.mkstemp(prefix='.glossary-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(glossary, ensure_ascii=False))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, GLOSSARY_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _notify(version):
+    for listener in list(_listeners):
+        try:
+            listener(version)
+        except Exception as e:
+            log_event(logger, logging.WARNING, "glossary listener failed", version=version, error=str(e))
+
+
+def glossary_snapshot():
+    """Return (version, glossary) shared by every page and session
+
+    The glossary maps category to a tuple of terms and is read-only; change
+    it with update_glossary. The file is only re-read when its mtime or size
+    changes, which also bumps the version.
+    """
+    stamp = _file_stamp()
+    changed = False
+    with _lock:
+        if _state['glossary'] is None or stamp != _state['stamp']:
+            glossary = DEFAULT_GLOSSARY
+            if stamp is not None:
+                try:
+                    with open(GLOSSARY_FILE, 'r', encoding='utf-8') as f:
+                        glossary = json.load(f)
+                except Exception as e:
+                    log_event(logger, logging.ERROR, "load glossary failed", path=GLOSSARY_FILE, error=str(e))
+                    if _state['glossary'] is not None:
+                        return _state['version'], _state['glossary']
+            glossary = dict(glossary)
+            locale_terms = glossary.pop(LOCALE_TERMS_KEY, {})
+            changed = _state['glossary'] is not None
+            _state.update(version=_state['version'] + 1, stamp=stamp, glossary=_freeze(glossary),
+                          locale_terms=_freeze_locale_terms(locale_terms))
+        version, glossary = _state['version'], _state['glossary']
+    if changed:
+        log_event(logger, logging.INFO, "glossary reloaded", path=GLOSSARY_FILE, version=version)
+        _notify(version)
+    return version, glossary
+
+
+def get_glossary():
+    return glossary_snapshot()[1]
+
+
+def glossary_version():
+    return glossary_snapshot()[0]
+
+
+def get_locale_terms():
+    """Return the read-only {locale code: {source term: target term}} mappings of the current version"""
+    glossary_snapshot()
+    with _lock:
+        return _state['locale_terms']
+
+
+def _save(change, part, copy_part):
+    """Apply change to a mutable copy of one part of the glossary and save the whole file"""
+    glossary_snapshot()
+    with _lock:
+        current = copy_part(_state[part])
+        updated = copy_part(current)
+        change(updated)
+        if updated == current:
+            return _state['version'], None
+        parts = {
+            'glossary': {category: list(terms) for category, terms in _state['glossary'].items()},
+            'locale_terms': {locale: dict(terms) for locale, terms in _state['locale_terms'].items()},
+            part: updated
+        }
+        try:
+            _write(parts['glossary'], parts['locale_terms'])
+        except Exception as e:
+            log_event(logger, logging.ERROR, "save glossary failed", path=GLOSSARY_FILE, error=str(e))
+            return None, f"Error saving glossary: {str(e)}"
+        _state.update(version=_state['version'] + 1, stamp=_file_stamp(), glossary=_freeze(parts['glossary']),
+                      locale_terms=_freeze_locale_terms(parts['locale_terms']))
+        version = _state['version']
+    log_event(logger, logging.INFO, "glossary saved", path=GLOSSARY_FILE, version=version,
+              terms=sum(len(terms) for terms in parts['glossary'].values()),
+              locale_terms=sum(len(terms) for terms in parts['locale_terms'].values()))
+    _notify(version)
+    return version, None
+
+
+def update_glossary(change):
+    """Apply change(glossary) to a mutable copy, save it and bump the version
+
+    The copy maps category to a list of terms and is edited in place; the
+    return value of change is ignored. Nothing is written if the glossary
+    ends up unchanged. Returns (version, error).
+    """
+    return _save(change, 'glossary', lambda glossary: {category: list(terms) for category, terms in glossary.items()})
+
+
+def replace_glossary(glossary):
+    """Replace every category of the glossary, keeping the locale term mappings"""
+    def replace(current):
+        current.clear()
+        current.update({category: list(terms) for category, terms in glossary.items()})
+    return update_glossary(replace)
+
+
+def update_locale_terms(change):
+    """Like update_glossary for the per-locale term mappings ({locale code: {source: target}})"""
+    return _save(change, 'locale_terms', lambda locale_terms: {locale: dict(terms)
+                                                               for locale, terms in locale_terms.items()})
+
+
+def on_change(listener):
+    """Call listener(version) whenever the glossary changes, in this or another session"""
+    _listeners.append(listener)
+    return listener
+
+
+def cached_for_version(build):
+    """Wrap build(glossary) so its result is reused until the glossary version changes
+
+    Used for values derived from the whole glossary (flattened term lists,
+    search indexes, compiled matchers).
+    """
+    cache = {}
+    cache_lock = threading.Lock()
+
+    @on_change
+    def drop(version):
+        with cache_lock:
+            cache.clear()
+
+    @functools.wraps(build)
+    def get():
+        version, glossary = glossary_snapshot()
+        with cache_lock:
+            if version in cache:
+                return cache[version]
+        value = build(glossary)
+        with cache_lock:
+            cache.clear()
+            cache[version] = value
+        return value
+
+    return get
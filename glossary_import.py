@@ -0,0 +1,175 @@
+import csv
+import io
+import logging
+import re
+import time
+
+from glossary import update_glossary
+from logs import log_event
+
+logger = logging.getLogger(__name__)
+
+# Longest term accepted from an import; longer cells are usually whole
+# sentences pasted into the wrong column
+MAX_TERM_CHARS = 500
+
+# Row errors kept for the report; later ones are only counted so a broken
+# 100k-row export can't fill memory with messages
+MAX_REPORTED_ERRORS = 500
+
+CATEGORY_PATTERN = re.compile(r"^[a-z0-9_]+$")
+
+
+def normalize_category(category):
+    """Normalize a category name the way the Add Category form does"""
+    return category.strip().lower().replace(' ', '_')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_csv_rows(upload):
+    """Stream the rows of an uploaded CSV without decoding the whole file at once"""
+    upload.seek(0)
+    text = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        # Leave the upload open for Streamlit
+        text.detach()
+
+
+def iter_xlsx_rows(upload):
+    """Stream the rows of the first sheet of an uploaded XLSX
+
+    Uses openpyxl, the engine pandas reads .xlsx with, in read-only mode so
+    rows are parsed one at a time instead of loading the sheet into a
+    DataFrame.
+    """
+    import openpyxl
+
+    upload.seek(0)
+    workbook = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def iter_upload_rows(upload):
+    name = (getattr(upload, 'name', '') or '').lower()
+    if name.endswith('.xlsx'):
+        return iter_xlsx_rows(upload)
+    return iter_csv_rows(upload)
+
+
+def _header_columns(row):
+    """Return (category column, term column, is header) for the first row"""
+    names = [_cell(value).lower() for value in row]
+    if 'term' in names:
+        return (names.index('category') if 'category' in names else None), names.index('term'), True
+    # No recognizable header: assume Category, Term columns and keep the row as data
+    return 0, 1, False
+
+
+def import_glossary_rows(rows, existing):
+    """Validate and dedup imported (category, term) rows against the existing glossary
+
+    Rows are consumed one at a time; only new terms are kept. Returns
+    (additions, report) where additions maps category to the new terms in
+    file order.
+    """
+    seen = {category: set(terms) for category, terms in existing.items()}
+    categories = {}
+    additions = {}
+    report = {'rows': 0, 'added': 0, 'duplicates': 0, 'error_count': 0, 'errors': [], 'new_categories': []}
+
+    def reject(row_number, message):
+        report['error_count'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'Row': row_number, 'Error': message})
+
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return additions, report
+    category_column, term_column, has_header = _header_columns(first)
+    numbered = enumerate(rows, start=2) if has_header else _chain_numbered(first, rows)
+
+    # Rows are lists of strings (XLSX cells are converted while streaming)
+    for row_number, row in numbered:
+        term = row[term_column].strip() if term_column < len(row) else ''
+        raw_category = row[category_column] if category_column is not None and category_column < len(row) else ''
+        if not term and not raw_category.strip() and not any(value.strip() for value in row):
+            continue
+        report['rows'] += 1
+        category = categories.get(raw_category)
+        if category is None:
+            category = categories[raw_category] = normalize_category(raw_category) or 'custom_terms'
+        if not term:
+            reject(row_number, "Term is empty")
+            continue
+        if len(term) > MAX_TERM_CHARS:
+            reject(row_number, f"Term is longer than {MAX_TERM_CHARS} characters")
+            continue
+        if not CATEGORY_PATTERN.match(category):
+            reject(row_number, f"Invalid category '{category}' (use letters, digits and underscores)")
+            continue
+        terms = seen.get(category)
+        if terms is None:
+            terms = seen[category] = set()
+            report['new_categories'].append(category)
+        if term in terms:
+            report['duplicates'] += 1
+            continue
+        terms.add(term)
+        additions.setdefault(category, []).append(term)
+        report['added'] += 1
+
+    return additions, report
+
+
+def _chain_numbered(first, rows):
+    yield 1, first
+    yield from enumerate(rows, start=2)
+
+
+def import_glossary_file(upload, existing):
+    """Merge the terms of an uploaded CSV or XLSX into the glossary
+
+    Returns (report, error); the glossary is written once, after the whole
+    file has been validated.
+    """
+    start_time = time.time()
+    try:
+        additions, report = import_glossary_rows(iter_upload_rows(upload), existing)
+    except ImportError:
+        return None, "Reading .xlsx files needs openpyxl, the Excel engine used by pandas"
+    except (UnicodeDecodeError, csv.Error) as e:
+        return None, f"Could not read the file: {str(e)}"
+    except Exception as e:
+        log_event(logger, logging.ERROR, "glossary import failed", file=getattr(upload, 'name', None), error=str(e))
+        return None, f"Error importing glossary: {str(e)}"
+
+    if additions:
+        def merge(current):
+            # Another session may have added some of the terms since validation
+            for category, terms in additions.items():
+                present = set(current.setdefault(category, []))
+                current[category].extend(term for term in terms if term not in present)
+
+        _, error = update_glossary(merge)
+        if error:
+            return None, error
+
+    report['seconds'] = time.time() - start_time
+    log_event(logger, logging.INFO, "glossary imported", file=getattr(upload, 'name', None), rows=report['rows'],
+              added=report['added'], duplicates=report['duplicates'], errors=report['error_count'],
+              seconds=round(report['seconds'], 2))
+    return report, None
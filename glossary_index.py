@@ -0,0 +1,180 @@
+import re
+from bisect import bisect_left
+from collections import Counter
+
+from glossary import cached_for_version
+from metrics import timed
+
+# Substring and fuzzy lookups go through an index of character n-grams of
+# this size; shorter queries fall back to a scan of the lowercased terms
+NGRAM_SIZE = 3
+
+# Close matches need at least this share of n-grams in common with the query
+FUZZY_MIN_SIMILARITY = 0.3
+
+FUZZY_MAX_RESULTS = 50
+
+WORD_PATTERN = re.compile(r"\S+")
+
+# Stripped from the words of a text before looking up terms that start with them
+WORD_PUNCTUATION = "\"'()[]{}.,;:!?"
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    padded = f" {text} "
+    return {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+class GlossaryIndex:
+    """Search index over every term of one glossary version
+
+    Terms are kept in one array sorted by their lowercased form, so prefix
+    queries are two bisects, and in an n-gram index for substring and close
+    matches. Results are entry positions, i.e. indexes into ``terms``.
+    """
+
+    def __init__(self, glossary):
+        entries = sorted(
+            (term.lower(), term, category)
+            for category, terms in glossary.items()
+            for term in terms
+        )
+        self.keys = [entry[0] for entry in entries]
+        self.terms = [entry[1] for entry in entries]
+        self.categories = [entry[2] for entry in entries]
+        self.by_category = {category: [] for category in glossary}
+        self.grams = {}
+        for position, key in enumerate(self.keys):
+            self.by_category[self.categories[position]].append(position)
+            for gram in ngrams(key):
+                self.grams.setdefault(gram, []).append(position)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def prefix(self, query):
+        query = query.lower()
+        start = bisect_left(self.keys, query)
+        end = bisect_left(self.keys, query + '\uffff', lo=start)
+        return list(range(start, end))
+
+    def substring(self, query):
+        """Positions of terms containing query, in alphabetical order"""
+        query = query.lower()
+        if len(query) < NGRAM_SIZE:
+            return [position for position, key in enumerate(self.keys) if query in key]
+        # Inner n-grams only; the padded edge grams would require a word boundary
+        query_grams = {query[i:i + NGRAM_SIZE] for i in range(len(query) - NGRAM_SIZE + 1)}
+        postings = sorted((self.grams.get(gram, []) for gram in query_grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return sorted(position for position in candidates if query in self.keys[position])
+
+    def fuzzy(self, query, limit=FUZZY_MAX_RESULTS, min_similarity=FUZZY_MIN_SIMILARITY):
+        """Positions of terms sharing most n-grams with query, best first"""
+        query_grams = ngrams(query.lower())
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.grams.get(gram, []))
+        scored = []
+        for position, count in shared.items():
+            key = self.keys[position]
+            union = len(query_grams) + max(len(key) + 3 - NGRAM_SIZE, 1) - count
+            similarity = count / union
+            if similarity >= min_similarity:
+                scored.append((-similarity, position))
+        scored.sort()
+        return [position for _, position in scored[:limit]]
+
+    def search(self, query, category=None, fuzzy=False):
+        """Rank prefix matches, then other substring matches, then (optionally) close matches
+
+        Returns (position, match) hits where match is the (start, end) span of
+        the query in the term, or None for close matches and empty queries.
+        Turn the hits of a displayed page into terms with result().
+        """
+        query = query.strip()
+        if not query:
+            positions = self.by_category.get(category, []) if category else range(len(self.keys))
+            return [(position, None) for position in positions]
+
+        lowered = query.lower()
+        seen = set()
+        hits = []
+        for position in self.prefix(query) + self.substring(query):
+            if position in seen or (category and self.categories[position] != category):
+                continue
+            seen.add(position)
+            start = self.keys[position].find(lowered)
+            # Lowercasing a few characters changes their length, which would shift the span
+            match = (start, start + len(lowered)) if len(self.keys[position]) == len(self.terms[position]) else None
+            hits.append((position, match))
+        if fuzzy:
+            for position in self.fuzzy(query):
+                if position in seen or (category and self.categories[position] != category):
+                    continue
+                seen.add(position)
+                hits.append((position, None))
+        return hits
+
+    def result(self, hit):
+        position, match = hit
+        return {'term': self.terms[position], 'category': self.categories[position], 'match': match}
+
+
+@cached_for_version
+@timed('parse')
+def get_glossary_index(glossary):
+    """Search index of the current glossary, rebuilt only when the glossary changes"""
+    return GlossaryIndex(glossary)
+
+
+def paginate(results, page, page_size):
+    """Return (page results, page, total pages) with page clamped to the valid range"""
+    total_pages = max(1, (len(results) + page_size - 1) // page_size)
+    page = min(max(page, 0), total_pages - 1)
+    return results[page * page_size:(page + 1) * page_size], page, total_pages
+
+
+def highlight(result):
+    """Markdown of a search result's term with the matched span in bold"""
+    term = result['term']
+    if not result['match']:
+        return term
+    start, end = result['match']
+    return f"{term[:start]}**{term[start:end]}**{term[end:]}"
+
+
+@cached_for_version
+def _terms_by_first_word(glossary):
+    index = {}
+    for terms in glossary.values():
+        for term in terms:
+            words = term.split()
+            if words:
+                index.setdefault(words[0], set()).add(term)
+    return index
+
+
+def glossary_terms_in_text(text):
+    """Glossary terms that occur in text
+
+    Only terms starting with one of the text's words are compared, so the
+    cost depends on the text rather than on the size of the glossary.
+    """
+    if not isinstance(text, str) or not text:
+        return []
+    index = _terms_by_first_word()
+    found = set()
+    for match in WORD_PATTERN.finditer(text):
+        word = match.group(0)
+        stripped = word.lstrip(WORD_PUNCTUATION)
+        start = match.start() + len(word) - len(stripped)
+        for key in {word, stripped, stripped.rstrip(WORD_PUNCTUATION)}:
+            for term in index.get(key, ()):
+                if term not in found and text.startswith(term, start if key != word else match.start()):
+                    found.add(term)
+    return sorted(found)
@@ -0,0 +1,355 @@
+import html
+import logging
+import math
+import os
+import re
+import time
+
+from glossary_index import glossary_terms_in_text
+from locale_terms import get_term_matcher
+from logs import log_event
+from metrics import timed
+from translation_memory import remember_translations
+
+logger = logging.getLogger(__name__)
+
+# Already-translated documents (e.g. T&C delivered by legal as DOCX or PDF)
+# are split into paragraphs, aligned with the source segments of a page or
+# CMS item and stored in the translation memory, so those segments are never
+# sent to a model again.
+
+DOCUMENT_TYPES = ['docx', 'pdf']
+
+# Block elements of rich text; each block is aligned with its own paragraph
+BLOCK_PATTERN = re.compile(r"(<(p|h[1-6]|li|blockquote|figcaption)\b[^>]*>)(.*?)(</\2\s*>)", re.S | re.I)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+ENTITY_PATTERN = re.compile(r"&(#\d+|#x[0-9a-f]+|\w+);", re.I)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Anchors: numbers (compared by digits only, since separators differ between
+# locales) and URLs or e-mail addresses, which survive translation unchanged
+NUMBER_PATTERN = re.compile(r"\d[\d.,]*")
+LINK_PATTERN = re.compile(r"(?:https?://|www\.)\S+|[\w.+-]+@[\w-]+\.[\w.]+", re.I)
+
+# PDF lines that are only page furniture
+PAGE_NUMBER_PATTERN = re.compile(r"^(page\s+)?\d+(\s*(/|of)\s*\d+)?$", re.I)
+LIST_MARKER_PATTERN = re.compile(r"^(\(?\d+(\.\d+)*[.)]|\(?[a-z][.)]|[•▪●◦\-–])\s", re.I)
+SENTENCE_END = ('.', ':', ';', '!', '?', '。', '؟')
+
+# How far (in positions) the alignment may drift from the diagonal, on top
+# of the difference between the number of units and paragraphs
+ALIGN_BAND = 15
+
+# Length ratio deviation (as a log ratio) that costs as much as a missing anchor
+LENGTH_TOLERANCE = math.log(1.6)
+
+SKIP_COST = 1.5
+MERGE_COST = 0.5
+
+# Matches up to this cost are selected for seeding by default
+MAX_SEED_COST = 1.0
+
+
+def _plain(text):
+    return WHITESPACE_PATTERN.sub(' ', html.unescape(TAG_PATTERN.sub(' ', text))).strip()
+
+
+def _is_html(text):
+    return bool(TAG_PATTERN.search(text) or ENTITY_PATTERN.search(text))
+
+
+def iter_docx_paragraphs(upload):
+    """Yield the non-empty paragraphs of a DOCX, including table cells, in document order"""
+    import docx
+    from docx.oxml.ns import qn
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    upload.seek(0)
+    document = docx.Document(upload)
+    for child in document.element.body.iterchildren():
+        if child.tag == qn('w:p'):
+            paragraphs = [Paragraph(child, document)]
+        elif child.tag == qn('w:tbl'):
+            paragraphs = []
+            seen = set()
+            for row in Table(child, document).rows:
+                for cell in row.cells:
+                    # Merged cells are returned once per spanned column
+                    if id(cell._tc) not in seen:
+                        seen.add(id(cell._tc))
+                        paragraphs.extend(cell.paragraphs)
+        else:
+            continue
+        for paragraph in paragraphs:
+            text = WHITESPACE_PATTERN.sub(' ', paragraph.text).strip()
+            if text:
+                yield text
+
+
+def _pdf_page_lines(text):
+    """Normalized lines of a page, with None for blank lines and page numbers dropped"""
+    for line in (text or '').splitlines():
+        line = WHITESPACE_PATTERN.sub(' ', line).strip()
+        if not line:
+            yield None
+        elif not PAGE_NUMBER_PATTERN.match(line):
+            yield line
+
+
+def iter_pdf_paragraphs(upload):
+    """Yield the paragraphs of a PDF, reading one page at a time
+
+    PDF text has no paragraph marks, so lines are joined until a blank line,
+    a list marker, or a short line ending a sentence. A paragraph running
+    over a page break is continued on the next page.
+    """
+    from PyPDF2 import PdfReader
+
+    upload.seek(0)
+    reader = PdfReader(upload)
+    current = []
+    for page in reader.pages:
+        lines = list(_pdf_page_lines(page.extract_text()))
+        width = max((len(line) for line in lines if line), default=0)
+        for line in lines:
+            if current and (line is None or LIST_MARKER_PATTERN.match(line)):
+                yield ' '.join(current)
+                current = []
+            if line is None:
+                continue
+            if current and current[-1].endswith('-') and line[:1].islower():
+                # Re-join a word hyphenated at the end of the line
+                current[-1] = current[-1][:-1] + line
+            else:
+                current.append(line)
+            if line.endswith(SENTENCE_END) and len(line) < 0.8 * width:
+                yield ' '.join(current)
+                current = []
+    if current:
+        yield ' '.join(current)
+
+
+def iter_document_paragraphs(upload):
+    name = (getattr(upload, 'name', '') or '').lower()
+    if name.endswith('.pdf'):
+        return iter_pdf_paragraphs(upload)
+    return iter_docx_paragraphs(upload)
+
+
+def source_units(segments, locale_code):
+    """Split source segments into alignment units
+
+    segments is a list of (key, source text). Rich text is split into its
+    block elements; other texts are one unit. Each unit records the span of
+    the source it translates, whether its translation must be HTML-escaped,
+    whether it has inline markup (which a plain paragraph can't restore) and
+    its anchors: numbers, links and terms expected verbatim in the
+    translation (glossary terms and the locale's mapped targets).
+    """
+    matcher = get_term_matcher(locale_code)
+    units = []
+    for key, source in segments:
+        if not isinstance(source, str):
+            continue
+        blocks = list(BLOCK_PATTERN.finditer(source))
+        spans = [(block.start(3), block.end(3)) for block in blocks] or [(0, len(source))]
+        is_html = _is_html(source)
+        for start, end in spans:
+            inner = source[start:end]
+            text = _plain(inner)
+            if not text:
+                continue
+            terms = set(glossary_terms_in_text(text))
+            if matcher is not None:
+                terms.update(matcher.required(text).values())
+            anchors = _anchors(text)
+            units.append({
+                'key': key,
+                'start': start,
+                'end': end,
+                'text': text,
+                'length': len(text),
+                'html': is_html,
+                'markup': bool(TAG_PATTERN.search(inner)) if blocks else bool(TAG_PATTERN.search(source)),
+                'terms': terms,
+                # Anchors and terms that should reappear in the translation
+                'expected': anchors | terms
+            })
+    return units
+
+
+def _anchors(text):
+    numbers = {re.sub(r"\D", "", number) for number in NUMBER_PATTERN.findall(text)}
+    return numbers | {link.rstrip('.,;)').lower() for link in LINK_PATTERN.findall(text)}
+
+
+def _move_cost(units, paragraphs, ratio):
+    if not units or not paragraphs:
+        return SKIP_COST
+    source_length = sum(unit['length'] for unit in units)
+    target = ' '.join(paragraph['text'] for paragraph in paragraphs)
+    expected = set().union(*(unit['expected'] for unit in units))
+    found = set().union(*(paragraph['anchors'] for paragraph in paragraphs))
+    terms = set().union(*(unit['terms'] for unit in units))
+    cost = abs(math.log((len(target) + 1) / (ratio * source_length + 1))) / LENGTH_TOLERANCE
+    if terms:
+        found = found | {term for term in terms if term in target}
+    if expected or found:
+        cost += 1 - len(expected & found) / len(expected | found)
+    else:
+        cost += 0.5
+    if len(units) > 1 or len(paragraphs) > 1:
+        cost += MERGE_COST
+    return cost
+
+
+@timed('parse')
+def align(units, paragraphs):
+    """Monotonic alignment of source units with translated paragraphs
+
+    Dynamic programming over 1-1, 1-0, 0-1, 1-2 and 2-1 matches, scored by
+    length ratio (against the document's overall ratio) and shared anchors,
+    within a band around the diagonal. Returns (unit indexes, paragraph
+    indexes, cost) steps in document order.
+    """
+    n, m = len(units), len(paragraphs)
+    if not n or not m:
+        return []
+    ratio = sum(len(paragraph['text']) for paragraph in paragraphs) / max(sum(unit['length'] for unit in units), 1)
+    band = ALIGN_BAND + abs(n - m)
+    log = math.log
+    scaled_lengths = [ratio * unit['length'] + 1 for unit in units]
+    target_lengths = [len(paragraph['text']) + 1 for paragraph in paragraphs]
+
+    def pair_cost(i, j):
+        # _move_cost of a single unit and paragraph, inlined for the hot loop
+        unit, paragraph = units[i], paragraphs[j]
+        cost = abs(log(target_lengths[j] / scaled_lengths[i])) / LENGTH_TOLERANCE
+        expected, found = unit['expected'], paragraph['anchors']
+        if unit['terms']:
+            found = found | {term for term in unit['terms'] if term in paragraph['text']}
+        if expected or found:
+            return cost + 1 - len(expected & found) / len(expected | found)
+        return cost + 0.5
+
+    costs = {(0, 0): 0.0}
+    back = {}
+    for i in range(n + 1):
+        center = round(i * m / n)
+        for j in range(max(0, center - band), min(m, center + band) + 1):
+            if i == 0 and j == 0:
+                continue
+            best = None
+            for di, dj in ((1, 1), (1, 0), (0, 1), (1, 2), (2, 1)):
+                previous = costs.get((i - di, j - dj))
+                if previous is None:
+                    continue
+                if not di or not dj:
+                    cost = previous + SKIP_COST
+                elif di == 1 and dj == 1:
+                    cost = previous + pair_cost(i - 1, j - 1)
+                elif best is not None and previous + MERGE_COST >= best[0]:
+                    # A merge costs at least MERGE_COST and can't win
+                    continue
+                else:
+                    cost = previous + _move_cost(units[i - di:i], paragraphs[j - dj:j], ratio)
+                if best is None or cost < best[0]:
+                    best = (cost, di, dj)
+            if best is not None:
+                costs[(i, j)] = best[0]
+                back[(i, j)] = (best[1], best[2])
+
+    steps = []
+    i, j = n, m
+    while i or j:
+        di, dj = back[(i, j)]
+        steps.append((list(range(i - di, i)), list(range(j - dj, j)), costs[(i, j)] - costs[(i - di, j - dj)]))
+        i, j = i - di, j - dj
+    steps.reverse()
+    return steps
+
+
+def ingest_document(upload, segments, locale_code):
+    """Align an already-translated DOCX or PDF with source segments
+
+    Returns (matches, error). matches has one row per source unit with the
+    aligned paragraph text (empty when nothing matched), the match cost and
+    whether the row can seed the memory and is selected by default.
+    """
+    start_time = time.time()
+    try:
+        paragraphs = [{'text': text, 'anchors': _anchors(text)} for text in iter_document_paragraphs(upload)]
+    except ImportError as e:
+        return None, f"Reading this file needs {e.name or 'python-docx / PyPDF2'} (see requirements.txt)"
+    except Exception as e:
+        log_event(logger, logging.ERROR, "document ingestion failed", file=getattr(upload, 'name', None), error=str(e))
+        return None, f"Could not read the document: {str(e)}"
+    if not paragraphs:
+        return None, "No text found in the document (scanned PDFs need OCR first)"
+
+    units = source_units(segments, locale_code)
+    if not units:
+        return None, "The source has no text to align"
+    matches = [dict(unit, translation='', cost=None, seedable=False, selected=False) for unit in units]
+    for unit_indexes, paragraph_indexes, cost in align(units, paragraphs):
+        # A unit may continue over two paragraphs; two units sharing one
+        # paragraph can't be split apart and are left unmatched
+        if len(unit_indexes) != 1 or not paragraph_indexes:
+            continue
+        match = matches[unit_indexes[0]]
+        match.update(translation=' '.join(paragraphs[j]['text'] for j in paragraph_indexes), cost=cost,
+                     seedable=not match['markup'])
+        match['selected'] = match['seedable'] and cost <= MAX_SEED_COST
+
+    log_event(logger, logging.INFO, "aligned document", file=getattr(upload, 'name', None), locale=locale_code,
+              paragraphs=len(paragraphs), units=len(units),
+              matched=sum(1 for match in matches if match['translation']),
+              selected=sum(1 for match in matches if match['selected']), seconds=round(time.time() - start_time, 2))
+    return matches, None
+
+
+def match_rows(matches):
+    """Rows for reviewing matches; "Seed" is the editable selection"""
+    return [
+        {
+            'Seed': match['selected'],
+            'Source': match['text'],
+            'Translation': match['translation'],
+            'Confidence': round(max(0.0, 1 - match['cost'] / (2 * MAX_SEED_COST)), 2) if match['cost'] is not None else 0.0,
+            'Note': '' if match['seedable'] or not match['translation'] else "Inline markup, can't seed"
+        }
+        for match in matches
+    ]
+
+
+def segment_translations(segments, matches, selected):
+    """Rebuild full translations of the segments whose every unit is selected
+
+    Each unit's span of the source is replaced with its paragraph text,
+    escaped when the source is HTML, so block markup is kept. Returns
+    [(source, translation)].
+    """
+    by_key = {}
+    for match, chosen in zip(matches, selected):
+        by_key.setdefault(match['key'], []).append(match if chosen and match['seedable'] and match['translation']
+                                                   else None)
+    pairs = []
+    for key, source in segments:
+        key_matches = by_key.get(key)
+        if not key_matches or None in key_matches:
+            continue
+        translation = source
+        for match in sorted(key_matches, key=lambda match: match['start'], reverse=True):
+            text = html.escape(match['translation'], quote=False) if match['html'] else match['translation']
+            translation = translation[:match['start']] + text + translation[match['end']:]
+        pairs.append((source, translation))
+    return pairs
+
+
+def seed_memory(segments, matches, selected, locale_code, origin):
+    """Store the selected aligned translations in the translation memory; returns (stored, error)"""
+    pairs = segment_translations(segments, matches, selected)
+    if not pairs:
+        return 0, None
+    return remember_translations(pairs, locale_code, f"document:{os.path.basename(origin)}")
@@ -0,0 +1,130 @@
+import logging
+import threading
+
+import anthropic
+import openai
+
+from concurrency import call_with_limit
+from logs import log_sampled
+from metrics import span
+from usage import extract_usage, record_usage
+
+logger = logging.getLogger(__name__)
+
+# Prompt cache statistics shared by every page and session in this process
+_cache_lock = threading.Lock()
+_cache_stats = {
+    'requests': 0,
+    'prompt_tokens': 0,
+    'cached_tokens': 0,
+    'cache_write_tokens': 0
+}
+
+
+def record_cache_usage(provider, usage):
+    """Accumulate prompt cache hits from a provider usage object"""
+    if usage is None:
+        return
+    tokens = extract_usage(provider, usage)
+    prompt = tokens['prompt_tokens']
+    cached = tokens['cached_tokens']
+    written = tokens['cache_write_tokens']
+
+    with _cache_lock:
+        _cache_stats['requests'] += 1
+        _cache_stats['prompt_tokens'] += prompt
+        _cache_stats['cached_tokens'] += cached
+        _cache_stats['cache_write_tokens'] += written
+
+    log_sampled(logger, "prompt cache usage", provider=provider, prompt_tokens=prompt, cached_tokens=cached,
+                cache_write_tokens=written)
+
+
+def get_cache_stats():
+    """Return a snapshot of prompt cache statistics"""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+    stats['hit_rate'] = stats['cached_tokens'] / stats['prompt_tokens'] if stats['prompt_tokens'] else 0.0
+    return stats
+
+
+def usage_cache_stats(totals):
+    """Prompt cache statistics of one job, from its usage report totals
+
+    get_cache_stats counts every job of the process since it started.
+    """
+    stats = {key: totals[key] for key in ('prompt_tokens', 'cached_tokens', 'cache_write_tokens')}
+    stats['requests'] = totals['calls']
+    stats['hit_rate'] = stats['cached_tokens'] / stats['prompt_tokens'] if stats['prompt_tokens'] else 0.0
+    return stats
+
+
+def format_cache_stats(stats):
+    """Format prompt cache statistics for display"""
+    if not stats['requests']:
+        return "Prompt cache: no requests yet"
+    return (f"Prompt cache: {stats['hit_rate']:.0%} of {stats['prompt_tokens']:,} prompt tokens served from cache "
+            f"over {stats['requests']} requests")
+
+
+def record_response_usage(provider, model, response, locale=None):
+    """Feed a response's token usage into the prompt cache stats and the active usage tracker"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return
+    record_cache_usage(provider, usage)
+    record_usage(provider, model, extract_usage(provider, usage), locale=locale)
+
+
+def build_openai_messages(static_prompt, locale_prompt, user_message):
+    """Build chat messages with the static prompt first so it forms a cacheable prefix"""
+    messages = [{"role": "system", "content": static_prompt}]
+    if locale_prompt:
+        messages.append({"role": "system", "content": locale_prompt})
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def build_anthropic_system(static_prompt, locale_prompt):
+    """Build Anthropic system blocks with a cache breakpoint after the static prompt"""
+    system = [{
+        "type": "text",
+        "text": static_prompt,
+        "cache_control": {"type": "ephemeral"}
+    }]
+    if locale_prompt:
+        system.append({"type": "text", "text": locale_prompt})
+    return system
+
+
+def openai_chat(api_key, model, static_prompt, locale_prompt, user_message, locale=None, **kwargs):
+    """Call OpenAI chat completions with a cacheable static system prompt
+
+    The static prompt is sent first and unchanged for every locale so
+    OpenAI's automatic prefix caching applies; the locale prompt follows it.
+    ``locale`` only labels the request in the latency metrics.
+    """
+    client = openai.OpenAI(api_key=api_key)
+    messages = build_openai_messages(static_prompt, locale_prompt, user_message)
+
+    with span('llm_request', provider='openai', model=model, locale=locale):
+        response = call_with_limit('openai', client.chat.completions.create, model=model, messages=messages, **kwargs)
+    record_response_usage('openai', model, response, locale)
+    return response
+
+
+def anthropic_message(api_key, model, static_prompt, locale_prompt, user_message, locale=None, **kwargs):
+    """Call Anthropic messages with a cache breakpoint after the static system prompt"""
+    client = anthropic.Anthropic(api_key=api_key)
+
+    with span('llm_request', provider='anthropic', model=model, locale=locale):
+        response = call_with_limit(
+            'anthropic',
+            client.messages.create,
+            model=model,
+            system=build_anthropic_system(static_prompt, locale_prompt),
+            messages=[{"role": "user", "content": user_message}],
+            **kwargs
+        )
+    record_response_usage('anthropic', model, response, locale)
+    return response
@@ -0,0 +1,183 @@
+import logging
+import re
+
+from dedup import collect_text_refs
+from glossary import cached_for_version, get_locale_terms
+from logs import log_event
+from metrics import span
+
+logger = logging.getLogger(__name__)
+
+
+class TermMatcher:
+    """Compiled source -> target term mappings of one locale
+
+    Sources match case-sensitively as whole words, longest first, so
+    "Deriv Bot" wins over "Deriv".
+    """
+
+    def __init__(self, mappings):
+        self.mappings = dict(mappings)
+        alternatives = "|".join(re.escape(source) for source in sorted(self.mappings, key=len, reverse=True))
+        self.pattern = re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+
+    def required(self, text):
+        """{source: target} for every mapped term in text"""
+        if not isinstance(text, str):
+            return {}
+        return {source: self.mappings[source] for source in self.pattern.findall(text)}
+
+    def map_fully(self, text):
+        """Translation of a text made only of mapped terms, punctuation and numbers, or None"""
+        if not isinstance(text, str) or not text.strip():
+            return None
+        remainder = self.pattern.sub("", text)
+        if remainder == text or any(char.isalpha() for char in remainder):
+            return None
+        return self.pattern.sub(lambda match: self.mappings[match.group(0)], text)
+
+    def enforce(self, source_text, translated_text):
+        """Apply the mappings of source_text to its translation
+
+        Mapped terms the model left in the source language are replaced with
+        their target. Returns (translated_text, sources whose target is still
+        missing).
+        """
+        required = self.required(source_text)
+        if not required or not isinstance(translated_text, str):
+            return translated_text, []
+        pending = {source for source, target in required.items() if target not in translated_text}
+        if not pending:
+            return translated_text, []
+        translated_text = self.pattern.sub(
+            lambda match: self.mappings[match.group(0)] if match.group(0) in pending else match.group(0),
+            translated_text
+        )
+        return translated_text, [source for source in pending if required[source] not in translated_text]
+
+
+@cached_for_version
+def _matchers(glossary):
+    # Filled lazily per locale; dropped with the rest of the version's caches
+    return {}
+
+
+def get_term_matcher(locale_code):
+    """Matcher for a locale, or None if it has no mappings
+
+    Mappings of the base language (e.g. "pt") apply to its regional locales
+    ("pt-PT"), which override them term by term.
+    """
+    matchers = _matchers()
+    key = (locale_code or "").lower()
+    if key not in matchers:
+        by_locale = {locale.lower(): terms for locale, terms in get_locale_terms().items()}
+        mappings = {**by_locale.get(key.split("-")[0], {}), **by_locale.get(key, {})}
+        mappings = {source: target for source, target in mappings.items() if source and target}
+        matchers[key] = TermMatcher(mappings) if mappings else None
+    return matchers[key]
+
+
+def map_text(text, locale_code):
+    """Return (translation, term mappings) for a single text
+
+    The translation is set when the text consists only of mapped terms and no
+    model call is needed; otherwise the mappings found in the text are
+    returned for the prompt.
+    """
+    matcher = get_term_matcher(locale_code)
+    if matcher is None:
+        return None, {}
+    mapped = matcher.map_fully(text)
+    if mapped is not None:
+        return mapped, {}
+    return None, matcher.required(text)
+
+
+def map_segments(texts, locale_code, skip=()):
+    """Return ({index: translation} for fully mapped texts, term mappings found in the rest)"""
+    matcher = get_term_matcher(locale_code)
+    if matcher is None:
+        return {}, {}
+    mapped = {}
+    term_mappings = {}
+    for idx, text in enumerate(texts):
+        if idx in skip:
+            continue
+        translation = matcher.map_fully(text)
+        if translation is not None:
+            mapped[idx] = translation
+        else:
+            term_mappings.update(matcher.required(text))
+    if mapped:
+        log_event(logger, logging.INFO, "segments translated from locale terms", locale=locale_code,
+                  segments=len(mapped))
+    return mapped, term_mappings
+
+
+def _log_missing(locale_code, missing):
+    if missing:
+        log_event(logger, logging.WARNING, "locale terms not applied", locale=locale_code,
+                  terms=", ".join(sorted(set(missing))))
+
+
+def enforce_text(text, translated_text, locale_code):
+    """Enforce the locale's term mappings on one translation
+
+    A text made up only of mapped terms always gets its mapped translation.
+    """
+    matcher = get_term_matcher(locale_code)
+    if matcher is None:
+        return translated_text
+    mapped = matcher.map_fully(text)
+    if mapped is not None:
+        return mapped
+    with span('glossary_match', locale=locale_code):
+        translated_text, missing = matcher.enforce(text, translated_text)
+    _log_missing(locale_code, missing)
+    return translated_text
+
+
+def enforce_segments(texts, translations, locale_code):
+    """Enforce term mappings on {index: translation} of the given source texts; returns the fixed dict"""
+    matcher = get_term_matcher(locale_code)
+    if matcher is None:
+        return translations
+    fixed = {}
+    missing = []
+    with span('glossary_match', locale=locale_code):
+        for idx, translated_text in translations.items():
+            source = texts[idx] if 0 <= idx < len(texts) else None
+            fixed[idx], idx_missing = matcher.enforce(source, translated_text)
+            missing.extend(idx_missing)
+    _log_missing(locale_code, missing)
+    return fixed
+
+
+def content_term_mappings(content, locale_code):
+    """Term mappings found in the texts of a JSON structure"""
+    matcher = get_term_matcher(locale_code)
+    if matcher is None:
+        return {}
+    term_mappings = {}
+    for ref in collect_text_refs(content):
+        term_mappings.update(matcher.required(ref['text']))
+    return term_mappings
+
+
+def enforce_content(content, translated_content, locale_code):
+    """Enforce term mappings in place on a translated JSON structure, pairing texts with the source"""
+    matcher = get_term_matcher(locale_code)
+    if matcher is None:
+        return translated_content
+    source_refs = collect_text_refs(content)
+    translated_refs = collect_text_refs(translated_content)
+    if len(source_refs) != len(translated_refs):
+        return translated_content
+    missing = []
+    with span('glossary_match', locale=locale_code):
+        for source_ref, translated_ref in zip(source_refs, translated_refs):
+            translated_ref['text'], ref_missing = matcher.enforce(source_ref['text'], translated_ref['text'])
+            missing.extend(ref_missing)
+    _log_missing(locale_code, missing)
+    return translated_content
@@ -0,0 +1,148 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+# Full prompts, API responses and payloads are only written in debug mode;
+# otherwise events carry sizes and truncated previews
+DEBUG_LOGGING = os.environ.get('BUMBLEBEE_DEBUG_LOGGING', '').lower() in ('1', 'true', 'yes')
+
+LOG_LEVEL = os.environ.get('BUMBLEBEE_LOG_LEVEL', 'INFO').upper()
+
+# "text" renders "event key=value ...", "json" renders one JSON object per line
+LOG_FORMAT = os.environ.get('BUMBLEBEE_LOG_FORMAT', 'text')
+
+# Longest value kept in a field outside debug mode
+PREVIEW_CHARS = int(os.environ.get('BUMBLEBEE_LOG_PREVIEW_CHARS', '200'))
+
+# Per-item events (one per field or per request) are logged once every N calls
+SAMPLE_EVERY = int(os.environ.get('BUMBLEBEE_LOG_SAMPLE_EVERY', '20'))
+
+# Libraries that log every HTTP request at INFO
+NOISY_LOGGERS = ['httpx', 'httpcore', 'urllib3', 'openai', 'anthropic']
+
+_setup_lock = threading.Lock()
+_listener = None
+_sample_lock = threading.Lock()
+_sample_counters = {}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Render a record's message followed by its structured fields"""
+
+    def __init__(self, fmt='text'):
+        super().__init__(datefmt='%Y-%m-%d %H:%M:%S')
+        self.fmt = fmt
+
+    def format(self, record):
+        fields = getattr(record, 'fields', {})
+        if self.fmt == 'json':
+            entry = {
+                'time': self.formatTime(record, self.datefmt),
+                'level': record.levelname,
+                'logger': record.name,
+                'event': record.getMessage()
+            }
+            entry.update(fields)
+            if record.exc_info:
+                entry['exc_info'] = self.formatException(record.exc_info)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record, self.datefmt)} - {record.levelname} - {record.name} - {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={_format_value(value)}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _format_value(value):
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    return json.dumps(text, ensure_ascii=False) if (' ' in text or not text) else text
+
+
+def setup_logging(level=None, debug=None):
+    """Route all logging through a queue drained by a background thread
+
+    Safe to call on every Streamlit rerun; the handler is installed once per
+    process. Log calls then only enqueue the record, so writing to stdout
+    never blocks a translation thread.
+    """
+    global _listener, DEBUG_LOGGING
+    with _setup_lock:
+        if debug is not None:
+            DEBUG_LOGGING = debug
+        root = logging.getLogger()
+        root.setLevel(logging.DEBUG if DEBUG_LOGGING else (level or LOG_LEVEL))
+        for name in NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.DEBUG if DEBUG_LOGGING else logging.WARNING)
+        if _listener is not None:
+            return
+
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+        log_queue = queue.SimpleQueue()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def set_debug_logging(enabled):
+    """Turn full payload dumps on or off for this process"""
+    setup_logging(debug=enabled)
+
+
+def is_debug_logging():
+    return DEBUG_LOGGING
+
+
+def truncate(value, limit=None):
+    """Shorten a string or JSON-serializable value for a log field"""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    limit = PREVIEW_CHARS if limit is None else limit
+    if DEBUG_LOGGING or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more chars)"
+
+
+def log_event(logger, level, event, **fields):
+    """Log an event with key=value fields; non-numeric values are truncated outside debug mode"""
+    if not logger.isEnabledFor(level):
+        return
+    fields = {key: value if isinstance(value, (int, float, bool, type(None))) else truncate(value)
+              for key, value in fields.items()}
+    logger.log(level, event, extra={'fields': fields})
+
+
+def should_sample(event, every=None):
+    """True for the first call of an event and then once every ``every`` calls"""
+    every = SAMPLE_EVERY if every is None else every
+    if DEBUG_LOGGING or every <= 1:
+        return True
+    with _sample_lock:
+        counter = _sample_counters.setdefault(event, itertools.count())
+        return next(counter) % every == 0
+
+
+def log_sampled(logger, event, every=None, level=logging.INFO, **fields):
+    """Log a per-item event only for a sample of calls
+
+    Warnings and errors should use log_event so none are dropped.
+    """
+    if logger.isEnabledFor(level) and should_sample(event, every):
+        log_event(logger, level, event, **fields)
+
+
+def log_payload(logger, event, payload, **fields):
+    """Dump a full request/response payload, only in debug mode"""
+    if not DEBUG_LOGGING:
+        return
+    text = payload if isinstance(payload, str) else json.dumps(payload, indent=2, ensure_ascii=False, default=str)
+    logger.debug(f"{event}\n{text}", extra={'fields': fields})
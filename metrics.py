@@ -0,0 +1,193 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Stages recorded by the pipelines. "job" spans wrap a whole translation run
+# so the time not covered by any other stage (UI updates, overhead) can be
+# derived from them.
+STAGES = ['fetch', 'parse', 'glossary_match', 'limiter_wait', 'llm_request', 'parse_response',
+          'webflow_update', 'job']
+
+# Stages measured inside other stages (the limiter wait is part of the
+# llm_request/fetch/webflow_update span that issued the call)
+NESTED_STAGES = ['limiter_wait']
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0]
+
+# Recent samples kept per series for exact p50/p95 in the Performance panel
+SAMPLE_WINDOW = 1000
+
+METRIC_PREFIX = "bumblebee"
+
+_metrics_lock = threading.Lock()
+_series = {}
+
+
+def _series_key(stage, labels):
+    return (stage, tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None)))
+
+
+def observe(stage, seconds, error=False, **labels):
+    """Record one duration for a stage, labelled e.g. by provider, model and locale"""
+    key = _series_key(stage, labels)
+    with _metrics_lock:
+        series = _series.get(key)
+        if series is None:
+            series = {
+                'count': 0,
+                'sum': 0.0,
+                'errors': 0,
+                'buckets': [0] * len(BUCKETS),
+                'samples': deque(maxlen=SAMPLE_WINDOW)
+            }
+            _series[key] = series
+        series['count'] += 1
+        series['sum'] += seconds
+        if error:
+            series['errors'] += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                series['buckets'][i] += 1
+                break
+        series['samples'].append(seconds)
+
+
+@contextmanager
+def span(stage, **labels):
+    """Time a block as one stage observation; exceptions are counted as errors"""
+    start_time = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start_time, error=error, **labels)
+
+
+def timed(stage, **labels):
+    """Decorator recording every call of a function as a stage span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def get_metrics():
+    """Return a snapshot of every series with count, sum, errors, p50/p95 and buckets"""
+    with _metrics_lock:
+        items = [(key, dict(series, samples=list(series['samples']), buckets=list(series['buckets'])))
+                 for key, series in _series.items()]
+
+    snapshot = []
+    for (stage, labels), series in sorted(items):
+        snapshot.append({
+            'stage': stage,
+            'labels': dict(labels),
+            'count': series['count'],
+            'sum': series['sum'],
+            'errors': series['errors'],
+            'mean': series['sum'] / series['count'] if series['count'] else 0.0,
+            'p50': _percentile(series['samples'], 50),
+            'p95': _percentile(series['samples'], 95),
+            'buckets': dict(zip(BUCKETS, series['buckets']))
+        })
+    return snapshot
+
+
+def stage_summary(snapshot=None):
+    """Total busy seconds per stage and the share of job time left to UI/overhead
+
+    Stage times are summed across threads, so under concurrency they can
+    exceed the job wall time; compare stages with each other in that case.
+    """
+    snapshot = get_metrics() if snapshot is None else snapshot
+    totals = {}
+    counts = {}
+    for series in snapshot:
+        totals[series['stage']] = totals.get(series['stage'], 0.0) + series['sum']
+        counts[series['stage']] = counts.get(series['stage'], 0) + series['count']
+
+    job_seconds = totals.pop('job', 0.0)
+    counts.pop('job', None)
+    staged_seconds = sum(seconds for stage, seconds in totals.items() if stage not in NESTED_STAGES)
+    return {
+        'stages': {stage: {'seconds': totals[stage], 'count': counts[stage]} for stage in totals},
+        'job_seconds': job_seconds,
+        'other_seconds': max(job_seconds - staged_seconds, 0.0)
+    }
+
+
+def bottleneck(summary):
+    """Name the dominant part of recorded time: LLM, Webflow or UI/other"""
+    stages = summary['stages']
+    groups = {
+        'LLM-bound': stages.get('llm_request', {}).get('seconds', 0.0),
+        'Webflow-bound': sum(stages.get(s, {}).get('seconds', 0.0) for s in ['fetch', 'webflow_update']),
+        'UI/other-bound': summary['other_seconds'] + sum(
+            stages.get(s, {}).get('seconds', 0.0) for s in ['parse', 'glossary_match', 'parse_response'])
+    }
+    if not any(groups.values()):
+        return None
+    return max(groups, key=groups.get)
+
+
+def reset_metrics():
+    """Drop all recorded series"""
+    with _metrics_lock:
+        _series.clear()
+
+
+def export_json(snapshot=None):
+    """Export all series as JSON"""
+    snapshot = get_metrics() if snapshot is None else snapshot
+    series = [dict(s, buckets={str(bound): count for bound, count in s['buckets'].items()}) for s in snapshot]
+    return json.dumps({'series': series, 'summary': stage_summary(snapshot)}, indent=2)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+def export_prometheus(snapshot=None):
+    """Export all series in the Prometheus text exposition format"""
+    snapshot = get_metrics() if snapshot is None else snapshot
+    name = f"{METRIC_PREFIX}_stage_duration_seconds"
+    lines = [f"# HELP {name} Duration of translation pipeline stages.", f"# TYPE {name} histogram"]
+    for series in snapshot:
+        labels = dict(series['labels'], stage=series['stage'])
+        cumulative = 0
+        for bound, count in series['buckets'].items():
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(dict(labels, le=str(bound)))} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(dict(labels, le='+Inf'))} {series['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {series['sum']:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {series['count']}")
+
+    errors_name = f"{METRIC_PREFIX}_stage_errors_total"
+    lines.append(f"# HELP {errors_name} Failed stage executions.")
+    lines.append(f"# TYPE {errors_name} counter")
+    for series in snapshot:
+        lines.append(f"{errors_name}{_format_labels(dict(series['labels'], stage=series['stage']))} {series['errors']}")
+    return "\n".join(lines) + "\n"
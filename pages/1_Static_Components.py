@@ -1,13 +1,39 @@
 import streamlit as st
-import requests
 import json
-import openai
+import logging
 import time
 import tempfile
 import os
 import zipfile
 from streamlit_option_menu import option_menu
-from utils import get_site_locales
+from utils import WEBFLOW_API_BASE, get_site_locales, webflow_request
+from components import (format_translated_properties, get_component_content, get_component_properties,
+                        get_localized_component_texts, parse_component_content, parse_component_properties,
+                        update_component_content, update_component_properties)
+from changeset import changes_to_nodes, dom_texts
+from exchange import (EXPORT_FORMATS, UPLOAD_TYPES, dom_import_changes, dom_segment_id, dom_segments, find_locale,
+                      read_exchange, remove_export_file, validate_segments, write_export_file)
+from dedup import SegmentMemo, build_segment_payload, dedup_stats, fan_out, format_dedup_stats, normalize_segment, parse_segment_response
+from concurrency import DEFAULT_MAX_LIMIT, fixed_limit, format_limiter_stats
+from locale_terms import enforce_segments, map_segments
+from translation_memory import recall_segments
+from quality import format_failures, gate_translations, quality_notes
+from metrics import observe
+from llm import format_cache_stats, openai_chat, usage_cache_stats
+from prompts import DERIV_CONTEXT_RULE, JSON_OUTPUT_INSTRUCTIONS, PRODUCT_NAMES_RULE, build_locale_prompt, build_static_prompt
+from sweep import DEFAULT_SWEEP_WORKERS, result_matrix, run_sweep, sweep_counts
+from translation import get_glossary_terms
+from usage import UsageTracker, format_usage_totals, track_usage
+from logs import log_event, log_payload, setup_logging
+
+# Log records are queued and written by a background thread
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Model and sampling of the translation requests, shared by the re-requests
+# of segments failing the quality checks
+TRANSLATION_MODEL = "gpt-4o-mini"
+TRANSLATION_TEMPERATURE = 0.3
 
 # Hide the default menu
 st.set_page_config(
@@ -124,7 +150,7 @@ with st.sidebar:
 
 def get_site_components(site_id, api_key):
     """Get list of components from the site with pagination handling"""
-    base_url = f"https://api.webflow.com/v2/sites/{site_id}/components"
+    base_url = f"{WEBFLOW_API_BASE}/sites/{site_id}/components"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
@@ -136,10 +162,10 @@ def get_site_components(site_id, api_key):
     
     while True:
         url = f"{base_url}?limit={limit}&offset={offset}"
-        print(f"\n[DEBUG] Fetching components from URL: {url}")
+        log_event(logger, logging.DEBUG, "fetch components", offset=offset, limit=limit)
         
         try:
-            response = requests.get(url, headers=headers)
+            response = webflow_request("GET", url, headers=headers)
             response.raise_for_status()
             data = response.json()
             
@@ -151,7 +177,8 @@ def get_site_components(site_id, api_key):
             pagination = data.get('pagination', {})
             total = pagination.get('total', 0)
             
-            print(f"[DEBUG] Retrieved {len(current_components)} components (Total: {len(all_components)}/{total})")
+            log_event(logger, logging.DEBUG, "fetched components", count=len(current_components),
+                      fetched=len(all_components), total=total)
             
             # Check if we've got all components
             if len(all_components) >= total:
@@ -161,97 +188,21 @@ def get_site_components(site_id, api_key):
             offset += limit
             
         except Exception as e:
-            print(f"[DEBUG] Error fetching components: {str(e)}")
+            log_event(logger, logging.ERROR, "fetch components failed", offset=offset, error=str(e))
             st.error(f"Error fetching components: {str(e)}")
             return []
     
-    print(f"[DEBUG] Successfully fetched all {len(all_components)} components")
+    log_event(logger, logging.INFO, "fetched all components", total=len(all_components))
     return all_components
 
-def get_component_content(site_id, component_id, api_key):
-    """Get component content using DOM endpoint with pagination handling"""
-    base_url = f"https://api.webflow.com/v2/sites/{site_id}/components/{component_id}/dom"
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}",
-        "accept-version": "1.0.0"
-    }
+def translate_content_with_openai(parsed_nodes, target_language, api_key, known_translations=None):
+    """Translate content using OpenAI while preserving JSON structure
     
-    all_nodes = []
-    offset = 0
-    limit = 100  # Maximum allowed by API
-    
-    while True:
-        # Construct URL with pagination parameters
-        url = f"{base_url}?limit={limit}&offset={offset}"
-        
-        print("\n" + "="*50)
-        print(f"API REQUEST - Get Component Content (Offset: {offset})")
-        print("="*50)
-        print(f"URL: {url}")
-        print("\nHeaders:")
-        for key, value in headers.items():
-            if key.lower() == 'authorization':
-                print(f"{key}: Bearer ****{value[-4:]}")
-            else:
-                print(f"{key}: {value}")
-        
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Add nodes from this batch to our collection
-            current_nodes = data.get('nodes', [])
-            all_nodes.extend(current_nodes)
-            
-            # Get pagination info
-            pagination = data.get('pagination', {})
-            total = pagination.get('total', 0)
-            
-            print(f"\nRetrieved {len(current_nodes)} nodes (Total: {len(all_nodes)}/{total})")
-            
-            # Print the complete API response for debugging
-            print("\n" + "="*50)
-            print("COMPLETE API RESPONSE")
-            print("="*50)
-            print(json.dumps(data, indent=2))
-            
-            # Check if we've got all nodes
-            if len(all_nodes) >= total:
-                break
-                
-            # Update offset for next batch
-            offset += limit
-            
-        except Exception as e:
-            print(f"\nERROR: {str(e)}")
-            st.error(f"Error fetching component content: {str(e)}")
-            return None
-    
-    # Return complete data with all nodes
-    return {
-        "nodes": all_nodes,
-        "lastUpdated": data.get("lastUpdated")
-    }
-
-def parse_component_content(content):
-    """Parse component content to extract node IDs and HTML"""
-    parsed_nodes = []
-    
-    for node in content.get('nodes', []):
-        # Only include nodes that have non-empty html
-        if node.get('text', {}).get('html'):
-            node_data = {
-                "nodeId": node['id'],
-                "text": node['text']['html']  # Getting HTML instead of plain text
-            }
-            parsed_nodes.append(node_data)
-    
-    return {"nodes": parsed_nodes}
-
-def translate_content_with_openai(parsed_nodes, target_language, api_key):
-    """Translate content using OpenAI while preserving JSON structure"""
+    known_translations maps normalized source segments to translations into
+    target_language (e.g. from other components of a sweep); only the
+    remaining segments are sent to OpenAI.
+    """
+    known_translations = known_translations or {}
     try:
         # First verify we have valid inputs
         if not parsed_nodes:
@@ -261,58 +212,62 @@ def translate_content_with_openai(parsed_nodes, target_language, api_key):
         if not api_key:
             return None, "OpenAI API key is missing"
             
-        client = openai.OpenAI(api_key=api_key)
-        
-        # Print debug information
-        print("\n" + "="*50)
-        print("TRANSLATION REQUEST")
-        print("="*50)
-        print(f"Target Language: {target_language}")
-        print("Content to translate:")
-        print(json.dumps(parsed_nodes, indent=2))
-        
-        # Get all terms from the glossary that should not be translated
-        do_not_translate_terms = []
-        if 'glossary' in st.session_state:
-            for category, terms in st.session_state.glossary.items():
-                do_not_translate_terms.extend(terms)
+        log_payload(logger, "translation request", parsed_nodes, locale=target_language)
         
-        # Format the terms as a bulleted list for the prompt
-        terms_list = "\n".join([f"- {term}" for term in do_not_translate_terms])
-        
-        # Prepare the system message explaining what we want
-        system_message = f"""You are a professional translator with 20 years of experience.  
-        Translate only the "text" values in the JSON to {target_language}. 
-
-        If the {target_language} is "sw", then in that case translate to Swahili only.
+        # The static prompt (rules + glossary) is identical for every locale so
+        # it can be served from the provider's prompt cache; only the short
+        # locale prompt changes between languages
+        static_prompt = build_static_prompt(
+            task='Translate only the "text" values in the JSON.',
+            glossary_terms=get_glossary_terms(),
+            rules=[DERIV_CONTEXT_RULE, PRODUCT_NAMES_RULE],
+            output_instructions=JSON_OUTPUT_INSTRUCTIONS
+        )
         
-        DO NOT TRANSLATE the following terms - keep them exactly as they appear:
-        {terms_list}
+        # Collapse repeated texts so each unique segment is only translated once
+        plan, segment_payload = build_segment_payload(parsed_nodes)
+        log_event(logger, logging.INFO, "translation request", locale=target_language,
+                  dedup=format_dedup_stats(dedup_stats(plan)))
         
-        Follow these additional rules when translating:
-        - When encountering the word "Deriv" and any succeeding word, analyze the context and based on it, keep it in English. For example, "Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be kept in English.
-        - Keep product names such as P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, Deriv Bot, and Binary Bot in English.
+        # Reuse translations that are already known for this language
+        translations = {
+            idx: known_translations[normalize_segment(text)]
+            for idx, text in enumerate(plan['unique'])
+            if normalize_segment(text) in known_translations
+        }
+        # Approved translations from the translation memory need no model call either
+        translations.update(recall_segments(plan['unique'], target_language, skip=translations))
+        # Texts made up only of mapped locale terms need no model call
+        mapped, term_mappings = map_segments(plan['unique'], target_language, skip=translations)
+        translations.update(mapped)
+        segment_payload["segments"] = [
+            segment for segment in segment_payload["segments"]
+            if segment["id"] not in translations
+        ]
+        if not segment_payload["segments"]:
+            log_event(logger, logging.INFO, "all segments already translated, skipping OpenAI call",
+                      locale=target_language, segments=len(translations))
+            translated_content, _ = fan_out(parsed_nodes, plan, translations)
+            return translated_content, None
         
-        Keep all other JSON structure and values exactly the same.
-        Return only the JSON, no explanations."""
+        locale_prompt = build_locale_prompt(target_language, term_mappings)
         
         # Prepare the JSON for translation
-        user_message = f"Translate this JSON content. Original JSON:\n{json.dumps(parsed_nodes, indent=2)}"
+        user_message = f"Translate this JSON content. Original JSON:\n{json.dumps(segment_payload, indent=2)}"
         
         # Make the API call
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.3
+            response = openai_chat(
+                api_key=api_key,
+                model=TRANSLATION_MODEL,
+                static_prompt=static_prompt,
+                locale_prompt=locale_prompt,
+                locale=target_language,
+                user_message=user_message,
+                temperature=TRANSLATION_TEMPERATURE
             )
             
-            # Print the raw response for debugging
-            print("\nOpenAI Response:")
-            print(response)
+            log_payload(logger, "OpenAI response", str(response), locale=target_language)
             
             # Extract and validate the response content
             response_content = response.choices[0].message.content
@@ -322,60 +277,236 @@ def translate_content_with_openai(parsed_nodes, target_language, api_key):
             # Try to parse the JSON response
             try:
                 translated_json = json.loads(response_content)
-                return translated_json, None
+                
+                translated = enforce_segments(plan['unique'], parse_segment_response(translated_json), target_language)
+
+                def retranslate(failures):
+                    retry_payload = {"segments": [segment for segment in segment_payload["segments"]
+                                                  if segment["id"] in failures]}
+                    try:
+                        retry_response = openai_chat(
+                            api_key=api_key,
+                            model=TRANSLATION_MODEL,
+                            static_prompt=static_prompt,
+                            locale_prompt=build_locale_prompt(target_language, term_mappings, quality_notes(failures)),
+                            locale=target_language,
+                            user_message=f"Translate this JSON content. Original JSON:\n{json.dumps(retry_payload, indent=2)}",
+                            temperature=TRANSLATION_TEMPERATURE
+                        )
+                        retried = parse_segment_response(json.loads(retry_response.choices[0].message.content or ''))
+                    except Exception as e:
+                        return None, str(e)
+                    return enforce_segments(plan['unique'], retried, target_language), None
+
+                # Check the model's output locally and re-request only the failing
+                # segments; nothing is returned for upload while any still fail
+                translated, failures = gate_translations(plan['unique'], translated, target_language, retranslate)
+                if failures:
+                    return None, format_failures(failures, plan['unique'])
+                translations.update(translated)
+
+                # Fan the unique translations back out to every node that uses them
+                translated_content, missing = fan_out(parsed_nodes, plan, translations)
+                if missing:
+                    return None, f"OpenAI response is missing {len(missing)} of {len(plan['unique'])} segments"
+                return translated_content, None
             except json.JSONDecodeError as e:
-                print(f"JSON Parse Error: {str(e)}")
-                print("Raw response content:")
-                print(response_content)
+                log_event(logger, logging.ERROR, "OpenAI response is not JSON", locale=target_language, error=str(e),
+                          response=response_content)
                 return None, f"Failed to parse OpenAI response as JSON: {str(e)}"
                 
         except Exception as e:
-            print(f"OpenAI API Error: {str(e)}")
+            log_event(logger, logging.ERROR, "OpenAI API error", locale=target_language, error=str(e))
             return None, f"OpenAI API Error: {str(e)}"
             
     except Exception as e:
-        print(f"Unexpected Error: {str(e)}")
+        log_event(logger, logging.ERROR, "translation failed", locale=target_language, error=str(e))
         return None, f"Translation error: {str(e)}"
 
-def update_component_content(site_id, component_id, locale_id, nodes, api_key):
-    """Update component content with translated text"""
-    # Updated URL structure to match the API specification
-    url = f"https://api.webflow.com/v2/sites/{site_id}/components/{component_id}/dom?localeId={locale_id}"
+def render_component_exchange(component_id, parsed_nodes):
+    """Export the component's texts for a translation vendor and apply the vendor's edited file"""
+    site_id = st.session_state.site_id
+    api_key = st.session_state.api_key
+    locale_options = {f"{locale.get('displayName', 'Unnamed')} ({locale.get('tag', 'No tag')})": locale
+                      for locale in st.session_state.locales if locale.get('type') != 'Primary'}
+    export_tab, import_tab = st.tabs(["Export", "Import"])
     
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}",
-        "content-type": "application/json"
-    }
+    with export_tab:
+        col1, col2 = st.columns(2)
+        with col1:
+            language = st.selectbox("Language", options=list(locale_options.keys()), key="component_exchange_language")
+        with col2:
+            export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key="component_exchange_format")
+        if language and st.button("Prepare export", key="prepare_component_exchange"):
+            locale = locale_options[language]
+            with st.spinner("Reading the current translations..."):
+                current_texts = get_localized_component_texts(site_id, component_id, locale.get('id'), api_key)
+            if current_texts is None:
+                st.warning(f"Could not read the current {locale.get('tag')} content; targets are left empty")
+            remove_export_file(st.session_state.get('component_exchange_file'))
+            st.session_state.component_exchange_file = {
+                'component_id': component_id,
+                **write_export_file(export_format, 'component', component_id, locale.get('tag'),
+                                    dom_segments(parsed_nodes['nodes'], current_texts, locale.get('tag')))
+            }
+        export = st.session_state.get('component_exchange_file')
+        if export and export['component_id'] == component_id and os.path.exists(export['path']):
+            with open(export['path'], 'rb') as file:
+                st.download_button(f"Download {export['file_name']} ({export['segments']} segments)", file,
+                                   file_name=export['file_name'], mime=export['mime'],
+                                   key="download_component_exchange")
     
-    payload = {
-        "nodes": nodes
-    }
+    with import_tab:
+        uploaded_file = st.file_uploader("Vendor file (XLIFF 2.0 or CSV)", type=UPLOAD_TYPES,
+                                         key="component_exchange_upload")
+        if uploaded_file and st.button("Check file", key="check_component_exchange"):
+            document, error = read_exchange(uploaded_file)
+            if not error and (document['target_type'], document['target_id']) != ('component', component_id):
+                error = f"The file is for {document['target_type']} {document['target_id']}, not this component"
+            locale = find_locale(locale_options.values(), document['locale']) if not error else None
+            if not error and locale is None:
+                error = f"The site has no secondary locale '{document['locale']}'"
+            if error:
+                st.error(error)
+            else:
+                known_ids = [dom_segment_id(*key) for key in dom_texts(parsed_nodes['nodes'])]
+                targets, errors = validate_segments(document, known_ids)
+                current_texts = get_localized_component_texts(site_id, component_id, locale.get('id'), api_key) or {}
+                changes, unchanged = dom_import_changes(targets, current_texts)
+                st.session_state.component_exchange_import = {
+                    'component_id': component_id,
+                    'locale_id': locale.get('id'),
+                    'locale': locale.get('tag'),
+                    'changes': changes,
+                    'unchanged': unchanged
+                }
+                log_event(logger, logging.INFO, "staged vendor import", component_id=component_id,
+                          locale=locale.get('tag'), changed=len(changes), unchanged=unchanged, rejected=len(errors))
+                if errors:
+                    st.warning(f"{len(errors)} segments were skipped")
+                    st.dataframe(errors, use_container_width=True, hide_index=True)
+        
+        staged = st.session_state.get('component_exchange_import')
+        if not staged or staged['component_id'] != component_id:
+            return
+        st.write(f"{len(staged['changes'])} {staged['locale']} values would change, "
+                 f"{staged['unchanged']} are already up to date")
+        if staged['changes']:
+            st.dataframe(staged['changes'], use_container_width=True, hide_index=True)
+            if st.button(f"Apply {len(staged['changes'])} changes to Webflow", key="apply_component_exchange"):
+                result, error = update_component_content(site_id, component_id, staged['locale_id'],
+                                                         changes_to_nodes(staged['changes']), api_key)
+                if error:
+                    st.error(f"Failed to update content for {staged['locale']}: {error}")
+                else:
+                    st.success(f"Updated {len(staged['changes'])} values for {staged['locale']}")
+                st.session_state.component_exchange_import = None
+
+def sweep_components(components, locales, include_properties, max_workers):
+    """Translate the DOM (and optionally the properties) of every component into every locale
     
-    print("\n" + "="*50)
-    print("UPDATE COMPONENT CONTENT REQUEST")
-    print("="*50)
-    print(f"URL: {url}")
-    print(f"Locale ID: {locale_id}")
-    print("\nHeaders:")
-    for key, value in headers.items():
-        if key.lower() == 'authorization':
-            print(f"{key}: Bearer ****{value[-4:]}")
-        else:
-            print(f"{key}: {value}")
-    print("\nPayload:")
-    print(json.dumps(payload, indent=2))
+    Components share one memo, so texts repeated across components (headers,
+    footers, CTAs) are translated once per locale. Returns the unit results.
+    """
+    site_id = st.session_state.site_id
+    api_key = st.session_state.api_key
+    openai_key = st.session_state.openai_key
+    memo = SegmentMemo()
     
-    try:
-        response = requests.post(url, headers=headers, json=payload)
-        print("\nResponse Status:", response.status_code)
-        print("Response Body:", response.text)
-        response.raise_for_status()
-        return response.json(), None
-    except Exception as e:
-        error_msg = f"Error updating component content: {str(e)}"
-        print(f"\nERROR: {error_msg}")
-        return None, error_msg
+    def fetch(component):
+        content, error = get_component_content(site_id, component['id'], api_key)
+        if error:
+            return None, error
+        source = {"nodes": parse_component_content(content)['nodes'], "properties": []}
+        if include_properties:
+            properties_data, error = get_component_properties(site_id, component['id'], api_key)
+            if error:
+                return None, error
+            source["properties"] = parse_component_properties(properties_data)['properties']
+        return source, None
+    
+    def translate(component, source, locale):
+        known = memo.known_translations(source, locale['tag'])
+        translated, error = translate_content_with_openai(source, locale['tag'], openai_key, known_translations=known)
+        if not error:
+            memo.prime_from(source, translated, locale['tag'])
+        return translated, error
+    
+    def update(component, locale, translated):
+        skipped = True
+        if translated['nodes']:
+            result, error = update_component_content(site_id, component['id'], locale['id'], translated['nodes'], api_key)
+            if error:
+                return None, error
+            skipped = skipped and result.get('skipped', False)
+        if translated['properties']:
+            result, error = update_component_properties(site_id, component['id'], locale['id'],
+                                                        format_translated_properties(translated), api_key)
+            if error:
+                return None, error
+            skipped = skipped and result.get('skipped', False)
+        return {'skipped': skipped}, None
+    
+    progress_bar = st.progress(0.0)
+    status = st.empty()
+    
+    def on_result(result, done, total):
+        progress_bar.progress(done / total)
+        status.info(f"{done}/{total} component translations done: {result['target']} ({result['locale']}) "
+                    f"{result['status']}")
+    
+    results = run_sweep(components, locales, fetch, translate, update, max_workers=max_workers, on_result=on_result)
+    status.empty()
+    return results
+
+def render_component_sweep(components):
+    """Site-wide sweep: every component matching a filter, every selected locale"""
+    st.write("Translate all matching components at once instead of one component and one language per run.")
+    
+    name_filter = st.text_input("Component name contains", key="sweep_filter",
+                                help="Leave empty to sweep every component")
+    matching = [comp for comp in components if name_filter.lower() in comp.get('name', '').lower()]
+    
+    secondary_locales = [locale for locale in st.session_state.get('locales') or [] if locale.get('type') != 'Primary']
+    locale_options = {f"{locale.get('displayName', 'Unnamed')} ({locale.get('tag', 'No tag')})": locale
+                      for locale in secondary_locales}
+    sweep_languages = st.multiselect("Languages", options=list(locale_options.keys()),
+                                     default=list(locale_options.keys()), key="sweep_languages")
+    include_properties = st.checkbox("Include component properties", value=True, key="sweep_properties")
+    
+    adaptive = st.checkbox("Adaptive concurrency (raise parallel requests until the APIs push back)", value=True,
+                           key="sweep_adaptive")
+    max_workers = st.slider("Parallel component translations", min_value=1, max_value=DEFAULT_MAX_LIMIT,
+                            value=DEFAULT_SWEEP_WORKERS, key="sweep_workers")
+    
+    if not st.button(f"Sweep {len(matching)} components × {len(sweep_languages)} languages", key="start_sweep",
+                     disabled=not matching or not sweep_languages or not st.session_state.openai_key):
+        return
+    
+    targets = [{'id': comp['id'], 'name': comp.get('name', 'Unnamed')} for comp in matching]
+    locales = [{'id': locale.get('id'), 'tag': locale.get('tag', 'unknown')}
+               for name, locale in locale_options.items() if name in sweep_languages]
+    
+    start_time = time.time()
+    usage_tracker = UsageTracker('components_sweep', source=f"{len(targets)} components")
+    # A fixed limit caps only this sweep; the shared limiters stay adaptive
+    with track_usage(usage_tracker), fixed_limit(None if adaptive else max_workers):
+        results = sweep_components(targets, locales, include_properties, max_workers)
+    observe('job', time.time() - start_time, page='components_sweep')
+    usage_report = usage_tracker.save()
+    
+    counts = sweep_counts(results)
+    st.success(f"Sweep finished in {time.time() - start_time:.0f}s: {counts['updated']} updated, "
+               f"{counts['unchanged']} already up to date, {counts['error']} failed")
+    st.dataframe(result_matrix(results), use_container_width=True, hide_index=True)
+    st.caption(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+    st.caption(format_limiter_stats())
+    st.caption(f"Usage: {format_usage_totals(usage_report['totals'])}")
+    failed = [result for result in results if result['status'] == 'error']
+    if failed:
+        with st.expander(f"View {len(failed)} failed component translations", expanded=False):
+            for result in failed:
+                st.error(f"❌ {result['target']} - {result['locale']}: {result['message']}")
 
 def main():
     st.title("Static Components Manager")
@@ -466,6 +597,9 @@ def main():
         st.write("Showing components in table (limited to 100 rows):")
         st.table(component_data)
         
+        with st.expander("Site-wide Sweep", expanded=False):
+            render_component_sweep(filtered_components)
+        
         # Update component selection to use filtered list
         selected_component = st.selectbox(
             f"Select a component (Total visible: {filtered_count})",
@@ -500,12 +634,14 @@ def main():
                     st.session_state.last_viewed_component_id != component_id):
                     
                     with st.spinner("Fetching component content..."):
-                        content = get_component_content(
+                        content, error = get_component_content(
                             site_id=st.session_state.site_id,
                             component_id=component_id,
                             api_key=st.session_state.api_key
                         )
-                        if content:
+                        if error:
+                            st.error(error)
+                        elif content:
                             st.session_state.current_component_content = content
                             st.session_state.parsed_nodes = parse_component_content(content)
                             st.session_state.last_viewed_component_id = component_id
@@ -527,6 +663,9 @@ def main():
                             for locale in st.session_state.locales
                         }
                         
+                        plan, _ = build_segment_payload(st.session_state.parsed_nodes)
+                        st.caption(f"Deduplication: {format_dedup_stats(dedup_stats(plan))}")
+                        
                         # Multi-select for languages
                         if not st.session_state.translation_in_progress:
                             selected_languages = st.multiselect(
@@ -547,6 +686,8 @@ def main():
                                 else:
                                     st.session_state.translation_in_progress = True
                                     st.session_state.current_translation_index = 0
+                                    st.session_state.translation_started_at = time.time()
+                                    st.session_state.usage_tracker = UsageTracker('components', source=selected_component)
                                     st.rerun()
                         
                         # Handle ongoing translation
@@ -557,11 +698,12 @@ def main():
                             st.write(f"Translating {current_language} ({st.session_state.current_translation_index + 1}/{len(st.session_state.selected_languages)})")
                             
                             # Perform translation for current language
-                            translated_content, error = translate_content_with_openai(
-                                st.session_state.parsed_nodes,
-                                locale_options[current_language]['tag'],
-                                st.session_state.openai_key
-                            )
+                            with track_usage(st.session_state.get('usage_tracker')):
+                                translated_content, error = translate_content_with_openai(
+                                    st.session_state.parsed_nodes,
+                                    locale_options[current_language]['tag'],
+                                    st.session_state.openai_key
+                                )
                             
                             if error:
                                 st.error(f"Error translating to {current_language}: {error}")
@@ -591,13 +733,21 @@ def main():
                                         st.error(f"Failed to update content for {current_language}: {error}")
                                         st.session_state.translation_in_progress = False
                                     else:
-                                        st.success(f"Successfully updated content for {current_language}")
+                                        if result.get('skipped'):
+                                            st.info(f"Content for {current_language} is already up to date, no update sent")
+                                        else:
+                                            st.success(f"Successfully updated content for {current_language}")
                                         
                                         # Move to next language or finish
                                         st.session_state.current_translation_index += 1
                                         if st.session_state.current_translation_index >= len(st.session_state.selected_languages):
                                             st.session_state.translation_in_progress = False
                                             st.success("All translations completed!")
+                                            observe('job', time.time() - st.session_state.translation_started_at, page='components')
+                                            usage_report = st.session_state.usage_tracker.save()
+                                            st.caption(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+                                            st.caption(format_limiter_stats())
+                                            st.caption(f"Usage: {format_usage_totals(usage_report['totals'])}")
                                             if st.button("Start New Translation"):
                                                 st.session_state.translation_in_progress = False
                                                 st.session_state.current_translation_index = 0
@@ -611,6 +761,10 @@ def main():
                             st.warning("Please add your OpenAI API key in the sidebar to enable translations")
                         if not st.session_state.locales:
                             st.warning("No locales available for translation")
+                    
+                    if st.session_state.locales:
+                        st.subheader("Vendor Exchange (XLIFF/CSV)")
+                        render_component_exchange(component_id, st.session_state.parsed_nodes)
                 else:
                     st.info("No text content found in this component")
 
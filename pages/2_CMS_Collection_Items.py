@@ -1,265 +1,62 @@
 import streamlit as st
-import requests
-import json
-import openai
 import logging
 import time
 import datetime
+import queue
+import threading
 import concurrent.futures
+import os
 from concurrent.futures import ThreadPoolExecutor
-import anthropic  # Add this new import for Claude API
+from utils import WEBFLOW_API_BASE, webflow_request
+from changeset import (accepted_changes, add_changes, change_id, change_set_rows, change_set_totals, diff_fields,
+                       export_change_set, forget_localized, get_localized, keep_unwritten, merge_changes, new_change_set,
+                       rejected_changes, remember_localized, replace_changes, review_rows, set_rejections)
+from bulk_jobs import compile_units, create_job, list_jobs, push_job, refresh_job, submit_job
+from cms_schema import get_collection_schema
+from collection_store import (cache_items, format_item_cache_stats, get_cached_items, invalidate_items,
+                              parse_collection_items, records_size)
+from concurrency import DEFAULT_MAX_LIMIT, fixed_limit, format_limiter_stats
+from dedup import SegmentMemo, format_dedup_stats
+from exchange import (EXPORT_FORMATS, UPLOAD_TYPES, field_import_changes, field_segment_id, find_locale, item_segments,
+                      parse_field_segment_id, read_exchange, remove_export_file, validate_segments, write_export_file)
+from ingestion import DOCUMENT_TYPES, ingest_document, match_rows, seed_memory
+from locale_terms import enforce_text, map_text
+from metrics import observe, span
+from llm import anthropic_message, format_cache_stats, openai_chat, usage_cache_stats
+from prompts import build_cms_portuguese_static_prompt, build_cms_static_prompt, build_locale_prompt
+from translation import MULTI_LOCALE_MAX_CHARS, get_glossary_terms, is_short_segment, translate_multi_locale
+from translation_memory import recall_text
+from quality import format_failures, gate_translations, review_changes
+from usage import UsageTracker, format_usage_totals, submit_with_context, track_usage, usage_labels
+from logs import log_event, log_payload, log_sampled, setup_logging
 
-# Set up logging configuration at the top of the file
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Log records are queued and written by a background thread
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# Maximum page size of the Webflow items endpoint
+COLLECTION_PAGE_SIZE = 100
+
+# Pages fetched ahead of translation in streaming mode; bounds how many
+# items are held in memory however large the collection is
+STREAM_PREFETCH_PAGES = 2
+
 # Hide the default menu
 st.set_page_config(
     page_title="J.Jonah Jameson - Get it to the front page",
     layout="wide"
 )
 
-# Add at the top of the file with other imports
-COLLECTION_CONFIGS = {
-    "Blog": {
-        "fields_to_translate": [
-            'disclaimer-2',
-            'post',
-            'summary',
-            'name',
-            'meta-description-2',
-            'page-title'
-        ],
-        "fields_to_preserve": ['slug', 'accumulators-option'],
-        "display_name": "Blog Post",
-        "item_identifier": "name"
-    },
-    "Support Questions": {
-        "fields_to_translate": [
-            'answer',
-            'name'
-        ],
-        "fields_to_preserve": ['slug', 'category-3', 'order-number'],
-        "display_name": "Help Center Question",
-        "item_identifier": "question"
-    },
-    "Tncs": {
-        "fields_to_translate": [
-            'name',
-            'content',
-            'meta-description',
-            'page-title'
-        ],
-        "fields_to_preserve": ['slug', 'order', 'category'],
-        "display_name": "Tncs",
-        "item_identifier": "name"
-    },
-    "Terms and Conditions": {
-        "fields_to_translate": [
-            'name',
-            'content',
-            'pdf-name-1',
-            'description',
-            'page-title'
-        ],
-        "fields_to_preserve": ['slug', 'order', 'category', 'pdf-link-1', 'link-1'],
-        "display_name": "Terms and Conditions",
-        "item_identifier": "name"
-    },
-    "Trading Specifications": {
-        "fields_to_translate": [            
-        ],
-        "fields_to_preserve": [
-            'type'
-        ],
-        "display_name": "Trading Specifications",
-        "item_identifier": "name"
-    },
-    "Help Center Categories": {
-        "fields_to_translate": [
-            'name',
-            'page-title',
-            'meta-description'
-        ],
-        "fields_to_preserve": [
-            'slug',
-            'type',
-            'order-number',
-            'main-questions',
-        ],
-        "display_name": "Help Centre Category",
-        "item_identifier": "name"
-    },
-    "Help Centre Categories": {
-        "fields_to_translate": [
-            'name',
-            'page-title',
-            'meta-description'
-        ],
-        "fields_to_preserve": [
-            'slug',
-            'type',
-            'order-number',
-            'main-questions',
-        ],
-        "display_name": "Help Centre Category",
-        "item_identifier": "name"
-    },
-    "Help Centre Questions": {
-        "fields_to_translate": [
-            'name',                    # Question title
-            'answer',                 # Answer content
-        ],
-        "fields_to_preserve": [
-            'slug',                   # URL slug
-            'category',            # Category identifier
-            'order-number'
-        ],
-        "display_name": "Help Centre Question",
-        "item_identifier": "name"  # Use question field as identifier
-    },
-    "Help Center Questions": {
-        "fields_to_translate": [
-            'name',                    # Question title
-            'answer',                 # Answer content
-        ],
-        "fields_to_preserve": [
-            'slug',                   # URL slug
-            'category',            # Category identifier
-            'order-number'
-        ],
-        "display_name": "Help Center Question",
-        "item_identifier": "name"  # Use question field as identifier
-    },
-    "EU Blogs": {
-        "fields_to_translate": [
-            'disclaimer',
-            'post',
-            'summary',
-            'name',
-            'meta-description-2',
-            'page-title'
-        ],
-        "fields_to_preserve": ['slug', 'accumulators-option'],
-        "display_name": "Blog Post",
-        "item_identifier": "name"
-    },
-    
-    "EU Newsroom": {
-        "fields_to_translate": [
-            'post',
-            'image-alt-text',
-            'summary',
-            'name',
-            'meta-description-2',
-            'page-title'
-        ],
-        "fields_to_preserve": ['slug'],
-        "display_name": "EU Newsroom",
-        "item_identifier": "name"
-    },
-
-        "Newsroom": {
-        "fields_to_translate": [
-            'post',
-            'image-alt-text',
-            'summary',
-            'name',
-            'meta-description-2',
-            'page-title'
-        ],
-        "fields_to_preserve": ['slug'],
-        "display_name": "Newsroom",
-        "item_identifier": "name"
-    },
-
-    "Tactical Indices": {
-        "fields_to_translate": [
-            'disclaimer-2',
-            'text'
-            ],
-        "fields_to_preserve": ['slug'],
-        "display_name": "Tactical Indices",
-        "item_identifier": "name"
-    },
-    
-    "ROW Trading pages FAQ's": {
-        "fields_to_translate": [
-            'answer',
-            'name'
-            ],
-        "fields_to_preserve": ['slug'],
-        "display_name": "ROW Trading pages FAQ's",
-        "item_identifier": "name"
-    },
-    
-    "EU CTA Footer CMS": {
-        "fields_to_translate": [
-            'description'
-        ],
-        "fields_to_preserve": ['slug'],
-        "display_name": "EU CTA Footer",
-        "item_identifier": "description"
-    },
-
-        "CTA Footer CMS": {
-        "fields_to_translate": [
-            'description'
-        ],
-        "fields_to_preserve": ['slug'],
-        "display_name": " CTA Footer CMS",
-        "item_identifier": "description"
-    },
-
-}
-
-def get_collection_config(collection_name):
-    """Get collection configuration based on collection name"""
-    for collection_type, config in COLLECTION_CONFIGS.items():
-        if collection_type.lower() in collection_name.lower():
-            return collection_type, config
-    return None, None
-
-def parse_collection_items(items, collection_type, config):
-    """Parse collection items based on collection type"""
-    parsed_items = []
-    
-    for item in items:
-        field_data = item.get('fieldData', {})
-        
-        # Get identifier for display
-        identifier = field_data.get(config['item_identifier'], 'Unnamed')
-        
-        # Create filtered data dictionary
-        filtered_data = {
-            key: field_data.get(key, '')
-            for key in config['fields_to_translate'] + config['fields_to_preserve']
-            if key in field_data
-        }
-        
-        parsed_items.append({
-            'id': item.get('id'),
-            'identifier': identifier,
-            'slug': field_data.get('slug', 'no-slug'),
-            'data': filtered_data
-        })
-    
-    return parsed_items
-
 def get_cms_locales(site_id, api_key):
     """Get list of CMS locales from site data"""
-    url = f"https://api.webflow.com/v2/sites/{site_id}"
+    url = f"{WEBFLOW_API_BASE}/sites/{site_id}"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = webflow_request("GET", url, headers=headers)
         response.raise_for_status()
         data = response.json()
         
@@ -291,40 +88,9 @@ def get_cms_locales(site_id, api_key):
         st.error(f"Error fetching CMS locales: {str(e)}")
         return []
 
-def get_collection_items(site_id, collection_id, api_key, offset=0, limit=100):
-    """Get collection items with optional filtering"""
-    url = f"https://api.webflow.com/v2/collections/{collection_id}/items"
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}"
-    }
-    
-    params = {
-        "offset": offset,
-        "limit": limit
-    }
-    
-    logger.info(f"Fetching collection items: URL={url}, offset={offset}, limit={limit}")
-    
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Log pagination info for debugging
-        pagination = data.get('pagination', {})
-        logger.info(f"Pagination info: total={pagination.get('total', 'N/A')}, offset={pagination.get('offset', 'N/A')}, limit={pagination.get('limit', 'N/A')}")
-        
-        return data
-    except Exception as e:
-        error_msg = f"Error fetching collection items: {str(e)}"
-        logger.error(error_msg)
-        st.error(error_msg)
-        return None
-
 def translate_collection_item(collection_id, item_id, api_key, cms_locale_id):
     """Get translated version of a collection item"""
-    url = f"https://api.webflow.com/v2/collections/{collection_id}/items/{item_id}"
+    url = f"{WEBFLOW_API_BASE}/collections/{collection_id}/items/{item_id}"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
@@ -336,7 +102,7 @@ def translate_collection_item(collection_id, item_id, api_key, cms_locale_id):
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = webflow_request("GET", url, headers=headers, params=params)
         response.raise_for_status()
         return response.json(), None
     except Exception as e:
@@ -344,7 +110,7 @@ def translate_collection_item(collection_id, item_id, api_key, cms_locale_id):
 
 def update_collection_item(collection_id, item_id, api_key, cms_locale_id, field_data):
     """Update a collection item with translated content"""
-    url = f"https://api.webflow.com/v2/collections/{collection_id}/items/{item_id}"
+    url = f"{WEBFLOW_API_BASE}/collections/{collection_id}/items/{item_id}"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}",
@@ -360,127 +126,136 @@ def update_collection_item(collection_id, item_id, api_key, cms_locale_id, field
     }
     
     try:
-        response = requests.patch(url, headers=headers, json=payload)
+        response = webflow_request("PATCH", url, headers=headers, json=payload)
         response.raise_for_status()
         return response.json(), None
     except Exception as e:
         return None, f"Error updating translation: {str(e)}"
 
-def generate_curl_command(collection_id, item_id, api_key, cms_locale_id, field_data):
-    """Generate curl command for updating translation"""
-    # Prepare the payload with proper escaping for curl
-    payload = {
-        "isArchived": False,
-        "isDraft": False,
-        "fieldData": field_data,
-        "cmsLocaleId": cms_locale_id
-    }
-    
-    # Create the curl command
-    curl_command = f"""curl -X PATCH "https://api.webflow.com/v2/collections/{collection_id}/items/{item_id}" \\
-     -H "Authorization: Bearer {api_key}" \\
-     -H "Content-Type: application/json" \\
-     -d '{json.dumps(payload, ensure_ascii=False)}'"""
+def translate_with_openai_concurrent(text, target_language, api_key, rich_text=False, term_mappings=None,
+                                     notes=None):
+    """Thread-safe version of translate_with_openai for concurrent processing
     
-    return curl_command
-
-def translate_with_openai_concurrent(text, target_language, api_key):
-    """Thread-safe version of translate_with_openai for concurrent processing"""
+    rich_text marks HTML values (RichText fields) whose markup must be kept.
+    term_mappings are the locale's fixed term translations found in the text.
+    notes describe the problems of a rejected earlier translation.
+    """
     try:
-        # Log translation request details
-        logger.info(f"\n{'='*50}")
-        logger.info("TRANSLATION REQUEST DETAILS")
-        logger.info(f"{'='*50}")
-        logger.info(f"Target Language: {target_language}")
-        logger.info(f"Input Text Length: {len(text)} characters")
-        logger.info(f"Input Text Preview: {text[:200]}..." if len(text) > 200 else text)
+        do_not_translate_terms = get_glossary_terms()
         
-        # Log glossary terms being used
-        do_not_translate_terms = []
-        if 'glossary' in st.session_state:
-            for category, terms in st.session_state.glossary.items():
-                do_not_translate_terms.extend(terms)
-            logger.info(f"\nGlossary Terms Applied:")
-            logger.info(f"Total Terms: {len(do_not_translate_terms)}")
-            logger.info("Terms List:")
-            for term in do_not_translate_terms:
-                logger.info(f"- {term}")
-        
-        client = openai.OpenAI(api_key=api_key)
-        
-        # Format terms for prompt
-        terms_list = "\n".join([f"- {term}" for term in do_not_translate_terms])
-        
-        system_message = f"""You are a professional translator with 20 years of experience.
-        Translate the text to {target_language}.
-
-        If the {target_language} is "sw", then in that case translate to Swahili only.
-        
-        DO NOT TRANSLATE the following terms - keep them exactly as they appear:
-        {terms_list}
-        
-        Follow these additional rules when translating:
-        - When encountering the word "Deriv" and any succeeding word, keep it in English. For example, "Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be kept in English.
-        - Keep product names such as P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, Deriv Bot, and Binary Bot in English.
-        - When encountering the symbol "?", mirror it in the translated text when the target language is Arabic.
-        
-        Return only the translation, no explanations."""
-        
-        # Log OpenAI request
-        logger.info(f"\n{'='*50}")
-        logger.info("OPENAI API REQUEST")
-        logger.info(f"{'='*50}")
-        logger.info(f"Model: gpt-4.1-mini")
-        logger.info("System Message:")
-        logger.info(system_message)
-        logger.info("\nUser Message:")
-        logger.info(text)
+        # Static prompt (rules + glossary) is shared by every locale so the
+        # provider can serve it from its prompt cache
+        static_prompt = build_cms_static_prompt(do_not_translate_terms, rich_text=rich_text)
+        locale_prompt = build_locale_prompt(target_language, term_mappings, notes)
+        log_payload(logger, "OpenAI request", {'system': [static_prompt, locale_prompt], 'user': text},
+                    locale=target_language)
         
         # Make API call with timing
         start_time = time.time()
-        response = client.chat.completions.create(
+        response = openai_chat(
+            api_key=api_key,
             model="gpt-4.1-mini",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": text}
-            ]
+            static_prompt=static_prompt,
+            locale_prompt=locale_prompt,
+            locale=target_language,
+            user_message=text
             # temperature=0.3
         )
         end_time = time.time()
         
-        # Log OpenAI response
-        logger.info(f"\n{'='*50}")
-        logger.info("OPENAI API RESPONSE")
-        logger.info(f"{'='*50}")
-        logger.info(f"Response Time: {end_time - start_time:.2f} seconds")
-        
         translated_text = response.choices[0].message.content.strip()
+        log_payload(logger, "OpenAI response", translated_text, locale=target_language)
         
-        # Log translation result
-        logger.info(f"\nTranslated Text Preview: {translated_text[:200]}..." if len(translated_text) > 200 else translated_text)
-        
-        # Log term preservation check
-        logger.info(f"\n{'='*50}")
-        logger.info("TERM PRESERVATION CHECK")
-        logger.info(f"{'='*50}")
-        for term in do_not_translate_terms:
-            if term in text and term in translated_text:
-                logger.info(f"✅ Term preserved: {term}")
-            elif term in text and term not in translated_text:
-                logger.warning(f"⚠️ Term not preserved: {term}")
+        with span('glossary_match', locale=target_language):
+            missing_terms = [term for term in do_not_translate_terms if term in text and term not in translated_text]
+        if missing_terms:
+            log_event(logger, logging.WARNING, "glossary terms not preserved", locale=target_language,
+                      terms=", ".join(missing_terms))
         
-        logger.info(f"\n{'='*50}\n")
+        log_sampled(logger, "translated field", provider="openai", model="gpt-4.1-mini", locale=target_language,
+                    input_chars=len(text), output_chars=len(translated_text), glossary_terms=len(do_not_translate_terms),
+                    seconds=round(end_time - start_time, 2), preview=translated_text)
         
         return translated_text, None
     except Exception as e:
         error_msg = f"Translation error: {str(e)}"
-        logger.error(error_msg)
-        logger.error(f"{'='*50}\n")
+        log_event(logger, logging.ERROR, "translation failed", provider="openai", locale=target_language,
+                  input_chars=len(text), error=str(e))
         return None, error_msg
 
-def execute_curl_command_concurrent(collection_id, item_id, api_key, cms_locale_id, field_data):
-    """Thread-safe version of execute_curl_command for concurrent processing"""
-    url = f"https://api.webflow.com/v2/collections/{collection_id}/items/{item_id}"
+def get_localized_item_fields(collection_id, item_id, api_key, cms_locale_id, localized=None):
+    """Current localized field data of an item, from the cache or fetched from Webflow; None if unavailable
+    
+    localized maps (item ID, locale ID) to field data a job read together
+    with the source page; it is used before the cache.
+    """
+    if localized and (item_id, cms_locale_id) in localized:
+        return localized[(item_id, cms_locale_id)]
+    cache_key = ('item', collection_id, item_id, cms_locale_id)
+    fields = get_localized(cache_key)
+    if fields is not None:
+        return fields
+    item, error = translate_collection_item(collection_id, item_id, api_key, cms_locale_id)
+    if error:
+        log_event(logger, logging.WARNING, "fetch localized item failed", collection_id=collection_id, item_id=item_id,
+                  cms_locale_id=cms_locale_id, error=error)
+        return None
+    fields = item.get('fieldData', {})
+    remember_localized(cache_key, fields)
+    return fields
+
+def localized_field_data(items, locale_id, fields=None):
+    """Map (item ID, locale ID) to the field data of listed localized items, keeping only fields if set"""
+    localized = {}
+    for item in items:
+        field_data = item.get('fieldData', {})
+        if fields is not None:
+            field_data = {key: value for key, value in field_data.items() if key in fields}
+        localized[(item.get('id'), locale_id)] = field_data
+    return localized
+
+def read_localized_items(collection_id, api_key, locales, fields=None):
+    """Read the localized field data of every item for each locale with paged list requests
+    
+    One request per 100 items and locale, instead of one per item and locale
+    when items are checked one by one. Returns the map taken by
+    get_localized_item_fields, held by the caller for the job rather than in
+    the expiring localized cache.
+    """
+    localized = {}
+    for locale in locales:
+        try:
+            for items, total in iter_collection_items(collection_id, api_key, cms_locale_id=locale['id']):
+                localized.update(localized_field_data(items, locale['id'], fields))
+        except Exception as e:
+            log_event(logger, logging.WARNING, "read localized items failed", collection_id=collection_id,
+                      cms_locale_id=locale['id'], error=str(e))
+    return localized
+
+def execute_curl_command_concurrent(collection_id, item_id, api_key, cms_locale_id, field_data, localized=None):
+    """Thread-safe version of execute_curl_command for concurrent processing
+    
+    Only fields whose value differs from the current localized item are
+    sent; when nothing changed no request is made and the result has
+    "skipped" set. If the localized item can't be read, every field is sent.
+    localized is passed on to get_localized_item_fields.
+    """
+    url = f"{WEBFLOW_API_BASE}/collections/{collection_id}/items/{item_id}"
+    cache_key = ('item', collection_id, item_id, cms_locale_id)
+    
+    current_fields = get_localized_item_fields(collection_id, item_id, api_key, cms_locale_id, localized)
+    if current_fields is not None:
+        changes, unchanged = diff_fields(current_fields, field_data)
+        log_sampled(logger, "diffed item fields", collection_id=collection_id, item_id=item_id,
+                    cms_locale_id=cms_locale_id, changed=len(changes), unchanged=unchanged)
+        if not changes:
+            return {
+                'status_code': None,
+                'response': None,
+                'error': None,
+                'skipped': True
+            }
+        field_data = {change['field']: change['new'] for change in changes}
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}",
@@ -495,246 +270,758 @@ def execute_curl_command_concurrent(collection_id, item_id, api_key, cms_locale_
     }
     
     try:
-        response = requests.patch(url, headers=headers, json=payload)
+        response = webflow_request("PATCH", url, headers=headers, json=payload)
         if response.status_code == 200:
+            if current_fields is not None:
+                remember_localized(cache_key, merge_changes(current_fields, changes))
             return {
                 'status_code': response.status_code,
                 'response': response.json(),
                 'error': None
             }
         else:
+            forget_localized(cache_key)
             return {
                 'status_code': response.status_code,
                 'response': response.text,
                 'error': f"HTTP Error: {response.status_code}"
             }
     except Exception as e:
+        forget_localized(cache_key)
         return {
             'status_code': None,
             'response': None,
             'error': str(e)
         }
 
-def translate_with_claude_portuguese(text, target_language, api_key):
+def translate_with_claude_portuguese(text, target_language, api_key, rich_text=False, term_mappings=None,
+                                     notes=None):
     """Thread-safe version of translate with Claude API for Portuguese translations"""
     try:
-        # Log translation request details
-        logger.info(f"\n{'='*50}")
-        logger.info("CLAUDE PORTUGUESE TRANSLATION REQUEST DETAILS")
-        logger.info(f"{'='*50}")
-        logger.info(f"Target Language: {target_language}")
-        logger.info(f"Input Text Length: {len(text)} characters")
-        logger.info(f"Input Text Preview: {text[:200]}..." if len(text) > 200 else text)
-        
-        # Log glossary terms being used
-        do_not_translate_terms = []
-        if 'glossary' in st.session_state:
-            for category, terms in st.session_state.glossary.items():
-                do_not_translate_terms.extend(terms)
-            logger.info(f"\nGlossary Terms Applied:")
-            logger.info(f"Total Terms: {len(do_not_translate_terms)}")
-            logger.info("Terms List:")
-            for term in do_not_translate_terms:
-                logger.info(f"- {term}")
-        
-        # Format terms for prompt
-        terms_list = "\n".join([f"- {term}" for term in do_not_translate_terms])
-        
-        # Create Claude client
-        client = anthropic.Anthropic(api_key=api_key)
-        
-        system_message = f"""Act as a professional translator with 20 years of experience specializing in European Portuguese (Portugal) and these translation MUST strictly adhere to Portugal's Portuguese language standards, NOT Brazilian Portuguese. Your role is to ensure accurate, contextually relevant translations, adhering strictly to guidelines and using available resources efficiently. Translations should read naturally to native speakers of the target language, not just as direct translations from English.
-        Translate the text to {target_language}.
-        
-        DO NOT TRANSLATE the following terms - keep them exactly as they appear:
-        {terms_list}
+        do_not_translate_terms = get_glossary_terms()
         
-        Follow these additional rules when translating:
-        - When encountering the word "Deriv" and any succeeding word, keep it in English. For example, "Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be kept in English.
-        - Keep product names such as P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, Deriv Bot, and Binary Bot in English.
-        
-        Return only the translation, no explanations."""
-        
-        # Log Claude API request
-        logger.info(f"\n{'='*50}")
-        logger.info("CLAUDE API REQUEST (PORTUGUESE)")
-        logger.info(f"{'='*50}")
-        logger.info(f"Model: claude-3-5-sonnet")
-        logger.info("System Message:")
-        logger.info(system_message)
-        logger.info("\nUser Message:")
-        logger.info(text)
+        # Static prompt (rules + glossary) is marked as a cache breakpoint so
+        # repeated Portuguese requests read it from Anthropic's prompt cache
+        static_prompt = build_cms_portuguese_static_prompt(do_not_translate_terms, rich_text=rich_text)
+        locale_prompt = build_locale_prompt(target_language, term_mappings, notes)
+        log_payload(logger, "Claude request", {'system': [static_prompt, locale_prompt], 'user': text},
+                    locale=target_language)
         
         # Make API call with timing
         start_time = time.time()
-        response = client.messages.create(
+        response = anthropic_message(
+            api_key=api_key,
             model="claude-3-5-sonnet-20240620",
-            system=system_message,
-            messages=[
-                {"role": "user", "content": text}
-            ],
+            static_prompt=static_prompt,
+            locale_prompt=locale_prompt,
+            locale=target_language,
+            user_message=text,
             temperature=0.3,
             max_tokens=8000
         )
         end_time = time.time()
         
-        # Log Claude API response
-        logger.info(f"\n{'='*50}")
-        logger.info("CLAUDE API RESPONSE (PORTUGUESE)")
-        logger.info(f"{'='*50}")
-        logger.info(f"Response Time: {end_time - start_time:.2f} seconds")
-        
         translated_text = response.content[0].text
+        log_payload(logger, "Claude response", translated_text, locale=target_language)
         
-        # Log translation result
-        logger.info(f"\nTranslated Text Preview: {translated_text[:200]}..." if len(translated_text) > 200 else translated_text)
-        
-        # Log term preservation check
-        logger.info(f"\n{'='*50}")
-        logger.info("TERM PRESERVATION CHECK (PORTUGUESE)")
-        logger.info(f"{'='*50}")
-        for term in do_not_translate_terms:
-            if term in text and term in translated_text:
-                logger.info(f"✅ Term preserved: {term}")
-            elif term in text and term not in translated_text:
-                logger.warning(f"⚠️ Term not preserved: {term}")
+        with span('glossary_match', locale=target_language):
+            missing_terms = [term for term in do_not_translate_terms if term in text and term not in translated_text]
+        if missing_terms:
+            log_event(logger, logging.WARNING, "glossary terms not preserved", locale=target_language,
+                      terms=", ".join(missing_terms))
         
-        logger.info(f"\n{'='*50}\n")
+        log_sampled(logger, "translated field", provider="anthropic", model="claude-3-5-sonnet", locale=target_language,
+                    input_chars=len(text), output_chars=len(translated_text), glossary_terms=len(do_not_translate_terms),
+                    seconds=round(end_time - start_time, 2), preview=translated_text)
         
         return translated_text, None
     except Exception as e:
         error_msg = f"Claude Portuguese translation error: {str(e)}"
-        logger.error(error_msg)
-        logger.error(f"{'='*50}\n")
+        log_event(logger, logging.ERROR, "translation failed", provider="anthropic", locale=target_language,
+                  input_chars=len(text), error=str(e))
         return None, error_msg
 
-def process_language_translation_concurrent(item_data, locale, openai_key, webflow_key, collection_id, config):
-    """Process translation for a single language using concurrent approach"""
+def translate_field_value(value, locale_code, openai_key, claude_api_key=None, rich_text=False, notes=None,
+                          keep_failed=False):
+    """Translate one field value through the translation memory, the locale term mappings or a model
+    
+    Portuguese goes to Claude when claude_api_key is set. notes are the
+    reasons a previous translation of the value was rejected; the value then
+    always goes to the model with the notes. With keep_failed a translation
+    still failing the quality checks is returned for review instead of an
+    error.
+    """
+    mapped, term_mappings = map_text(value, locale_code)
+    if not notes:
+        # Approved translations from the translation memory need no model call
+        recalled = recall_text(value, locale_code)
+        if recalled is not None:
+            return recalled, None
+        # Values made up only of mapped locale terms need no model call
+        if mapped is not None:
+            return mapped, None
+    use_claude = claude_api_key and locale_code.lower() in ['pt', 'pt-br', 'pt-pt']
+    
+    def request(problems=()):
+        request_notes = list(notes or []) + list(problems)
+        # Translate the field using appropriate API
+        if use_claude:
+            # Use Claude for Portuguese if API key is available
+            translated_text, error = translate_with_claude_portuguese(value, locale_code, claude_api_key,
+                                                                      rich_text=rich_text, term_mappings=term_mappings,
+                                                                      notes=request_notes)
+        else:
+            # Use OpenAI for all other languages and for Portuguese if Claude API key is not available
+            translated_text, error = translate_with_openai_concurrent(value, locale_code, openai_key,
+                                                                      rich_text=rich_text, term_mappings=term_mappings,
+                                                                      notes=request_notes)
+        if error:
+            return None, error
+        return {0: enforce_text(value, translated_text, locale_code)}, None
+    
+    translated, error = request()
+    if error:
+        return None, error
+    # A field failing the quality checks is re-requested with the problems
+    # as notes; if it still fails the item is not updated
+    translated, failures = gate_translations([value], translated, locale_code, lambda failures: request(failures[0]),
+                                             keep_failed=keep_failed)
+    if failures and not keep_failed:
+        return None, format_failures(failures, [value])
+    return translated[0], None
+
+def process_language_translation_concurrent(item_data, locale, openai_key, webflow_key, collection_id, schema, memo=None,
+                                            usage_tracker=None, dry_run=False, localized=None):
+    """Process translation for a single language using concurrent approach
+    
+    When a SegmentMemo is passed, identical field values across the items and
+    fields of the job are translated once per locale and reused. Token usage
+    is recorded on usage_tracker, labelled by item, locale and field. With
+    dry_run the item is not updated; the result carries the field changes
+    against the current localized item instead. localized holds localized
+    field data read with the item's page (see get_localized_item_fields).
+    """
     # Store translations for this language
     current_translations = {}
+    failed_fields = {}
+    claude_api_key = st.session_state.get('claude_api_key')
     
-    # Determine if we should use Claude API for Portuguese (only if Claude API key is available)
-    is_portuguese = locale['code'].lower() in ['pt', 'pt-br', 'pt-pt']
-    use_claude = is_portuguese and st.session_state.get('claude_api_key')
+    def translate_field(value, rich_text):
+        # In a dry run, translations failing the quality checks are kept and
+        # staged as rejected for review
+        return translate_field_value(value, locale['code'], openai_key, claude_api_key, rich_text=rich_text,
+                                     keep_failed=dry_run)
     
     # Translate each field - only translate fields in fields_to_translate
-    for key, value in item_data['data'].items():
-        if key in config['fields_to_translate'] and isinstance(value, str):
-            # Translate the field using appropriate API
-            if use_claude:
-                # Use Claude for Portuguese if API key is available
-                translated_text, error = translate_with_claude_portuguese(
-                    value, locale['code'], st.session_state.claude_api_key
-                )
-            else:
-                # Use OpenAI for all other languages and for Portuguese if Claude API key is not available
-                translated_text, error = translate_with_openai_concurrent(
-                    value, locale['code'], openai_key
-                )
+    for key, value in item_data.data.items():
+        if key in schema.translate_fields and isinstance(value, str):
+            rich_text = key in schema.rich_text_fields
+            with track_usage(usage_tracker), usage_labels(item=item_data.identifier, locale=locale['code'], field=key):
+                if memo is not None:
+                    translated_text, error = memo.get_or_translate(
+                        value, locale['code'], lambda text: translate_field(text, rich_text)
+                    )
+                else:
+                    translated_text, error = translate_field(value, rich_text)
                 
             if error:
-                return {
-                    'item': item_data['identifier'],
-                    'language': locale['name'],
-                    'status': 'error',
-                    'message': f"Error translating {key}: {error}"
-                }
+                # Keep translating the other fields so only the failed ones need a retry
+                failed_fields[key] = error
+                continue
             current_translations[key] = translated_text
         else:
             # Preserve other fields
             current_translations[key] = value
     
+    if failed_fields:
+        field, error = next(iter(failed_fields.items()))
+        more = f" (+{len(failed_fields) - 1} more fields)" if len(failed_fields) > 1 else ""
+        result = {
+            'item': item_data.identifier,
+            'language': locale['name'],
+            'status': 'error',
+            'message': f"Error translating {field}: {error}{more}"
+        }
+        # The translated fields are staged with the failed ones rejected, so a
+        # retry only re-requests the failed fields
+        current_fields = get_localized_item_fields(collection_id, item_data.id, webflow_key, locale['id'], localized)
+        if current_fields is not None:
+            changes, unchanged = diff_fields(current_fields, {key: value for key, value in current_translations.items()
+                                                              if key in schema.translate_fields})
+            changes.extend({'field': key, 'old': current_fields.get(key), 'new': None, 'bytes': 0, 'rejected': error}
+                           for key, error in failed_fields.items())
+            result.update(item_id=item_data.id, locale_code=locale['code'], locale_id=locale['id'], changes=changes,
+                          unchanged=unchanged)
+        return result
+    
+    if dry_run:
+        current_fields = get_localized_item_fields(collection_id, item_data.id, webflow_key, locale['id'], localized)
+        if current_fields is None:
+            return {
+                'item': item_data.identifier,
+                'language': locale['name'],
+                'status': 'error',
+                'message': "Error fetching the current localized item"
+            }
+        changes, unchanged = diff_fields(current_fields, current_translations)
+        rejected = review_changes(changes, item_data.data, locale['code'])
+        return {
+            'item': item_data.identifier,
+            'item_id': item_data.id,
+            'language': locale['name'],
+            'locale_code': locale['code'],
+            'locale_id': locale['id'],
+            'status': 'success',
+            'message': f"Dry run: {len(changes)} fields would change ({rejected} rejected), {unchanged} unchanged",
+            'changes': changes,
+            'unchanged': unchanged
+        }
+    
     # Execute update to Webflow
     result = execute_curl_command_concurrent(
         collection_id=collection_id,
-        item_id=item_data['id'],
+        item_id=item_data.id,
         api_key=webflow_key,
         cms_locale_id=locale['id'],
-        field_data=current_translations
+        field_data=current_translations,
+        localized=localized
     )
     
     # Return result
     return {
-        'item': item_data['identifier'],
+        'item': item_data.identifier,
         'language': locale['name'],
         'status': 'success' if not result.get('error') else 'error',
-        'message': result.get('error', 'Translation completed successfully')
+        'message': result.get('error') or ('Already up to date, no update sent' if result.get('skipped')
+                                           else 'Translation completed successfully')
     }
 
+def prefetch_short_fields_multi_locale(items, schema, locales, openai_key, memo, usage_tracker=None):
+    """Translate short plain-text fields of the given items into every locale with multi-locale requests
+    
+    Results are seeded into the memo so the per-locale pass reuses them
+    instead of making one request per field and locale.
+    """
+    # Portuguese goes through Claude when a Claude key is available
+    use_claude_for_portuguese = bool(st.session_state.get('claude_api_key'))
+    locale_codes = [
+        locale['code'] for locale in locales
+        if not (use_claude_for_portuguese and locale['code'].lower() in ['pt', 'pt-br', 'pt-pt'])
+    ]
+    
+    texts = [
+        value
+        for item in items
+        for key, value in item.data.items()
+        if key in schema.translate_fields and key not in schema.rich_text_fields and is_short_segment(value)
+    ]
+    if not texts or not locale_codes or not openai_key:
+        return 0, []
+    
+    with track_usage(usage_tracker), usage_labels(field='multi-locale'):
+        results, errors = translate_multi_locale(texts, locale_codes, openai_key)
+    
+    primed = 0
+    for text, per_locale in results.items():
+        for code, translated_text in per_locale.items():
+            memo.prime(text, code, translated_text)
+            primed += 1
+    
+    logger.info(f"Multi-locale prefetch seeded {primed} field translations")
+    return primed, errors
+
+def translate_collection_streaming(collection_id, collection_name, schema, locales, max_workers, use_multi_locale,
+                                   dry_run=False, limit=None):
+    """Translate every item of a collection into all locales while later pages are still loading
+    
+    Pages are translated as soon as they arrive. At most
+    STREAM_PREFETCH_PAGES pages are translated at once, and the same number
+    wait in the loader queue. limit caps the job's in-flight requests per
+    backend (see fixed_limit). Returns (results, memo, usage_report).
+    """
+    progress_container = st.progress(0)
+    status_container = st.empty()
+    openai_key = st.session_state.openai_key
+    webflow_key = st.session_state.api_key
+    
+    memo = SegmentMemo()
+    usage_tracker = UsageTracker('cms_stream', source=collection_name)
+    start_time = time.time()
+    all_results = []
+    pending_pages = []
+    
+    def finish_oldest_page():
+        for future in concurrent.futures.as_completed(pending_pages.pop(0)):
+            all_results.append(future.result())
+    
+    with fixed_limit(limit), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            # Each locale's localized page is read with its source page, so
+            # unchanged items are skipped without one read per item and locale
+            for page_items, loaded, total, localized in stream_collection_items(collection_id, webflow_key, schema,
+                                                                                 locales=locales):
+                if use_multi_locale:
+                    prefetch_short_fields_multi_locale(page_items, schema, locales, openai_key, memo, usage_tracker)
+                pending_pages.append([
+                    submit_with_context(
+                        executor,
+                        process_language_translation_concurrent,
+                        item_data=item_data,
+                        locale=locale,
+                        openai_key=openai_key,
+                        webflow_key=webflow_key,
+                        collection_id=collection_id,
+                        schema=schema,
+                        memo=memo,
+                        usage_tracker=usage_tracker,
+                        dry_run=dry_run,
+                        localized=localized
+                    )
+                    for item_data in page_items
+                    for locale in locales
+                ])
+                while len(pending_pages) >= STREAM_PREFETCH_PAGES:
+                    finish_oldest_page()
+                progress_container.progress(min(loaded / max(total, 1), 1.0))
+                status_container.info(f"Loaded {loaded} of {total} items, {len(all_results)} translations done "
+                                      f"({str(datetime.timedelta(seconds=int(time.time() - start_time)))} elapsed)")
+        except Exception as e:
+            log_event(logger, logging.ERROR, "collection stream failed", collection_id=collection_id, error=str(e))
+            st.error(f"Error loading collection items, stopping after the pages already loaded: {str(e)}")
+        while pending_pages:
+            finish_oldest_page()
+    
+    progress_container.progress(1.0)
+    status_container.success(f"Finished {len(all_results)} translations in "
+                             f"{str(datetime.timedelta(seconds=int(time.time() - start_time)))}")
+    observe('job', time.time() - start_time, page='cms_stream')
+    return all_results, memo, usage_tracker.save()
+
+def build_cms_change_set(collection_id, results):
+    """Collect the field changes of dry-run results, and the staged fields of failed items, into a change set"""
+    change_set = new_change_set('collection', collection_id)
+    for result in results:
+        if 'changes' in result:
+            add_changes(change_set, result['locale_code'], result['locale_id'], result['changes'], result['unchanged'],
+                        item_id=result['item_id'], item=result['item'])
+    return change_set
+
+def retranslate_rejected_fields(entry, locale_code, items_by_id, schema, max_workers=5):
+    """Re-request only the rejected fields of a locale, with each rejection note as context
+    
+    Accepted fields are kept as they are. Re-translations that still fail
+    the quality checks stay rejected with the problems as note. Returns
+    (re-translated count, errors).
+    """
+    openai_key = st.session_state.openai_key
+    claude_api_key = st.session_state.get('claude_api_key')
+    
+    def retry(change):
+        item = items_by_id.get(change['item_id'])
+        source = item.data.get(change['field']) if item is not None else None
+        if not isinstance(source, str):
+            return change, None, "source item is not loaded"
+        # Failed requests have no translation to correct, so their error isn't passed on
+        notes = None
+        if isinstance(change['new'], str):
+            notes = [f'{change["rejected"]} (rejected translation: "{change["new"]}")']
+        with usage_labels(item=change.get('item', change['item_id']), locale=locale_code, field=change['field']):
+            translated_text, error = translate_field_value(source, locale_code, openai_key, claude_api_key,
+                                                           rich_text=change['field'] in schema.rich_text_fields,
+                                                           notes=notes, keep_failed=True)
+        return change, translated_text, error
+    
+    # Workers see the caller's usage tracker, so the re-requests are recorded
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [submit_with_context(executor, retry, change) for change in rejected_changes(entry)]
+        outcomes = [future.result() for future in futures]
+    retried = {change_id(change): translated_text for change, translated_text, error in outcomes if not error}
+    errors = [f"{change.get('item', change['item_id'])} / {change['field']}: {error}"
+              for change, _, error in outcomes if error]
+    replace_changes(entry, retried)
+    for change in entry['changes']:
+        if change_id(change) in retried:
+            review_changes([change], items_by_id[change['item_id']].data, locale_code)
+    log_event(logger, logging.INFO, "re-translated rejected fields", locale=locale_code, fields=len(retried),
+              failed=len(errors), still_rejected=len(rejected_changes(entry)))
+    return len(retried), errors
+
+def render_cms_change_set(collection_id, max_workers=5, state_key='cms_change_set', parsed_items=None, schema=None,
+                          title="Dry Run Change Set"):
+    """Show staged field changes, let the user reject single fields and apply exactly the accepted writes
+    
+    With the parsed items and schema, rejected fields can be re-translated
+    on their own.
+    """
+    change_set = st.session_state.get(state_key)
+    if not change_set or change_set['target_id'] != collection_id:
+        return
+    
+    st.subheader(title)
+    st.caption("Tick Reject (and add a note) for translations that must not be written; they can be "
+               "re-translated on their own while the accepted ones are kept.")
+    for locale_code, entry in change_set['locales'].items():
+        if entry['changes']:
+            with st.expander(f"Changes for {locale_code}", expanded=bool(rejected_changes(entry))):
+                rows = review_rows(entry)
+                edited = st.data_editor(rows, use_container_width=True, hide_index=True,
+                                        disabled=[column for column in rows[0] if column not in ('Reject', 'Note')],
+                                        key=f"review_{state_key}_{locale_code}_{entry.get('revision', 0)}")
+                set_rejections(entry, {row['Segment']: row['Note'] for row in edited if row['Reject']})
+    
+    totals = change_set_totals(change_set)
+    accepted = totals['changed'] - totals['rejected']
+    st.write(f"{totals['changed']} fields would change ({totals['rejected']} rejected), {totals['unchanged']} "
+             f"are already up to date (byte delta {totals['bytes']:+d})")
+    st.dataframe(change_set_rows(change_set), use_container_width=True, hide_index=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Download change set (JSON)", export_change_set(change_set),
+                           file_name=f"changes-{collection_id}.json", mime="application/json",
+                           key=f"download_{state_key}")
+    with col2:
+        if (totals['rejected'] and parsed_items is not None and schema is not None
+                and st.button(f"Re-translate {totals['rejected']} rejected", key=f"retry_{state_key}")):
+            items_by_id = {item.id: item for item in parsed_items}
+            usage_tracker = UsageTracker('cms_retry', source=collection_id)
+            for locale_code, entry in change_set['locales'].items():
+                if not rejected_changes(entry):
+                    continue
+                with st.spinner(f"Re-translating rejected fields for {locale_code}..."), track_usage(usage_tracker):
+                    _, errors = retranslate_rejected_fields(entry, locale_code, items_by_id, schema, max_workers)
+                if errors:
+                    st.error(f"{len(errors)} fields could not be re-translated for {locale_code}, e.g. {errors[0]}")
+            usage_tracker.save()
+            st.rerun()
+    with col3:
+        if not accepted or not st.button(f"Apply {accepted} changes to Webflow", key=f"apply_{state_key}"):
+            return
+    
+    # Only the accepted changed fields of each item are sent, with the staged
+    # translations; rejected ones and failed writes stay staged
+    updates = {}
+    staged = {}
+    for locale_code, entry in change_set['locales'].items():
+        for change in accepted_changes(entry):
+            key = (change['item_id'], locale_code, entry['locale_id'])
+            updates.setdefault(key, {})[change['field']] = change['new']
+            staged.setdefault(key, []).append(change_id(change))
+    
+    with st.spinner(f"Updating {len(updates)} localized items..."):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                key: executor.submit(execute_curl_command_concurrent, collection_id, key[0], st.session_state.api_key,
+                                     key[2], field_data)
+                for key, field_data in updates.items()
+            }
+            failed = {}
+            errors = []
+            for key, future in futures.items():
+                error = future.result()['error']
+                if error:
+                    failed.setdefault(key[1], {}).update(dict.fromkeys(staged[key], error))
+                    errors.append(error)
+    
+    if errors:
+        st.error(f"{len(errors)} of {len(updates)} item updates failed and stay staged, e.g. {errors[0]}")
+    else:
+        st.success(f"Updated {len(updates)} localized items")
+    if not keep_unwritten(change_set, failed):
+        st.session_state[state_key] = None
+
+def collection_segments(collection_id, schema, parsed_items, locale, api_key):
+    """Exchange segments of every item, with targets streamed page by page from the localized items
+    
+    Localized pages are also kept in the localized cache, so an import right
+    after the export diffs without refetching.
+    """
+    items_by_id = {item.id: item for item in parsed_items}
+    seen = set()
+    for localized_items, total in iter_collection_items(collection_id, api_key, cms_locale_id=locale['id']):
+        for localized in localized_items:
+            item = items_by_id.get(localized.get('id'))
+            if item is None:
+                continue
+            seen.add(item.id)
+            field_data = {key: value for key, value in localized.get('fieldData', {}).items()
+                          if key in schema.kept_fields}
+            remember_localized(('item', collection_id, item.id, locale['id']), field_data)
+            yield from item_segments(item, schema.field_order, field_data, locale['code'])
+    for item in parsed_items:
+        if item.id not in seen:
+            yield from item_segments(item, schema.field_order, None, locale['code'])
+
+def render_item_ingestion(item, schema):
+    """Align an already-translated DOCX/PDF with an item's fields and seed the translation memory"""
+    locale_options = {f"{locale['name']} ({locale['code']})": locale
+                      for locale in (st.session_state.cms_locales or []) if not locale.get('default')}
+    segments = [(field, item.data[field]) for field in schema.field_order if isinstance(item.data.get(field), str)]
+    col1, col2 = st.columns(2)
+    with col1:
+        language = st.selectbox("Language of the document", options=list(locale_options.keys()),
+                                key="item_ingestion_language")
+    with col2:
+        uploaded_file = st.file_uploader("Translated document", type=DOCUMENT_TYPES, key="item_ingestion_upload")
+    if uploaded_file and language and st.button("Align with item", key="align_item_document"):
+        locale_code = locale_options[language]['code']
+        with st.spinner("Reading and aligning the document..."):
+            matches, error = ingest_document(uploaded_file, segments, locale_code)
+        if error:
+            st.error(error)
+            st.session_state.item_ingestion = None
+        else:
+            st.session_state.item_ingestion = {'item_id': item.id, 'locale': locale_code, 'file': uploaded_file.name,
+                                               'matches': matches}
+    
+    ingestion = st.session_state.get('item_ingestion')
+    if not ingestion or ingestion['item_id'] != item.id:
+        return
+    matches = ingestion['matches']
+    st.write(f"{sum(1 for match in matches if match['translation'])} of {len(matches)} blocks matched a paragraph "
+             f"of {ingestion['file']}. A field is stored only when all of its blocks are selected.")
+    edited = st.data_editor(match_rows(matches), use_container_width=True, hide_index=True,
+                            disabled=['Source', 'Translation', 'Confidence', 'Note'], key="item_ingestion_rows")
+    if st.button(f"Seed translation memory ({ingestion['locale']})", key="seed_item_memory"):
+        stored, error = seed_memory(segments, matches, [row['Seed'] for row in edited], ingestion['locale'],
+                                    ingestion['file'])
+        if error:
+            st.error(error)
+        else:
+            st.success(f"Stored {stored} fields; they will no longer be sent to a model for {ingestion['locale']}")
+            st.session_state.item_ingestion = None
+
+def render_cms_exchange(collection_id, schema, parsed_items):
+    """Export the collection's translatable fields for a translation vendor and stage their edited file"""
+    locales = [locale for locale in (st.session_state.cms_locales or []) if not locale.get('default')]
+    locale_options = {f"{locale['name']} ({locale['code']})": locale for locale in locales}
+    export_tab, import_tab = st.tabs(["Export", "Import"])
+    
+    with export_tab:
+        col1, col2 = st.columns(2)
+        with col1:
+            language = st.selectbox("Language", options=list(locale_options.keys()), key="cms_exchange_language")
+        with col2:
+            export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key="cms_exchange_format")
+        if language and st.button(f"Prepare export of {len(parsed_items)} items", key="prepare_cms_exchange"):
+            locale = locale_options[language]
+            remove_export_file(st.session_state.get('cms_exchange_file'))
+            st.session_state.cms_exchange_file = None
+            try:
+                with st.spinner("Streaming the current translations into the export..."):
+                    export = write_export_file(export_format, 'collection', collection_id, locale['code'],
+                                               collection_segments(collection_id, schema, parsed_items, locale,
+                                                                   st.session_state.api_key))
+                st.session_state.cms_exchange_file = {'collection_id': collection_id, **export}
+            except Exception as e:
+                log_event(logger, logging.ERROR, "collection export failed", collection_id=collection_id,
+                          cms_locale_id=locale['id'], error=str(e))
+                st.error(f"Export failed: {str(e)}")
+        export = st.session_state.get('cms_exchange_file')
+        if export and export['collection_id'] == collection_id and os.path.exists(export['path']):
+            with open(export['path'], 'rb') as file:
+                st.download_button(f"Download {export['file_name']} ({export['segments']} segments)", file,
+                                   file_name=export['file_name'], mime=export['mime'], key="download_cms_exchange")
+    
+    with import_tab:
+        uploaded_file = st.file_uploader("Vendor file (XLIFF 2.0 or CSV)", type=UPLOAD_TYPES, key="cms_exchange_upload")
+        if uploaded_file and st.button("Check file", key="check_cms_exchange"):
+            document, error = read_exchange(uploaded_file)
+            if not error and (document['target_type'], document['target_id']) != ('collection', collection_id):
+                error = f"The file is for {document['target_type']} {document['target_id']}, not this collection"
+            locale = find_locale(locales, document['locale'], key='code') if not error else None
+            if not error and locale is None:
+                error = f"The site has no secondary CMS locale '{document['locale']}'"
+            if error:
+                st.error(error)
+            else:
+                identifiers = {item.id: item.identifier for item in parsed_items}
+                known_ids = [field_segment_id(item_id, field) for item_id in identifiers
+                             for field in schema.translate_fields]
+                targets, errors = validate_segments(document, known_ids)
+                with st.spinner("Comparing with the current translations..."):
+                    localized = read_localized_items(collection_id, st.session_state.api_key, [locale],
+                                                     schema.kept_fields)
+                    current_by_item = {
+                        item_id: get_localized_item_fields(collection_id, item_id, st.session_state.api_key,
+                                                           locale['id'], localized)
+                        for item_id in {parse_field_segment_id(segment_id)[0] for segment_id in targets}
+                    }
+                changes_by_item, unchanged = field_import_changes(targets, current_by_item)
+                change_set = new_change_set('collection', collection_id)
+                entry = add_changes(change_set, locale['code'], locale['id'], [], unchanged)
+                for item_id, changes in changes_by_item.items():
+                    add_changes(change_set, locale['code'], locale['id'], changes, 0, item_id=item_id,
+                                item=identifiers[item_id])
+                st.session_state.cms_exchange_change_set = change_set
+                log_event(logger, logging.INFO, "staged vendor import", collection_id=collection_id,
+                          locale=locale['code'], items=len(changes_by_item), changed=len(entry['changes']),
+                          unchanged=unchanged, rejected=len(errors))
+                if errors:
+                    st.warning(f"{len(errors)} segments were skipped")
+                    st.dataframe(errors, use_container_width=True, hide_index=True)
+        render_cms_change_set(collection_id, state_key='cms_exchange_change_set', parsed_items=parsed_items,
+                              schema=schema)
+
 def get_collections(site_id, api_key):
     """Get list of collections from the site"""
-    url = f"https://api.webflow.com/v2/sites/{site_id}/collections"
+    url = f"{WEBFLOW_API_BASE}/sites/{site_id}/collections"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = webflow_request("GET", url, headers=headers)
         response.raise_for_status()
         return response.json().get('collections', [])
     except Exception as e:
         st.error(f"Error fetching collections: {str(e)}")
         return []
 
-def get_all_collection_items(site_id, collection_id, api_key):
-    """Get all collection items with pagination handling"""
+def iter_collection_items(collection_id, api_key, limit=COLLECTION_PAGE_SIZE, cms_locale_id=None, offset=0):
+    """Yield (items, total) for each page of a collection, fetching a page only when asked for
+    
+    With a cms_locale_id the localized items of that locale are returned.
+    Request errors are raised so callers can decide how to surface them.
+    """
+    url = f"{WEBFLOW_API_BASE}/collections/{collection_id}/items"
+    headers = {
+        "accept": "application/json",
+        "authorization": f"Bearer {api_key}"
+    }
+    
+    while True:
+        params = {"offset": offset, "limit": limit}
+        if cms_locale_id:
+            params["cmsLocaleId"] = cms_locale_id
+        response = webflow_request("GET", url, headers=headers, params=params)
+        response.raise_for_status()
+        data = response.json()
+        items = data.get('items', [])
+        total = data.get('pagination', {}).get('total', 0)
+        log_event(logger, logging.DEBUG, "fetched collection items", collection_id=collection_id, offset=offset,
+                  count=len(items), total=total)
+        if items:
+            yield items, total
+        offset += limit
+        if not items or offset >= total:
+            return
+
+def _put_until_stopped(pages, value, stop):
+    # Block on a full queue, but give up once the consumer has gone away
+    while not stop.is_set():
+        try:
+            pages.put(value, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def read_localized_page(collection_id, api_key, locales, offset, fields=None):
+    """Localized field data of each locale's page at offset, for get_localized_item_fields
+    
+    A locale whose page can't be read is left out; its items are then read
+    one by one when needed.
+    """
+    localized = {}
+    for locale in locales:
+        try:
+            items, _ = next(iter_collection_items(collection_id, api_key, cms_locale_id=locale['id'], offset=offset),
+                            ([], 0))
+        except Exception as e:
+            log_event(logger, logging.WARNING, "read localized page failed", collection_id=collection_id,
+                      cms_locale_id=locale['id'], offset=offset, error=str(e))
+            continue
+        localized.update(localized_field_data(items, locale['id'], fields))
+    return localized
+
+def stream_collection_items(collection_id, api_key, schema, prefetch_pages=STREAM_PREFETCH_PAGES, locales=()):
+    """Yield (parsed_items, loaded, total, localized) per page while a background thread fetches the next pages
+    
+    At most prefetch_pages parsed pages wait in the queue, so translation of
+    the first page starts right away and memory stays bounded. With locales,
+    the loader also reads each locale's page at the same offset; localized
+    is the map taken by get_localized_item_fields and lives only as long as
+    the caller holds the page. Fetch errors of source pages are re-raised
+    in the consumer.
+    """
+    pages = queue.Queue(maxsize=prefetch_pages)
+    stop = threading.Event()
+    done = object()
+    
+    def load():
+        try:
+            offset = 0
+            for items, total in iter_collection_items(collection_id, api_key):
+                localized = read_localized_page(collection_id, api_key, locales, offset, schema.kept_fields)
+                offset += COLLECTION_PAGE_SIZE
+                page = (parse_collection_items(items, schema), len(items), total, localized)
+                if not _put_until_stopped(pages, page, stop):
+                    return
+            result = done
+        except Exception as e:
+            result = e
+        _put_until_stopped(pages, result, stop)
+    
+    threading.Thread(target=load, name=f"collection-loader-{collection_id}", daemon=True).start()
+    loaded = 0
+    try:
+        while True:
+            page = pages.get()
+            if page is done:
+                return
+            if isinstance(page, Exception):
+                raise page
+            parsed_items, count, total, localized = page
+            loaded += count
+            yield parsed_items, loaded, total, localized
+    finally:
+        stop.set()
+
+def get_all_collection_items(site_id, collection_id, api_key, schema):
+    """Get all collection items with pagination handling
+    
+    Each page is parsed as soon as it arrives so raw API items are never
+    held for the whole collection. A complete load is shared with other
+    sessions on the same site; a cached copy is returned without fetching.
+    """
+    cached = get_cached_items(site_id, collection_id, api_key, schema)
+    if cached is not None:
+        return cached
+    
     all_items = []
-    offset = 0
-    limit = 100  # Maximum allowed by API
+    total = 0
     
     # Create a progress placeholder
     progress_placeholder = st.empty()
     status_placeholder = st.empty()
-    
-    # First request to get total count
     status_placeholder.info(f"Fetching initial batch of items...")
-    response = get_collection_items(site_id, collection_id, api_key, offset, limit)
-    
-    if not response or 'items' not in response:
-        status_placeholder.error("Failed to fetch collection items")
-        return []
     
-    # Get total from first response - properly access the pagination object
-    total = response.get('pagination', {}).get('total', 0)
-    items = response.get('items', [])
-    all_items.extend(items)
-    
-    # Update progress
-    progress = min(len(all_items) / max(total, 1), 1.0)
-    progress_placeholder.progress(progress)
-    status_placeholder.info(f"Loaded {len(all_items)} of {total} items...")
-    
-    # Continue fetching if there are more items
-    while len(all_items) < total:
-        offset += limit
-        status_placeholder.info(f"Fetching items {offset} to {min(offset + limit, total)}...")
-        response = get_collection_items(site_id, collection_id, api_key, offset, limit)
-        
-        if not response or 'items' not in response:
-            status_placeholder.warning(f"Error fetching batch at offset {offset}")
-            break
-        
-        items = response.get('items', [])
-        if not items:
-            break
+    try:
+        for items, total in iter_collection_items(collection_id, api_key):
+            all_items.extend(parse_collection_items(items, schema))
             
-        all_items.extend(items)
-        
-        # Update progress
-        progress = min(len(all_items) / max(total, 1), 1.0)
-        progress_placeholder.progress(progress)
-        status_placeholder.info(f"Loaded {len(all_items)} of {total} items...")
-        
-        # Optional: Add a small delay to avoid rate limiting
-        time.sleep(0.2)
+            # Update progress
+            progress_placeholder.progress(min(len(all_items) / max(total, 1), 1.0))
+            status_placeholder.info(f"Loaded {len(all_items)} of {total} items...")
+    except Exception as e:
+        log_event(logger, logging.ERROR, "fetch collection items failed", collection_id=collection_id,
+                  offset=len(all_items), error=str(e))
+        if not all_items:
+            status_placeholder.error(f"Failed to fetch collection items: {str(e)}")
+            return []
+        status_placeholder.warning(f"Error fetching batch at offset {len(all_items)}: {str(e)}")
     
     # Clear the progress indicators when done
     if len(all_items) >= total:
         status_placeholder.success(f"Successfully loaded all {total} items!")
+        all_items = cache_items(site_id, collection_id, api_key, schema, all_items)
     else:
         status_placeholder.warning(f"Loaded {len(all_items)} of {total} items. Some items may be missing.")
     
+    log_event(logger, logging.INFO, "loaded collection items", collection_id=collection_id,
+              items=len(all_items), bytes=records_size(all_items))
     return all_items
 
 def main():
@@ -770,7 +1057,6 @@ def main():
         st.session_state.cms_locales = None
         st.session_state.collections = None
         st.session_state.selected_collection = None
-        st.session_state.collection_items = None
         st.session_state.parsed_items = None
         st.session_state.selected_item = 'All'
         st.session_state.multi_selected_items = []
@@ -789,8 +1075,6 @@ def main():
         st.session_state.collections = None
     if 'selected_collection' not in st.session_state:
         st.session_state.selected_collection = None
-    if 'collection_items' not in st.session_state:
-        st.session_state.collection_items = None
     if 'parsed_items' not in st.session_state:
         st.session_state.parsed_items = None
     if 'selected_item' not in st.session_state:
@@ -802,14 +1086,10 @@ def main():
     
     # Add mode selection at the top
     st.subheader("Translation Mode")
-    mode_options = ["Single Item", "The Need for Speed (Batch Translation)"]
+    mode_options = ["Single Item", "The Need for Speed (Batch Translation)", "Bulk Offline (Batch API)"]
     selected_mode = st.radio("Select Mode", mode_options, key="mode_selection")
     st.session_state.selected_mode = selected_mode
     
-    # Display warning if "The Need for Speed" is selected but not for Blog collection
-    if st.session_state.selected_mode == "The Need for Speed (Batch Translation)" and st.session_state.selected_collection and "Blog" not in st.session_state.selected_collection:
-        st.warning("⚠️ 'The Need for Speed' mode is currently only available for Blog collections. Please select a Blog collection to use this feature.")
-    
     # Fetch CMS locales (different from site locales in app.py)
     st.subheader("CMS Locales")
     
@@ -855,37 +1135,47 @@ def main():
         # Only fetch items if collection changes
         if selected_collection != st.session_state.selected_collection:
             st.session_state.selected_collection = selected_collection
-            st.session_state.collection_items = None  # Clear cached items
-            st.session_state.parsed_items = None
+            st.session_state.parsed_items = None  # Clear cached items
             st.session_state.selected_item = 'All'  # Reset selected item
             st.session_state.multi_selected_items = []  # Reset multi-selected items
         
         if selected_collection:
-            # Get collection type and config
+            # Extract collection name and ID
             collection_name = selected_collection.split('(')[0].strip()
-            collection_type, config = get_collection_config(collection_name)
+            collection_id = selected_collection.split('(')[-1].strip(')')
             
-            if not config:
-                st.warning(f"Collection type '{collection_name}' is not configured for translation.\n\nAvailable types: {', '.join(COLLECTION_CONFIGS.keys())}")
+            # Translatable fields come from the collection schema, adjusted by collection_overrides.json
+            schema, schema_error = get_collection_schema(collection_id, collection_name, st.session_state.api_key)
+            if not schema:
+                st.warning(f"Could not load the schema of collection '{collection_name}': {schema_error}")
                 return
+            if not schema.translate_fields:
+                st.info(f"Collection '{collection_name}' has no plain text or rich text fields to translate.")
+            else:
+                st.caption(f"Translatable fields ({schema.source}): {', '.join(schema.field_order)}")
             
-            # Extract collection ID
-            collection_id = selected_collection.split('(')[-1].strip(')')
+            if st.button("Reload items from Webflow", key="reload_collection_items"):
+                invalidate_items(st.session_state.site_id, collection_id)
+                st.session_state.parsed_items = None
             
-            # Only fetch items if not already in session state
-            if st.session_state.collection_items is None:
+            # Only fetch items if not already in session state; the session
+            # keeps a reference to the shared parsed items, not a copy
+            if st.session_state.parsed_items is None:
                 with st.status("Loading collection items...", expanded=True) as status:
-                    items = get_all_collection_items(st.session_state.site_id, collection_id, st.session_state.api_key)
+                    items = get_all_collection_items(st.session_state.site_id, collection_id,
+                                                     st.session_state.api_key, schema)
                     if items:
-                        st.session_state.collection_items = items
-                        
-                        # Parse items based on collection type
-                        st.session_state.parsed_items = parse_collection_items(items, collection_type, config)
+                        st.session_state.parsed_items = items
                         status.update(label="Collection items loaded successfully!", state="complete", expanded=False)
             
             # Use items from session state
             if st.session_state.parsed_items:
                 parsed_items = st.session_state.parsed_items
+                st.caption(f"{len(parsed_items)} items held in ~{records_size(parsed_items) / (1024 * 1024):.1f} MB. "
+                           f"{format_item_cache_stats()}")
+                
+                if schema.translate_fields and st.checkbox("Vendor exchange (XLIFF/CSV)", key="show_cms_exchange"):
+                    render_cms_exchange(collection_id, schema, parsed_items)
                 
                 # Add search functionality
                 search_term = st.text_input("Search items", key="search_items")
@@ -894,18 +1184,18 @@ def main():
                 filtered_items = parsed_items
                 if search_term:
                     filtered_items = [item for item in parsed_items 
-                                     if search_term.lower() in item['identifier'].lower() or 
-                                        search_term.lower() in item['slug'].lower()]
+                                     if search_term.lower() in item.identifier.lower() or 
+                                        search_term.lower() in item.slug.lower()]
                     st.write(f"Found {len(filtered_items)} items matching '{search_term}'")
                 
                 # SINGLE ITEM MODE
                 if st.session_state.selected_mode == "Single Item":
                     # Create a selectbox with filtered items
-                    item_options = ['All'] + [f"{item['identifier']} ({item['slug']})" for item in filtered_items]
+                    item_options = ['All'] + [f"{item.identifier} ({item.slug})" for item in filtered_items]
                     
                     # Use selectbox with key to maintain state
                     selected_item = st.selectbox(
-                        f"Select {config['display_name']} (Total: {len(filtered_items)} of {len(parsed_items)})",
+                        f"Select {schema.display_name} (Total: {len(filtered_items)} of {len(parsed_items)})",
                         options=item_options,
                         key="item_selectbox"
                     )
@@ -916,13 +1206,17 @@ def main():
                     if selected_item != 'All':
                         selected_slug = selected_item.split('(')[-1].strip(')')
                         selected_data = next(
-                            (item for item in filtered_items if item['slug'] == selected_slug),
+                            (item for item in filtered_items if item.slug == selected_slug),
                             None
                         )
                         
                         if selected_data:
                             st.subheader("Original Content")
-                            st.json(selected_data['data'])
+                            st.json(dict(selected_data.data))
+                            
+                            if schema.translate_fields and st.checkbox("Seed translation memory from a document",
+                                                                       key="show_item_ingestion"):
+                                render_item_ingestion(selected_data, schema)
                             
                             # Translation section
                             st.subheader("Translation Management")
@@ -968,8 +1262,8 @@ def main():
                                             st.markdown("### Translated Content")
                                         
                                         # Process each field
-                                        for key, value in selected_data['data'].items():
-                                            if key in config['fields_to_preserve']:
+                                        for key, value in selected_data.data.items():
+                                            if key in schema.preserve_fields:
                                                 edited_fields[key] = value
                                                 continue
                                             
@@ -1026,23 +1320,16 @@ def main():
                                                     # Clear previous translations
                                                     st.session_state.current_translations = {}
                                                     
-                                                    for key, value in selected_data['data'].items():
-                                                        if isinstance(value, str) and key not in config['fields_to_preserve']:
-                                                            # Use the same logic as process_language_translation_concurrent
-                                                            # to determine which API to use
-                                                            is_portuguese = language_code.lower() in ['pt', 'pt-br', 'pt-pt']
-                                                            use_claude = is_portuguese and st.session_state.get('claude_api_key')
-                                                            
-                                                            if use_claude:
-                                                                # Use Claude for Portuguese if API key is available
-                                                                translated_text, error = translate_with_claude_portuguese(
-                                                                    value, language_code, st.session_state.claude_api_key
-                                                                )
-                                                            else:
-                                                                # Use OpenAI for all other languages and for Portuguese if Claude API key is not available
-                                                                translated_text, error = translate_with_openai_concurrent(
-                                                                    value, language_code, st.session_state.openai_key
-                                                                )
+                                                    for key, value in selected_data.data.items():
+                                                        if isinstance(value, str) and key not in schema.preserve_fields:
+                                                            # Same path as process_language_translation_concurrent:
+                                                            # translation memory, locale terms, then the model and
+                                                            # the quality checks
+                                                            translated_text, error = translate_field_value(
+                                                                value, language_code, st.session_state.openai_key,
+                                                                st.session_state.get('claude_api_key'),
+                                                                rich_text=key in schema.rich_text_fields
+                                                            )
                                                             
                                                             if error:
                                                                 st.error(f"Error translating {key}: {error}")
@@ -1060,7 +1347,7 @@ def main():
                                             with st.spinner("Updating content..."):
                                                 result = execute_curl_command_concurrent(
                                                     collection_id=collection_id,
-                                                    item_id=selected_data['id'],
+                                                    item_id=selected_data.id,
                                                     api_key=st.session_state.api_key,
                                                     cms_locale_id=cms_locale_id,
                                                     field_data=edited_fields
@@ -1072,6 +1359,13 @@ def main():
                                                     st.success("✅ Content updated successfully!")
                             
                             else:  # All Languages mode
+                                use_multi_locale = st.checkbox(
+                                    "Multi-locale mode for short fields",
+                                    value=True,
+                                    help=f"Fields up to {MULTI_LOCALE_MAX_CHARS} characters are translated into all languages with a single request",
+                                    key="single_item_multi_locale"
+                                )
+                                
                                 if st.button("Translate and Update All Languages"):
                                     # Create a progress container
                                     progress_container = st.empty()
@@ -1085,6 +1379,18 @@ def main():
                                     languages_to_translate = [l for l in st.session_state.cms_locales if not l.get('default', False)]
                                     total_languages = len(languages_to_translate)
                                     
+                                    # Fields sharing the same text are translated once per language
+                                    memo = SegmentMemo()
+                                    usage_tracker = UsageTracker('cms_item', source=collection_name)
+                                    job_start_time = time.time()
+                                    
+                                    if use_multi_locale:
+                                        status_container.info("Translating short fields for all languages...")
+                                        prefetch_short_fields_multi_locale(
+                                            [selected_data], schema, languages_to_translate,
+                                            st.session_state.openai_key, memo, usage_tracker
+                                        )
+                                    
                                     for idx, locale in enumerate(languages_to_translate):
                                         # Update progress (ensure it's between 0 and 1)
                                         progress = min(idx / total_languages, 1.0)
@@ -1104,7 +1410,9 @@ def main():
                                             openai_key=st.session_state.openai_key,
                                             webflow_key=st.session_state.api_key,
                                             collection_id=collection_id,
-                                            config=config
+                                            schema=schema,
+                                            memo=memo,
+                                            usage_tracker=usage_tracker
                                         )
                                         
                                         # Store result
@@ -1126,9 +1434,15 @@ def main():
                                     # Clear progress and status when complete
                                     progress_container.empty()
                                     status_container.success("All translations completed!")
+                                    observe('job', time.time() - job_start_time, page='cms_item')
+                                    usage_report = usage_tracker.save()
+                                    st.caption(f"Deduplication: {format_dedup_stats(memo.stats())}")
+                                    st.caption(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+                                    st.caption(format_limiter_stats())
+                                    st.caption(f"Usage: {format_usage_totals(usage_report['totals'])}")
                 
                 # THE NEED FOR SPEED MODE (BATCH TRANSLATION)
-                else:
+                elif st.session_state.selected_mode == "The Need for Speed (Batch Translation)":
                     st.subheader("The Need for Speed - Batch Translation")
                     st.write("Select multiple items to translate to all languages at once.")
                     
@@ -1141,26 +1455,100 @@ def main():
                         key="translation_processing"
                     )
                     
-                    # Add max workers option for parallel processing
+                    # Add concurrency option for parallel processing
+                    adaptive_concurrency = True
                     if translation_processing == "Parallel (Faster, translates all languages in parallel)":
-                        max_workers = st.slider(
-                            "Maximum parallel translations",
-                            min_value=2,
-                            max_value=10,
-                            value=5,
-                            help="Higher values may be faster but could hit API rate limits"
+                        concurrency_mode = st.radio(
+                            "Concurrency",
+                            ["Adaptive (raises parallel requests until the APIs push back)", "Fixed"],
+                            index=0,
+                            key="concurrency_mode"
                         )
+                        adaptive_concurrency = concurrency_mode != "Fixed"
+                        if adaptive_concurrency:
+                            # The per-backend limiters gate the actual in-flight requests
+                            max_workers = DEFAULT_MAX_LIMIT
+                        else:
+                            max_workers = st.slider(
+                                "Maximum parallel translations",
+                                min_value=2,
+                                max_value=10,
+                                value=5,
+                                help="Higher values may be faster but could hit API rate limits"
+                            )
+                        st.caption(format_limiter_stats())
                     
-                    # Create a multiselect with filtered items
-                    item_options = [f"{item['identifier']} ({item['slug']})" for item in filtered_items]
+                    use_multi_locale = st.checkbox(
+                        "Multi-locale mode for short fields",
+                        value=True,
+                        help=f"Fields up to {MULTI_LOCALE_MAX_CHARS} characters (titles, names, meta descriptions) are translated into all languages with a single request",
+                        key="batch_multi_locale"
+                    )
                     
-                    # Use multiselect to allow multiple item selection
-                    multi_selected_items = st.multiselect(
-                        f"Select {config['display_name']} items to translate (Total: {len(filtered_items)} of {len(parsed_items)})",
-                        options=item_options,
-                        key="multi_item_selectbox"
+                    # A dry run compares the translations with the live localized
+                    # items and lists the writes without sending them
+                    dry_run = st.checkbox(
+                        "Dry run (compute the changes without writing to Webflow)",
+                        value=False,
+                        key="batch_dry_run"
                     )
                     
+                    stream_collection = st.checkbox(
+                        "Translate the whole collection, streaming pages from Webflow",
+                        value=False,
+                        help=f"Items are fetched {COLLECTION_PAGE_SIZE} at a time and translation starts as soon as the first page arrives",
+                        key="stream_collection"
+                    )
+                    
+                    if stream_collection:
+                        multi_selected_items = []
+                        languages_to_translate = [l for l in st.session_state.cms_locales if not l.get('default', False)]
+                        st.write(f"Will translate every item to {len(languages_to_translate)} languages: "
+                                 f"{', '.join(locale['code'] for locale in languages_to_translate)}")
+                        
+                        if st.button("Start Collection Translation", key="start_stream_translation"):
+                            if not st.session_state.get('openai_key'):
+                                st.error("OpenAI API Key is missing. Please add it in the sidebar to enable translations.")
+                                return
+                            
+                            stream_workers = max_workers if translation_processing.startswith("Parallel") else 1
+                            
+                            # A fixed limit caps only this job; the shared limiters stay adaptive
+                            all_results, memo, usage_report = translate_collection_streaming(
+                                collection_id, collection_name, schema, languages_to_translate,
+                                stream_workers, use_multi_locale, dry_run,
+                                limit=None if adaptive_concurrency else max_workers
+                            )
+                            if dry_run:
+                                st.session_state.cms_change_set = build_cms_change_set(collection_id, all_results)
+                            else:
+                                # Failed items are staged with their translated fields so only the failed fields are retried
+                                retry_set = build_cms_change_set(collection_id, all_results)
+                                st.session_state.cms_retry_change_set = retry_set if retry_set['locales'] else None
+                            
+                            st.subheader("Collection Translation Summary")
+                            failed_results = [res for res in all_results if res['status'] == 'error']
+                            st.write(f"Total translations: {len(all_results)} "
+                                     f"({len(all_results) - len(failed_results)} successful, {len(failed_results)} failed)")
+                            st.write(f"Deduplication: {format_dedup_stats(memo.stats())}")
+                            st.write(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+                            st.write(format_limiter_stats())
+                            st.write(f"Usage: {format_usage_totals(usage_report['totals'])}")
+                            if failed_results:
+                                with st.expander(f"View {len(failed_results)} failed translations", expanded=False):
+                                    for res in failed_results:
+                                        st.error(f"❌ {res['item']} - {res['language']}: {res['message']}")
+                    else:
+                        # Create a multiselect with filtered items
+                        item_options = [f"{item.identifier} ({item.slug})" for item in filtered_items]
+                        
+                        # Use multiselect to allow multiple item selection
+                        multi_selected_items = st.multiselect(
+                            f"Select {schema.display_name} items to translate (Total: {len(filtered_items)} of {len(parsed_items)})",
+                            options=item_options,
+                            key="multi_item_selectbox"
+                        )
+                    
                     # Update selected items in session state
                     st.session_state.multi_selected_items = multi_selected_items
                     
@@ -1177,7 +1565,7 @@ def main():
                         
                         # Display fields that will be translated
                         st.write("Fields that will be translated:")
-                        for field in config['fields_to_translate']:
+                        for field in schema.field_order:
                             st.write(f"- {field}")
                         
                         # Start batch translation button
@@ -1205,6 +1593,10 @@ def main():
                             all_results = []
                             start_time = time.time()
                             
+                            # Identical segments across the selected items are translated once per locale
+                            memo = SegmentMemo()
+                            usage_tracker = UsageTracker('cms_batch', source=collection_name)
+                            
                             # Function to format elapsed time
                             def format_elapsed_time(seconds):
                                 return str(datetime.timedelta(seconds=int(seconds)))
@@ -1214,7 +1606,7 @@ def main():
                             for selected_item in multi_selected_items:
                                 selected_slug = selected_item.split('(')[-1].strip(')')
                                 item_data = next(
-                                    (item for item in filtered_items if item['slug'] == selected_slug),
+                                    (item for item in filtered_items if item.slug == selected_slug),
                                     None
                                 )
                                 if item_data:
@@ -1223,6 +1615,18 @@ def main():
                             # Update main progress
                             total_items = len(selected_items_data)
                             
+                            # Translate short fields of every selected item into all languages up front
+                            if use_multi_locale:
+                                main_status_container.info("Translating short fields for all languages...")
+                                primed, prefetch_errors = prefetch_short_fields_multi_locale(
+                                    selected_items_data, schema, languages_to_translate,
+                                    st.session_state.openai_key, memo, usage_tracker
+                                )
+                                if prefetch_errors:
+                                    main_status_container.warning(f"Multi-locale mode failed for some fields; they will be translated per language ({len(prefetch_errors)} errors)")
+                                else:
+                                    main_status_container.info(f"Prepared {primed} short field translations in multi-locale mode")
+                            
                             # PARALLEL PROCESSING
                             if translation_processing == "Parallel (Faster, translates all languages in parallel)":
                                 # Process each item
@@ -1234,11 +1638,11 @@ def main():
                                     # Update main progress
                                     main_progress = min((item_idx) / total_items, 1.0)
                                     main_progress_container.progress(main_progress)
-                                    main_status_container.info(f"Processing item {item_idx + 1} of {total_items}: {item_data['identifier']}")
+                                    main_status_container.info(f"Processing item {item_idx + 1} of {total_items}: {item_data.identifier}")
                                     
                                     # Reset item progress
                                     item_progress_container.progress(0)
-                                    item_status_container.info(f"Starting translation for: {item_data['identifier']}")
+                                    item_status_container.info(f"Starting translation for: {item_data.identifier}")
                                     
                                     # Item start time
                                     item_start_time = time.time()
@@ -1248,18 +1652,24 @@ def main():
                                     
                                     # Create tasks for parallel execution
                                     tasks = []
-                                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                                    # A fixed limit caps only this job; the shared limiters stay adaptive
+                                    with fixed_limit(None if adaptive_concurrency else max_workers), \
+                                            ThreadPoolExecutor(max_workers=max_workers) as executor:
                                         # Submit tasks to the executor
                                         futures = []
                                         for locale in languages_to_translate:
-                                            future = executor.submit(
+                                            future = submit_with_context(
+                                                executor,
                                                 process_language_translation_concurrent,
                                                 item_data=item_data,
                                                 locale=locale,
                                                 openai_key=st.session_state.openai_key,
                                                 webflow_key=st.session_state.api_key,
                                                 collection_id=collection_id,
-                                                config=config
+                                                schema=schema,
+                                                memo=memo,
+                                                usage_tracker=usage_tracker,
+                                                dry_run=dry_run
                                             )
                                             futures.append(future)
                                         
@@ -1287,8 +1697,8 @@ def main():
                                         
                                         # Update results in real-time
                                         with results_container:
-                                            st.write(f"Results for {item_data['identifier']}:")
-                                            with st.expander(f"View translation results for {item_data['identifier']}", expanded=False):
+                                            st.write(f"Results for {item_data.identifier}:")
+                                            with st.expander(f"View translation results for {item_data.identifier}", expanded=False):
                                                 for res in item_results:
                                                     if res['status'] == 'success':
                                                         st.success(f"✅ {res['language']}: {res['message']}")
@@ -1296,7 +1706,7 @@ def main():
                                                         st.error(f"❌ {res['language']}: {res['message']}")
                                         
                                         # Update item status
-                                        item_status_container.success(f"Completed translations for: {item_data['identifier']} in {format_elapsed_time(item_elapsed)}")
+                                        item_status_container.success(f"Completed translations for: {item_data.identifier} in {format_elapsed_time(item_elapsed)}")
                             
                             # SEQUENTIAL PROCESSING (ORIGINAL METHOD)
                             else:
@@ -1309,11 +1719,11 @@ def main():
                                     # Update main progress
                                     main_progress = min((item_idx) / total_items, 1.0)
                                     main_progress_container.progress(main_progress)
-                                    main_status_container.info(f"Processing item {item_idx + 1} of {total_items}: {item_data['identifier']}")
+                                    main_status_container.info(f"Processing item {item_idx + 1} of {total_items}: {item_data.identifier}")
                                     
                                     # Reset item progress
                                     item_progress_container.progress(0)
-                                    item_status_container.info(f"Starting translation for: {item_data['identifier']}")
+                                    item_status_container.info(f"Starting translation for: {item_data.identifier}")
                                     
                                     # Item start time
                                     item_start_time = time.time()
@@ -1335,7 +1745,10 @@ def main():
                                             openai_key=st.session_state.openai_key,
                                             webflow_key=st.session_state.api_key,
                                             collection_id=collection_id,
-                                            config=config
+                                            schema=schema,
+                                            memo=memo,
+                                            usage_tracker=usage_tracker,
+                                            dry_run=dry_run
                                         )
                                         
                                         # Add to results
@@ -1353,8 +1766,8 @@ def main():
                                     
                                     # Update results in real-time
                                     with results_container:
-                                        st.write(f"Results for {item_data['identifier']}:")
-                                        with st.expander(f"View translation results for {item_data['identifier']}", expanded=False):
+                                        st.write(f"Results for {item_data.identifier}:")
+                                        with st.expander(f"View translation results for {item_data.identifier}", expanded=False):
                                             for res in item_results:
                                                 if res['status'] == 'success':
                                                     st.success(f"✅ {res['language']}: {res['message']}")
@@ -1362,10 +1775,18 @@ def main():
                                                     st.error(f"❌ {res['language']}: {res['message']}")
                                     
                                     # Update item status
-                                    item_status_container.success(f"Completed translations for: {item_data['identifier']} in {format_elapsed_time(item_elapsed)}")
+                                    item_status_container.success(f"Completed translations for: {item_data.identifier} in {format_elapsed_time(item_elapsed)}")
                                 
                             # Calculate total elapsed time
                             total_elapsed = time.time() - start_time
+                            observe('job', total_elapsed, page='cms_batch')
+                            if dry_run:
+                                st.session_state.cms_change_set = build_cms_change_set(collection_id, all_results)
+                            else:
+                                # Failed items are staged with their translated fields so only the failed fields are retried
+                                retry_set = build_cms_change_set(collection_id, all_results)
+                                st.session_state.cms_retry_change_set = retry_set if retry_set['locales'] else None
+                            usage_report = usage_tracker.save()
                             
                             # Update main progress when complete
                             main_progress_container.progress(1.0)
@@ -1379,6 +1800,10 @@ def main():
                             # Show basic stats outside expander
                             st.write(f"Total translations: {len(all_results)} ({success_count} successful, {error_count} failed)")
                             st.write(f"Total time: {format_elapsed_time(total_elapsed)}")
+                            st.write(f"Deduplication: {format_dedup_stats(memo.stats())}")
+                            st.write(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+                            st.write(format_limiter_stats())
+                            st.write(f"Usage: {format_usage_totals(usage_report['totals'])}")
                             
                             # Show detailed stats in expander
                             with st.expander("View detailed translation statistics", expanded=False):
@@ -1394,6 +1819,85 @@ def main():
                             language_status_container.empty()
                             item_progress_container.empty()
                             item_status_container.empty()
+                    
+                    render_cms_change_set(collection_id, parsed_items=parsed_items, schema=schema)
+                    render_cms_change_set(collection_id, state_key='cms_retry_change_set', parsed_items=parsed_items,
+                                          schema=schema, title="Failed Fields to Retry")
+
+                # BULK OFFLINE MODE (PROVIDER BATCH APIS)
+                else:
+                    st.subheader("Bulk Offline Translation")
+                    st.write("Compile every field and language into a provider batch job. Batch jobs are cheaper "
+                             "and run within 24 hours; refresh the job status and push the results when it completes.")
+                    
+                    bulk_all_items = st.checkbox("Translate all items in the collection", value=False, key="bulk_all_items")
+                    if bulk_all_items:
+                        bulk_items = filtered_items
+                    else:
+                        item_options = [f"{item.identifier} ({item.slug})" for item in filtered_items]
+                        bulk_selected = st.multiselect(
+                            f"Select {schema.display_name} items to translate (Total: {len(filtered_items)} of {len(parsed_items)})",
+                            options=item_options,
+                            key="bulk_item_selectbox"
+                        )
+                        bulk_slugs = [option.split('(')[-1].strip(')') for option in bulk_selected]
+                        bulk_items = [item for item in filtered_items if item.slug in bulk_slugs]
+                    
+                    languages_to_translate = [l for l in st.session_state.cms_locales if not l.get('default', False)]
+                    use_claude_for_portuguese = bool(st.session_state.get('claude_api_key'))
+                    
+                    if bulk_items:
+                        units, batch_requests = compile_units(bulk_items, schema, languages_to_translate, use_claude_for_portuguese)
+                        st.write(f"{len(bulk_items)} items x {len(languages_to_translate)} languages: "
+                                 f"{len(units)} field translations in {len(batch_requests)} batch requests")
+                        
+                        if st.button("Submit Bulk Job", key="submit_bulk_job"):
+                            if not st.session_state.get('openai_key'):
+                                st.error("OpenAI API Key is missing. Please add it in the sidebar to enable translations.")
+                                return
+                            with st.spinner("Compiling and submitting batch job..."):
+                                job = create_job(
+                                    collection_id=collection_id,
+                                    collection_name=collection_name,
+                                    items=bulk_items,
+                                    schema=schema,
+                                    locales=languages_to_translate,
+                                    glossary_terms=get_glossary_terms(),
+                                    use_claude_for_portuguese=use_claude_for_portuguese
+                                )
+                                errors = submit_job(job, st.session_state.openai_key, st.session_state.get('claude_api_key'))
+                            if errors:
+                                for error in errors:
+                                    st.error(error)
+                            else:
+                                st.success(f"Submitted bulk job {job['job_id']}")
+                    
+                    # Jobs for this collection
+                    st.subheader("Bulk Jobs")
+                    jobs = list_jobs(collection_id)
+                    if not jobs:
+                        st.info("No bulk jobs for this collection yet.")
+                    for job in jobs:
+                        with st.expander(f"{job['job_id']} - {job['status']} ({len(job['units'])} field translations)", expanded=False):
+                            for provider, batch_info in job['batches'].items():
+                                st.write(f"{provider}: {batch_info.get('id') or 'not submitted'} ({batch_info['status']}, {batch_info['count']} requests)")
+                            
+                            if job['status'] == 'submitted' and st.button("Refresh Status", key=f"refresh_{job['job_id']}"):
+                                with st.spinner("Polling batch status..."):
+                                    refresh_job(job, st.session_state.get('openai_key'), st.session_state.get('claude_api_key'))
+                                st.rerun()
+                            
+                            if (job['status'] in ['completed', 'pushed'] or job.get('result_count')) and st.button("Push to Webflow", key=f"push_{job['job_id']}"):
+                                with st.spinner("Pushing translations to Webflow..."):
+                                    results = refresh_job(job, st.session_state.get('openai_key'), st.session_state.get('claude_api_key'))
+                                    push_job(job, results, execute_curl_command_concurrent, st.session_state.api_key)
+                            
+                            if job.get('push_results'):
+                                success_count = sum(1 for res in job['push_results'] if res['status'] == 'success')
+                                st.write(f"Pushed: {success_count} of {len(job['push_results'])} item translations successful")
+                                for res in job['push_results']:
+                                    if res['status'] != 'success':
+                                        st.error(f"❌ {res['item']} - {res['language']}: {res['message']}")
 
     # Add footer at the bottom of the app
     st.markdown("---")
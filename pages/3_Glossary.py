@@ -1,175 +1,12 @@
 import streamlit as st
-import json
 import csv
 from io import StringIO
-import os
-import re
 
-# Initialize session state for glossary
-if 'glossary' not in st.session_state:
-    # Default glossary with common terms that should not be translated
-    st.session_state.glossary = {
-        'product_names': [
-            'Deriv',
-            'Deriv App',
-            'Deriv Bot',
-            'Deriv GO',
-            'Deriv Life',
-            'Deriv Blog',
-            'Deriv X',
-            'Deriv cTrader',
-            'MT5',
-            'P2P',
-            'SmartTrader',
-            'Deriv Trader',
-            'Binary Bot'
-        ],
-        'technical_terms': [
-            # Web Technologies
-            'API',
-            'URL',
-            'HTTP',
-            'HTTPS',
-            'SSL',
-            'TLS',
-            'JSON',
-            'XML',
-            'REST',
-            'RESTful',
-            'SOAP',
-            'WebSocket',
-            'WS',
-            'WSS',
-            'GET',
-            'POST',
-            'PUT',
-            'DELETE',
-            'OAuth',
-            'Passkey',
-            
-            # Web Browsers & Tools
-            'Google Chrome',
-            'Firefox',
-            'Safari',
-            'Edge',
-            'Chrome DevTools',
-            
-            # Cloud & Storage
-            'Google Drive',
-            'Dropbox',
-            'iCloud',
-            'AWS',
-            'Azure',
-            
-            # Development Frameworks & Libraries
-            'Flutter',
-            'React',
-            'Angular',
-            'Vue.js',
-            'Node.js',
-            'Express.js',
-            'Django',
-            'Flask',
-            
-            # Security
-            'CORS',
-            'XSS',
-            'CSRF',
-            'JWT',
-            'SSH',
-            'VPN',
-            
-            # Database
-            'SQL',
-            'NoSQL',
-            'MongoDB',
-            'PostgreSQL',
-            'MySQL',
-            'Redis',
-            
-            # File Types
-            'CSV',
-            'PDF',
-            'ZIP',
-            'RAR',
-            'JPG',
-            'PNG',
-            'SVG',
-            
-            # Protocols
-            'FTP',
-            'SMTP',
-            'POP3',
-            'IMAP',
-            'TCP/IP',
-            'UDP',
-            
-            # Mobile Development
-            'iOS',
-            'Android',
-            'APK',
-            'IPA'
-        ],
-        'awards_name': [
-            'Affiliate Program of the Year',
-            'Best Customer Service - Global',
-            'Best Latam Region Broker',
-            'Best Partner Programme',
-            'Best Trading Experience',
-            'Best Trading Experience (LATAM) 2024',
-            'Broker of the Year - Global',
-            'Finance Magnates 2024',
-            'Forex Expo Dubai 2024',
-            'FX&Trust Score Awards 2024',
-            'Global Forex Awards',
-            'Global Forex Awards 2024',
-            'Most Innovative Broker',
-            'Most Innovative Broker— MEA 2025',
-            'Most Trusted Broker',
-            'UF Awards 2024'
-        ],
-        'address': [
-            "17 Rue d'Antin, 75002 Paris",
-            "181, Leoforos Archiepiskopou Makariou III Avenue 15 Business Centre, 1st Floor, 3030, Limassol Cyprus",
-            "2nd Floor, Suite 2, Omar Hodge Building, 325 Waterfront Drive, Road Town, Tortola, VG 1110, British Virgin Islands",
-            "67-1 & 69-1, Jalan KLJ 6, Taman Kota Laksamana Jaya, Melaka 75200",
-            "72 Limassol Avenue, 12th floor, Asteroid Business Centre, 2014 Strovolos, Nicosia",
-            "80 Robinson Road, #11-03, Singapore 068898",
-            "AJIB Building, No 12A & 12B, 3rd Floor, Al Bonouk Street, Al Abdali Boulevard, Amman - Jordan.",
-            "Cayman Enterprise City, Strathvale House, 2nd Floor, 90N Church St, George Town, Cayman Islands",
-            "Deriv HQ, 3500, Jalan Teknokrat 3, 63000 Cyberjaya, Selangor",
-            "Deriv Technologies Limited, Apex Forbury Road, Reading RG1 1AX",
-            "E-5-6, Soho Ipoh 2, Jalan Sultan Idris Shah, Ipoh 30000, Perak",
-            "Edificio Atrium, Piso 2, Guido Spano Esq. Doctor Morra, Asunción 1849",
-            "F16, Level 1, Paragon Labuan, Jalan Tun Mustapha, Labuan 87000, Sabah",
-            "First Floor, 68 - 72 Leonard Street, London, EC2A 4QX",
-            "Kemperplatz 1 Mitte D, 10785 Berlin, Germany",
-            "Level 2 East Wing, Kigali Heights, KG7 Avenue, Kigali",
-            "Level 3, W Business Centre, Triq Dun Karm, Birkirkara, BKR 9033",
-            "Nicosia",
-            "No. 1-23A, First Floor, Paragon, Jalan Tun Mustapha, 87008, Federal Territory of Labuan, Malaysia.",
-            "Office 1902, Jumeirah Business Center 1, JLT Cluster G",
-            "Room 408A, Empire Centre, 68 Mody Road, Tsim Sha Tsui East, Kowloon, Hong Kong",
-            "Suite 5, One Cornet Street, St Peter Port, Guernsey GY1 1 BZ",
-            "World Trade Center Ciudad del Este",
-            "Yumiwork, Lolam building, Kumul Highway, Land # 11/OD22/021, Port Vila, Vanuatu"
-        ],
-        'list_of_people': [
-            'Chris Horn',
-            'Derrick',
-            'Jean Yeas',
-            'Rakshit',
-            'Jean-Yves Sireau',
-            'Louise Wolf',
-            'Seema Hallon',
-            'Joanna Frendo',
-            'Jennice Lourdsamy',
-            'Prakash Bhudia'
-        ],
-        'custom_terms': []  # For user-added terms
-    }
+from glossary import (DEFAULT_CATEGORIES, get_glossary, get_locale_terms, replace_glossary, update_glossary,
+                      update_locale_terms)
+from glossary_import import import_glossary_file
+from glossary_index import get_glossary_index, highlight, paginate
 
-# Add to session state initialization
 if 'search_query' not in st.session_state:
     st.session_state.search_query = ""
 if 'page_size' not in st.session_state:
@@ -177,27 +14,88 @@ if 'page_size' not in st.session_state:
 if 'current_page' not in st.session_state:
     st.session_state.current_page = {}  # Dictionary to store current page for each category
 
-def save_glossary_to_file():
-    """Save the current glossary to a JSON file"""
-    try:
-        with open('glossary.json', 'w') as f:
-            json.dump(st.session_state.glossary, f, indent=2)
-        return True
-    except Exception as e:
-        st.error(f"Error saving glossary: {str(e)}")
+def saved(result):
+    """Show the error of a glossary store update, if any; True if it was saved"""
+    _, error = result
+    if error:
+        st.error(error)
         return False
+    return True
 
-def load_glossary_from_file():
-    """Load the glossary from a JSON file"""
-    try:
-        with open('glossary.json', 'r') as f:
-            st.session_state.glossary = json.load(f)
-        return True
-    except FileNotFoundError:
-        return False
-    except Exception as e:
-        st.error(f"Error loading glossary: {str(e)}")
-        return False
+def render_term_page(key, hits, index, show_category=False):
+    """Show one page of glossary search hits with previous/next controls"""
+    page_terms, page, total_pages = paginate(hits, st.session_state.current_page.get(key, 0),
+                                             st.session_state.page_size)
+    st.session_state.current_page[key] = page
+    
+    # Show pagination controls if needed
+    if total_pages > 1:
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            if st.button("← Previous", key=f"prev_{key}", disabled=page == 0):
+                st.session_state.current_page[key] -= 1
+                st.rerun()
+        
+        with col2:
+            # Center the pagination text
+            st.markdown(f"<div style='text-align: center;'>Page {page + 1} of {total_pages}</div>", unsafe_allow_html=True)
+        
+        with col3:
+            if st.button("Next →", key=f"next_{key}", disabled=page == total_pages - 1):
+                st.session_state.current_page[key] += 1
+                st.rerun()
+    
+    # Display terms with numbering
+    start_idx = page * st.session_state.page_size
+    for i, hit in enumerate(page_terms):
+        result = index.result(hit)
+        line = f"{start_idx + i + 1}. {highlight(result)}"
+        if show_category:
+            line += f" · *{result['category'].replace('_', ' ').title()}*"
+        st.markdown(line)
+
+def render_locale_terms():
+    """Edit the fixed source -> target term translations of each locale"""
+    st.header("Locale Terms")
+    st.write("""
+    Terms that must always be translated a specific way in one locale. They are applied before and
+    after the model: texts made up only of these terms are translated without a model call, and the
+    mapped translation replaces any source term the model leaves untranslated. Mappings for a base
+    language (e.g. `pt`) also apply to its regional locales (e.g. `pt-PT`).
+    """)
+    
+    locale_terms = get_locale_terms()
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        locale_code = st.selectbox("Locale", options=sorted(locale_terms.keys()), key="locale_terms_locale",
+                                   placeholder="Add a locale first")
+    with col2:
+        new_locale = st.text_input("Add locale", placeholder="e.g. pt-PT", key="locale_terms_new_locale")
+        if st.button("Add Locale", use_container_width=True) and new_locale.strip():
+            if saved(update_locale_terms(lambda current: current.setdefault(new_locale.strip(), {}))):
+                st.rerun()
+    
+    if not locale_code:
+        return
+    
+    rows = [{"Source": source, "Target": target} for source, target in locale_terms[locale_code].items()]
+    edited_rows = st.data_editor(rows or [{"Source": "", "Target": ""}], num_rows="dynamic",
+                                 use_container_width=True, key=f"locale_terms_editor_{locale_code}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Save Terms", key="save_locale_terms"):
+            mappings = {
+                row["Source"].strip(): row["Target"].strip()
+                for row in edited_rows
+                if (row.get("Source") or "").strip() and (row.get("Target") or "").strip()
+            }
+            if saved(update_locale_terms(lambda current: current.update({locale_code: mappings}))):
+                st.success(f"Saved {len(mappings)} terms for {locale_code}")
+    with col2:
+        if st.button(f"Delete {locale_code}", key="delete_locale_terms"):
+            if saved(update_locale_terms(lambda current: current.pop(locale_code, None))):
+                st.rerun()
 
 def export_glossary_to_csv():
     """Export the glossary to a CSV file"""
@@ -205,47 +103,28 @@ def export_glossary_to_csv():
     writer = csv.writer(output)
     writer.writerow(['Category', 'Term'])
     
-    for category, terms in st.session_state.glossary.items():
+    for category, terms in get_glossary().items():
         for term in terms:
             writer.writerow([category, term])
     
     return output.getvalue()
 
-def import_glossary_from_csv(csv_file):
-    """Import glossary from a CSV file"""
-    try:
-        content = csv_file.getvalue().decode('utf-8')
-        csv_reader = csv.reader(StringIO(content))
-        next(csv_reader)  # Skip header row
-        
-        # Start with existing structure but empty lists
-        new_glossary = {
-            'product_names': [],
-            'technical_terms': [],
-            'awards_name': [],
-            'address': [],
-            'list_of_people': [],  # Add new category here too
-            'custom_terms': []
-        }
-        
-        # Process each row in the CSV
-        for row in csv_reader:
-            if len(row) == 2:
-                category, term = row
-                
-                # Create category if it doesn't exist
-                if category not in new_glossary:
-                    new_glossary[category] = []
-                
-                # Add term to appropriate category
-                new_glossary[category].append(term)
-        
-        st.session_state.glossary = new_glossary
-        save_glossary_to_file()
-        return True
-    except Exception as e:
-        st.error(f"Error importing glossary: {str(e)}")
+def import_glossary_from_file(uploaded_file):
+    """Merge a CSV or XLSX upload into the glossary and show the import report"""
+    report, error = import_glossary_file(uploaded_file, get_glossary())
+    if error:
+        st.error(error)
         return False
+    st.success(f"Imported {report['added']} new terms from {report['rows']} rows in {report['seconds']:.1f}s "
+               f"({report['duplicates']} duplicates skipped, {report['error_count']} rows rejected)")
+    if report['new_categories']:
+        st.info(f"New categories: {', '.join(report['new_categories'])}")
+    if report['errors']:
+        shown = len(report['errors'])
+        label = f"{report['error_count']} rejected rows" + (f" (first {shown} shown)" if shown < report['error_count'] else "")
+        with st.expander(label, expanded=False):
+            st.dataframe(report['errors'], use_container_width=True, hide_index=True)
+    return True
 
 def main():
     st.title("Translation Glossary Manager")
@@ -254,16 +133,16 @@ def main():
     These terms will be preserved in their original form.
     """)
     
-    # Load existing glossary if available
-    if os.path.exists('glossary.json'):
-        load_glossary_from_file()
+    # Shared by every page and session; only re-read when glossary.json changes
+    glossary = get_glossary()
     
     # Create tabs for different sections
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "View Glossary", 
         "Add/Remove Terms", 
         "Import/Export",
-        "Settings"
+        "Settings",
+        "Locale Terms"
     ])
     
     with tab1:
@@ -273,72 +152,30 @@ def main():
         search_query = st.text_input("Search terms", 
                                     placeholder="Type to search...",
                                     value=st.session_state.search_query)
+        if search_query != st.session_state.search_query:
+            st.session_state.current_page['search_results'] = 0
         st.session_state.search_query = search_query
+        include_close_matches = st.checkbox("Include close matches", value=True,
+                                            help="Also list terms spelled similarly to the search")
         
-        # Display each category in an expander
-        for category, terms in st.session_state.glossary.items():
-            # Initialize current page for this category if not exists
-            if category not in st.session_state.current_page:
-                st.session_state.current_page[category] = 0
-                
-            # Filter terms based on search query
-            if search_query:
-                filtered_terms = [term for term in terms if search_query.lower() in term.lower()]
+        # Prebuilt for this glossary version, so typing doesn't re-sort or re-scan every term
+        index = get_glossary_index()
+        
+        if search_query.strip():
+            hits = index.search(search_query, fuzzy=include_close_matches)
+            matched_categories = len({index.categories[position] for position, _ in hits})
+            st.caption(f"{len(hits)} matching terms in {matched_categories} categories")
+            if hits:
+                render_term_page('search_results', hits, index, show_category=True)
             else:
-                filtered_terms = terms
-                
-            # Sort terms alphabetically
-            sorted_terms = sorted(filtered_terms)
-            
-            # Calculate pagination
-            total_pages = max(1, (len(sorted_terms) + st.session_state.page_size - 1) // st.session_state.page_size)
-            
-            # Ensure current page is valid
-            if st.session_state.current_page[category] >= total_pages:
-                st.session_state.current_page[category] = max(0, total_pages - 1)
-            
-            # Get terms for current page
-            start_idx = st.session_state.current_page[category] * st.session_state.page_size
-            end_idx = min(start_idx + st.session_state.page_size, len(sorted_terms))
-            page_terms = sorted_terms[start_idx:end_idx]
-            
-            # Display category with pagination info
-            with st.expander(f"{category.replace('_', ' ').title()} ({len(filtered_terms)} terms)"):
-                if filtered_terms:
-                    # Show pagination controls if needed
-                    if total_pages > 1:
-                        col1, col2, col3 = st.columns([1, 3, 1])
-                        with col1:
-                            if st.button("← Previous", key=f"prev_{category}", 
-                                        disabled=st.session_state.current_page[category] == 0):
-                                st.session_state.current_page[category] -= 1
-                                st.rerun()
-                        
-                        with col2:
-                            # Center the pagination text
-                            st.markdown(f"<div style='text-align: center;'>Page {st.session_state.current_page[category] + 1} of {total_pages}</div>", unsafe_allow_html=True)
-                        
-                        with col3:
-                            if st.button("Next →", key=f"next_{category}", 
-                                        disabled=st.session_state.current_page[category] == total_pages - 1):
-                                st.session_state.current_page[category] += 1
-                                st.rerun()
-                    
-                    # Display terms with numbering
-                    for i, term in enumerate(page_terms):
-                        global_idx = start_idx + i + 1
-                        # Highlight search term if present
-                        if search_query and search_query.lower() in term.lower():
-                            # Fix the split operation - don't use flags parameter directly
-                            pattern = re.compile(re.escape(search_query), re.IGNORECASE)
-                            term_parts = pattern.split(term)
-                            highlighted_term = f"**{search_query}**".join(term_parts)
-                            st.markdown(f"{global_idx}. {highlighted_term}")
-                        else:
-                            st.write(f"{global_idx}. {term}")
-                else:
-                    if search_query:
-                        st.write(f"No matching terms found for '{search_query}'")
+                st.write(f"No matching terms found for '{search_query}'")
+        else:
+            # Display each category in an expander
+            for category in glossary.keys():
+                hits = index.search('', category=category)
+                with st.expander(f"{category.replace('_', ' ').title()} ({len(hits)} terms)"):
+                    if hits:
+                        render_term_page(category, hits, index)
                     else:
                         st.write("No terms in this category")
     
@@ -357,10 +194,9 @@ def main():
             if st.button("Add Category") and new_category:
                 # Normalize category name
                 normalized_category = new_category.lower().replace(' ', '_')
-                if normalized_category not in st.session_state.glossary:
-                    st.session_state.glossary[normalized_category] = []
-                    save_glossary_to_file()
-                    st.success(f"Added new category: {normalized_category}")
+                if normalized_category not in glossary:
+                    if saved(update_glossary(lambda current: current.setdefault(normalized_category, []))):
+                        st.success(f"Added new category: {normalized_category}")
                 else:
                     st.warning("Category already exists")
             
@@ -369,17 +205,19 @@ def main():
             # Delete category
             categories_to_delete = st.multiselect(
                 "Select categories to delete",
-                options=[cat for cat in st.session_state.glossary.keys() 
-                        if cat not in ['product_names', 'technical_terms', 'awards_name', 'address', 'list_of_people', 'custom_terms']],
+                options=[cat for cat in glossary.keys() 
+                        if cat not in DEFAULT_CATEGORIES],
                 help="Default categories cannot be deleted"
             )
             
             if st.button("Delete Selected Categories") and categories_to_delete:
                 if st.checkbox("Confirm deletion? This cannot be undone."):
-                    for cat in categories_to_delete:
-                        del st.session_state.glossary[cat]
-                    save_glossary_to_file()
-                    st.success(f"Deleted {len(categories_to_delete)} categories")
+                    def delete_categories(current):
+                        for cat in categories_to_delete:
+                            current.pop(cat, None)
+                    
+                    if saved(update_glossary(delete_categories)):
+                        st.success(f"Deleted {len(categories_to_delete)} categories")
         
         st.divider()
         
@@ -393,17 +231,16 @@ def main():
         with col2:
             category = st.selectbox(
                 "Select category",
-                options=list(st.session_state.glossary.keys()),
+                options=list(glossary.keys()),
                 format_func=lambda x: x.replace('_', ' ').title(),
                 label_visibility="collapsed"
             )
         
         with col3:
             if st.button("Add Term", use_container_width=True) and new_term:
-                if new_term not in st.session_state.glossary[category]:
-                    st.session_state.glossary[category].append(new_term)
-                    save_glossary_to_file()
-                    st.success(f"Added '{new_term}' to {category}")
+                if new_term not in glossary[category]:
+                    if saved(update_glossary(lambda current: current[category].append(new_term))):
+                        st.success(f"Added '{new_term}' to {category}")
                 else:
                     st.warning(f"'{new_term}' already exists in {category}")
         
@@ -416,7 +253,7 @@ def main():
         with col1:
             remove_category = st.selectbox(
                 "Select category to remove terms from",
-                options=list(st.session_state.glossary.keys()),
+                options=list(glossary.keys()),
                 format_func=lambda x: x.replace('_', ' ').title(),
                 key="remove_category",
                 label_visibility="collapsed",
@@ -427,7 +264,7 @@ def main():
             # Create numbered options for the multiselect
             numbered_terms = [
                 f"{i+1}. {term}" 
-                for i, term in enumerate(sorted(st.session_state.glossary[remove_category]))
+                for i, term in enumerate(sorted(glossary[remove_category]))
             ]
             
             terms_to_remove = st.multiselect(
@@ -441,10 +278,12 @@ def main():
             if st.button("Remove Selected Terms", use_container_width=True) and terms_to_remove:
                 # Extract actual terms from numbered format
                 actual_terms = [term.split('. ', 1)[1] for term in terms_to_remove]
-                for term in actual_terms:
-                    st.session_state.glossary[remove_category].remove(term)
-                save_glossary_to_file()
-                st.success(f"Removed {len(terms_to_remove)} term(s)")
+                
+                def remove_terms(current):
+                    current[remove_category] = [term for term in current[remove_category] if term not in actual_terms]
+                
+                if saved(update_glossary(remove_terms)):
+                    st.success(f"Removed {len(terms_to_remove)} term(s)")
     
     with tab3:
         st.header("Import/Export Glossary")
@@ -464,11 +303,12 @@ def main():
         
         with col2:
             st.subheader("Import")
-            uploaded_file = st.file_uploader("Upload CSV file", type=['csv'])
+            uploaded_file = st.file_uploader("Upload CSV or XLSX file", type=['csv', 'xlsx'],
+                                             help="Columns: Category, Term. Terms are merged into the glossary; "
+                                                  "terms already in their category are skipped.")
             if uploaded_file is not None:
-                if st.button("Import from CSV"):
-                    if import_glossary_from_csv(uploaded_file):
-                        st.success("Glossary imported successfully!")
+                if st.button("Import File"):
+                    import_glossary_from_file(uploaded_file)
     
     with tab4:
         st.header("Glossary Settings")
@@ -486,7 +326,7 @@ def main():
         if new_page_size != st.session_state.page_size:
             st.session_state.page_size = new_page_size
             # Reset current pages when changing page size
-            st.session_state.current_page = {category: 0 for category in st.session_state.glossary.keys()}
+            st.session_state.current_page = {category: 0 for category in glossary.keys()}
             st.success(f"Page size updated to {new_page_size} terms")
         
         st.divider()
@@ -494,7 +334,7 @@ def main():
         if st.button("Reset to Default"):
             if st.checkbox("Are you sure? This will remove all custom terms."):
                 # Reset to default glossary
-                st.session_state.glossary = {
+                default_glossary = {
                     'product_names': [
                         'Deriv',
                         'Deriv App',
@@ -680,8 +520,11 @@ def main():
                     ],
                     'custom_terms': []
                 }
-                save_glossary_to_file()
-                st.success("Glossary reset to default")
+                if saved(replace_glossary(default_glossary)):
+                    st.success("Glossary reset to default")
+    
+    with tab5:
+        render_locale_terms()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,13 +1,33 @@
 import streamlit as st
-import requests
 import json
-import openai
+import logging
 import time
 import tempfile
 import os
 import zipfile
 from streamlit_option_menu import option_menu
-from utils import get_site_locales
+from utils import WEBFLOW_API_BASE, get_site_locales, webflow_request
+from components import format_translated_properties, get_component_properties, parse_component_properties, update_component_properties
+from dedup import build_segment_payload, dedup_stats, fan_out, format_dedup_stats, normalize_segment, parse_segment_response
+from concurrency import format_limiter_stats
+from locale_terms import content_term_mappings, enforce_content, enforce_segments, map_segments
+from translation_memory import recall_segments
+from quality import format_failures, gate_translations, quality_notes
+from metrics import observe
+from llm import format_cache_stats, openai_chat, usage_cache_stats
+from prompts import DERIV_CONTEXT_RULE, JSON_OUTPUT_INSTRUCTIONS, PRODUCT_NAMES_RULE, build_locale_prompt, build_static_prompt
+from translation import MULTI_LOCALE_MAX_CHARS, get_glossary_terms, is_short_segment, translate_multi_locale
+from usage import UsageTracker, format_usage_totals, track_usage
+from logs import log_event, log_payload, setup_logging
+
+# Log records are queued and written by a background thread
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Model and sampling of the translation requests, shared by the re-requests
+# of segments failing the quality checks
+TRANSLATION_MODEL = "gpt-4o-mini"
+TRANSLATION_TEMPERATURE = 0.3
 
 # Hide the default menu
 st.set_page_config(
@@ -134,7 +154,7 @@ with st.sidebar:
 
 def get_site_components(site_id, api_key):
     """Get list of components from the site with pagination handling"""
-    base_url = f"https://api.webflow.com/v2/sites/{site_id}/components"
+    base_url = f"{WEBFLOW_API_BASE}/sites/{site_id}/components"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
@@ -146,10 +166,10 @@ def get_site_components(site_id, api_key):
     
     while True:
         url = f"{base_url}?limit={limit}&offset={offset}"
-        print(f"\n[DEBUG] Fetching components from URL: {url}")
+        log_event(logger, logging.DEBUG, "fetch components", offset=offset, limit=limit)
         
         try:
-            response = requests.get(url, headers=headers)
+            response = webflow_request("GET", url, headers=headers)
             response.raise_for_status()
             data = response.json()
             
@@ -161,7 +181,8 @@ def get_site_components(site_id, api_key):
             pagination = data.get('pagination', {})
             total = pagination.get('total', 0)
             
-            print(f"[DEBUG] Retrieved {len(current_components)} components (Total: {len(all_components)}/{total})")
+            log_event(logger, logging.DEBUG, "fetched components", count=len(current_components),
+                      fetched=len(all_components), total=total)
             
             # Check if we've got all components
             if len(all_components) >= total:
@@ -171,95 +192,13 @@ def get_site_components(site_id, api_key):
             offset += limit
             
         except Exception as e:
-            print(f"[DEBUG] Error fetching components: {str(e)}")
+            log_event(logger, logging.ERROR, "fetch components failed", offset=offset, error=str(e))
             st.error(f"Error fetching components: {str(e)}")
             return []
     
-    print(f"[DEBUG] Successfully fetched all {len(all_components)} components")
+    log_event(logger, logging.INFO, "fetched all components", total=len(all_components))
     return all_components
 
-def get_component_content(site_id, component_id, api_key):
-    """Get component content using DOM endpoint with pagination handling"""
-    base_url = f"https://api.webflow.com/v2/sites/{site_id}/components/{component_id}/dom"
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}",
-        "accept-version": "1.0.0"
-    }
-    
-    all_nodes = []
-    offset = 0
-    limit = 100  # Maximum allowed by API
-    
-    while True:
-        # Construct URL with pagination parameters
-        url = f"{base_url}?limit={limit}&offset={offset}"
-        
-        print("\n" + "="*50)
-        print(f"API REQUEST - Get Component Content (Offset: {offset})")
-        print("="*50)
-        print(f"URL: {url}")
-        print("\nHeaders:")
-        for key, value in headers.items():
-            if key.lower() == 'authorization':
-                print(f"{key}: Bearer ****{value[-4:]}")
-            else:
-                print(f"{key}: {value}")
-        
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Add nodes from this batch to our collection
-            current_nodes = data.get('nodes', [])
-            all_nodes.extend(current_nodes)
-            
-            # Get pagination info
-            pagination = data.get('pagination', {})
-            total = pagination.get('total', 0)
-            
-            print(f"\nRetrieved {len(current_nodes)} nodes (Total: {len(all_nodes)}/{total})")
-            
-            # Print the complete API response for debugging
-            print("\n" + "="*50)
-            print("COMPLETE API RESPONSE")
-            print("="*50)
-            print(json.dumps(data, indent=2))
-            
-            # Check if we've got all nodes
-            if len(all_nodes) >= total:
-                break
-                
-            # Update offset for next batch
-            offset += limit
-            
-        except Exception as e:
-            print(f"\nERROR: {str(e)}")
-            st.error(f"Error fetching component content: {str(e)}")
-            return None
-    
-    # Return complete data with all nodes
-    return {
-        "nodes": all_nodes,
-        "lastUpdated": data.get("lastUpdated")
-    }
-
-def parse_component_content(content):
-    """Parse component content to extract node IDs and HTML"""
-    parsed_nodes = []
-    
-    for node in content.get('nodes', []):
-        # Only include nodes that have non-empty html
-        if node.get('text', {}).get('html'):
-            node_data = {
-                "nodeId": node['id'],
-                "text": node['text']['html']  # Getting HTML instead of plain text
-            }
-            parsed_nodes.append(node_data)
-    
-    return {"nodes": parsed_nodes}
-
 def translate_content_with_openai(parsed_nodes, target_language, api_key):
     """Translate content using OpenAI while preserving JSON structure"""
     try:
@@ -271,56 +210,35 @@ def translate_content_with_openai(parsed_nodes, target_language, api_key):
         if not api_key:
             return None, "OpenAI API key is missing"
             
-        client = openai.OpenAI(api_key=api_key)
-        
-        # Print debug information
-        print("\n" + "="*50)
-        print("TRANSLATION REQUEST")
-        print("="*50)
-        print(f"Target Language: {target_language}")
-        print("Content to translate:")
-        print(json.dumps(parsed_nodes, indent=2))
-        
-        # Get all terms from the glossary that should not be translated
-        do_not_translate_terms = []
-        if 'glossary' in st.session_state:
-            for category, terms in st.session_state.glossary.items():
-                do_not_translate_terms.extend(terms)
-        
-        # Format the terms as a bulleted list for the prompt
-        terms_list = "\n".join([f"- {term}" for term in do_not_translate_terms])
-        
-        # Prepare the system message explaining what we want
-        system_message = f"""You are a professional translator with 20 years of experience.  
-        Translate only the "text" values in the JSON to {target_language}. 
-        
-        DO NOT TRANSLATE the following terms - keep them exactly as they appear:
-        {terms_list}
-        
-        Follow these additional rules when translating:
-        - When encountering the word "Deriv" and any succeeding word, analyze the context and based on it, keep it in English. For example, "Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be kept in English.
-        - Keep product names such as P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, Deriv Bot, and Binary Bot in English.
-        
-        Keep all other JSON structure and values exactly the same.
-        Return only the JSON, no explanations."""
+        log_payload(logger, "translation request", parsed_nodes, locale=target_language)
+        
+        # The static prompt (rules + glossary) is identical for every locale so
+        # it can be served from the provider's prompt cache; only the short
+        # locale prompt changes between languages
+        static_prompt = build_static_prompt(
+            task='Translate only the "text" values in the JSON.',
+            glossary_terms=get_glossary_terms(),
+            rules=[DERIV_CONTEXT_RULE, PRODUCT_NAMES_RULE],
+            output_instructions=JSON_OUTPUT_INSTRUCTIONS
+        )
+        locale_prompt = build_locale_prompt(target_language, content_term_mappings(parsed_nodes, target_language))
         
         # Prepare the JSON for translation
         user_message = f"Translate this JSON content. Original JSON:\n{json.dumps(parsed_nodes, indent=2)}"
         
         # Make the API call
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.3
+            response = openai_chat(
+                api_key=api_key,
+                model=TRANSLATION_MODEL,
+                static_prompt=static_prompt,
+                locale_prompt=locale_prompt,
+                locale=target_language,
+                user_message=user_message,
+                temperature=TRANSLATION_TEMPERATURE
             )
             
-            # Print the raw response for debugging
-            print("\nOpenAI Response:")
-            print(response)
+            log_payload(logger, "OpenAI response", str(response), locale=target_language)
             
             # Extract and validate the response content
             response_content = response.choices[0].message.content
@@ -330,159 +248,28 @@ def translate_content_with_openai(parsed_nodes, target_language, api_key):
             # Try to parse the JSON response
             try:
                 translated_json = json.loads(response_content)
-                return translated_json, None
+                return enforce_content(parsed_nodes, translated_json, target_language), None
             except json.JSONDecodeError as e:
-                print(f"JSON Parse Error: {str(e)}")
-                print("Raw response content:")
-                print(response_content)
+                log_event(logger, logging.ERROR, "OpenAI response is not JSON", locale=target_language, error=str(e),
+                          response=response_content)
                 return None, f"Failed to parse OpenAI response as JSON: {str(e)}"
                 
         except Exception as e:
-            print(f"OpenAI API Error: {str(e)}")
+            log_event(logger, logging.ERROR, "OpenAI API error", locale=target_language, error=str(e))
             return None, f"OpenAI API Error: {str(e)}"
             
     except Exception as e:
-        print(f"Unexpected Error: {str(e)}")
+        log_event(logger, logging.ERROR, "translation failed", locale=target_language, error=str(e))
         return None, f"Translation error: {str(e)}"
 
-def update_component_content(site_id, component_id, locale_id, nodes, api_key):
-    """Update component content with translated text"""
-    # Updated URL structure to match the API specification
-    url = f"https://api.webflow.com/v2/sites/{site_id}/components/{component_id}/dom?localeId={locale_id}"
-    
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}",
-        "content-type": "application/json"
-    }
-    
-    payload = {
-        "nodes": nodes
-    }
-    
-    print("\n" + "="*50)
-    print("UPDATE COMPONENT CONTENT REQUEST")
-    print("="*50)
-    print(f"URL: {url}")
-    print(f"Locale ID: {locale_id}")
-    print("\nHeaders:")
-    for key, value in headers.items():
-        if key.lower() == 'authorization':
-            print(f"{key}: Bearer ****{value[-4:]}")
-        else:
-            print(f"{key}: {value}")
-    print("\nPayload:")
-    print(json.dumps(payload, indent=2))
-    
-    try:
-        response = requests.post(url, headers=headers, json=payload)
-        print("\nResponse Status:", response.status_code)
-        print("Response Body:", response.text)
-        response.raise_for_status()
-        return response.json(), None
-    except Exception as e:
-        error_msg = f"Error updating component content: {str(e)}"
-        print(f"\nERROR: {error_msg}")
-        return None, error_msg
-
-def get_component_properties(site_id, component_id, api_key, locale_id=None):
-    """Get component properties with pagination handling"""
-    base_url = f"https://api.webflow.com/v2/sites/{site_id}/components/{component_id}/properties"
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}"
-    }
-    
-    # Add locale_id as a query parameter if provided
-    params = {}
-    if locale_id:
-        params["localeId"] = locale_id
-    
-    all_properties = []
-    offset = 0
-    limit = 100  # Maximum allowed by API
-    
-    while True:
-        # Add pagination parameters
-        params["limit"] = limit
-        params["offset"] = offset
-        
-        print("\n" + "="*50)
-        print(f"API REQUEST - Get Component Properties (Offset: {offset})")
-        print("="*50)
-        print(f"URL: {base_url}")
-        print(f"Params: {params}")
-        print("\nHeaders:")
-        for key, value in headers.items():
-            if key.lower() == 'authorization':
-                print(f"{key}: Bearer ****{value[-4:]}")
-            else:
-                print(f"{key}: {value}")
-        
-        try:
-            response = requests.get(base_url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Add properties from this batch
-            current_properties = data.get('properties', [])
-            all_properties.extend(current_properties)
-            
-            # Get pagination info
-            pagination = data.get('pagination', {})
-            total = pagination.get('total', 0)
-            
-            print(f"\nRetrieved {len(current_properties)} properties (Total: {len(all_properties)}/{total})")
-            
-            # Print the complete API response for debugging
-            print("\n" + "="*50)
-            print("COMPLETE API RESPONSE")
-            print("="*50)
-            print(json.dumps(data, indent=2))
-            
-            # Check if we've got all properties
-            if len(all_properties) >= total:
-                break
-                
-            # Update offset for next batch
-            offset += limit
-            
-        except Exception as e:
-            print(f"\nERROR: {str(e)}")
-            st.error(f"Error fetching component properties: {str(e)}")
-            return None
-    
-    # Return complete data with all properties
-    return {
-        "componentId": data.get("componentId"),
-        "properties": all_properties
-    }
-
-def parse_component_properties(properties_data):
-    """Parse component properties to extract property IDs and text content"""
-    parsed_properties = []
-    
-    for prop in properties_data.get('properties', []):
-        # Only include properties that have text content
-        if prop.get('type') in ['Plain Text', 'Rich Text'] and prop.get('text'):
-            property_data = {
-                "propertyId": prop['propertyId'],
-                "type": prop['type'],
-                "label": prop.get('label', ''),
-            }
-            
-            # Add the appropriate text field based on property type
-            if prop['type'] == 'Plain Text' and 'text' in prop.get('text', {}):
-                property_data["text"] = prop['text']['text']
-            elif prop['type'] == 'Rich Text' and 'html' in prop.get('text', {}):
-                property_data["text"] = prop['text']['html']
-                
-            parsed_properties.append(property_data)
-    
-    return {"properties": parsed_properties}
-
-def translate_properties_with_openai(parsed_properties, target_language, api_key):
-    """Translate properties using OpenAI while preserving structure"""
+def translate_properties_with_openai(parsed_properties, target_language, api_key, known_translations=None):
+    """Translate properties using OpenAI while preserving structure
+    
+    known_translations maps normalized segment text to an existing translation for this
+    language (e.g. from multi-locale mode); only the remaining segments are
+    sent to OpenAI.
+    """
+    known_translations = known_translations or {}
     try:
         # First verify we have valid inputs
         if not parsed_properties:
@@ -492,58 +279,62 @@ def translate_properties_with_openai(parsed_properties, target_language, api_key
         if not api_key:
             return None, "OpenAI API key is missing"
             
-        client = openai.OpenAI(api_key=api_key)
-        
-        # Print debug information
-        print("\n" + "="*50)
-        print("TRANSLATION REQUEST")
-        print("="*50)
-        print(f"Target Language: {target_language}")
-        print("Properties to translate:")
-        print(json.dumps(parsed_properties, indent=2))
-        
-        # Get all terms from the glossary that should not be translated
-        do_not_translate_terms = []
-        if 'glossary' in st.session_state:
-            for category, terms in st.session_state.glossary.items():
-                do_not_translate_terms.extend(terms)
-        
-        # Format the terms as a bulleted list for the prompt
-        terms_list = "\n".join([f"- {term}" for term in do_not_translate_terms])
-        
-        # Prepare the system message explaining what we want
-        system_message = f"""You are a professional translator with 20 years of experience.  
-        Translate only the "text" values in the JSON to {target_language}. 
-
-        If the {target_language} is "sw", then in that case translate to Swahili only.
-        
-        DO NOT TRANSLATE the following terms - keep them exactly as they appear:
-        {terms_list}
+        log_payload(logger, "translation request", parsed_properties, locale=target_language)
+        
+        # The static prompt (rules + glossary) is identical for every locale so
+        # it can be served from the provider's prompt cache; only the short
+        # locale prompt changes between languages
+        static_prompt = build_static_prompt(
+            task='Translate only the "text" values in the JSON.',
+            glossary_terms=get_glossary_terms(),
+            rules=[DERIV_CONTEXT_RULE, PRODUCT_NAMES_RULE],
+            output_instructions=JSON_OUTPUT_INSTRUCTIONS
+        )
         
-        Follow these additional rules when translating:
-        - When encountering the word "Deriv" and any succeeding word, analyze the context and based on it, keep it in English. For example, "Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be kept in English.
-        - Keep product names such as P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, Deriv Bot, and Binary Bot in English.
+        # Collapse repeated texts so each unique segment is only translated once
+        plan, segment_payload = build_segment_payload(parsed_properties)
+        log_event(logger, logging.INFO, "translation request", locale=target_language,
+                  dedup=format_dedup_stats(dedup_stats(plan)))
         
-        Keep all other JSON structure and values exactly the same.
-        Return only the JSON, no explanations."""
+        # Reuse translations that are already known for this language
+        translations = {
+            idx: known_translations[normalize_segment(text)]
+            for idx, text in enumerate(plan['unique'])
+            if normalize_segment(text) in known_translations
+        }
+        # Approved translations from the translation memory need no model call either
+        translations.update(recall_segments(plan['unique'], target_language, skip=translations))
+        # Texts made up only of mapped locale terms need no model call
+        mapped, term_mappings = map_segments(plan['unique'], target_language, skip=translations)
+        translations.update(mapped)
+        segment_payload["segments"] = [
+            segment for segment in segment_payload["segments"]
+            if segment["id"] not in translations
+        ]
+        if not segment_payload["segments"]:
+            log_event(logger, logging.INFO, "all segments already translated, skipping OpenAI call",
+                      locale=target_language, segments=len(translations))
+            translated_json, _ = fan_out(parsed_properties, plan, translations)
+            return format_translated_properties(translated_json), None
+        
+        locale_prompt = build_locale_prompt(target_language, term_mappings)
         
         # Prepare the JSON for translation
-        user_message = f"Translate this JSON content. Original JSON:\n{json.dumps(parsed_properties, indent=2)}"
+        user_message = f"Translate this JSON content. Original JSON:\n{json.dumps(segment_payload, indent=2)}"
         
         # Make the API call
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.3
+            response = openai_chat(
+                api_key=api_key,
+                model=TRANSLATION_MODEL,
+                static_prompt=static_prompt,
+                locale_prompt=locale_prompt,
+                locale=target_language,
+                user_message=user_message,
+                temperature=TRANSLATION_TEMPERATURE
             )
             
-            # Print the raw response for debugging
-            print("\nOpenAI Response:")
-            print(response)
+            log_payload(logger, "OpenAI response", str(response), locale=target_language)
             
             # Extract and validate the response content
             response_content = response.choices[0].message.content
@@ -554,74 +345,52 @@ def translate_properties_with_openai(parsed_properties, target_language, api_key
             try:
                 translated_json = json.loads(response_content)
                 
-                # Format the translated properties for the update API
-                formatted_properties = []
-                for prop in translated_json.get('properties', []):
-                    formatted_prop = {
-                        "propertyId": prop['propertyId']
-                    }
-                    
-                    # Add the appropriate field based on property type
-                    if prop['type'] == 'Plain Text':
-                        formatted_prop["text"] = prop['text']
-                    elif prop['type'] == 'Rich Text':
-                        formatted_prop["text"] = prop['text']
-                        
-                    formatted_properties.append(formatted_prop)
+                translated = enforce_segments(plan['unique'], parse_segment_response(translated_json), target_language)
+
+                def retranslate(failures):
+                    retry_payload = {"segments": [segment for segment in segment_payload["segments"]
+                                                  if segment["id"] in failures]}
+                    try:
+                        retry_response = openai_chat(
+                            api_key=api_key,
+                            model=TRANSLATION_MODEL,
+                            static_prompt=static_prompt,
+                            locale_prompt=build_locale_prompt(target_language, term_mappings, quality_notes(failures)),
+                            locale=target_language,
+                            user_message=f"Translate this JSON content. Original JSON:\n{json.dumps(retry_payload, indent=2)}",
+                            temperature=TRANSLATION_TEMPERATURE
+                        )
+                        retried = parse_segment_response(json.loads(retry_response.choices[0].message.content or ''))
+                    except Exception as e:
+                        return None, str(e)
+                    return enforce_segments(plan['unique'], retried, target_language), None
+
+                # Check the model's output locally and re-request only the failing
+                # segments; nothing is returned for upload while any still fail
+                translated, failures = gate_translations(plan['unique'], translated, target_language, retranslate)
+                if failures:
+                    return None, format_failures(failures, plan['unique'])
+                translations.update(translated)
+
+                # Fan the unique translations back out to every property that uses them
+                translated_json, missing = fan_out(parsed_properties, plan, translations)
+                if missing:
+                    return None, f"OpenAI response is missing {len(missing)} of {len(plan['unique'])} segments"
                 
-                return {"properties": formatted_properties}, None
+                return format_translated_properties(translated_json), None
             except json.JSONDecodeError as e:
-                print(f"JSON Parse Error: {str(e)}")
-                print("Raw response content:")
-                print(response_content)
+                log_event(logger, logging.ERROR, "OpenAI response is not JSON", locale=target_language, error=str(e),
+                          response=response_content)
                 return None, f"Failed to parse OpenAI response as JSON: {str(e)}"
                 
         except Exception as e:
-            print(f"OpenAI API Error: {str(e)}")
+            log_event(logger, logging.ERROR, "OpenAI API error", locale=target_language, error=str(e))
             return None, f"OpenAI API Error: {str(e)}"
             
     except Exception as e:
-        print(f"Unexpected Error: {str(e)}")
+        log_event(logger, logging.ERROR, "translation failed", locale=target_language, error=str(e))
         return None, f"Translation error: {str(e)}"
 
-def update_component_properties(site_id, component_id, locale_id, properties, api_key):
-    """Update component properties with translated text"""
-    url = f"https://api.webflow.com/v2/sites/{site_id}/components/{component_id}/properties"
-    
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}",
-        "content-type": "application/json"
-    }
-    
-    # Add locale_id as a query parameter
-    params = {"localeId": locale_id}
-    
-    print("\n" + "="*50)
-    print("UPDATE COMPONENT PROPERTIES REQUEST")
-    print("="*50)
-    print(f"URL: {url}")
-    print(f"Params: {params}")
-    print("\nHeaders:")
-    for key, value in headers.items():
-        if key.lower() == 'authorization':
-            print(f"{key}: Bearer ****{value[-4:]}")
-        else:
-            print(f"{key}: {value}")
-    print("\nPayload:")
-    print(json.dumps(properties, indent=2))
-    
-    try:
-        response = requests.post(url, headers=headers, params=params, json=properties)
-        print("\nResponse Status:", response.status_code)
-        print("Response Body:", response.text)
-        response.raise_for_status()
-        return response.json(), None
-    except Exception as e:
-        error_msg = f"Error updating component properties: {str(e)}"
-        print(f"\nERROR: {error_msg}")
-        return None, error_msg
-
 def main():
     st.title("Static Components Properties Manager")
     
@@ -738,12 +507,14 @@ def main():
                     st.session_state.last_viewed_component_id != component_id):
                     
                     with st.spinner("Fetching component properties..."):
-                        content = get_component_properties(
+                        content, error = get_component_properties(
                             site_id=st.session_state.site_id,
                             component_id=component_id,
                             api_key=st.session_state.api_key
                         )
-                        if content:
+                        if error:
+                            st.error(error)
+                        elif content:
                             st.session_state.current_component_content = content
                             st.session_state.parsed_nodes = parse_component_properties(content)
                             st.session_state.last_viewed_component_id = component_id
@@ -765,6 +536,9 @@ def main():
                             for locale in st.session_state.locales
                         }
                         
+                        plan, _ = build_segment_payload(st.session_state.parsed_nodes)
+                        st.caption(f"Deduplication: {format_dedup_stats(dedup_stats(plan))}")
+                        
                         # Multi-select for languages
                         if not st.session_state.translation_in_progress:
                             selected_languages = st.multiselect(
@@ -777,12 +551,37 @@ def main():
                             # Store selected languages in session state
                             if selected_languages != st.session_state.selected_languages:
                                 st.session_state.selected_languages = selected_languages
+                            
+                            use_multi_locale = st.checkbox(
+                                "Multi-locale mode for short properties",
+                                value=True,
+                                help=f"Properties up to {MULTI_LOCALE_MAX_CHARS} characters are translated into all selected languages with a single request",
+                                key="properties_multi_locale"
+                            )
                                 
                             # Start translation button
                             if st.button("Start Translation", key="start_translation"):
                                 if not st.session_state.selected_languages:
                                     st.warning("Please select at least one language")
                                 else:
+                                    st.session_state.translation_started_at = time.time()
+                                    st.session_state.usage_tracker = UsageTracker('properties', source=selected_component)
+                                    st.session_state.multi_locale_translations = {}
+                                    if use_multi_locale:
+                                        with st.spinner("Translating short properties for all selected languages..."):
+                                            short_texts = [
+                                                prop['text'] for prop in st.session_state.parsed_nodes['properties']
+                                                if is_short_segment(prop.get('text'))
+                                            ]
+                                            with track_usage(st.session_state.usage_tracker):
+                                                results, errors = translate_multi_locale(
+                                                    short_texts,
+                                                    [locale_options[language]['tag'] for language in st.session_state.selected_languages],
+                                                    st.session_state.openai_key
+                                                )
+                                            st.session_state.multi_locale_translations = results
+                                            if errors:
+                                                st.warning(f"Multi-locale mode failed for some properties; they will be translated per language ({len(errors)} errors)")
                                     st.session_state.translation_in_progress = True
                                     st.session_state.current_translation_index = 0
                                     st.rerun()
@@ -794,12 +593,20 @@ def main():
                             
                             st.write(f"Translating {current_language} ({st.session_state.current_translation_index + 1}/{len(st.session_state.selected_languages)})")
                             
-                            # Perform translation for current language
-                            translated_properties, error = translate_properties_with_openai(
-                                st.session_state.parsed_nodes,
-                                locale_options[current_language]['tag'],
-                                st.session_state.openai_key
-                            )
+                            # Perform translation for current language, reusing multi-locale results
+                            current_tag = locale_options[current_language]['tag']
+                            known_translations = {
+                                text: per_locale[current_tag]
+                                for text, per_locale in st.session_state.get('multi_locale_translations', {}).items()
+                                if current_tag in per_locale
+                            }
+                            with track_usage(st.session_state.get('usage_tracker')):
+                                translated_properties, error = translate_properties_with_openai(
+                                    st.session_state.parsed_nodes,
+                                    current_tag,
+                                    st.session_state.openai_key,
+                                    known_translations=known_translations
+                                )
                             
                             if error:
                                 st.error(f"Error translating to {current_language}: {error}")
@@ -826,13 +633,21 @@ def main():
                                         st.error(f"Failed to update properties for {current_language}: {error}")
                                         st.session_state.translation_in_progress = False
                                     else:
-                                        st.success(f"Successfully updated properties for {current_language}")
+                                        if result.get('skipped'):
+                                            st.info(f"Properties for {current_language} are already up to date, no update sent")
+                                        else:
+                                            st.success(f"Successfully updated properties for {current_language}")
                                         
                                         # Move to next language or finish
                                         st.session_state.current_translation_index += 1
                                         if st.session_state.current_translation_index >= len(st.session_state.selected_languages):
                                             st.session_state.translation_in_progress = False
                                             st.success("All translations completed!")
+                                            observe('job', time.time() - st.session_state.translation_started_at, page='properties')
+                                            usage_report = st.session_state.usage_tracker.save()
+                                            st.caption(format_cache_stats(usage_cache_stats(usage_report['totals'])))
+                                            st.caption(format_limiter_stats())
+                                            st.caption(f"Usage: {format_usage_totals(usage_report['totals'])}")
                                             if st.button("Start New Translation"):
                                                 st.session_state.translation_in_progress = False
                                                 st.session_state.current_translation_index = 0
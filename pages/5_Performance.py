@@ -0,0 +1,160 @@
+import streamlit as st
+import pandas as pd
+from collection_store import format_item_cache_stats
+from concurrency import format_limiter_stats
+from llm import format_cache_stats, get_cache_stats
+from logs import is_debug_logging, set_debug_logging, setup_logging
+from metrics import bottleneck, export_json, export_prometheus, get_metrics, reset_metrics, stage_summary
+from usage import MODEL_PRICING, format_usage_totals, list_reports
+
+st.set_page_config(
+    page_title="Performance",
+    layout="wide"
+)
+
+setup_logging()
+
+
+def usage_rows(groups):
+    """Table rows for usage totals grouped by a label"""
+    return [
+        {
+            "Group": group,
+            "Calls": totals['calls'],
+            "Prompt tokens": totals['prompt_tokens'],
+            "Cached tokens": totals['cached_tokens'],
+            "Completion tokens": totals['completion_tokens'],
+            "Cost (USD)": round(totals['cost'], 4)
+        }
+        for group, totals in sorted(groups.items(), key=lambda entry: -entry[1]['cost'])
+    ]
+
+
+def merge_totals(target, totals):
+    for key, value in totals.items():
+        target[key] = target.get(key, 0) + value
+
+
+def render_usage():
+    """Token usage and estimated cost from the saved job reports"""
+    st.header("Token usage and cost")
+    reports = list_reports()
+    if not reports:
+        st.info("No usage reports yet. Reports are saved when a translation job finishes.")
+        return
+
+    by_source = {}
+    by_locale = {}
+    for report in reports:
+        merge_totals(by_source.setdefault(report['source'], {}), report['totals'])
+        for locale, totals in report['rollups'].get('locale', {}).items():
+            merge_totals(by_locale.setdefault(locale, {}), totals)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("By collection / page")
+        st.dataframe(pd.DataFrame(usage_rows(by_source)), use_container_width=True, hide_index=True)
+    with col2:
+        st.subheader("By locale")
+        st.dataframe(pd.DataFrame(usage_rows(by_locale)), use_container_width=True, hide_index=True)
+
+    st.subheader("Jobs")
+    report_options = {
+        f"{report['started_at']} - {report['job_type']} - {report['source']} (${report['totals']['cost']:.4f})": report
+        for report in reports
+    }
+    selected = st.selectbox("Select a job", list(report_options.keys()))
+    report = report_options[selected]
+    st.write(format_usage_totals(report['totals']))
+    rollup_key = st.radio("Group by", list(report['rollups'].keys()), horizontal=True)
+    st.dataframe(pd.DataFrame(usage_rows(report['rollups'][rollup_key])), use_container_width=True, hide_index=True)
+
+    with st.expander("Cost model (USD per 1M tokens)"):
+        st.table(pd.DataFrame(MODEL_PRICING).T)
+
+
+def main():
+    st.title("Performance")
+    st.write("Per-stage latency of the translation jobs run in this app process since it started or was last reset.")
+
+    # Full prompt, response and payload dumps are off by default; they are
+    # slow and large on big jobs
+    debug_logging = st.toggle("Debug logging (full payload dumps)", value=is_debug_logging())
+    if debug_logging != is_debug_logging():
+        set_debug_logging(debug_logging)
+
+    snapshot = get_metrics()
+    if not snapshot:
+        st.info("No translation activity recorded yet. Run a translation on any page and come back here.")
+        render_usage()
+        return
+
+    summary = stage_summary(snapshot)
+    verdict = bottleneck(summary)
+    if verdict:
+        st.subheader(f"This process is mostly {verdict}")
+
+    # Busy time per stage; stages can overlap when jobs run in parallel
+    st.subheader("Stages")
+    stage_rows = [
+        {"Stage": stage, "Calls": totals['count'], "Busy time (s)": round(totals['seconds'], 2)}
+        for stage, totals in sorted(summary['stages'].items(), key=lambda entry: -entry[1]['seconds'])
+    ]
+    if summary['job_seconds']:
+        stage_rows.append({"Stage": "other (UI, overhead)", "Calls": None,
+                           "Busy time (s)": round(summary['other_seconds'], 2)})
+    st.dataframe(pd.DataFrame(stage_rows), use_container_width=True, hide_index=True)
+    if summary['job_seconds']:
+        st.caption(f"Total job wall time: {summary['job_seconds']:.2f}s")
+
+    st.caption(format_cache_stats(get_cache_stats()))
+    st.caption(format_limiter_stats())
+    st.caption(format_item_cache_stats())
+
+    # Histograms per provider / model / locale
+    st.subheader("Series")
+    stages = sorted({series['stage'] for series in snapshot})
+    selected_stages = st.multiselect("Stages", stages, default=stages)
+    series_rows = [
+        {
+            "Stage": series['stage'],
+            "Labels": ", ".join(f"{key}={value}" for key, value in series['labels'].items()),
+            "Count": series['count'],
+            "Errors": series['errors'],
+            "Mean (s)": round(series['mean'], 3),
+            "p50 (s)": round(series['p50'], 3),
+            "p95 (s)": round(series['p95'], 3)
+        }
+        for series in snapshot if series['stage'] in selected_stages
+    ]
+    st.dataframe(pd.DataFrame(series_rows), use_container_width=True, hide_index=True)
+
+    for series in snapshot:
+        if series['stage'] not in selected_stages:
+            continue
+        labels = ", ".join(f"{key}={value}" for key, value in series['labels'].items())
+        with st.expander(f"{series['stage']} {labels}"):
+            histogram = pd.DataFrame({
+                "Upper bound (s)": [str(bound) for bound in series['buckets']],
+                "Count": list(series['buckets'].values())
+            }).set_index("Upper bound (s)")
+            st.bar_chart(histogram)
+
+    # Export
+    st.subheader("Export")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Download JSON", export_json(snapshot), file_name="metrics.json", mime="application/json")
+    with col2:
+        st.download_button("Download Prometheus text", export_prometheus(snapshot), file_name="metrics.prom",
+                           mime="text/plain")
+    with col3:
+        if st.button("Reset metrics"):
+            reset_metrics()
+            st.rerun()
+
+    render_usage()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Prompts are split into a large static prefix (instructions, rules and the
+# glossary) that is identical for every locale, and a small suffix naming the
+# target language. Providers cache the longest repeated prefix, so keeping the
+# target language out of the prefix lets every locale reuse the cached prompt.
+
+TRANSLATOR_INTRO = "You are a professional translator with 20 years of experience."
+
+PORTUGUESE_TRANSLATOR_INTRO = (
+    "Act as a professional translator with 20 years of experience specializing in European Portuguese "
+    "(Portugal) and these translation MUST strictly adhere to Portugal's Portuguese language standards, "
+    "NOT Brazilian Portuguese. Your role is to ensure accurate, contextually relevant translations, "
+    "adhering strictly to guidelines and using available resources efficiently. Translations should read "
+    "naturally to native speakers of the target language, not just as direct translations from English."
+)
+
+DERIV_RULE = (
+    'When encountering the word "Deriv" and any succeeding word, keep it in English. For example, '
+    '"Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be kept in English.'
+)
+
+DERIV_CONTEXT_RULE = (
+    'When encountering the word "Deriv" and any succeeding word, analyze the context and based on it, '
+    'keep it in English. For example, "Deriv Blog," "Deriv Life," "Deriv Bot," and "Deriv App" should be '
+    'kept in English.'
+)
+
+PRODUCT_NAMES_RULE = (
+    "Keep product names such as P2P, MT5, Deriv X, Deriv cTrader, SmartTrader, Deriv Trader, Deriv GO, "
+    "Deriv Bot, and Binary Bot in English."
+)
+
+ARABIC_QUESTION_MARK_RULE = (
+    'When encountering the symbol "?", mirror it in the translated text when the target language is Arabic.'
+)
+
+JSON_OUTPUT_INSTRUCTIONS = (
+    "Keep all other JSON structure and values exactly the same.\n"
+    "Return only the JSON, no explanations."
+)
+
+TEXT_OUTPUT_INSTRUCTIONS = "Return only the translation, no explanations."
+
+RICH_TEXT_RULE = (
+    "The text is HTML. Translate only the human-readable text and keep every tag, attribute, URL and "
+    "HTML entity exactly as it is."
+)
+
+
+def unique_terms(glossary_terms):
+    """Drop duplicate glossary terms while keeping their order stable"""
+    seen = set()
+    terms = []
+    for term in glossary_terms or []:
+        if term not in seen:
+            seen.add(term)
+            terms.append(term)
+    return terms
+
+
+def build_static_prompt(task, glossary_terms, rules, output_instructions, intro=TRANSLATOR_INTRO):
+    """Build the locale-independent, cacheable part of a translation prompt"""
+    terms_list = "\n".join(f"- {term}" for term in unique_terms(glossary_terms))
+    rules_list = "\n".join(f"- {rule}" for rule in rules)
+    return (
+        f"{intro}\n"
+        f"{task} The target language is given at the end of these instructions.\n\n"
+        f"DO NOT TRANSLATE the following terms - keep them exactly as they appear:\n"
+        f"{terms_list}\n\n"
+        f"Follow these additional rules when translating:\n"
+        f"{rules_list}\n\n"
+        f"{output_instructions}"
+    )
+
+
+def build_locale_prompt(target_language, term_mappings=None, notes=None):
+    """Build the small per-locale suffix of a translation prompt
+
+    term_mappings lists the fixed {source: target} translations of the
+    locale's terms that occur in the text being translated. notes are
+    corrections for a re-requested translation, e.g. failed quality checks.
+    """
+    prompt = f"Target language: {target_language}"
+    if target_language and target_language.lower() == "sw":
+        prompt += '\nThe target language "sw" is Swahili; translate to Swahili only.'
+    if term_mappings:
+        mappings_list = "\n".join(f'- "{source}" -> "{target}"' for source, target in term_mappings.items())
+        prompt += (
+            "\nAlways translate these terms exactly as shown, even if they are in the do-not-translate list:\n"
+            f"{mappings_list}"
+        )
+    if notes:
+        notes_list = "\n".join(f"- {note}" for note in notes)
+        prompt += f"\nA previous translation of this text was rejected. Fix these problems:\n{notes_list}"
+    return prompt
+
+
+def build_cms_static_prompt(glossary_terms, rich_text=False):
+    """Static prompt for translating a single CMS field with OpenAI"""
+    rules = [DERIV_RULE, PRODUCT_NAMES_RULE, ARABIC_QUESTION_MARK_RULE]
+    return build_static_prompt(
+        task="Translate the text.",
+        glossary_terms=glossary_terms,
+        rules=rules + [RICH_TEXT_RULE] if rich_text else rules,
+        output_instructions=TEXT_OUTPUT_INSTRUCTIONS
+    )
+
+
+def build_cms_portuguese_static_prompt(glossary_terms, rich_text=False):
+    """Static prompt for translating a single CMS field to European Portuguese with Claude"""
+    rules = [DERIV_RULE, PRODUCT_NAMES_RULE]
+    return build_static_prompt(
+        task="Translate the text.",
+        glossary_terms=glossary_terms,
+        rules=rules + [RICH_TEXT_RULE] if rich_text else rules,
+        output_instructions=TEXT_OUTPUT_INSTRUCTIONS,
+        intro=PORTUGUESE_TRANSLATOR_INTRO
+    )
@@ -0,0 +1,314 @@
+import functools
+import html
+import logging
+import re
+import statistics
+from collections import Counter
+
+from changeset import change_key
+from glossary_index import glossary_terms_in_text
+from locale_terms import get_term_matcher
+from logs import log_event
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Local checks run on every translation before it can reach Webflow. A check
+# takes a SegmentBatch (all translations of one locale in a job) and returns
+# {index: problem}; register more with @quality_check.
+
+# Re-requests of failing segments before the translation is given up
+QUALITY_RETRIES = 1
+
+TAG_PATTERN = re.compile(r"<\s*(/?)\s*([a-zA-Z][\w-]*)[^>]*?(/?)\s*>")
+VOID_TAGS = frozenset({'area', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'})
+PLACEHOLDER_PATTERN = re.compile(r"\{\{[^{}]+\}\}|\{[\w.]+\}|%\(\w+\)[sdif]|%[sdif]|\[\[[^\]]+\]\]")
+# Space, NBSP, thin and narrow NBSP group thousands in fr, ru, pl, pt-PT and
+# others, so "10 000" is the same number as "10,000"
+NUMBER_PATTERN = re.compile(r"\d(?:[\d.,]*\d)?(?:(?:[ \u00a0\u2009\u202f]\d{3}(?!\d))+(?:[.,]\d+)?)?")
+LINK_PATTERN = re.compile(r"(?:https?://|www\.)[^\s<>\"']+|[\w.+-]+@[\w-]+\.[\w.-]+", re.I)
+WORD_PATTERN = re.compile(r"[^\W\d_]{2,}")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Arabic-Indic and Persian digits count as the same numbers
+EASTERN_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹', '01234567890123456789')
+
+# Locales whose question mark is the mirrored "؟" (see ARABIC_QUESTION_MARK_RULE)
+MIRRORED_QUESTION_MARK_LANGUAGES = ('ar', 'fa', 'ur')
+
+# Translation/source length ratios outside these bounds are always suspicious
+LENGTH_RATIO_BOUNDS = (0.25, 4.0)
+# Shorter sources vary too much in length to judge
+LENGTH_MIN_CHARS = 20
+# With enough segments, ratios this far from the batch median are outliers
+LENGTH_OUTLIER_FACTOR = 2.5
+LENGTH_MIN_BATCH = 8
+
+# Identical copies of sources with at least this many words (glossary terms
+# left out) count as untranslated
+UNTRANSLATED_MIN_WORDS = 3
+
+_checks = {}
+
+
+def quality_check(name):
+    """Register a check function(batch) -> {index: problem} under name"""
+    def register(check):
+        _checks[name] = check
+        return check
+    return register
+
+
+def _strip_tags(text):
+    return WHITESPACE_PATTERN.sub(' ', html.unescape(TAG_PATTERN.sub(' ', text))).strip()
+
+
+@functools.lru_cache(maxsize=8192)
+def text_features(text):
+    """Features of a text shared by the checks; cached since a source is checked for every locale"""
+    tags = Counter()
+    for closing, name, self_closing in TAG_PATTERN.findall(text):
+        name = name.lower()
+        if name not in VOID_TAGS and not self_closing:
+            tags[(name, bool(closing))] += 1
+    plain = _strip_tags(text)
+    links = LINK_PATTERN.findall(text)
+    without_links = LINK_PATTERN.sub(' ', plain)
+    return {
+        'tags': tags,
+        'placeholders': Counter(PLACEHOLDER_PATTERN.findall(text)),
+        'numbers': Counter(re.sub(r"\D", "", number)
+                           for number in NUMBER_PATTERN.findall(without_links.translate(EASTERN_DIGITS))),
+        'links': Counter(link.rstrip('.,;:)') for link in links),
+        'plain': plain,
+        'question_marks': without_links.count('?'),
+        'length': len(plain)
+    }
+
+
+class SegmentBatch:
+    """Source texts and their translations into one locale, checked together"""
+
+    def __init__(self, sources, translations, locale_code):
+        self.sources = sources
+        self.translations = translations
+        self.locale_code = locale_code
+        self.language = (locale_code or '').lower().split('-')[0]
+        self.source_features = [text_features(source) for source in sources]
+        self.translation_features = [text_features(translation) for translation in translations]
+
+    def __len__(self):
+        return len(self.sources)
+
+
+def _describe(counter):
+    return ", ".join(f"{'</' if closing else '<'}{name}>" for name, closing in sorted(counter))
+
+
+@quality_check('html_tags')
+def check_html_tags(batch):
+    problems = {}
+    for idx, (source, translation) in enumerate(zip(batch.source_features, batch.translation_features)):
+        if source['tags'] == translation['tags']:
+            continue
+        missing = source['tags'] - translation['tags']
+        extra = translation['tags'] - source['tags']
+        parts = []
+        if missing:
+            parts.append(f"missing {_describe(missing)}")
+        if extra:
+            parts.append(f"unexpected {_describe(extra)}")
+        problems[idx] = f"HTML tags differ from the source ({'; '.join(parts)})"
+    return problems
+
+
+@quality_check('placeholders')
+def check_placeholders(batch):
+    problems = {}
+    for idx, (source, translation) in enumerate(zip(batch.source_features, batch.translation_features)):
+        missing = source['placeholders'] - translation['placeholders']
+        if missing:
+            problems[idx] = f"Placeholders missing: {', '.join(sorted(missing))}"
+    return problems
+
+
+@quality_check('glossary')
+def check_glossary(batch):
+    """Do-not-translate terms of the source must appear in the translation
+
+    A term the locale maps to a fixed translation may appear as that
+    translation instead.
+    """
+    matcher = get_term_matcher(batch.locale_code)
+    problems = {}
+    for idx, (source, translation) in enumerate(zip(batch.sources, batch.translations)):
+        terms = glossary_terms_in_text(source)
+        if not terms:
+            continue
+        mapped = matcher.mappings if matcher is not None else {}
+        missing = [term for term in terms if term not in translation and mapped.get(term, term) not in translation]
+        # Don't report "Deriv" when "Deriv Bot" is already reported
+        missing = [term for term in missing if not any(term != other and term in other for other in missing)]
+        if missing:
+            problems[idx] = f"Glossary terms not kept: {', '.join(missing)}"
+    return problems
+
+
+@quality_check('length_ratio')
+def check_length_ratio(batch):
+    """Flag translations far longer or shorter than their source
+
+    Besides fixed bounds, ratios are compared with the batch median, so
+    languages that are naturally shorter or longer than English are judged
+    against themselves.
+    """
+    ratios = {
+        idx: translation['length'] / source['length']
+        for idx, (source, translation) in enumerate(zip(batch.source_features, batch.translation_features))
+        if source['length'] >= LENGTH_MIN_CHARS
+    }
+    median = statistics.median(ratios.values()) if len(ratios) >= LENGTH_MIN_BATCH else None
+    low, high = LENGTH_RATIO_BOUNDS
+    problems = {}
+    for idx, ratio in ratios.items():
+        if not low <= ratio <= high:
+            problems[idx] = f"Translation is {ratio:.1f}x the length of the source"
+        elif median and not median / LENGTH_OUTLIER_FACTOR <= ratio <= median * LENGTH_OUTLIER_FACTOR:
+            problems[idx] = f"Translation is {ratio:.1f}x the length of the source (typical: {median:.1f}x)"
+    return problems
+
+
+@quality_check('untranslated')
+def check_untranslated(batch):
+    if batch.language == 'en':
+        return {}
+    problems = {}
+    for idx, (source, translation) in enumerate(zip(batch.source_features, batch.translation_features)):
+        if source['plain'] != translation['plain'] or not source['plain']:
+            continue
+        text = source['plain']
+        for term in glossary_terms_in_text(text):
+            text = text.replace(term, ' ')
+        if len(WORD_PATTERN.findall(text)) >= UNTRANSLATED_MIN_WORDS:
+            problems[idx] = "Translation is identical to the source"
+    return problems
+
+
+@quality_check('numbers_links')
+def check_numbers_links(batch):
+    problems = {}
+    for idx, (source, translation) in enumerate(zip(batch.source_features, batch.translation_features)):
+        parts = []
+        missing_numbers = source['numbers'] - translation['numbers']
+        if missing_numbers:
+            parts.append(f"numbers {', '.join(sorted(missing_numbers))}")
+        missing_links = source['links'] - translation['links']
+        if missing_links:
+            parts.append(f"links {', '.join(sorted(missing_links))}")
+        if parts:
+            problems[idx] = f"Not preserved: {'; '.join(parts)}"
+    return problems
+
+
+@quality_check('rtl_punctuation')
+def check_rtl_punctuation(batch):
+    if batch.language not in MIRRORED_QUESTION_MARK_LANGUAGES:
+        return {}
+    problems = {}
+    for idx, (source, translation) in enumerate(zip(batch.source_features, batch.translation_features)):
+        if translation['question_marks']:
+            problems[idx] = 'Uses "?" instead of "؟"'
+        elif source['question_marks'] and '؟' not in translation['plain']:
+            problems[idx] = 'Question mark "؟" missing'
+    return problems
+
+
+@timed('parse_response')
+def check_translations(texts, translations, locale_code, checks=None):
+    """Run the quality checks on {index: translation} of the given source texts
+
+    Returns {index: [problems]} for the failing segments only.
+    """
+    indexes = [idx for idx, translation in translations.items()
+               if isinstance(translation, str) and 0 <= idx < len(texts) and isinstance(texts[idx], str)]
+    if not indexes:
+        return {}
+    batch = SegmentBatch([texts[idx] for idx in indexes], [translations[idx] for idx in indexes], locale_code)
+    failures = {}
+    counts = {}
+    for name in checks or _checks:
+        for position, problem in _checks[name](batch).items():
+            failures.setdefault(indexes[position], []).append(problem)
+            counts[name] = counts.get(name, 0) + 1
+    if failures:
+        log_event(logger, logging.WARNING, "translations failed quality checks", locale=locale_code,
+                  segments=len(indexes), failed=len(failures), **counts)
+    return failures
+
+
+def check_text(text, translation, locale_code):
+    """Problems of a single translation, empty when it passes"""
+    return check_translations([text], {0: translation}, locale_code).get(0, [])
+
+
+def quality_notes(failures):
+    """Prompt notes describing failed segments, for a re-request"""
+    return [f"Segment {idx}: {'; '.join(problems)}" for idx, problems in sorted(failures.items())]
+
+
+def format_failures(failures, texts, limit=3):
+    """Short error message naming the first failing segments"""
+    examples = []
+    for idx, problems in sorted(failures.items())[:limit]:
+        source = _strip_tags(texts[idx])
+        examples.append(f'"{source[:40]}{"…" if len(source) > 40 else ""}": {"; ".join(problems)}')
+    more = f" (+{len(failures) - limit} more)" if len(failures) > limit else ""
+    return f"{len(failures)} segments failed quality checks: {' | '.join(examples)}{more}"
+
+
+def gate_translations(texts, translations, locale_code, retranslate, retries=QUALITY_RETRIES, keep_failed=False):
+    """Check translations and re-request only the failing segments
+
+    retranslate(failures) gets {index: [problems]} and returns
+    ({index: translation}, error). Segments still failing after the retries
+    are left out of the result unless keep_failed is set, for callers that
+    flag them for review instead. Returns (translations, failures).
+    """
+    translations = dict(translations)
+    failures = check_translations(texts, translations, locale_code)
+    for attempt in range(retries):
+        if not failures:
+            break
+        log_event(logger, logging.INFO, "re-requesting failed segments", locale=locale_code,
+                  segments=len(failures), attempt=attempt + 1)
+        retried, error = retranslate(failures)
+        if error:
+            log_event(logger, logging.WARNING, "re-request of failed segments failed", locale=locale_code, error=error)
+            break
+        retried = {idx: translation for idx, translation in retried.items() if idx in failures}
+        translations.update(retried)
+        still_failing = check_translations(texts, retried, locale_code)
+        failures = {idx: still_failing.get(idx, problems) if idx in retried else problems
+                    for idx, problems in failures.items() if idx not in retried or idx in still_failing}
+    if keep_failed:
+        return translations, failures
+    passed = {idx: translation for idx, translation in translations.items() if idx not in failures}
+    return passed, failures
+
+
+def review_changes(changes, sources, locale_code):
+    """Reject the changes whose new value fails the quality checks, with the problems as note
+
+    sources maps each change's key (field, or (nodeId, propertyId)) to its
+    source text. Returns the number of rejected changes.
+    """
+    texts = []
+    translations = {}
+    for idx, change in enumerate(changes):
+        texts.append(sources.get(change_key(change)))
+        if isinstance(change['new'], str):
+            translations[idx] = change['new']
+    failures = check_translations(texts, translations, locale_code)
+    for idx, problems in failures.items():
+        changes[idx]['rejected'] = "; ".join(problems)
+    return len(failures)
@@ -0,0 +1,110 @@
+import concurrent.futures
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from logs import log_event
+from usage import submit_with_context
+
+logger = logging.getLogger(__name__)
+
+# Parallel (target, locale) units of a sweep; the per-backend limiters still
+# gate the actual in-flight requests
+DEFAULT_SWEEP_WORKERS = 8
+
+STATUS_SYMBOLS = {'updated': '✅', 'unchanged': '➖', 'error': '❌'}
+
+
+def _run_unit(target, locale, source, translate_fn, update_fn):
+    start = time.time()
+    result = None
+    try:
+        translated, error = translate_fn(target, source, locale)
+        if not error:
+            result, error = update_fn(target, locale, translated)
+    except Exception as e:
+        error = str(e)
+    if error:
+        status, message = 'error', error
+    elif result and result.get('skipped'):
+        status, message = 'unchanged', "Already up to date, no update sent"
+    else:
+        status, message = 'updated', "Updated"
+    return {
+        'target': target['name'],
+        'target_id': target['id'],
+        'locale': locale['tag'],
+        'status': status,
+        'message': message,
+        'seconds': time.time() - start
+    }
+
+
+def run_sweep(targets, locales, fetch_fn, translate_fn, update_fn, max_workers=DEFAULT_SWEEP_WORKERS, on_result=None):
+    """Translate and update every (target, locale) pair with bounded parallelism
+
+    Targets are dicts with "id" and "name"; locales carry "id" and "tag".
+    Each target is fetched once with fetch_fn(target) -> (source, error), and
+    its locale units are queued as soon as the fetch returns, so translation
+    starts while other targets are still loading. Each unit runs
+    translate_fn(target, source, locale) -> (translated, error) and then
+    update_fn(target, locale, translated) -> (result, error); a result with
+    "skipped" set counts as unchanged. on_result(result, done, total) is
+    called on the calling thread as units finish. Returns the unit results.
+    """
+    total = len(targets) * len(locales)
+    results = []
+
+    def finish(result):
+        results.append(result)
+        if result['status'] == 'error':
+            log_event(logger, logging.WARNING, "sweep unit failed", target=result['target_id'],
+                      locale=result['locale'], error=result['message'])
+        if on_result:
+            on_result(result, len(results), total)
+
+    # Fetches get their own pool so queued fetches never hold back translation
+    with ThreadPoolExecutor(max_workers=max_workers) as fetch_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as unit_pool:
+        fetches = {submit_with_context(fetch_pool, fetch_fn, target): target for target in targets}
+        pending = set(fetches)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future not in fetches:
+                    finish(future.result())
+                    continue
+                target = fetches[future]
+                try:
+                    source, error = future.result()
+                except Exception as e:
+                    source, error = None, str(e)
+                if error:
+                    for locale in locales:
+                        finish({'target': target['name'], 'target_id': target['id'], 'locale': locale['tag'],
+                                'status': 'error', 'message': error, 'seconds': 0.0})
+                    continue
+                pending.update(
+                    submit_with_context(unit_pool, _run_unit, target, locale, source, translate_fn, update_fn)
+                    for locale in locales
+                )
+
+    log_event(logger, logging.INFO, "sweep finished", targets=len(targets), locales=len(locales),
+              **sweep_counts(results))
+    return results
+
+
+def sweep_counts(results):
+    counts = {status: 0 for status in STATUS_SYMBOLS}
+    for result in results:
+        counts[result['status']] += 1
+    return counts
+
+
+def result_matrix(results):
+    """One row per target with a status symbol per locale"""
+    rows = {}
+    for result in results:
+        row = rows.setdefault(result['target_id'], {'Target': result['target']})
+        row[result['locale']] = STATUS_SYMBOLS[result['status']]
+    return list(rows.values())
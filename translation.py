@@ -0,0 +1,187 @@
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dedup import build_dedup_plan, normalize_segment
+from glossary import cached_for_version
+from locale_terms import enforce_text, map_text
+from llm import openai_chat
+from prompts import ARABIC_QUESTION_MARK_RULE, DERIV_RULE, PRODUCT_NAMES_RULE, build_static_prompt
+from quality import check_translations
+from translation_memory import recall_text
+from usage import submit_with_context
+
+logger = logging.getLogger(__name__)
+
+# Segments up to this many characters are translated for every target
+# locale in a single request instead of one request per locale
+MULTI_LOCALE_MAX_CHARS = 300
+
+# Rough budget of source characters x locales per multi-locale request so a
+# single response stays well inside the model's output token limit
+MULTI_LOCALE_CHAR_BUDGET = 12000
+
+MULTI_LOCALE_MODEL = "gpt-4.1-mini"
+
+
+@cached_for_version
+def _flatten_glossary(glossary):
+    return [term for terms in glossary.values() for term in terms]
+
+
+def get_glossary_terms():
+    """Get all do-not-translate terms from the shared glossary store
+
+    The flattened list is rebuilt only when the glossary version changes;
+    callers get a copy they may modify.
+    """
+    return list(_flatten_glossary())
+
+
+def is_short_segment(text, max_chars=MULTI_LOCALE_MAX_CHARS):
+    """Check whether a segment qualifies for multi-locale translation"""
+    return isinstance(text, str) and 0 < len(text.strip()) <= max_chars
+
+
+def chunk_segments(segments, locale_count, char_budget=MULTI_LOCALE_CHAR_BUDGET):
+    """Split (id, text) segments into chunks that fit the multi-locale budget"""
+    chunks = []
+    current = []
+    current_size = 0
+    for segment_id, text in segments:
+        size = len(text) * max(locale_count, 1)
+        if current and current_size + size > char_budget:
+            chunks.append(current)
+            current = []
+            current_size = 0
+        current.append((segment_id, text))
+        current_size += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def translate_multi_locale_chunk(segments, locale_codes, api_key, glossary_terms, model=MULTI_LOCALE_MODEL):
+    """Translate a chunk of short segments into several locales with one request
+
+    Returns ({segment id: {locale code: translation}}, error).
+    """
+    locales_list = ", ".join(f'"{code}"' for code in locale_codes)
+
+    # The static prompt does not mention the target languages so it stays
+    # cacheable across every chunk and job
+    static_prompt = build_static_prompt(
+        task="Translate every segment in the JSON into each of the requested target languages.",
+        glossary_terms=glossary_terms,
+        rules=[
+            DERIV_RULE,
+            PRODUCT_NAMES_RULE,
+            'If a target language is "sw", translate to Swahili.',
+            ARABIC_QUESTION_MARK_RULE,
+            "Preserve any HTML tags exactly as they appear."
+        ],
+        output_instructions=(
+            "Return only a JSON object keyed by segment id. Each value must be an object keyed by\n"
+            "target language code containing the translated text, for example:\n"
+            '{"0": {"fr": "...", "es": "..."}}'
+        )
+    )
+    locale_prompt = f"Target languages: {locales_list}"
+
+    user_message = json.dumps({
+        "target_languages": locale_codes,
+        "segments": {str(segment_id): text for segment_id, text in segments}
+    }, ensure_ascii=False)
+
+    logger.info(f"Multi-locale request: {len(segments)} segments x {len(locale_codes)} locales ({locales_list})")
+
+    try:
+        start_time = time.time()
+        response = openai_chat(
+            api_key=api_key,
+            model=model,
+            static_prompt=static_prompt,
+            locale_prompt=locale_prompt,
+            locale='multi',
+            user_message=user_message,
+            response_format={"type": "json_object"}
+        )
+        logger.info(f"Multi-locale response time: {time.time() - start_time:.2f} seconds")
+
+        translated_json = json.loads(response.choices[0].message.content)
+    except json.JSONDecodeError as e:
+        return None, f"Failed to parse multi-locale response as JSON: {str(e)}"
+    except Exception as e:
+        return None, f"Multi-locale translation error: {str(e)}"
+
+    results = {}
+    for segment_id, _ in segments:
+        per_locale = translated_json.get(str(segment_id))
+        if not isinstance(per_locale, dict):
+            continue
+        results[segment_id] = {
+            code: per_locale[code]
+            for code in locale_codes
+            if isinstance(per_locale.get(code), str)
+        }
+    return results, None
+
+
+def translate_multi_locale(texts, locale_codes, api_key, glossary_terms=None, max_workers=4):
+    """Translate short texts into every locale in as few requests as possible
+
+    Identical texts are collapsed first. Returns ({normalized text: {locale
+    code: translation}}, errors); texts or locales missing from the result
+    should be translated through the regular per-locale path.
+    """
+    if glossary_terms is None:
+        glossary_terms = get_glossary_terms()
+
+    plan = build_dedup_plan(text for text in texts if is_short_segment(text))
+    if not plan['unique'] or not locale_codes:
+        return {}, []
+
+    # Texts with an approved translation or made up only of mapped locale
+    # terms in every locale need no model call
+    results = {}
+    segments = []
+    for segment_id, text in enumerate(plan['unique']):
+        mapped = {code: recall_text(text, code) or map_text(text, code)[0] for code in locale_codes}
+        if all(mapped.values()):
+            results[normalize_segment(text)] = mapped
+        else:
+            segments.append((segment_id, text))
+    if not segments:
+        return results, []
+
+    chunks = chunk_segments(segments, len(locale_codes))
+    errors = []
+    translated = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        futures = [
+            submit_with_context(executor, translate_multi_locale_chunk, chunk, locale_codes, api_key, glossary_terms)
+            for chunk in chunks
+        ]
+        for future in futures:
+            chunk_results, error = future.result()
+            if error:
+                logger.error(error)
+                errors.append(error)
+                continue
+            for segment_id, per_locale in chunk_results.items():
+                text = plan['unique'][segment_id]
+                for code, translated_text in per_locale.items():
+                    translated.setdefault(code, {})[segment_id] = enforce_text(text, translated_text, code)
+
+    # Translations failing the quality checks are left out, so they go through
+    # the per-locale path where they are checked and re-requested with notes
+    for code, locale_translations in translated.items():
+        failures = check_translations(plan['unique'], locale_translations, code)
+        for segment_id, translated_text in locale_translations.items():
+            if segment_id not in failures:
+                results.setdefault(normalize_segment(plan['unique'][segment_id]), {})[code] = translated_text
+
+    logger.info(f"Multi-locale translation: {len(segments)} unique segments x {len(locale_codes)} "
+                f"locales in {len(chunks)} request(s) instead of {len(segments) * len(locale_codes)}")
+    return results, errors
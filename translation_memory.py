@@ -0,0 +1,131 @@
+import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from dedup import normalize_segment
+from logs import log_event
+
+logger = logging.getLogger(__name__)
+
+# Approved translations ({locale code: {normalized source: entry}}) shared by
+# every page and session; segments found here are never sent to a model
+TRANSLATION_MEMORY_FILE = os.environ.get('TRANSLATION_MEMORY_FILE', 'translation_memory.json')
+
+_lock = threading.Lock()
+_state = {'stamp': None, 'entries': None}
+
+
+def _file_stamp():
+    try:
+        stat = os.stat(TRANSLATION_MEMORY_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _write(entries):
+    """Atomically replace the memory file so readers never see a partial write"""
+    directory = os.path.dirname(os.path.abspath(TRANSLATION_MEMORY_FILE))
+    fd, tmp_path = tempfile.mkstemp(prefix='.translation-memory-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(entries, ensure_ascii=False))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, TRANSLATION_MEMORY_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _entries():
+    """Current entries, re-reading the file only when its mtime or size changed; call with _lock held"""
+    stamp = _file_stamp()
+    if _state['entries'] is None or stamp != _state['stamp']:
+        entries = {}
+        if stamp is not None:
+            try:
+                with open(TRANSLATION_MEMORY_FILE, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except Exception as e:
+                log_event(logger, logging.ERROR, "load translation memory failed", path=TRANSLATION_MEMORY_FILE,
+                          error=str(e))
+                if _state['entries'] is not None:
+                    return _state['entries']
+        _state.update(stamp=stamp, entries=entries)
+    return _state['entries']
+
+
+def _locale_key(locale_code):
+    return (locale_code or '').lower()
+
+
+def recall_text(text, locale_code):
+    """Approved translation of a text into a locale, or None"""
+    if not isinstance(text, str) or not text.strip():
+        return None
+    with _lock:
+        entry = _entries().get(_locale_key(locale_code), {}).get(normalize_segment(text))
+    return entry['target'] if entry else None
+
+
+def recall_segments(texts, locale_code, skip=()):
+    """Return {index: translation} for the texts that have an approved translation"""
+    with _lock:
+        memory = _entries().get(_locale_key(locale_code))
+    if not memory:
+        return {}
+    recalled = {}
+    for idx, text in enumerate(texts):
+        if idx in skip or not isinstance(text, str):
+            continue
+        entry = memory.get(normalize_segment(text))
+        if entry:
+            recalled[idx] = entry['target']
+    if recalled:
+        log_event(logger, logging.INFO, "segments translated from memory", locale=locale_code,
+                  segments=len(recalled))
+    return recalled
+
+
+def remember_translations(pairs, locale_code, origin):
+    """Store approved (source, translation) pairs for a locale
+
+    origin names where the translations come from (e.g. the ingested file)
+    and is kept with every entry. Existing entries for the same source are
+    replaced. Returns (stored count, error).
+    """
+    added = datetime.datetime.now().isoformat(timespec='seconds')
+    with _lock:
+        entries = {locale: dict(memory) for locale, memory in _entries().items()}
+        memory = entries.setdefault(_locale_key(locale_code), {})
+        stored = 0
+        for source, target in pairs:
+            key = normalize_segment(source)
+            if not key or not isinstance(target, str) or not target.strip():
+                continue
+            memory[key] = {'target': target, 'origin': origin, 'added': added}
+            stored += 1
+        if not stored:
+            return 0, None
+        try:
+            _write(entries)
+        except Exception as e:
+            log_event(logger, logging.ERROR, "save translation memory failed", path=TRANSLATION_MEMORY_FILE,
+                      error=str(e))
+            return None, f"Error saving translation memory: {str(e)}"
+        _state.update(stamp=_file_stamp(), entries=entries)
+        total = len(memory)
+    log_event(logger, logging.INFO, "translation memory saved", locale=locale_code, origin=origin, stored=stored,
+              total=total)
+    return stored, None
+
+
+def translation_memory_stats():
+    """{locale code: entry count}"""
+    with _lock:
+        return {locale: len(memory) for locale, memory in _entries().items()}
@@ -0,0 +1,200 @@
+import contextvars
+import datetime
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens. Models are matched by longest prefix so dated snapshots
+# (claude-3-5-sonnet-20240620) use their family's price.
+MODEL_PRICING = {
+    'o3-mini': {'input': 1.10, 'cached_input': 0.55, 'cache_write': 1.10, 'output': 4.40},
+    'gpt-4.1-mini': {'input': 0.40, 'cached_input': 0.10, 'cache_write': 0.40, 'output': 1.60},
+    'gpt-4o-mini': {'input': 0.15, 'cached_input': 0.075, 'cache_write': 0.15, 'output': 0.60},
+    'claude-3-5-sonnet': {'input': 3.00, 'cached_input': 0.30, 'cache_write': 3.75, 'output': 15.00},
+}
+
+# Batch API requests are billed at half price by both providers
+BATCH_DISCOUNT = 0.5
+
+USAGE_REPORTS_DIR = os.environ.get('USAGE_REPORTS_DIR', 'usage_reports')
+
+ROLLUP_KEYS = ['locale', 'item', 'field', 'model']
+
+_current_tracker = contextvars.ContextVar('usage_tracker', default=None)
+_current_labels = contextvars.ContextVar('usage_labels', default={})
+
+
+def _value(usage, name):
+    """Read a token count from a usage object or dict, treating missing values as 0"""
+    if usage is None:
+        return 0
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return value or 0
+
+
+def extract_usage(provider, usage):
+    """Normalize a provider usage object into prompt/cached/cache write/completion tokens
+
+    ``prompt_tokens`` always includes cached and cache-write tokens.
+    """
+    if provider == 'anthropic':
+        cached = _value(usage, 'cache_read_input_tokens')
+        written = _value(usage, 'cache_creation_input_tokens')
+        # Anthropic reports uncached input separately from cache reads/writes
+        prompt = _value(usage, 'input_tokens') + cached + written
+        completion = _value(usage, 'output_tokens')
+    else:
+        details = usage.get('prompt_tokens_details') if isinstance(usage, dict) else getattr(usage, 'prompt_tokens_details', None)
+        cached = _value(details, 'cached_tokens')
+        written = 0
+        prompt = _value(usage, 'prompt_tokens')
+        completion = _value(usage, 'completion_tokens')
+    return {
+        'prompt_tokens': prompt,
+        'cached_tokens': cached,
+        'cache_write_tokens': written,
+        'completion_tokens': completion
+    }
+
+
+def get_model_pricing(model):
+    """Return the price entry for a model, or None for unknown models"""
+    matches = [name for name in MODEL_PRICING if model and model.startswith(name)]
+    return MODEL_PRICING[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model, tokens, batch=False):
+    """Estimate the USD cost of one call from its normalized token counts"""
+    pricing = get_model_pricing(model)
+    if pricing is None:
+        return 0.0
+    uncached = tokens['prompt_tokens'] - tokens['cached_tokens'] - tokens['cache_write_tokens']
+    cost = (max(uncached, 0) * pricing['input']
+            + tokens['cached_tokens'] * pricing['cached_input']
+            + tokens['cache_write_tokens'] * pricing['cache_write']
+            + tokens['completion_tokens'] * pricing['output']) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+class UsageTracker:
+    """Collects token usage of every LLM call made while it is the active tracker"""
+
+    def __init__(self, job_type, source, job_id=None):
+        self.job_id = job_id or f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.job_type = job_type
+        self.source = source
+        self.started_at = datetime.datetime.now().isoformat(timespec='seconds')
+        self._lock = threading.Lock()
+        self.records = []
+
+    def add(self, provider, model, tokens, batch=False, **labels):
+        record = dict(tokens, provider=provider, model=model, batch=batch,
+                      cost=estimate_cost(model, tokens, batch), **labels)
+        with self._lock:
+            self.records.append(record)
+
+    def totals(self, records=None):
+        with self._lock:
+            records = list(self.records) if records is None else records
+        totals = {'calls': len(records), 'prompt_tokens': 0, 'cached_tokens': 0, 'cache_write_tokens': 0,
+                  'completion_tokens': 0, 'cost': 0.0}
+        for record in records:
+            for key in ['prompt_tokens', 'cached_tokens', 'cache_write_tokens', 'completion_tokens', 'cost']:
+                totals[key] += record[key]
+        return totals
+
+    def rollup(self, key):
+        """Totals grouped by a record label such as locale, item or field"""
+        with self._lock:
+            records = list(self.records)
+        groups = {}
+        for record in records:
+            groups.setdefault(str(record.get(key) or '-'), []).append(record)
+        return {group: self.totals(group_records) for group, group_records in sorted(groups.items())}
+
+    def to_report(self):
+        return {
+            'job_id': self.job_id,
+            'job_type': self.job_type,
+            'source': self.source,
+            'started_at': self.started_at,
+            'finished_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'totals': self.totals(),
+            'rollups': {key: self.rollup(key) for key in ROLLUP_KEYS}
+        }
+
+    def save(self):
+        """Persist the job's usage report and return it"""
+        report = self.to_report()
+        os.makedirs(USAGE_REPORTS_DIR, exist_ok=True)
+        with open(os.path.join(USAGE_REPORTS_DIR, f"{self.job_id}.json"), 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"Usage report {self.job_id}: {format_usage_totals(report['totals'])}")
+        return report
+
+
+@contextmanager
+def track_usage(tracker):
+    """Make tracker the destination of usage recorded in this context
+
+    Passing None keeps whatever tracker is already active.
+    """
+    if tracker is None:
+        yield _current_tracker.get()
+        return
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@contextmanager
+def usage_labels(**labels):
+    """Attach labels (item, field, locale) to usage recorded in this context"""
+    token = _current_labels.set(dict(_current_labels.get(), **labels))
+    try:
+        yield
+    finally:
+        _current_labels.reset(token)
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """Submit to an executor so the worker sees the caller's tracker and labels"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def record_usage(provider, model, tokens, batch=False, **labels):
+    """Add one call's normalized tokens to the active tracker, if any"""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        labels = {key: value for key, value in labels.items() if value is not None}
+        tracker.add(provider, model, tokens, batch=batch, **dict(_current_labels.get(), **labels))
+
+
+def list_reports():
+    """Load every saved usage report, newest first"""
+    if not os.path.isdir(USAGE_REPORTS_DIR):
+        return []
+    reports = []
+    for name in os.listdir(USAGE_REPORTS_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(USAGE_REPORTS_DIR, name)) as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(reports, key=lambda report: report.get('started_at', ''), reverse=True)
+
+
+def format_usage_totals(totals):
+    """Format usage totals for display"""
+    return (f"{totals['calls']} LLM calls, {totals['prompt_tokens']:,} prompt tokens "
+            f"({totals['cached_tokens']:,} cached), {totals['completion_tokens']:,} completion tokens, "
+            f"estimated ${totals['cost']:.4f}")
@@ -1,16 +1,46 @@
+import logging
+import os
+import time
+
 import requests
 import streamlit as st
 
+from concurrency import call_with_limit
+from logs import log_event
+from metrics import observe
+
+logger = logging.getLogger(__name__)
+
+# Overridable so the app and benchmarks can run against a local mock server
+WEBFLOW_API_BASE = os.environ.get("WEBFLOW_API_BASE", "https://api.webflow.com/v2").rstrip("/")
+
+
+def webflow_request(method, url, **kwargs):
+    """Send a Webflow API request through the adaptive Webflow concurrency limiter
+
+    Reads are recorded as the "fetch" stage and writes as "webflow_update".
+    """
+    stage = 'fetch' if method.upper() == 'GET' else 'webflow_update'
+    start_time = time.perf_counter()
+    error = True
+    try:
+        response = call_with_limit('webflow', requests.request, method, url, **kwargs)
+        error = response.status_code >= 400
+        return response
+    finally:
+        observe(stage, time.perf_counter() - start_time, error=error, method=method.upper())
+
+
 def get_site_locales(site_id, api_key):
     """Get list of locales with their IDs"""
-    url = f"https://api.webflow.com/v2/sites/{site_id}"
+    url = f"{WEBFLOW_API_BASE}/sites/{site_id}"
     headers = {
         "accept": "application/json",
         "authorization": f"Bearer {api_key}"
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = webflow_request("GET", url, headers=headers)
         response.raise_for_status()
         data = response.json()
         
@@ -29,6 +59,6 @@ def get_site_locales(site_id, api_key):
             
         return locales
     except Exception as e:
-        print(f"\nERROR: {str(e)}")
+        log_event(logger, logging.ERROR, "fetch site locales failed", site_id=site_id, error=str(e))
         st.error(f"Error fetching site locales: {str(e)}")
         return []